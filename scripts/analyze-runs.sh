@@ -11,14 +11,19 @@
 #   ./scripts/analyze-runs.sh --json             # Machine-readable JSON
 #   ./scripts/analyze-runs.sh --since 2026-02-11 # Filter by date (YYYY-MM-DD)
 #
+# Records are streamed through jq in one pass, so memory does not grow with
+# the number of runs (beyond a small per-bead index of result fields).
+#
+# Env: RUNS_DIR, RESULTS_DIR (default: state/runs, state/results)
+#
 # Dependencies: jq (required)
 
 set -euo pipefail
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 WORKSPACE_ROOT="$(dirname "$SCRIPT_DIR")"
-RUNS_DIR="$WORKSPACE_ROOT/state/runs"
-RESULTS_DIR="$WORKSPACE_ROOT/state/results"
+RUNS_DIR="${RUNS_DIR:-$WORKSPACE_ROOT/state/runs}"
+RESULTS_DIR="${RESULTS_DIR:-$WORKSPACE_ROOT/state/results}"
 
 # Options
 OUTPUT_JSON=false
@@ -49,130 +54,58 @@ if ! command -v jq &> /dev/null; then
   exit 1
 fi
 
-collect_json_records() {
+# Concatenated contents of every record file in <dir>, in `find` order.
+# find -exec batches the file list, so no single argv holds all the paths.
+stream_json_records() {
   local dir="$1"
-  [[ -d "$dir" ]] || { echo "[]"; return 0; }
-  local -a files=()
-  mapfile -t files < <(find "$dir" -name "*.json" -type f)
-  if [[ ${#files[@]} -eq 0 ]]; then
-    echo "[]"
-    return 0
-  fi
-  jq -s '.' "${files[@]}"
+  [[ -d "$dir" ]] || return 0
+  find "$dir" -name "*.json" -type f -exec cat {} +
 }
 
-# Collect all run and result records
-runs="$(collect_json_records "$RUNS_DIR")"
-results="$(collect_json_records "$RESULTS_DIR")"
+WORK_DIR="$(mktemp -d)"
+trap 'rm -rf "$WORK_DIR"' EXIT
 
-# Merge runs and results by bead ID
-merged=$(jq -n \
-  --argjson runs "$runs" \
-  --argjson results "$results" \
-  '
-  # Index results by bead
-  ($results | map({(.bead): .}) | add) as $results_map |
+# Index results by bead. Only the three fields the report reads are kept, and
+# the index goes to a file rather than argv.
+stream_json_records "$RESULTS_DIR" | jq -cn '
+  reduce inputs as $result ({};
+    .[$result.bead] = {status: $result.status, finished_at: $result.finished_at, reason: $result.reason}
+  )
+' > "$WORK_DIR/results-index.json"
 
-  # Merge each run with its result
-  $runs | map(
+# One pass over the run records: merge each run with its result, apply the
+# date filter, and fold it into running totals. Memory stays proportional to
+# the number of distinct agents/models/templates/reasons, not runs. With
+# --json the merged records are also written out one per line for raw_data.
+# The last output line is the statistics object.
+# Note: Some legacy records have placeholder timestamp "'$START'" (literal string with quotes)
+stream_json_records "$RUNS_DIR" | jq -cn \
+  --slurpfile index "$WORK_DIR/results-index.json" \
+  --arg since "$SINCE_DATE" \
+  --arg placeholder "'\$START'" \
+  --argjson emit_raw "$OUTPUT_JSON" '
+  ($index[0] | if length == 0 then null else . end) as $results_map |
+
+  def merged:
     . as $run |
     ($results_map[$run.bead] // {}) as $result |
     $run + {
       result_status: ($result.status // null),
       result_finished_at: ($result.finished_at // null),
       result_reason: ($result.reason // null)
-    }
-  )
-  ')
-
-# Apply date filter if specified
-if [[ -n "$SINCE_DATE" ]]; then
-  merged=$(echo "$merged" | jq --arg since "$SINCE_DATE" '
-    map(select(
-      .started_at >= $since or
-      (.result_finished_at // .started_at) >= $since
-    ))
-  ')
-fi
+    };
 
-# Calculate statistics
-# Note: Some legacy records have placeholder timestamp "'$START'" (literal string with quotes)
-stats=$(echo "$merged" | jq --arg placeholder "'\$START'" '
-  # Basic counts
-  length as $total |
+  def in_window:
+    $since == "" or
+    .started_at >= $since or
+    (.result_finished_at // .started_at) >= $since;
 
-  # Status counts
-  (map(select(.result_status == "done")) | length) as $success |
-  (map(select(.result_status == "failed")) | length) as $failed |
-  (map(select(.result_status == "timeout")) | length) as $timeout |
-  (map(select(.result_status == null or .result_status == "running")) | length) as $running |
-
-  # Success rate
-  (if $total > 0 then ($success / $total * 100) else 0 end) as $success_rate |
-
-  # Retry analysis
-  (map(select(.attempt > 1)) | length) as $retries |
-  (if $total > 0 then ($retries / $total * 100) else 0 end) as $retry_rate |
-
-  # Duration calculations (only for completed tasks with valid timestamps)
-  (map(
+  # Duration of a finished run with valid timestamps; empty otherwise.
+  def duration:
     select(.result_finished_at and .started_at and .started_at != $placeholder) |
-    ((.result_finished_at | fromdateiso8601) - (.started_at | fromdateiso8601))
-  )) as $durations |
-
-  (if ($durations | length) > 0 then
-    ($durations | add / length)
-  else 0 end) as $avg_duration |
-
-  # Agent type breakdown
-  (group_by(.agent) | map({
-    agent: .[0].agent,
-    count: length,
-    success: (map(select(.result_status == "done")) | length),
-    failed: (map(select(.result_status == "failed")) | length),
-    avg_duration: (
-      [.[] |
-       select(.result_finished_at and .started_at and .started_at != $placeholder) |
-       ((.result_finished_at | fromdateiso8601) - (.started_at | fromdateiso8601))
-      ] as $agent_durations |
-      if ($agent_durations | length) > 0 then
-        ($agent_durations | add / length)
-      else 0 end
-    )
-  })) as $by_agent |
-
-  # Model breakdown
-  (group_by(.model) | map({
-    model: .[0].model,
-    count: length,
-    success: (map(select(.result_status == "done")) | length)
-  })) as $by_model |
-
-  # Template breakdown
-  (group_by(.template_name // "custom") | map({
-    template: (.[0].template_name // "custom"),
-    count: length,
-    success: (map(select(.result_status == "done")) | length),
-    avg_duration: (
-      [.[] |
-       select(.result_finished_at and .started_at and .started_at != $placeholder) |
-       ((.result_finished_at | fromdateiso8601) - (.started_at | fromdateiso8601))
-      ] as $template_durations |
-      if ($template_durations | length) > 0 then
-        ($template_durations | add / length)
-      else 0 end
-    )
-  })) as $by_template |
-
-  # Failure reasons
-  (map(select(.result_status == "failed" and .result_reason)) |
-   group_by(.result_reason) |
-   map({reason: .[0].result_reason, count: length}) |
-   sort_by(-.count)
-  ) as $failure_reasons |
-
-  # Task patterns (extract from prompt)
-  (map(
+    ((.result_finished_at | fromdateiso8601) - (.started_at | fromdateiso8601));
+
+  def task_type:
     .prompt as $p |
     if ($p | test("^Build ")) then "build"
     elif ($p | test("^Fix ")) then "fix"
@@ -181,29 +114,70 @@ stats=$(echo "$merged" | jq --arg placeholder "'\$START'" '
     elif ($p | test("^Design ")) then "design"
     elif ($p | test("^Implement ")) then "implement"
     else "other"
+    end;
+
+  def bump($field; $key; $record; $duration):
+    .[$field][$key | tojson] |= (
+      (. // {key: $key, count: 0, success: 0, failed: 0, duration_sum: 0, duration_count: 0}) |
+      .count += 1 |
+      .success += (if $record.result_status == "done" then 1 else 0 end) |
+      .failed += (if $record.result_status == "failed" then 1 else 0 end) |
+      if $duration == null then . else (.duration_sum += $duration | .duration_count += 1) end
+    );
+
+  def groups($field): [.[$field][]] | sort_by(.key);
+
+  def avg: if .duration_count > 0 then .duration_sum / .duration_count else 0 end;
+
+  def finish:
+    .total as $total |
+    {
+      total_runs: $total,
+      success: .success,
+      failed: .failed,
+      timeout: .timeout,
+      running: .running,
+      success_rate: (if $total > 0 then (.success / $total * 100) else 0 end),
+      retry_count: .retries,
+      retry_rate: (if $total > 0 then (.retries / $total * 100) else 0 end),
+      avg_duration_seconds: (if .duration_count > 0 then .duration_sum / .duration_count else 0 end),
+      by_agent: (groups("agent") | map({agent: .key, count, success, failed, avg_duration: avg})),
+      by_model: (groups("model") | map({model: .key, count, success})),
+      by_template: (groups("template") | map({template: .key, count, success, avg_duration: avg})),
+      failure_reasons: (groups("reason") | map({reason: .key, count}) | sort_by(-.count)),
+      task_types: (groups("task_type") | map({task_type: .key, count}))
+    };
+
+  foreach ((inputs | merged | select(in_window)), null) as $record (
+    {total: 0, success: 0, failed: 0, timeout: 0, running: 0, retries: 0,
+     duration_sum: 0, duration_count: 0,
+     agent: {}, model: {}, template: {}, reason: {}, task_type: {}};
+
+    if $record == null then . else
+      ([$record | duration][0]) as $duration |
+      .total += 1 |
+      .success += (if $record.result_status == "done" then 1 else 0 end) |
+      .failed += (if $record.result_status == "failed" then 1 else 0 end) |
+      .timeout += (if $record.result_status == "timeout" then 1 else 0 end) |
+      .running += (if $record.result_status == null or $record.result_status == "running" then 1 else 0 end) |
+      .retries += (if $record.attempt > 1 then 1 else 0 end) |
+      (if $duration == null then . else (.duration_sum += $duration | .duration_count += 1) end) |
+      bump("agent"; $record.agent; $record; $duration) |
+      bump("model"; $record.model; $record; null) |
+      bump("template"; ($record.template_name // "custom"); $record; $duration) |
+      (if $record.result_status == "failed" and $record.result_reason
+       then bump("reason"; $record.result_reason; $record; null) else . end) |
+      bump("task_type"; ($record | task_type); $record; null)
+    end;
+
+    if $record == null then finish
+    elif $emit_raw then $record
+    else empty
     end
-  ) | group_by(.) | map({
-    task_type: .[0],
-    count: length
-  })) as $task_types |
-
-  {
-    total_runs: $total,
-    success: $success,
-    failed: $failed,
-    timeout: $timeout,
-    running: $running,
-    success_rate: $success_rate,
-    retry_count: $retries,
-    retry_rate: $retry_rate,
-    avg_duration_seconds: $avg_duration,
-    by_agent: $by_agent,
-    by_model: $by_model,
-    by_template: $by_template,
-    failure_reasons: $failure_reasons,
-    task_types: $task_types
-  }
-')
+  )
+' > "$WORK_DIR/merged.jsonl"
+
+stats="$(tail -n 1 "$WORK_DIR/merged.jsonl")"
 
 # Generate recommendations (as JSON array)
 # Build recommendations by checking metrics against thresholds
@@ -246,18 +220,33 @@ fi
 
 # Output results
 if $OUTPUT_JSON; then
-  # Machine-readable JSON output
-  jq -n \
+  # Machine-readable JSON output. raw_data is spliced in from the merged
+  # records file one record at a time, printed exactly as jq would print it
+  # inside the envelope (four-space indent, comma-separated).
+  envelope="$(jq -n \
     --argjson stats "$stats" \
     --argjson recs "$recommendations" \
-    --argjson data "$merged" \
     '{
       generated_at: (now | strftime("%Y-%m-%dT%H:%M:%SZ")),
       filter: {since: $ENV.SINCE_DATE},
       statistics: $stats,
       recommendations: $recs,
-      raw_data: $data
-    }'
+      raw_data: []
+    }')"
+  if [[ "$(wc -l < "$WORK_DIR/merged.jsonl")" -le 1 ]]; then
+    echo "$envelope"
+  else
+    head -n -2 <<<"$envelope"
+    echo '  "raw_data": ['
+    head -n -1 "$WORK_DIR/merged.jsonl" | jq '.' | awk '
+      /^[{[]/ && NR > 1 { print "    " previous ","; previous = $0; next }
+      NR > 1 { print "    " previous }
+      { previous = $0 }
+      END { print "    " previous }
+    '
+    echo '  ]'
+    echo '}'
+  fi
 else
   # Human-readable report
   echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
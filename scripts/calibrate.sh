@@ -16,8 +16,19 @@ if [[ -v CALIBRATION_DIR ]]; then
 else
     CALIBRATION_DIR="$WORKSPACE_ROOT/state/calibration"
 fi
+if [[ -v CALIBRATION_CACHE ]]; then
+    CALIBRATION_CACHE="${CALIBRATION_CACHE:?CALIBRATION_CACHE cannot be empty}"
+else
+    CALIBRATION_CACHE="$(dirname "$CALIBRATION_DIR")/calibration-stats.json"
+fi
 SCHEMA_FILE="$WORKSPACE_ROOT/state/schemas/calibration.schema.json"
 
+# A template/agent is a rejection pattern when the lower bound of the Wilson
+# interval for its reject rate is above this (i.e. the rate is above it with
+# ~95% confidence, not just in the sample).
+CALIBRATION_REJECT_THRESHOLD="${CALIBRATION_REJECT_THRESHOLD:-0.4}"
+CALIBRATION_MIN_JUDGMENTS="${CALIBRATION_MIN_JUDGMENTS:-3}"
+
 usage() {
     cat << EOF
 Usage: calibrate.sh <command> [options]
@@ -32,7 +43,7 @@ Commands:
   export --json
       Export all calibration data as JSON
 
-  patterns
+  patterns [--json]
       Identify statistically significant patterns
 
 Options:
@@ -65,12 +76,82 @@ has_calibration_files() {
     (( ${#files[@]} > 0 ))
 }
 
-unique_calibration_field_values() {
-    local jq_filter="$1"
-    local -a files=()
-    mapfile -t files < <(list_calibration_files)
-    (( ${#files[@]} > 0 )) || return 0
-    jq -r "$jq_filter" "${files[@]}" | sort -u
+# One jq pass over every calibration record: accept/reject counts overall and
+# per template/agent/model, each with a 95% Wilson interval for the reject
+# rate, plus the rejection patterns those intervals support.
+CALIBRATION_AGGREGATE_JQ='
+def wilson($k; $n):
+    if $n == 0 then {low: 0, high: 0} else
+        1.96 as $z |
+        ($k / $n) as $p |
+        (1 + $z * $z / $n) as $denominator |
+        (($p + $z * $z / (2 * $n)) / $denominator) as $center |
+        ($z * ((($p * (1 - $p) / $n) + ($z * $z / (4 * $n * $n))) | sqrt) / $denominator) as $margin |
+        {low: ([0, $center - $margin] | max), high: ([1, $center + $margin] | min)}
+    end;
+
+def tally($records):
+    ($records | length) as $total |
+    ([$records[] | select(.decision == "accept")] | length) as $accepts |
+    ([$records[] | select(.decision == "reject")] | length) as $rejects |
+    wilson($rejects; $total) as $ci |
+    {
+        total: $total,
+        accepts: $accepts,
+        rejects: $rejects,
+        accept_rate: (if $total > 0 then $accepts / $total else 0 end),
+        reject_rate: (if $total > 0 then $rejects / $total else 0 end),
+        reject_ci_low: $ci.low,
+        reject_ci_high: $ci.high
+    };
+
+def breakdown(key):
+    group_by(key) | map({key: (.[0] | key), value: tally(.)}) | from_entries;
+
+def patterns($dimension; $threshold; $min):
+    to_entries[]
+    | select(.value.total >= $min and .value.reject_ci_low > $threshold)
+    | {dimension: $dimension, key: .key} + .value;
+
+[inputs | select(type == "object")] as $records |
+tally($records) + {
+    generated_at: (now | strftime("%Y-%m-%dT%H:%M:%SZ")),
+    threshold: $threshold,
+    min_judgments: $min,
+    by_template: ($records | breakdown(.run_context.template_name // "null" | tostring)),
+    by_agent: ($records | breakdown(.run_context.agent | tostring)),
+    by_model: ($records | breakdown(.run_context.model | tostring))
+} | .patterns = [
+    (.by_template | patterns("template"; $threshold; $min)),
+    (.by_agent | patterns("agent"; $threshold; $min))
+]'
+
+# Recompute the aggregate from state/calibration and cache it. The cache is
+# dropped by record_calibration and ignored once the directory is newer.
+build_calibration_aggregate() {
+    local tmp
+    mkdir -p "$(dirname "$CALIBRATION_CACHE")"
+    tmp="$(mktemp "${CALIBRATION_CACHE}.tmp.XXXXXX")"
+    if ! find "$CALIBRATION_DIR" -maxdepth 1 -type f -name '*.json' -exec cat {} + \
+        | jq -cn --argjson threshold "$CALIBRATION_REJECT_THRESHOLD" \
+            --argjson min "$CALIBRATION_MIN_JUDGMENTS" "$CALIBRATION_AGGREGATE_JQ" > "$tmp"; then
+        rm -f "$tmp"
+        echo "Error: failed to aggregate calibration records in $CALIBRATION_DIR" >&2
+        return 1
+    fi
+    mv "$tmp" "$CALIBRATION_CACHE"
+}
+
+calibration_aggregate_is_current() {
+    [[ -f "$CALIBRATION_CACHE" ]] && ! [[ "$CALIBRATION_DIR" -nt "$CALIBRATION_CACHE" ]] \
+        && jq -e --argjson threshold "$CALIBRATION_REJECT_THRESHOLD" --argjson min "$CALIBRATION_MIN_JUDGMENTS" \
+            '.threshold == $threshold and .min_judgments == $min' "$CALIBRATION_CACHE" >/dev/null 2>&1
+}
+
+# Print the aggregate, rebuilding the cache first when it is stale.
+load_calibration_aggregate() {
+    calibration_aggregate_is_current || build_calibration_aggregate || return 1
+    cat "$CALIBRATION_CACHE"
 }
 
 record_calibration() {
@@ -139,6 +220,7 @@ record_calibration() {
 
     # Atomic write
     mv "$tmp_file" "$cal_file"
+    rm -f "$CALIBRATION_CACHE"
 
     echo "Recorded: $bead_id → $decision"
     if [[ -n "$reason" ]]; then
@@ -152,129 +234,26 @@ show_stats() {
         return 0
     fi
 
-    # Count total accepts/rejects
-    local total=0 accepts=0 rejects=0
-
-    for cal_file in "$CALIBRATION_DIR"/*.json; do
-        [[ -f "$cal_file" ]] || continue
-        total=$((total + 1))
-
-        decision=$(jq -r '.decision' "$cal_file")
-        if [[ "$decision" == "accept" ]]; then
-            accepts=$((accepts + 1))
-        elif [[ "$decision" == "reject" ]]; then
-            rejects=$((rejects + 1))
-        fi
-    done
-
-    local accept_rate=0
-    if [[ $total -gt 0 ]]; then
-        accept_rate=$(awk "BEGIN {printf \"%.1f\", ($accepts / $total) * 100}")
-    fi
-
-    echo "=== Calibration Statistics ==="
-    echo "Total judgments: $total"
-    echo "Accepts: $accepts ($accept_rate%)"
-    echo "Rejects: $rejects"
-    echo ""
-
-    # By template
-    echo "--- By Template ---"
-    local templates
-    templates="$(unique_calibration_field_values '.run_context.template_name // "null"')"
-
-    for template in $templates; do
-        local t_total=0 t_accepts=0 t_rejects=0
-
-        for cal_file in "$CALIBRATION_DIR"/*.json; do
-            [[ -f "$cal_file" ]] || continue
-
-            local cal_template
-            cal_template=$(jq -r '.run_context.template_name // "null"' "$cal_file")
-            if [[ "$cal_template" == "$template" ]]; then
-                t_total=$((t_total + 1))
-                decision=$(jq -r '.decision' "$cal_file")
-                if [[ "$decision" == "accept" ]]; then
-                    t_accepts=$((t_accepts + 1))
-                else
-                    t_rejects=$((t_rejects + 1))
-                fi
-            fi
-        done
-
-        local t_accept_rate=0
-        if [[ $t_total -gt 0 ]]; then
-            t_accept_rate=$(awk "BEGIN {printf \"%.1f\", ($t_accepts / $t_total) * 100}")
-        fi
-
-        echo "  $template: $t_accepts/$t_total ($t_accept_rate%)"
-    done
-
-    # By agent
-    echo ""
-    echo "--- By Agent ---"
-    local agents
-    agents="$(unique_calibration_field_values '.run_context.agent')"
-
-    for agent in $agents; do
-        local a_total=0 a_accepts=0 a_rejects=0
-
-        for cal_file in "$CALIBRATION_DIR"/*.json; do
-            [[ -f "$cal_file" ]] || continue
-
-            local cal_agent
-            cal_agent=$(jq -r '.run_context.agent' "$cal_file")
-            if [[ "$cal_agent" == "$agent" ]]; then
-                a_total=$((a_total + 1))
-                decision=$(jq -r '.decision' "$cal_file")
-                if [[ "$decision" == "accept" ]]; then
-                    a_accepts=$((a_accepts + 1))
-                else
-                    a_rejects=$((a_rejects + 1))
-                fi
-            fi
-        done
-
-        local a_accept_rate=0
-        if [[ $a_total -gt 0 ]]; then
-            a_accept_rate=$(awk "BEGIN {printf \"%.1f\", ($a_accepts / $a_total) * 100}")
-        fi
-
-        echo "  $agent: $a_accepts/$a_total ($a_accept_rate%)"
-    done
-
-    # By model
-    echo ""
-    echo "--- By Model ---"
-    local models
-    models="$(unique_calibration_field_values '.run_context.model')"
-
-    for model in $models; do
-        local m_total=0 m_accepts=0 m_rejects=0
-
-        for cal_file in "$CALIBRATION_DIR"/*.json; do
-            [[ -f "$cal_file" ]] || continue
-
-            local cal_model
-            cal_model=$(jq -r '.run_context.model' "$cal_file")
-            if [[ "$cal_model" == "$model" ]]; then
-                m_total=$((m_total + 1))
-                decision=$(jq -r '.decision' "$cal_file")
-                if [[ "$decision" == "accept" ]]; then
-                    m_accepts=$((m_accepts + 1))
-                else
-                    m_rejects=$((m_rejects + 1))
-                fi
-            fi
-        done
-
-        local m_accept_rate=0
-        if [[ $m_total -gt 0 ]]; then
-            m_accept_rate=$(awk "BEGIN {printf \"%.1f\", ($m_accepts / $m_total) * 100}")
-        fi
-
-        echo "  $model: $m_accepts/$m_total ($m_accept_rate%)"
-    done
+    local aggregate
+    aggregate="$(load_calibration_aggregate)" || return 1
+
+    jq -r '
+        def rows($title; $group):
+            "", "--- By \($title) ---",
+            ($group | to_entries[] | ["row", .key, .value.accepts, .value.total, .value.accept_rate,
+                1 - .value.reject_ci_high, 1 - .value.reject_ci_low] | @tsv);
+        "=== Calibration Statistics ===",
+        "Total judgments: \(.total)",
+        (["accepts", .accepts, .accept_rate] | @tsv),
+        "Rejects: \(.rejects)",
+        rows("Template"; .by_template),
+        rows("Agent"; .by_agent),
+        rows("Model"; .by_model)
+    ' <<<"$aggregate" | awk -F'\t' '
+        $1 == "accepts" { printf "Accepts: %d (%.1f%%)\n", $2, $3 * 100; next }
+        $1 == "row" { printf "  %s: %d/%d (%.1f%%, 95%% CI %.1f-%.1f%%)\n", $2, $3, $4, $5 * 100, $6 * 100, $7 * 100; next }
+        { print }
+    '
 }
 
 export_json() {
@@ -292,83 +271,38 @@ export_json() {
 }
 
 identify_patterns() {
+    local output_json=false aggregate
+    [[ "${1:-}" == "--json" ]] && output_json=true
+
     if ! has_calibration_files; then
-        echo "No calibration data yet."
+        if [[ "$output_json" == "true" ]]; then
+            echo '{"total": 0, "by_template": {}, "by_agent": {}, "by_model": {}, "patterns": []}'
+        else
+            echo "No calibration data yet."
+        fi
+        return 0
+    fi
+
+    aggregate="$(load_calibration_aggregate)" || return 1
+    if [[ "$output_json" == "true" ]]; then
+        jq '.' <<<"$aggregate"
         return 0
     fi
 
     echo "=== Calibration Patterns ==="
     echo ""
-
-    local found_patterns=0
-
-    # Check templates with >3 judgments and reject rate >40%
-    local templates
-    templates="$(unique_calibration_field_values '.run_context.template_name // "null"')"
-
-    for template in $templates; do
-        local t_total=0 t_rejects=0
-
-        for cal_file in "$CALIBRATION_DIR"/*.json; do
-            [[ -f "$cal_file" ]] || continue
-
-            local cal_template
-            cal_template=$(jq -r '.run_context.template_name // "null"' "$cal_file")
-            if [[ "$cal_template" == "$template" ]]; then
-                t_total=$((t_total + 1))
-                decision=$(jq -r '.decision' "$cal_file")
-                if [[ "$decision" == "reject" ]]; then
-                    t_rejects=$((t_rejects + 1))
-                fi
-            fi
-        done
-
-        if [[ $t_total -ge 3 ]]; then
-            local reject_rate
-            reject_rate=$(awk "BEGIN {print ($t_rejects / $t_total) * 100}")
-            if awk "BEGIN {exit !($reject_rate > 40)}"; then
-                echo "⚠ Template '$template': $t_rejects/$t_total rejections (${reject_rate}%)"
-                echo "   Recommendation: Revise template or avoid for this task type"
-                found_patterns=$((found_patterns + 1))
-            fi
-        fi
-    done
-
-    # Check agents with >3 judgments and reject rate >40%
-    local agents
-    agents="$(unique_calibration_field_values '.run_context.agent')"
-
-    for agent in $agents; do
-        local a_total=0 a_rejects=0
-
-        for cal_file in "$CALIBRATION_DIR"/*.json; do
-            [[ -f "$cal_file" ]] || continue
-
-            local cal_agent
-            cal_agent=$(jq -r '.run_context.agent' "$cal_file")
-            if [[ "$cal_agent" == "$agent" ]]; then
-                a_total=$((a_total + 1))
-                decision=$(jq -r '.decision' "$cal_file")
-                if [[ "$decision" == "reject" ]]; then
-                    a_rejects=$((a_rejects + 1))
-                fi
-            fi
-        done
-
-        if [[ $a_total -ge 3 ]]; then
-            local reject_rate
-            reject_rate=$(awk "BEGIN {print ($a_rejects / $a_total) * 100}")
-            if awk "BEGIN {exit !($reject_rate > 40)}"; then
-                echo "⚠ Agent '$agent': $a_rejects/$a_total rejections (${reject_rate}%)"
-                echo "   Recommendation: Review agent configuration or prompt templates"
-                found_patterns=$((found_patterns + 1))
-            fi
-        fi
-    done
-
-    if [[ $found_patterns -eq 0 ]]; then
-        echo "No significant patterns detected yet (need 3+ judgments with >40% reject rate)"
-    fi
+    jq -r '
+        if (.patterns | length) == 0 then
+            "No significant patterns detected yet (need \(.min_judgments)+ judgments with a reject rate above \(.threshold * 100)% at 95% confidence)"
+        else
+            .patterns[] |
+            (if .dimension == "template" then "Template" else "Agent" end) as $kind |
+            "⚠ \($kind) \u0027\(.key)\u0027: \(.rejects)/\(.total) rejections (\(.reject_rate * 100 | floor)%, 95% CI \(.reject_ci_low * 100 | floor)-\(.reject_ci_high * 100 | ceil)%)",
+            (if .dimension == "template"
+             then "   Recommendation: Revise template or avoid for this task type"
+             else "   Recommendation: Review agent configuration or prompt templates" end)
+        end
+    ' <<<"$aggregate"
 }
 
 # Main command dispatcher
@@ -400,7 +334,7 @@ case "$command" in
         fi
         ;;
     patterns)
-        identify_patterns
+        identify_patterns "$@"
         ;;
     *)
         echo "Error: unknown command: $command" >&2
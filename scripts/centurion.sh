@@ -2,12 +2,17 @@
 # centurion.sh — Merge a branch to main with quality-gated checks
 #
 # Usage:
-#   centurion.sh merge [--level quick|standard|deep] [--dry-run] [--verbose|--quiet] <branch> <repo-path>
+#   centurion.sh merge [--level quick|standard|deep] [--dry-run] [--fresh-review] [--verbose|--quiet] <branch> <repo-path>
 #                                           Merge branch into main (quality-gated)
 #   centurion.sh status [--verbose|--quiet] [repo-path]  Show branch/merge status
 #   centurion.sh history [--limit N] [--verbose|--quiet] Show recent centurion run history
-#   centurion.sh check [--level quick|standard|deep] [--verbose|--quiet] [repo-path]
+#   centurion.sh check [--level quick|standard|deep] [--fresh-review] [--verbose|--quiet] [repo-path]
 #                                           Run quality checks without merging (pre-commit friendly)
+#                                           --fresh-review: ignore cached deep semantic review verdicts
+#   centurion.sh queue add [--level L] <branch> <repo-path>   Enqueue a branch (starts a worker)
+#   centurion.sh queue run [--batch N] <repo-path>            Merge queued branches in batches
+#   centurion.sh queue status [--json] <repo-path>            Pending branches, worker, throughput
+#   centurion.sh queue remove <branch> <repo-path>            Drop a queued branch
 set -euo pipefail
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
@@ -19,11 +24,17 @@ CENTURION_HISTORY_FILE="${CENTURION_HISTORY_FILE:-$WORKSPACE_ROOT/state/centurio
 source "$SCRIPT_DIR/lib/common.sh"
 source "$SCRIPT_DIR/lib/config.sh"
 source "$SCRIPT_DIR/lib/centurion-log.sh"
+source "$SCRIPT_DIR/lib/centurion-gate-cache.sh"
+source "$SCRIPT_DIR/lib/centurion-lint-plan.sh"
 source "$SCRIPT_DIR/lib/centurion-test-gate.sh"
+source "$SCRIPT_DIR/lib/centurion-gate-runner.sh"
 source "$SCRIPT_DIR/lib/centurion-semantic.sh"
 source "$SCRIPT_DIR/lib/centurion-conflicts.sh"
 source "$SCRIPT_DIR/lib/centurion-senate.sh"
 source "$SCRIPT_DIR/lib/centurion-wake.sh"
+source "$SCRIPT_DIR/lib/centurion-worktree.sh"
+source "$SCRIPT_DIR/lib/centurion-queue.sh"
+source "$SCRIPT_DIR/lib/centurion-queue-worker.sh"
 
 TEST_GATE_LAST_OUTPUT=""
 CENTURION_VERBOSE="${CENTURION_VERBOSE:-false}"
@@ -47,6 +58,7 @@ write_result() {
     mv "$tmp" "$target"
 }
 
+# Fields in CENTURION_HISTORY_EXTRA (a JSON object) are added to the record.
 append_history() {
     local branch="$1" repo_path="$2" quality_level="$3" status="$4" checks="$5" detail="${6:-}"
     local duration_ms="$7"
@@ -60,10 +72,44 @@ append_history() {
         --arg checks "$checks" \
         --arg detail "$detail" \
         --argjson duration_ms "${duration_ms:-0}" \
-        '{timestamp:$ts, branch:$branch, repo:$repo, quality_level:$level, status:$status, checks:$checks, detail:$detail, duration_ms:$duration_ms}' \
+        --argjson gates "${CENTURION_LAST_GATES_JSON:-[]}" \
+        --argjson extra "${CENTURION_HISTORY_EXTRA:-"{}"}" \
+        '{timestamp:$ts, branch:$branch, repo:$repo, quality_level:$level, status:$status, checks:$checks, detail:$detail, duration_ms:$duration_ms, gates:$gates,
+          cache_hits:([$gates[] | select(.status == "cached")] | length),
+          lint_mode:(first($gates[] | select(.name == "lint") | .mode) // null),
+          lint_files:(first($gates[] | select(.name == "lint") | .files) // null)} + $extra' \
         >> "$CENTURION_HISTORY_FILE"
 }
 
+# Per-repo lock shared by `merge` and the queue worker.
+centurion_lock_file() {
+    local repo_path="$1"
+    echo "/tmp/centurion-$(printf '%s' "$repo_path" | sha256sum | cut -c1-12).lock"
+}
+
+# EXIT trap for cmd_merge. Globals, not locals: the trap also fires after
+# cmd_merge has returned normally.
+_CENTURION_LOCK_FILE=""
+_CENTURION_WORKTREE=""
+_CENTURION_WORKTREE_REPO=""
+_centurion_cleanup() {
+    [[ -n "$_CENTURION_LOCK_FILE" ]] && rm -f "$_CENTURION_LOCK_FILE"
+    centurion_worktree_release "$_CENTURION_WORKTREE_REPO" "$_CENTURION_WORKTREE"
+}
+
+# Record a merge rejected for conflicts and exit 1.
+_reject_merge_conflict() {
+    local branch="$1" repo_path="$2" quality_level="$3" conflicts="$4" extra_json="$5" checks="$6" started_epoch="$7"
+    local duration_ms
+    write_result "$branch" "conflict" "$repo_path" "$conflicts" "$quality_level" "$extra_json"
+    notify_wake_gateway "Centurion: merge conflict for $branch (${conflicts//$'\n'/ })"
+    log_error "Merge conflict: $branch -> main"
+    log_error "  Conflicting files: $conflicts"
+    duration_ms="$(( ( $(epoch_now) - started_epoch ) * 1000 ))"
+    append_history "$branch" "$repo_path" "$quality_level" "conflict" "$checks" "$conflicts" "$duration_ms"
+    exit 1
+}
+
 # ── Commands ─────────────────────────────────────────────────────────────────
 
 cmd_merge() {
@@ -103,46 +149,45 @@ cmd_merge() {
         fi
     fi
 
-    # Refuse to merge if working tree is dirty
-    if git -C "$repo_path" status --porcelain 2>/dev/null | grep -q .; then
-        echo "Error: working tree is dirty in $repo_path" >&2
+    # The merge itself happens in a scratch worktree, so agents may keep
+    # working in the repo. Only a checkout that has main checked out gets
+    # fast-forwarded at the end, and that one has to be clean.
+    local main_checkout
+    main_checkout="$(centurion_main_checkout "$repo_path")"
+    if [[ -n "$main_checkout" ]] && git -C "$main_checkout" status --porcelain 2>/dev/null | grep -q .; then
+        echo "Error: working tree is dirty in $main_checkout (main is checked out there)" >&2
         echo "  Commit or stash changes before merging" >&2
-        git -C "$repo_path" status --short >&2
+        git -C "$main_checkout" status --short >&2
         write_result "$branch" "dirty-worktree" "$repo_path" "uncommitted changes present" "$quality_level"
         duration_ms="$(( ( $(epoch_now) - started_epoch ) * 1000 ))"
         append_history "$branch" "$repo_path" "$quality_level" "dirty-worktree" "preflight" "uncommitted changes present" "$duration_ms"
         exit 1
     fi
 
-    # Lock file to prevent concurrent merges to the same repo
-    local lock_file="/tmp/centurion-$(printf '%s' "$repo_path" | sha256sum | cut -c1-12).lock"
-    if [[ -f "$lock_file" ]]; then
-        local lock_pid lock_age
-        lock_pid="$(head -1 "$lock_file" 2>/dev/null)" || lock_pid=""
-        if [[ -n "$lock_pid" ]] && kill -0 "$lock_pid" 2>/dev/null; then
-            echo "Error: another centurion merge is running for $repo_path (PID $lock_pid)" >&2
-            echo "  Lock file: $lock_file" >&2
-            exit 1
+    # Lock file to prevent concurrent merges to the same repo. The queue
+    # worker already holds it while it calls cmd_merge for single branches.
+    local lock_file=""
+    if [[ "${CENTURION_MERGE_LOCK_HELD:-false}" != "true" ]]; then
+        lock_file="$(centurion_lock_file "$repo_path")"
+        if [[ -f "$lock_file" ]]; then
+            local lock_pid lock_age
+            lock_pid="$(head -1 "$lock_file" 2>/dev/null)" || lock_pid=""
+            if [[ -n "$lock_pid" ]] && kill -0 "$lock_pid" 2>/dev/null; then
+                echo "Error: another centurion merge is running for $repo_path (PID $lock_pid)" >&2
+                echo "  Lock file: $lock_file" >&2
+                echo "  Use 'centurion.sh queue add' to merge after it" >&2
+                exit 1
+            fi
+            # Stale lock — remove it
+            log_info "Removing stale lock file (PID $lock_pid no longer running)"
+            rm -f "$lock_file"
         fi
-        # Stale lock — remove it
-        log_info "Removing stale lock file (PID $lock_pid no longer running)"
-        rm -f "$lock_file"
+        echo "$$" > "$lock_file"
     fi
-    echo "$$" > "$lock_file"
-    # Clean up lock on exit
-    local _prev_branch_for_cleanup=""
-    _centurion_cleanup() {
-        [[ -n "${lock_file:-}" ]] && rm -f "$lock_file"
-        if [[ -n "${_prev_branch_for_cleanup:-}" ]]; then
-            git -C "$repo_path" checkout "$_prev_branch_for_cleanup" 2>/dev/null || true
-        fi
-    }
+    _CENTURION_LOCK_FILE="$lock_file"
+    _CENTURION_WORKTREE_REPO="$repo_path"
     trap '_centurion_cleanup' EXIT
 
-    local prev_branch
-    prev_branch="$(git -C "$repo_path" rev-parse --abbrev-ref HEAD)"
-    _prev_branch_for_cleanup="$prev_branch"
-
     # Check if branch is already fully merged into main
     if git -C "$repo_path" merge-base --is-ancestor "$branch" main 2>/dev/null; then
         log_info "Branch $branch is already merged into main — nothing to do"
@@ -152,35 +197,101 @@ cmd_merge() {
         exit 0
     fi
 
-    git -C "$repo_path" checkout main >/dev/null 2>&1
+    # Preflight: predict the merge with git merge-tree, without a checkout.
+    # Conflicts that no trivial strategy resolves go to the Senate right away,
+    # and without a verdict the branch is rejected before any worktree is set
+    # up. Otherwise (or when merge-tree is unavailable) the trial merge below
+    # reproduces what was predicted.
+    local senate_case_file=""
+    if [[ "${CENTURION_MERGE_PREFLIGHT:-true}" == "true" ]]; then
+        local preflight_rc=0
+        merge_preflight "$repo_path" main "$branch" || preflight_rc=$?
+        case "$preflight_rc" in
+            0)
+                log_debug "Preflight: clean merge predicted (tree $(jq -r '.tree[:12]' <<<"$MERGE_PREFLIGHT_LAST_JSON"))"
+                ;;
+            1)
+                local preflight_summary
+                preflight_summary="$(jq -c '{status, tree, conflict_count, auto_resolvable}' <<<"$MERGE_PREFLIGHT_LAST_JSON")"
+                merge_extra_json="$(jq -cn --argjson preflight "$preflight_summary" '{preflight:$preflight}')"
+                if [[ "$(jq -r '.auto_resolvable' <<<"$preflight_summary")" == "true" ]]; then
+                    log_info "Preflight: $(jq -r '.conflict_count' <<<"$preflight_summary") trivially resolvable conflict(s) predicted for $branch"
+                else
+                    local preflight_report preflight_auto preflight_conflicts
+                    preflight_report="$(jq -c '{conflict_count, conflicts: [.conflicts[] | {file, marker_lines, preview, stages, strategy}]}' <<<"$MERGE_PREFLIGHT_LAST_JSON")"
+                    preflight_auto="$(jq -c '[.conflicts[] | select(.strategy != null) | {file, strategy}] as $resolved
+                        | [.conflicts[] | select(.strategy == null) | {file, reason: "no_trivial_strategy"}] as $unresolved
+                        | {resolved_count: ($resolved | length), unresolved_count: ($unresolved | length), resolved: $resolved, unresolved: $unresolved, predicted: true}' \
+                        <<<"$MERGE_PREFLIGHT_LAST_JSON")"
+                    preflight_conflicts="$(jq -r '.conflicts[].file' <<<"$MERGE_PREFLIGHT_LAST_JSON")"
+                    merge_extra_json="$(jq -cn --argjson current "$merge_extra_json" --argjson report "$preflight_report" --argjson auto "$preflight_auto" \
+                        '$current + {conflict_report:$report, auto_resolution:$auto}')"
+                    if senate_case_file="$(escalate_to_senate "$repo_path" "$branch" "merge-conflict-unresolved" "$quality_level" "$preflight_report" "$preflight_auto")"; then
+                        local preflight_case_id
+                        preflight_case_id="$(basename "$senate_case_file" .json)"
+                        merge_extra_json="$(jq -cn \
+                            --argjson current "$merge_extra_json" \
+                            --arg case_id "$preflight_case_id" \
+                            --arg case_file "$senate_case_file" \
+                            '$current + {senate_escalation:{case_id:$case_id, case_file:$case_file, status:"pending"}}')"
+                        notify_wake_gateway "Centurion: escalated conflict for $branch to Senate ($preflight_case_id)"
+                        if ! senate_wait_for_verdict "$preflight_case_id" "${CENTURION_SENATE_WAIT_SECONDS:-0}" >/dev/null; then
+                            merge_extra_json="$(jq -cn --argjson current "$merge_extra_json" '$current + {senate_resolution:{status:"pending"}}')"
+                            _reject_merge_conflict "$branch" "$repo_path" "$quality_level" "$preflight_conflicts" "$merge_extra_json" \
+                                "preflight,conflict-analysis,senate" "$started_epoch"
+                        fi
+                    else
+                        senate_case_file=""
+                        _reject_merge_conflict "$branch" "$repo_path" "$quality_level" "$preflight_conflicts" "$merge_extra_json" \
+                            "preflight,conflict-analysis" "$started_epoch"
+                    fi
+                fi
+                ;;
+            *)
+                log_debug "Preflight: git merge-tree could not predict the merge; using a trial merge"
+                ;;
+        esac
+    fi
+
+    local main_before work_path
+    main_before="$(git -C "$repo_path" rev-parse main)"
+    if ! work_path="$(centurion_worktree_acquire "$repo_path" "$main_before")"; then
+        echo "Error: cannot create a merge worktree for $repo_path" >&2
+        exit 1
+    fi
+    _CENTURION_WORKTREE="$work_path"
+    log_debug "Merging in worktree $work_path (main at ${main_before:0:12})"
 
     # Merge
     local merge_output
-    if ! merge_output="$(git -C "$repo_path" merge --no-ff "$branch" -m "centurion: merge $branch to main" 2>&1)"; then
+    if ! merge_output="$(git -C "$work_path" merge --no-ff "$branch" -m "centurion: merge $branch to main" 2>&1)"; then
         local conflicts conflict_report
-        conflicts="$(git -C "$repo_path" diff --name-only --diff-filter=U 2>/dev/null || echo "unknown")"
-        conflict_report="$(collect_conflict_report "$repo_path")"
-        if auto_resolve_trivial_conflicts "$repo_path"; then
-            merge_extra_json="$(jq -cn --argjson report "$conflict_report" --argjson auto "$AUTO_RESOLUTION_LAST_JSON" \
-                '{conflict_report:$report, auto_resolution:$auto}')"
+        conflicts="$(git -C "$work_path" diff --name-only --diff-filter=U 2>/dev/null || echo "unknown")"
+        conflict_report="$(collect_conflict_report "$work_path")"
+        if auto_resolve_trivial_conflicts "$work_path"; then
+            merge_extra_json="$(jq -cn --argjson current "$merge_extra_json" --argjson report "$conflict_report" --argjson auto "$AUTO_RESOLUTION_LAST_JSON" \
+                '$current + {conflict_report:$report, auto_resolution:$auto}')"
             log_info "Auto-resolved trivial conflicts for $branch"
             notify_wake_gateway "Centurion: auto-resolved trivial conflict(s) for $branch"
         else
-            local senate_case_file=""
             local senate_case_id=""
             local conflict_resolved_via_senate="false"
-            merge_extra_json="$(jq -cn --argjson report "$conflict_report" --argjson auto "$AUTO_RESOLUTION_LAST_JSON" \
-                '{conflict_report:$report, auto_resolution:$auto}')"
-            if senate_case_file="$(escalate_to_senate "$repo_path" "$branch" "merge-conflict-unresolved" "$quality_level" "$conflict_report" "$AUTO_RESOLUTION_LAST_JSON")"; then
+            merge_extra_json="$(jq -cn --argjson current "$merge_extra_json" --argjson report "$conflict_report" --argjson auto "$AUTO_RESOLUTION_LAST_JSON" \
+                '$current + {conflict_report:$report, auto_resolution:$auto}')"
+            # A preflight escalation already opened the Senate case.
+            if [[ -z "$senate_case_file" ]] \
+                && senate_case_file="$(escalate_to_senate "$repo_path" "$branch" "merge-conflict-unresolved" "$quality_level" "$conflict_report" "$AUTO_RESOLUTION_LAST_JSON")"; then
+                notify_wake_gateway "Centurion: escalated conflict for $branch to Senate ($(basename "$senate_case_file" .json))"
+            fi
+            if [[ -n "$senate_case_file" ]]; then
                 senate_case_id="$(basename "$senate_case_file" .json)"
                 merge_extra_json="$(jq -cn \
                     --argjson current "$merge_extra_json" \
                     --arg case_id "$senate_case_id" \
                     --arg case_file "$senate_case_file" \
                     '$current + {senate_escalation:{case_id:$case_id, case_file:$case_file, status:"pending"}}')"
-                notify_wake_gateway "Centurion: escalated conflict for $branch to Senate ($senate_case_id)"
 
-                if resolve_conflict_via_senate "$repo_path" "$senate_case_id"; then
+                if resolve_conflict_via_senate "$work_path" "$senate_case_id"; then
                     conflict_resolved_via_senate="true"
                     merge_extra_json="$(jq -cn \
                         --argjson current "$merge_extra_json" \
@@ -197,24 +308,20 @@ cmd_merge() {
             fi
 
             if [[ "$conflict_resolved_via_senate" != "true" ]]; then
-                write_result "$branch" "conflict" "$repo_path" "$conflicts" "$quality_level" "$merge_extra_json"
-                notify_wake_gateway "Centurion: merge conflict for $branch ($conflicts)"
-                git -C "$repo_path" merge --abort 2>/dev/null || true
-                log_error "Merge conflict: $branch -> main"
-                log_error "  Conflicting files: $conflicts"
-                duration_ms="$(( ( $(epoch_now) - started_epoch ) * 1000 ))"
-                append_history "$branch" "$repo_path" "$quality_level" "conflict" "merge,conflict-analysis,senate" "$conflicts" "$duration_ms"
-                exit 1
+                git -C "$work_path" merge --abort 2>/dev/null || true
+                _reject_merge_conflict "$branch" "$repo_path" "$quality_level" "$conflicts" "$merge_extra_json" \
+                    "merge,conflict-analysis,senate" "$started_epoch"
             fi
         fi
     fi
 
-    # Mechanical quality gate
-    if ! run_quality_gate "$repo_path" "$quality_level"; then
+    # Mechanical quality gate, in the worktree but with the repo's config
+    CENTURION_GATE_WORKTREE="$work_path"
+    CENTURION_GATE_REPO="$repo_path"
+    if ! run_quality_gate "$work_path" "$quality_level" "$main_before" "HEAD"; then
         write_result "$branch" "quality-failed" "$repo_path" "${TEST_GATE_LAST_OUTPUT:0:500}" "$quality_level" "$merge_extra_json"
         notify_wake_gateway "Centurion: quality gate failed for $branch (level=$quality_level)"
-        git -C "$repo_path" reset --hard HEAD~1 >/dev/null
-        log_error "Reverted: quality checks failed after merging $branch"
+        log_error "Rejected: quality checks failed after merging $branch (main unchanged)"
         log_error "  Quality output (last 200 chars): ${TEST_GATE_LAST_OUTPUT:0:200}"
         duration_ms="$(( ( $(epoch_now) - started_epoch ) * 1000 ))"
         append_history "$branch" "$repo_path" "$quality_level" "quality-failed" "${CENTURION_LAST_CHECKS:-quality}" "${TEST_GATE_LAST_OUTPUT:0:200}" "$duration_ms"
@@ -238,8 +345,7 @@ cmd_merge() {
             1)
                 write_result "$branch" "semantic-failed" "$repo_path" "${semantic_detail:0:500}" "$quality_level" "$merge_extra_json"
                 notify_wake_gateway "Centurion: semantic review failed for $branch"
-                git -C "$repo_path" reset --hard HEAD~1 >/dev/null
-                log_error "Reverted: semantic review failed after merging $branch"
+                log_error "Rejected: semantic review failed after merging $branch (main unchanged)"
                 log_error "  Semantic summary: ${SEMANTIC_REVIEW_LAST_SUMMARY:-failed}"
                 duration_ms="$(( ( $(epoch_now) - started_epoch ) * 1000 ))"
                 append_history "$branch" "$repo_path" "$quality_level" "semantic-failed" "${CENTURION_LAST_CHECKS:-quality}" "${SEMANTIC_REVIEW_LAST_SUMMARY:-failed}" "$duration_ms"
@@ -248,8 +354,7 @@ cmd_merge() {
             *)
                 write_result "$branch" "semantic-review-needed" "$repo_path" "${semantic_detail:0:500}" "$quality_level" "$merge_extra_json"
                 notify_wake_gateway "Centurion: semantic review needs manual decision for $branch"
-                git -C "$repo_path" reset --hard HEAD~1 >/dev/null
-                log_error "Reverted: semantic review requested manual review for $branch"
+                log_error "Rejected: semantic review requested manual review for $branch (main unchanged)"
                 log_error "  Semantic summary: ${SEMANTIC_REVIEW_LAST_SUMMARY:-review-needed}"
                 duration_ms="$(( ( $(epoch_now) - started_epoch ) * 1000 ))"
                 append_history "$branch" "$repo_path" "$quality_level" "semantic-review-needed" "${CENTURION_LAST_CHECKS:-quality}" "${SEMANTIC_REVIEW_LAST_SUMMARY:-review-needed}" "$duration_ms"
@@ -258,10 +363,10 @@ cmd_merge() {
         esac
     fi
 
-    local commit_hash
-    commit_hash="$(git -C "$repo_path" rev-parse --short HEAD)"
+    local commit_hash merge_commit
+    merge_commit="$(git -C "$work_path" rev-parse HEAD)"
+    commit_hash="$(git -C "$work_path" rev-parse --short HEAD)"
     if [[ "$dry_run" == "true" ]]; then
-        git -C "$repo_path" reset --hard HEAD~1 >/dev/null
         write_result "$branch" "dry-run-pass" "$repo_path" "would-merge:$commit_hash" "$quality_level" "$merge_extra_json"
         duration_ms="$(( ( $(epoch_now) - started_epoch ) * 1000 ))"
         append_history "$branch" "$repo_path" "$quality_level" "dry-run-pass" "${CENTURION_LAST_CHECKS:-quality}" "$commit_hash" "$duration_ms"
@@ -271,9 +376,15 @@ cmd_merge() {
             log_info "DRY RUN: would merge $branch to main at $commit_hash"
         fi
     else
+        if ! centurion_advance_main "$repo_path" "$main_before" "$merge_commit"; then
+            write_result "$branch" "main-moved" "$repo_path" "main moved or its checkout changed during the merge" "$quality_level" "$merge_extra_json"
+            log_error "Could not fast-forward main to $commit_hash: main moved or its checkout changed during the merge"
+            duration_ms="$(( ( $(epoch_now) - started_epoch ) * 1000 ))"
+            append_history "$branch" "$repo_path" "$quality_level" "main-moved" "${CENTURION_LAST_CHECKS:-quality}" "$commit_hash" "$duration_ms"
+            exit 1
+        fi
         write_result "$branch" "merged" "$repo_path" "" "$quality_level" "$merge_extra_json"
         notify_wake_gateway "Centurion: merged $branch to main ($commit_hash, level=$quality_level)"
-        _prev_branch_for_cleanup="" # Don't switch back — we want to stay on main after success
         duration_ms="$(( ( $(epoch_now) - started_epoch ) * 1000 ))"
         append_history "$branch" "$repo_path" "$quality_level" "merged" "${CENTURION_LAST_CHECKS:-quality}" "$commit_hash" "$duration_ms"
         if [[ "$CENTURION_QUIET" == "true" ]]; then
@@ -292,7 +403,7 @@ cmd_status() {
         repos=("$repo_path")
     else
         require_config
-        mapfile -t repos < <(jq -r '.repos // {} | keys[]' "$CONFIG_FILE")
+        mapfile -t repos < <(config_keys repos)
         [[ ${#repos[@]} -gt 0 ]] || { echo "No repos configured" >&2; exit 1; }
     fi
 
@@ -351,7 +462,26 @@ cmd_check() {
         return 1
     fi
 
-    if ! run_quality_gate "$repo_path" "$quality_level"; then
+    local lint_base=""
+    if [[ "$(git -C "$repo_path" rev-parse --abbrev-ref HEAD 2>/dev/null)" != "main" ]] \
+        && git -C "$repo_path" show-ref --verify --quiet "refs/heads/main"; then
+        lint_base="main"
+    fi
+
+    # A branch that cannot merge into main fails before any gate runs.
+    if [[ -n "$lint_base" && "${CENTURION_MERGE_PREFLIGHT:-true}" == "true" ]] \
+        && ! merge_preflight "$repo_path" main HEAD \
+        && [[ "$(jq -r '.status == "conflict" and (.auto_resolvable | not)' <<<"$MERGE_PREFLIGHT_LAST_JSON")" == "true" ]]; then
+        local conflicts
+        conflicts="$(jq -r '[.conflicts[] | select(.strategy == null) | .file] | join(", ")' <<<"$MERGE_PREFLIGHT_LAST_JSON")"
+        log_error "Merge preflight failed for $repo_path: HEAD conflicts with main"
+        log_error "  Conflicting files: $conflicts"
+        duration_ms="$(( ( $(epoch_now) - started_epoch ) * 1000 ))"
+        append_history "check" "$repo_path" "$quality_level" "check-failed" "preflight" "conflicts with main: $conflicts" "$duration_ms"
+        return 1
+    fi
+
+    if ! run_quality_gate "$repo_path" "$quality_level" "$lint_base" "HEAD"; then
         log_error "Quality check failed for $repo_path (level=$quality_level)"
         log_error "  Output: ${TEST_GATE_LAST_OUTPUT:0:200}"
         duration_ms="$(( ( $(epoch_now) - started_epoch ) * 1000 ))"
@@ -408,6 +538,10 @@ case "${1:---help}" in
                     dry_run="true"
                     shift
                     ;;
+                --fresh-review)
+                    export CENTURION_SEMANTIC_CACHE_REFRESH="true"
+                    shift
+                    ;;
                 --level)
                     quality_level="${2:-}"
                     [[ -n "$quality_level" ]] || { echo "Error: --level requires a value" >&2; exit 1; }
@@ -480,6 +614,10 @@ case "${1:---help}" in
                     check_level="${2:-quick}"
                     shift 2
                     ;;
+                --fresh-review)
+                    export CENTURION_SEMANTIC_CACHE_REFRESH="true"
+                    shift
+                    ;;
                 --verbose)
                     CENTURION_VERBOSE="true"
                     shift
@@ -497,6 +635,11 @@ case "${1:---help}" in
         centurion_log_init "$CENTURION_VERBOSE" "$CENTURION_QUIET"
         cmd_check "$check_repo" "$check_level"
         ;;
+    queue)
+        shift
+        centurion_log_init "$CENTURION_VERBOSE" "$CENTURION_QUIET"
+        cmd_queue "$@"
+        ;;
     --help|-h|help) usage ;;
     *)      echo "Error: unknown command '$1'" >&2; usage; exit 1 ;;
 esac
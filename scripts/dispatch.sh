@@ -15,13 +15,39 @@ WORKSPACE_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
 source "$SCRIPT_DIR/lib/common.sh"
 source "$SCRIPT_DIR/lib/config.sh"
 source "$SCRIPT_DIR/lib/record.sh"
+source "$SCRIPT_DIR/lib/conflict-forecast.sh"
 
 # ── Arguments ────────────────────────────────────────────────────────────────
 
 usage() {
     echo "Usage: $0 <bead-id> <repo-path> <agent-type> <prompt> [--branch <name>] [--force] [--relay|--no-relay]" >&2
+    echo "       $0 --complete <bead-id> <status> <exit-code> <reason> [finished-at]" >&2
 }
 
+# Completion entry point for scripts/watcher.sh: rebuild the dispatch context
+# from the bead's watch spec and run complete_run (see end of file).
+COMPLETE_ONLY="false"
+COMPLETE_ARGS=()
+SPEC_FIELDS=()
+WATCH_SPEC=""
+if [[ "${1:-}" == "--complete" ]]; then
+    (( $# >= 5 )) || { usage; exit 1; }
+    COMPLETE_ONLY="true"
+    COMPLETE_ARGS=("$3" "$4" "$5" "${6:-}")
+    WATCH_SPEC="$WORKSPACE_ROOT/state/watch/$2.claimed.json"
+    [[ -f "$WATCH_SPEC" ]] || WATCH_SPEC="$WORKSPACE_ROOT/state/watch/$2.watch.json"
+    [[ -f "$WATCH_SPEC" ]] || { echo "Error: no watch spec for bead '$2'" >&2; exit 1; }
+    mapfile -t SPEC_FIELDS < <(jq -r '
+        .repo, .agent_type_raw, .template, (if .use_relay then "--relay" else "--no-relay" end),
+        .max_retries, .tmux_socket, .attempt, .started_at, .started_epoch, .prompt_hash, (.truthsayer_pid // "")
+    ' "$WATCH_SPEC")
+    (( ${#SPEC_FIELDS[@]} == 11 )) || { echo "Error: malformed watch spec $WATCH_SPEC" >&2; exit 1; }
+    DISPATCH_MAX_RETRIES="${SPEC_FIELDS[4]}"
+    DISPATCH_TMUX_SOCKET="${SPEC_FIELDS[5]}"
+    DISPATCH_WATCHER="daemon"
+    set -- "$2" "${SPEC_FIELDS[0]}" "${SPEC_FIELDS[1]}" "$(jq -r '.prompt' "$WATCH_SPEC")" "${SPEC_FIELDS[2]}" "${SPEC_FIELDS[3]}"
+fi
+
 (( $# >= 4 )) || { usage; exit 1; }
 
 BEAD_ID="$1"
@@ -57,11 +83,16 @@ fi
 TMUX_SOCKET="${DISPATCH_TMUX_SOCKET:-/tmp/openclaw-coding-agents.sock}"
 MAX_RETRIES="${DISPATCH_MAX_RETRIES:-2}"
 WATCH_INTERVAL_SECONDS="${DISPATCH_WATCH_INTERVAL:-20}"
+WATCH_MODE="${DISPATCH_WATCH_MODE:-event}"
+WATCH_FALLBACK_INTERVAL_SECONDS="${DISPATCH_WATCH_FALLBACK_INTERVAL:-120}"
 WATCH_TIMEOUT_SECONDS="${DISPATCH_WATCH_TIMEOUT:-3600}"
 RELAY_BIN="${DISPATCH_RELAY_BIN:-$HOME/go/bin/relay}"
 RELAY_ORCHESTRATOR_AGENT="${DISPATCH_RELAY_ORCHESTRATOR_AGENT:-athena}"
+WATCHER="${DISPATCH_WATCHER:-inline}"
+WATCHER_BIN="${DISPATCH_WATCHER_BIN:-$SCRIPT_DIR/watcher.sh}"
+VERIFY_MODE="${DISPATCH_VERIFY_MODE:-split}"
 
-for var in MAX_RETRIES WATCH_INTERVAL_SECONDS WATCH_TIMEOUT_SECONDS; do
+for var in MAX_RETRIES WATCH_INTERVAL_SECONDS WATCH_FALLBACK_INTERVAL_SECONDS WATCH_TIMEOUT_SECONDS; do
     val="${!var}"
     if ! is_integer "$val" || (( val < 1 )); then
         echo "Error: $var must be a positive integer (got '$val')" >&2
@@ -77,10 +108,35 @@ case "$USE_RELAY" in
         ;;
 esac
 
+case "$WATCH_MODE" in
+    event|poll) ;;
+    *)
+        echo "Error: DISPATCH_WATCH_MODE must be event or poll (got '$WATCH_MODE')" >&2
+        exit 1
+        ;;
+esac
+
+case "$WATCHER" in
+    inline|daemon) ;;
+    *)
+        echo "Error: DISPATCH_WATCHER must be inline or daemon (got '$WATCHER')" >&2
+        exit 1
+        ;;
+esac
+
+case "$VERIFY_MODE" in
+    split|full) ;;
+    *)
+        echo "Error: DISPATCH_VERIFY_MODE must be split or full (got '$VERIFY_MODE')" >&2
+        exit 1
+        ;;
+esac
+
 STATE_DIR="$WORKSPACE_ROOT/state"
 RUNS_DIR="$STATE_DIR/runs"
 RESULTS_DIR="$STATE_DIR/results"
 WATCH_DIR="$STATE_DIR/watch"
+ORCH_WAKE_FIFO="$STATE_DIR/orchestrator.wake"
 TRUTHSAYER_BIN="${TRUTHSAYER_BIN:-$HOME/truthsayer/truthsayer}"
 TRUTHSAYER_LOG_DIR="$STATE_DIR/truthsayer"
 SESSION_NAME="agent-$BEAD_ID"
@@ -89,6 +145,9 @@ RESULT_RECORD="$RESULTS_DIR/$BEAD_ID.json"
 STATUS_FILE="$WATCH_DIR/$BEAD_ID.status.json"
 PROMPT_FILE="$WATCH_DIR/$BEAD_ID.prompt.txt"
 RUNNER_SCRIPT="$WATCH_DIR/$BEAD_ID.runner.sh"
+WAKE_FIFO="$WATCH_DIR/$BEAD_ID.wake"
+[[ "$WATCHER" == "daemon" ]] && WAKE_FIFO="$WATCH_DIR/watcher.wake"
+[[ -n "$WATCH_SPEC" ]] || WATCH_SPEC="$WATCH_DIR/$BEAD_ID.watch.json"
 TRUTHSAYER_PID=""
 
 mkdir -p "$RUNS_DIR" "$RESULTS_DIR" "$WATCH_DIR" "$TRUTHSAYER_LOG_DIR"
@@ -98,19 +157,21 @@ mkdir -p "$RUNS_DIR" "$RESULTS_DIR" "$WATCH_DIR" "$TRUTHSAYER_LOG_DIR"
 require_cmd jq
 require_cmd tmux
 require_cmd sha256sum
-if [[ -x "$SCRIPT_DIR/lint-no-hidden-workspace.sh" ]]; then
-    "$SCRIPT_DIR/lint-no-hidden-workspace.sh"
-fi
+if [[ "$COMPLETE_ONLY" != "true" ]]; then
+    if [[ -x "$SCRIPT_DIR/lint-no-hidden-workspace.sh" ]]; then
+        "$SCRIPT_DIR/lint-no-hidden-workspace.sh"
+    fi
 
-# Disk space check — abort early if disk is nearly full
-check_disk_space "$WORKSPACE_ROOT" 200 || {
-    echo "Error: insufficient disk space to dispatch agent for bead '$BEAD_ID'" >&2
-    exit 1
-}
-check_disk_space "$REPO_PATH" 200 || {
-    echo "Error: insufficient disk space at repo '$REPO_PATH'" >&2
-    exit 1
-}
+    # Disk space check — abort early if disk is nearly full
+    check_disk_space "$WORKSPACE_ROOT" 200 || {
+        echo "Error: insufficient disk space to dispatch agent for bead '$BEAD_ID'" >&2
+        exit 1
+    }
+    check_disk_space "$REPO_PATH" 200 || {
+        echo "Error: insufficient disk space at repo '$REPO_PATH'" >&2
+        exit 1
+    }
+fi
 
 # ── Build agent command ──────────────────────────────────────────────────────
 
@@ -152,6 +213,10 @@ stop_truthsayer() {
 
 cleanup_runtime() {
     rm -f "$PROMPT_FILE" "$RUNNER_SCRIPT"
+    # The daemon's wake FIFO is shared by every bead; only remove our own
+    if [[ "$WATCHER" == "inline" ]]; then
+        rm -f "$WAKE_FIFO"
+    fi
     stop_truthsayer
 }
 
@@ -214,21 +279,43 @@ detect_relay_completion() {
     return 0
 }
 
-# Build coordination context: other active agents on this repo
+# Build coordination context: other active agents on this repo, with the
+# files each has committed so far (from the conflict forecast)
 build_coordination_context() {
-    local active_beads=""
+    local active_beads="" rows bead _agent _session prompt_short files
+    local -A touched=()
+    if conflict_forecast_refresh "$RUNS_DIR" "$REPO_PATH" 2>/dev/null; then
+        while IFS=$'\t' read -r bead files; do
+            [[ -n "$bead" ]] && touched["$bead"]="$files"
+        done < <(jq -r '.beads | to_entries[] | select(.value.files | length > 0)
+            | [.key, (.value.files[:20] | join(", ")) + (if (.value.files | length) > 20 then ", ..." else "" end)]
+            | @tsv' "$CONFLICT_FORECAST_FILE" 2>/dev/null)
+    fi
+
+    if rows="$(run_index_running "$RUNS_DIR" "$REPO_PATH" "$BEAD_ID")"; then
+        while IFS=$'\t' read -r bead _agent _session prompt_short; do
+            [[ -n "$bead" ]] || continue
+            active_beads+="- Bead $bead ($AGENT_TYPE): $prompt_short
+"
+            [[ -n "${touched[$bead]:-}" ]] && active_beads+="  Files committed so far: ${touched[$bead]}
+"
+        done <<<"$rows"
+        echo "$active_beads"
+        return 0
+    fi
     for run_file in "$RUNS_DIR"/*.json; do
         [[ -f "$run_file" ]] || continue
-        local bead status repo
+        local status repo
         bead="$(jq -r '.bead // empty' "$run_file" 2>/dev/null)" || continue
         [[ "$bead" == "$BEAD_ID" ]] && continue
         status="$(jq -r '.status // empty' "$run_file" 2>/dev/null)" || continue
         [[ "$status" == "running" ]] || continue
         repo="$(jq -r '.repo // empty' "$run_file" 2>/dev/null)" || continue
         [[ "$repo" == "$REPO_PATH" ]] || continue
-        local prompt_short
         prompt_short="$(jq -r '.prompt // empty' "$run_file" 2>/dev/null | head -c 200)" || prompt_short=""
         active_beads+="- Bead $bead ($AGENT_TYPE): $prompt_short
+"
+        [[ -n "${touched[$bead]:-}" ]] && active_beads+="  Files committed so far: ${touched[$bead]}
 "
     done
     echo "$active_beads"
@@ -339,6 +426,17 @@ detect_completion() {
 
 # ── Complete run ─────────────────────────────────────────────────────────────
 
+# Run the slow verify checks in the background and attach the merged result
+# to both records; complete_run does not wait for them.
+launch_slow_verification() {
+    (
+        local vout verification
+        vout="$("$WORKSPACE_ROOT/scripts/verify.sh" --checks slow "$REPO_PATH" "$BEAD_ID")" || exit 0
+        verification="$(printf '%s' "$vout" | jq -c '.checks + {overall}')" || exit 0
+        attach_verification "$verification"
+    ) </dev/null >/dev/null 2>&1 &
+}
+
 complete_run() {
     local status="$1" exit_code="$2" reason="$3" finished_at="${4:-$(iso_now)}"
     local now duration will_retry="false" output_summary="" failure_reason=""
@@ -355,38 +453,81 @@ complete_run() {
 
     stop_truthsayer
 
-    # Verification
-    local verification_json="null" verification_overall="unknown"
+    # Verification: in split mode only the fast checks hold up the records
+    # and wake-ups; the slow ones are attached when they finish.
+    local verification_json="null" verify_checks="all"
+    [[ "$VERIFY_MODE" == "split" ]] && verify_checks="fast"
     if [[ -x "$WORKSPACE_ROOT/scripts/verify.sh" ]]; then
         local vout
-        if vout="$("$WORKSPACE_ROOT/scripts/verify.sh" "$REPO_PATH" "$BEAD_ID")"; then
-            verification_json="$(printf '%s' "$vout" | jq '.checks' 2>/dev/null)" || verification_json="null"
-            verification_overall="$(printf '%s' "$vout" | jq -r '.overall // "unknown"' 2>/dev/null)" || verification_overall="unknown"
-        else
-            verification_overall="fail"
+        if vout="$("$WORKSPACE_ROOT/scripts/verify.sh" --checks "$verify_checks" "$REPO_PATH" "$BEAD_ID")"; then
+            verification_json="$(printf '%s' "$vout" | jq -c '.checks + {overall}' 2>/dev/null)" || verification_json="null"
         fi
     fi
 
-    # Write records
-    write_run_record "$status" "$finished_at" "$duration" "$exit_code" "$output_summary" "$failure_reason" "$verification_json"
-    write_result_record "$status" "$reason" "$finished_at" "$duration" "$exit_code" "$will_retry" "$output_summary" "$verification_json"
-
-    # Advisory validation
-    if [[ -x "$WORKSPACE_ROOT/scripts/validate-state.sh" ]]; then
-        "$WORKSPACE_ROOT/scripts/validate-state.sh" --runs "$RUN_RECORD" --results "$RESULT_RECORD" 2>/dev/null || true
-    fi
+    # Write records (schema-checked by the jq that builds them)
+    write_records "$status" "$reason" "$finished_at" "$duration" "$exit_code" "$will_retry" "$output_summary" "$failure_reason" "$verification_json"
+    [[ "$verification_json" == *'"pending"'* ]] && launch_slow_verification
 
     # Cleanup
     if session_exists; then
         tmux -S "$TMUX_SOCKET" kill-session -t "$SESSION_NAME" 2>/dev/null || true
     fi
     cleanup_runtime
+    # The slot is free: wake a waiting orchestrator so it can refill it now
+    if [[ -p "$ORCH_WAKE_FIFO" ]]; then
+        printf 'completed %s\n' "$BEAD_ID" 1<>"$ORCH_WAKE_FIFO" 2>/dev/null || true
+    fi
     append_memory "$status" "$duration" "$reason" "$will_retry"
     wake_athena "$status" "$duration" "$reason"
 }
 
 # ── Background watcher ───────────────────────────────────────────────────────
 
+# Hand this bead to scripts/watcher.sh: everything `dispatch.sh --complete`
+# needs to rebuild the run context later.
+write_watch_spec() {
+    local tmp
+    tmp="$(mktemp "${WATCH_SPEC}.tmp.XXXXXX")"
+    if ! jq -cn \
+        --arg bead "$BEAD_ID" \
+        --arg session "$SESSION_NAME" \
+        --arg repo "$REPO_PATH" \
+        --arg agent_type_raw "$AGENT_TYPE:$MODEL" \
+        --arg template "$TEMPLATE_NAME" \
+        --arg prompt "$PROMPT" \
+        --arg prompt_hash "$PROMPT_HASH" \
+        --arg started_at "$STARTED_AT" \
+        --arg tmux_socket "$TMUX_SOCKET" \
+        --arg status_file "$STATUS_FILE" \
+        --arg truthsayer_pid "$TRUTHSAYER_PID" \
+        --argjson use_relay "$USE_RELAY" \
+        --argjson started_epoch "$STARTED_EPOCH" \
+        --argjson deadline_epoch "$((STARTED_EPOCH + WATCH_TIMEOUT_SECONDS))" \
+        --argjson timeout_seconds "$WATCH_TIMEOUT_SECONDS" \
+        --argjson attempt "$ATTEMPT" \
+        --argjson max_retries "$MAX_RETRIES" \
+        '{bead:$bead, session:$session, repo:$repo, agent_type_raw:$agent_type_raw, template:$template,
+          prompt:$prompt, prompt_hash:$prompt_hash, started_at:$started_at, started_epoch:$started_epoch,
+          deadline_epoch:$deadline_epoch, timeout_seconds:$timeout_seconds, attempt:$attempt,
+          max_retries:$max_retries, use_relay:$use_relay, tmux_socket:$tmux_socket,
+          status_file:$status_file, truthsayer_pid:(if $truthsayer_pid == "" then null else $truthsayer_pid end)}' > "$tmp"; then
+        rm -f "$tmp"
+        return 1
+    fi
+    mv "$tmp" "$WATCH_SPEC"
+}
+
+# Sleep until the runner pokes the wake FIFO or $1 seconds pass.
+# Without an open FIFO descriptor this degrades to a plain sleep.
+wait_for_wake() {
+    local seconds="$1" fd="${2:-}" _line=""
+    if [[ -n "$fd" ]]; then
+        read -r -t "$seconds" -u "$fd" _line 2>/dev/null || true
+    else
+        sleep "$seconds"
+    fi
+}
+
 launch_watcher() {
     (
         set -euo pipefail
@@ -401,6 +542,14 @@ launch_watcher() {
         local deadline=$((STARTED_EPOCH + WATCH_TIMEOUT_SECONDS))
         local consecutive_errors=0
         local max_errors=10
+        local wake_fd="" interval="$WATCH_INTERVAL_SECONDS" nap
+
+        # Event mode: hold the FIFO open read-write before the first detection
+        # pass so a poke that lands between passes is buffered, never lost.
+        if [[ "$WATCH_MODE" == "event" && -p "$WAKE_FIFO" ]]; then
+            exec {wake_fd}<>"$WAKE_FIFO"
+            interval="$WATCH_FALLBACK_INTERVAL_SECONDS"
+        fi
 
         while true; do
             if [[ "$_watcher_interrupted" == "true" ]]; then
@@ -428,7 +577,10 @@ launch_watcher() {
                 exit 1
             fi
 
-            sleep "$WATCH_INTERVAL_SECONDS"
+            nap=$(( deadline - $(epoch_now) ))
+            (( nap > interval )) && nap="$interval"
+            (( nap < 1 )) && nap=1
+            wait_for_wake "$nap" "$wake_fd"
         done
     ) >/dev/null 2>&1 &
 }
@@ -443,6 +595,7 @@ create_runner_script() {
 #!/usr/bin/env bash
 set -euo pipefail
 STATUS_FILE=$(printf '%q' "$STATUS_FILE")
+WAKE_FIFO=$(printf '%q' "$WAKE_FIFO")
 PROMPT_FILE=$(printf '%q' "$PROMPT_FILE")
 BEAD_ID=$(printf '%q' "$BEAD_ID")
 SESSION_NAME=$(printf '%q' "$SESSION_NAME")
@@ -508,6 +661,10 @@ emit_status() {
         printf '{"bead":"%s","finished_at":"%s","exit_code":%s}\n' "\$BEAD_ID" "\$ts" "\$ec" > "\$STATUS_FILE"
         rm -f "\$tmp" 2>/dev/null || true
     fi
+    # Wake the dispatch watcher now; opening read-write never blocks on a FIFO
+    if [[ -p "\$WAKE_FIFO" ]]; then
+        printf '%s\n' "\$ec" 1<>"\$WAKE_FIFO" 2>/dev/null || true
+    fi
 
     stop_relay_heartbeat
     if relay_runner_enabled; then
@@ -525,7 +682,7 @@ emit_status() {
             --arg status "\$status" \
             --arg finished_at "\$ts" \
             --argjson exit_code "\$ec" \
-            '{type:$type, bead:$bead, session:$session, agent:$agent, model:$model, repo:$repo, status:$status, exit_code:$exit_code, finished_at:$finished_at}')
+            '{type:\$type, bead:\$bead, session:\$session, agent:\$agent, model:\$model, repo:\$repo, status:\$status, exit_code:\$exit_code, finished_at:\$finished_at}')
         "\$RELAY_BIN" send "\$RELAY_ORCHESTRATOR_AGENT" "\$payload" \
             --agent "\$SESSION_NAME" \
             --thread "\$BEAD_ID" \
@@ -573,6 +730,20 @@ $coord_section
 PROMPT
 }
 
+# ── Completion (watcher daemon) ──────────────────────────────────────────────
+
+if [[ "$COMPLETE_ONLY" == "true" ]]; then
+    ATTEMPT="${SPEC_FIELDS[6]}"
+    STARTED_AT="${SPEC_FIELDS[7]}"
+    STARTED_EPOCH="${SPEC_FIELDS[8]}"
+    PROMPT_HASH="${SPEC_FIELDS[9]}"
+    TRUTHSAYER_PID="${SPEC_FIELDS[10]}"
+    PROMPT_TRUNCATED="${PROMPT:0:200}"
+    complete_run "${COMPLETE_ARGS[@]}"
+    rm -f "$WATCH_SPEC"
+    exit 0
+fi
+
 # ── Main ─────────────────────────────────────────────────────────────────────
 
 # Preflight
@@ -634,8 +805,7 @@ if (( ATTEMPT > MAX_RETRIES )); then
     STARTED_AT="$(iso_now)"; STARTED_EPOCH="$(epoch_now)"
     PROMPT_TRUNCATED="${PROMPT:0:200}"
     PROMPT_HASH="$(printf '%s' "$PROMPT" | sha256sum | awk '{print $1}')"
-    write_run_record "failed" "$STARTED_AT" "0" "1"
-    write_result_record "failed" "max-retries-reached" "$STARTED_AT" "0" "1" "false"
+    write_records "failed" "max-retries-reached" "$STARTED_AT" "0" "1" "false"
     append_memory "failed" "0" "max-retries-reached" "false"
     wake_athena "failed" "0" "max-retries-reached"
     echo "Error: max retries reached for bead '$BEAD_ID' ($MAX_RETRIES)" >&2
@@ -649,10 +819,27 @@ PROMPT_TRUNCATED="${PROMPT:0:200}"
 PROMPT_HASH="$(printf '%s' "$PROMPT" | sha256sum | awk '{print $1}')"
 
 printf '%s' "$FULL_PROMPT" > "$PROMPT_FILE"
+
+# Daemon watcher: make sure it is up (and its shared wake FIFO exists) before
+# the runner is written, since the runner bakes in the FIFO it pokes
+if [[ "$WATCHER" == "daemon" ]] && ! "$WATCHER_BIN" start >/dev/null; then
+    echo "Warning: watcher daemon failed to start; using an inline watcher" >&2
+    WATCHER="inline"
+    WAKE_FIFO="$WATCH_DIR/$BEAD_ID.wake"
+fi
+
 create_runner_script
 
-write_run_record "running" "" "" ""
-write_result_record "running" "dispatched" "" "" "" "false"
+# Event-driven watcher: the runner pokes this FIFO as soon as it writes the status file
+if [[ "$WATCHER" == "inline" ]]; then
+    rm -f "$WAKE_FIFO"
+    if [[ "$WATCH_MODE" == "event" ]] && ! mkfifo "$WAKE_FIFO" 2>/dev/null; then
+        echo "Warning: could not create wake FIFO $WAKE_FIFO; falling back to polling" >&2
+        WATCH_MODE="poll"
+    fi
+fi
+
+write_records "running" "dispatched" "" "" "" "false"
 
 echo "Starting agent session: $SESSION_NAME"
 echo "Agent: $AGENT_TYPE | Model: $MODEL"
@@ -686,6 +873,14 @@ fi
 
 send_dispatch_event
 
-launch_watcher
-echo "Agent dispatched. Background watcher PID: $!"
+if [[ "$WATCHER" == "daemon" ]] && write_watch_spec; then
+    # Poke the daemon so it picks up the new bead (and any early exit) right away
+    printf 'registered %s\n' "$BEAD_ID" 1<>"$WAKE_FIFO" 2>/dev/null || true
+    echo "Agent dispatched. Tracked by watcher daemon (see: scripts/watcher.sh status)"
+else
+    # Never compete with the daemon for its shared FIFO
+    [[ "$WATCHER" == "daemon" ]] && WATCH_MODE="poll"
+    launch_watcher
+    echo "Agent dispatched. Background watcher PID: $! (mode: $WATCH_MODE)"
+fi
 echo "To attach: tmux -S $TMUX_SOCKET attach -t $SESSION_NAME"
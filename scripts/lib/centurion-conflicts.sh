@@ -4,114 +4,282 @@
 
 CONFLICT_REPORT_LAST_JSON='{"conflict_count":0,"conflicts":[]}'
 AUTO_RESOLUTION_LAST_JSON='{"resolved_count":0,"unresolved_count":0,"resolved":[],"unresolved":[]}'
+MERGE_PREFLIGHT_LAST_JSON='{"status":"unavailable"}'
+CONFLICT_TRIVIAL_STRATEGY=""
 
+# Marker lines and a preview (two lines before the first marker to eight
+# after it) per conflicted file, in one pass. Reads "<prefix><file>US<line>US
+# <text>" rows (`git grep -n -z` output with NUL turned into US) or, with
+# raw=1, the files themselves (named <prefix><file>). Prints
+#   file US space-separated marker lines US preview (lines joined by \036)
+# for each file that has markers.
+# shellcheck disable=SC2016
+_CONFLICT_MARKERS_AWK='
+function flush() {
+    if (file != "" && markers != "") printf "%s\037%s\037%s\n", file, markers, preview
+}
+raw == 1 {
+    name = substr(FILENAME, length(prefix) + 1)
+    line = FNR
+    text = $0
+}
+raw != 1 {
+    name = substr($1, length(prefix) + 1)
+    line = $2 + 0
+    text = $3
+    for (i = 4; i <= NF; i++) text = text "\037" $i
+}
+{
+    if (name != file) { flush(); file = name; markers = ""; preview = ""; first = 0; prev1 = ""; prev2 = "" }
+    gsub(/[[:cntrl:]]\[[0-9;]*[mK]/, "", text)
+    if (text ~ /^(<<<<<<<|=======|>>>>>>>)/) markers = markers (markers == "" ? "" : " ") line
+    if (first == 0 && markers != "") {
+        first = line
+        if (line > 2) preview = prev2 "\036"
+        if (line > 1) preview = preview prev1 "\036"
+        preview = preview text
+    } else if (first > 0 && line <= first + 8) {
+        preview = preview "\036" text
+    }
+    prev2 = prev1
+    prev1 = text
+}
+END { flush() }'
+
+# jq helpers for the rows above: marker_index($rows) maps each file to
+# {marker_lines, preview}.
+_CONFLICT_MARKERS_JQ='
+def rows($text): $text | split("\n")[] | select(length > 0) | split("\u001f");
+def marker_index($text):
+    [rows($text) | {key: .[0], value: {
+        marker_lines: (.[1] | split(" ") | map(tonumber)),
+        preview: (.[2] // "" | gsub("\u001e"; "\n"))}}] | from_entries;'
+
+# Reads "file US resolved|unresolved US strategy-or-reason" rows and builds
+# {resolved_count, unresolved_count, resolved: [{file, strategy}],
+#  unresolved: [{file, reason}]}.
+_CONFLICT_RESOLUTION_JQ='
+[inputs | select(length > 0) | split("\u001f")] as $rows
+| [$rows[] | select(.[1] == "resolved") | {file: .[0], strategy: .[2]}] as $resolved
+| [$rows[] | select(.[1] != "resolved") | {file: .[0], reason: .[2]}] as $unresolved
+| {resolved_count: ($resolved | length), unresolved_count: ($unresolved | length),
+   resolved: $resolved, unresolved: $unresolved}'
+
+# Pick the trivial strategy for a conflicted path from its stage blobs (base,
+# ours, theirs; empty when that side has no file): the side that still has the
+# file, or the side that changed when the other did not. Sets
+# CONFLICT_TRIVIAL_STRATEGY to ours|theirs, or empty when there is none.
+conflict_trivial_strategy() {
+    local base_hash="$1" ours_hash="$2" theirs_hash="$3"
+    CONFLICT_TRIVIAL_STRATEGY=""
+    if [[ -z "$ours_hash" && -n "$theirs_hash" ]]; then
+        CONFLICT_TRIVIAL_STRATEGY="theirs"
+    elif [[ -z "$theirs_hash" && -n "$ours_hash" ]]; then
+        CONFLICT_TRIVIAL_STRATEGY="ours"
+    elif [[ -n "$base_hash" && "$ours_hash" == "$base_hash" && "$theirs_hash" != "$base_hash" ]]; then
+        CONFLICT_TRIVIAL_STRATEGY="theirs"
+    elif [[ -n "$base_hash" && "$theirs_hash" == "$base_hash" && "$ours_hash" != "$base_hash" ]]; then
+        CONFLICT_TRIVIAL_STRATEGY="ours"
+    fi
+}
+
+# Predict merging <source> into <target> with `git merge-tree --write-tree`,
+# without touching any index or worktree. Sets MERGE_PREFLIGHT_LAST_JSON:
+#   {status: clean|conflict, tree, conflict_count, auto_resolvable,
+#    conflicts: [{file, marker_lines, preview, stages: {base, ours, theirs}, strategy}]}
+# marker_lines/preview come from the predicted tree, as collect_conflict_report
+# reads them from a conflicted worktree; strategy is what
+# auto_resolve_trivial_conflicts would apply (null: none).
+# Returns 0 for a clean merge, 1 for conflicts, 2 when merge-tree cannot
+# predict it (git older than 2.38, unrelated histories, bad refs).
+merge_preflight() {
+    local repo_path="$1" target="$2" source="$3"
+    local rc=0 tree="" entry meta path oid stage rows=""
+    local work_dir
+    local -a paths=()
+    local -A base=() ours=() theirs=()
+    MERGE_PREFLIGHT_LAST_JSON='{"status":"unavailable"}'
+
+    work_dir="$(mktemp -d)"
+    git -C "$repo_path" merge-tree --write-tree -z --no-messages "$target" "$source" \
+        > "$work_dir/merge-tree" 2>/dev/null || rc=$?
+    if (( rc > 1 )); then
+        rm -rf "$work_dir"
+        return 2
+    fi
+
+    # <tree> NUL, then "<mode> <oid> <stage>TAB<path>" NUL per conflicted stage.
+    {
+        IFS= read -r -d '' tree || true
+        while IFS= read -r -d '' entry && [[ -n "$entry" ]]; do
+            meta="${entry%%$'\t'*}"
+            path="${entry#*$'\t'}"
+            stage="${meta##* }"
+            oid="${meta#* }"
+            oid="${oid%% *}"
+            [[ -n "${base[$path]+set}${ours[$path]+set}${theirs[$path]+set}" ]] || paths+=("$path")
+            case "$stage" in
+                1) base["$path"]="$oid" ;;
+                2) ours["$path"]="$oid" ;;
+                3) theirs["$path"]="$oid" ;;
+            esac
+        done
+    } < "$work_dir/merge-tree"
+    if [[ -z "$tree" ]]; then
+        rm -rf "$work_dir"
+        return 2
+    fi
+
+    for path in "${paths[@]}"; do
+        conflict_trivial_strategy "${base[$path]:-}" "${ours[$path]:-}" "${theirs[$path]:-}"
+        rows+="$path"$'\x1f'"${base[$path]:-}"$'\x1f'"${ours[$path]:-}"$'\x1f'"${theirs[$path]:-}"$'\x1f'"$CONFLICT_TRIVIAL_STRATEGY"$'\n'
+    done
+    printf '%s' "$rows" > "$work_dir/stages"
+
+    # Marker lines and a preview (two lines before the first marker to eight
+    # after it) for every conflicted file, from one grep over the merged tree.
+    : > "$work_dir/markers"
+    if (( ${#paths[@]} > 0 )); then
+        git --literal-pathspecs -C "$repo_path" grep -n -z -I -e '' "$tree" -- "${paths[@]}" 2>/dev/null \
+            | tr '\0' '\037' \
+            | awk -F '\037' -v prefix="$tree:" "$_CONFLICT_MARKERS_AWK" > "$work_dir/markers" || true
+    fi
+
+    MERGE_PREFLIGHT_LAST_JSON="$(jq -cn --arg tree "$tree" --argjson clean "$(( rc == 0 ))" \
+        --rawfile stages "$work_dir/stages" --rawfile markers "$work_dir/markers" "$_CONFLICT_MARKERS_JQ"'
+        def oid: if . == "" then null else . end;
+        marker_index($markers) as $seen
+        | [rows($stages) | {file: .[0],
+            marker_lines: ($seen[.[0]].marker_lines // []),
+            preview: ($seen[.[0]].preview // ""),
+            stages: {base: (.[1] | oid), ours: (.[2] | oid), theirs: (.[3] | oid)},
+            strategy: (.[4] | oid)}] as $conflicts
+        | {status: (if $clean == 1 then "clean" else "conflict" end),
+           tree: $tree,
+           conflict_count: ($conflicts | length),
+           auto_resolvable: ($conflicts | all(.strategy != null)),
+           conflicts: $conflicts}')"
+    rm -rf "$work_dir"
+    (( rc == 0 )) || return 1
+}
+
+# Conflicted files of an in-progress merge with their marker lines and a
+# preview: one `git diff` for the paths and one awk over the files.
 collect_conflict_report() {
-    local repo_path="$1"
-    local conflicts_json='[]'
-    local -a conflicted_files=()
+    local repo_path="$1" file work_dir
+    local -a conflicted_files=() present=()
 
-    mapfile -t conflicted_files < <(git -C "$repo_path" diff --name-only --diff-filter=U 2>/dev/null || true)
+    work_dir="$(mktemp -d)"
+    git -C "$repo_path" diff --name-only -z --diff-filter=U > "$work_dir/files" 2>/dev/null || true
+    mapfile -t -d '' conflicted_files < "$work_dir/files"
     for file in "${conflicted_files[@]}"; do
-        [[ -n "$file" ]] || continue
-
-        local abs_file="$repo_path/$file"
-        local preview=""
-        local first_line=0 start_line=1 end_line=1
-        local marker_lines_json='[]'
-        local -a marker_lines=()
-
-        if [[ -f "$abs_file" ]]; then
-            mapfile -t marker_lines < <(grep -nE '^(<<<<<<<|=======|>>>>>>>)' "$abs_file" | cut -d: -f1)
-            if [[ ${#marker_lines[@]} -gt 0 ]]; then
-                first_line="${marker_lines[0]}"
-                start_line=$(( first_line > 2 ? first_line - 2 : 1 ))
-                end_line=$(( first_line + 8 ))
-                preview="$(sed -n "${start_line},${end_line}p" "$abs_file" | sed 's/[[:cntrl:]]\[[0-9;]*[mK]//g' | head -n 20)"
-                marker_lines_json="$(jq -cn '$ARGS.positional | map(tonumber)' --args "${marker_lines[@]}")"
-            fi
+        [[ -n "$file" && -f "$repo_path/$file" ]] && present+=("$repo_path/$file")
+    done
+    : > "$work_dir/markers"
+    if (( ${#present[@]} > 0 )); then
+        printf '%s\0' "${present[@]}" \
+            | xargs -0 awk -v raw=1 -v prefix="$repo_path/" "$_CONFLICT_MARKERS_AWK" > "$work_dir/markers" 2>/dev/null || true
+    fi
+
+    CONFLICT_REPORT_LAST_JSON="$(jq -cn --rawfile files "$work_dir/files" --rawfile markers "$work_dir/markers" "$_CONFLICT_MARKERS_JQ"'
+        marker_index($markers) as $seen
+        | [$files | split("\u0000")[] | select(length > 0)
+           | {file: ., marker_lines: ($seen[.].marker_lines // []), preview: ($seen[.].preview // "")}]
+        | {conflict_count: length, conflicts: .}')"
+    rm -rf "$work_dir"
+    printf '%s\n' "$CONFLICT_REPORT_LAST_JSON"
+}
+
+# Usage: conflict_checkout_side <repo-path> <ours|theirs> <path>...
+# Resolves conflicted paths to one side and stages them, with one
+# `git checkout` and one `git add` for the lot; when the batch fails, path by
+# path. Prints the paths that could not be resolved, NUL-terminated.
+conflict_checkout_side() {
+    local repo_path="$1" side="$2" path
+    shift 2
+    (( $# > 0 )) || return 0
+    if printf '%s\0' "$@" | git --literal-pathspecs -C "$repo_path" checkout "--$side" \
+            --pathspec-from-file=- --pathspec-file-nul >/dev/null 2>&1 \
+        && printf '%s\0' "$@" | git --literal-pathspecs -C "$repo_path" add \
+            --pathspec-from-file=- --pathspec-file-nul >/dev/null 2>&1; then
+        return 0
+    fi
+    for path in "$@"; do
+        if ! git --literal-pathspecs -C "$repo_path" checkout "--$side" -- "$path" >/dev/null 2>&1 \
+            || ! git --literal-pathspecs -C "$repo_path" add -- "$path" >/dev/null 2>&1; then
+            printf '%s\0' "$path"
         fi
+    done
+}
 
-        conflicts_json="$(jq -cn \
-            --argjson current "$conflicts_json" \
-            --arg file "$file" \
-            --arg preview "$preview" \
-            --argjson marker_lines "$marker_lines_json" \
-            '$current + [{file:$file, marker_lines:$marker_lines, preview:$preview}]')"
+# Usage: conflict_apply_strategies <repo-path> <strategies-var> <unresolved-reason> <path>...
+# Resolves each path per the associative array named <strategies-var>
+# (path -> ours|theirs; anything else is left for a human) and prints
+# "file US resolved|unresolved US strategy-or-reason" rows in path order.
+conflict_apply_strategies() {
+    local repo_path="$1" reason="$3" path side
+    local -n _strategies="$2"
+    shift 3
+    local -a batch=()
+    local -A failed=()
+
+    for side in ours theirs; do
+        batch=()
+        for path in "$@"; do
+            [[ "${_strategies[$path]:-}" == "$side" ]] && batch+=("$path")
+        done
+        while IFS= read -r -d '' path; do
+            failed["$path"]=1
+        done < <(conflict_checkout_side "$repo_path" "$side" "${batch[@]}")
     done
 
-    CONFLICT_REPORT_LAST_JSON="$(jq -cn --argjson conflicts "$conflicts_json" '{conflict_count: ($conflicts | length), conflicts:$conflicts}')"
-    printf '%s\n' "$CONFLICT_REPORT_LAST_JSON"
+    for path in "$@"; do
+        case "${_strategies[$path]:-}" in
+            ours|theirs)
+                if [[ -n "${failed[$path]+set}" ]]; then
+                    printf '%s\037unresolved\037checkout_failed\n' "$path"
+                else
+                    printf '%s\037resolved\037%s\n' "$path" "${_strategies[$path]}"
+                fi
+                ;;
+            *) printf '%s\037unresolved\037%s\n' "$path" "$reason" ;;
+        esac
+    done
 }
 
 auto_resolve_trivial_conflicts() {
-    local repo_path="$1"
-    local resolved_json='[]'
-    local unresolved_json='[]'
-    local resolved_count=0 unresolved_count=0
-    local -a conflicted_files=()
-
-    mapfile -t conflicted_files < <(git -C "$repo_path" diff --name-only --diff-filter=U 2>/dev/null || true)
-    [[ ${#conflicted_files[@]} -gt 0 ]] || {
+    local repo_path="$1" entry meta path oid stage
+    local -a paths=()
+    local -A base=() ours=() theirs=() strategy=()
+
+    # "<mode> <oid> <stage>TAB<path>" NUL per unmerged stage, in index order.
+    while IFS= read -r -d '' entry; do
+        meta="${entry%%$'\t'*}"
+        path="${entry#*$'\t'}"
+        stage="${meta##* }"
+        oid="${meta#* }"
+        oid="${oid%% *}"
+        [[ -n "${base[$path]+set}${ours[$path]+set}${theirs[$path]+set}" ]] || paths+=("$path")
+        case "$stage" in
+            1) base["$path"]="$oid" ;;
+            2) ours["$path"]="$oid" ;;
+            3) theirs["$path"]="$oid" ;;
+        esac
+    done < <(git -C "$repo_path" ls-files -u -z 2>/dev/null || true)
+    [[ ${#paths[@]} -gt 0 ]] || {
         AUTO_RESOLUTION_LAST_JSON='{"resolved_count":0,"unresolved_count":0,"resolved":[],"unresolved":[]}'
         return 1
     }
 
-    for file in "${conflicted_files[@]}"; do
-        [[ -n "$file" ]] || continue
-
-        local ours_hash="" theirs_hash="" base_hash="" strategy=""
-        while read -r _mode hash stage _path; do
-            case "$stage" in
-                1) base_hash="$hash" ;;
-                2) ours_hash="$hash" ;;
-                3) theirs_hash="$hash" ;;
-            esac
-        done < <(git -C "$repo_path" ls-files -u -- "$file" 2>/dev/null || true)
-
-        if [[ -z "$ours_hash" && -n "$theirs_hash" ]]; then
-            strategy="theirs"
-        elif [[ -z "$theirs_hash" && -n "$ours_hash" ]]; then
-            strategy="ours"
-        elif [[ -n "$base_hash" && "$ours_hash" == "$base_hash" && "$theirs_hash" != "$base_hash" ]]; then
-            strategy="theirs"
-        elif [[ -n "$base_hash" && "$theirs_hash" == "$base_hash" && "$ours_hash" != "$base_hash" ]]; then
-            strategy="ours"
-        fi
-
-        if [[ "$strategy" == "ours" || "$strategy" == "theirs" ]]; then
-            if git -C "$repo_path" checkout "--$strategy" -- "$file" >/dev/null 2>&1 && git -C "$repo_path" add -- "$file" >/dev/null 2>&1; then
-                resolved_count=$((resolved_count + 1))
-                resolved_json="$(jq -cn \
-                    --argjson current "$resolved_json" \
-                    --arg file "$file" \
-                    --arg strategy "$strategy" \
-                    '$current + [{file:$file, strategy:$strategy}]')"
-            else
-                unresolved_count=$((unresolved_count + 1))
-                unresolved_json="$(jq -cn \
-                    --argjson current "$unresolved_json" \
-                    --arg file "$file" \
-                    --arg reason "checkout_failed" \
-                    '$current + [{file:$file, reason:$reason}]')"
-            fi
-        else
-            unresolved_count=$((unresolved_count + 1))
-            unresolved_json="$(jq -cn \
-                --argjson current "$unresolved_json" \
-                --arg file "$file" \
-                --arg reason "no_trivial_strategy" \
-                '$current + [{file:$file, reason:$reason}]')"
-        fi
+    for path in "${paths[@]}"; do
+        conflict_trivial_strategy "${base[$path]:-}" "${ours[$path]:-}" "${theirs[$path]:-}"
+        strategy["$path"]="$CONFLICT_TRIVIAL_STRATEGY"
     done
 
-    AUTO_RESOLUTION_LAST_JSON="$(jq -cn \
-        --argjson resolved_count "$resolved_count" \
-        --argjson unresolved_count "$unresolved_count" \
-        --argjson resolved "$resolved_json" \
-        --argjson unresolved "$unresolved_json" \
-        '{resolved_count:$resolved_count, unresolved_count:$unresolved_count, resolved:$resolved, unresolved:$unresolved}')"
+    AUTO_RESOLUTION_LAST_JSON="$(conflict_apply_strategies "$repo_path" strategy no_trivial_strategy "${paths[@]}" \
+        | jq -cRn "$_CONFLICT_RESOLUTION_JQ")"
 
-    if (( unresolved_count == 0 && resolved_count > 0 )); then
+    if jq -e '.unresolved_count == 0 and .resolved_count > 0' <<<"$AUTO_RESOLUTION_LAST_JSON" >/dev/null; then
         if git -C "$repo_path" commit --no-edit >/dev/null 2>&1; then
             return 0
         fi
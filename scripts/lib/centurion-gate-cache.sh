@@ -0,0 +1,151 @@
+# shellcheck shell=bash
+# centurion-gate-cache.sh — Pass cache for Centurion quality gates
+# Source this file; do not execute directly.
+#
+# A gate that passed on a tree passes again on the same tree with the same
+# command and tool versions, so `merge --dry-run` followed by the real merge,
+# or re-running an already merged branch, does not rerun lint/tests/truthsayer.
+# Only passes are cached, and only for clean worktrees (HEAD^{tree} is then
+# exactly what the gates read).
+#
+# Env:
+#   CENTURION_GATE_CACHE              true|false (default: true)
+#   CENTURION_GATE_CACHE_DIR          default: state/centurion-gate-cache
+#   CENTURION_GATE_CACHE_TTL          entry lifetime in seconds (default: 604800)
+#   CENTURION_GATE_CACHE_MAX_ENTRIES  newest entries kept (default: 500)
+
+gate_cache_dir() {
+    if [[ -n "${CENTURION_GATE_CACHE_DIR:-}" ]]; then
+        echo "$CENTURION_GATE_CACHE_DIR"
+        return 0
+    fi
+    echo "$WORKSPACE_ROOT/state/centurion-gate-cache"
+}
+
+_gate_cache_ttl() {
+    local ttl="${CENTURION_GATE_CACHE_TTL:-604800}"
+    is_integer "$ttl" || ttl=604800
+    echo "$ttl"
+}
+
+# Tree the gates will read, or nothing when caching does not apply.
+gate_cache_tree() {
+    local repo_path="$1"
+    [[ "${CENTURION_GATE_CACHE:-true}" == "true" ]] || return 0
+    [[ -z "$(git -C "$repo_path" status --porcelain 2>/dev/null)" ]] || return 0
+    git -C "$repo_path" rev-parse --verify --quiet 'HEAD^{tree}' 2>/dev/null || true
+}
+
+# "<path> <first line of --version>" per installed tool; "<name> none" otherwise.
+_gate_tool_versions() {
+    local tool path version
+    for tool in "$@"; do
+        if path="$(type -P "$tool" 2>/dev/null)"; then
+            case "$tool" in
+                go) version="$(go version 2>/dev/null | head -1)" ;;
+                *) version="$("$tool" --version 2>/dev/null | head -1)" ;;
+            esac
+            printf '%s %s\n' "$path" "$version"
+        else
+            printf '%s none\n' "$tool"
+        fi
+    done
+}
+
+# Everything besides the tree that decides a gate's outcome. Empty means the
+# gate would not actually check anything (skipped), so it is never cached.
+gate_cache_signature() {
+    local gate="$1" repo_path="$2"
+    local configured="" ts_bin
+    case "$gate" in
+        lint)
+            configured="$(_repo_config_value "$repo_path" lint_cmd)"
+            if [[ -n "$configured" ]]; then
+                printf 'lint_cmd:%s\n' "$configured"
+                _gate_tool_versions "${configured%% *}"
+            else
+                echo "lint:auto"
+                _gate_tool_versions golangci-lint go node shellcheck
+                # An incremental pass only vouches for the files it checked.
+                if [[ "${LINT_GATE_MODE:-full}" == "incremental" ]]; then
+                    printf 'incremental:%s\n' "${LINT_GATE_SHELL_FILES[*]} ${LINT_GATE_JS_FILES[*]}"
+                fi
+            fi
+            ;;
+        tests)
+            configured="$(_repo_config_value "$repo_path" test_cmd)"
+            if [[ -n "$configured" ]]; then
+                printf 'test_cmd:%s\n' "$configured"
+                _gate_tool_versions "${configured%% *}"
+            else
+                echo "tests:auto"
+                _gate_tool_versions npm node go cargo
+            fi
+            ;;
+        truthsayer)
+            # Mirror run_truthsayer_gate's skip rules and binary choice.
+            [[ "${CENTURION_SKIP_TRUTHSAYER:-false}" == "true" ]] && return 0
+            if ! command -v truthsayer >/dev/null 2>&1 && [[ ! -x "$HOME/go/bin/truthsayer" ]]; then
+                return 0
+            fi
+            ts_bin="${TRUTHSAYER_BIN:-${HOME}/go/bin/truthsayer}"
+            [[ -x "$ts_bin" ]] || ts_bin="$(type -P truthsayer 2>/dev/null)" || return 0
+            printf 'truthsayer scan --severity error\n%s %s\n' "$ts_bin" "$(stat -c '%s:%Y' "$ts_bin" 2>/dev/null)"
+            ;;
+    esac
+}
+
+_gate_cache_file() {
+    local repo_path="$1" tree="$2" gate="$3" signature="$4"
+    local key
+    key="$(printf '%s\n%s\n%s\n%s' "$(_gate_config_repo "$repo_path")" "$tree" "$gate" "$signature" | sha256sum | awk '{print $1}')"
+    echo "$(gate_cache_dir)/$key.json"
+}
+
+# Prints the cache entry for a passing gate run, if there is a fresh one.
+gate_cache_lookup() {
+    local repo_path="$1" tree="$2" gate="$3" signature="$4"
+    local file entry cached_epoch
+    [[ -n "$tree" && -n "$signature" ]] || return 1
+    file="$(_gate_cache_file "$repo_path" "$tree" "$gate" "$signature")"
+    [[ -f "$file" ]] || return 1
+    entry="$(jq -c 'select(.status == "pass")' "$file" 2>/dev/null)" || return 1
+    [[ -n "$entry" ]] || return 1
+    cached_epoch="$(jq -r '.cached_epoch // 0' <<<"$entry")"
+    is_integer "$cached_epoch" || return 1
+    (( $(epoch_now) - cached_epoch <= $(_gate_cache_ttl) )) || return 1
+    echo "$entry"
+}
+
+gate_cache_store() {
+    local repo_path="$1" tree="$2" gate="$3" signature="$4" duration_ms="$5"
+    local file tmp
+    [[ -n "$tree" && -n "$signature" ]] || return 0
+    file="$(_gate_cache_file "$repo_path" "$tree" "$gate" "$signature")"
+    mkdir -p "$(dirname "$file")"
+    tmp="$(mktemp "${file}.tmp.XXXXXX")"
+    if jq -cn --arg repo "$repo_path" --arg tree "$tree" --arg gate "$gate" \
+            --arg signature "$signature" --arg cached_at "$(iso_now)" \
+            --argjson cached_epoch "$(epoch_now)" --argjson duration_ms "${duration_ms:-0}" \
+            '{repo:$repo, tree:$tree, gate:$gate, signature:$signature, status:"pass",
+              duration_ms:$duration_ms, cached_at:$cached_at, cached_epoch:$cached_epoch}' > "$tmp"; then
+        mv "$tmp" "$file"
+    else
+        rm -f "$tmp"
+    fi
+}
+
+# Drop entries older than the TTL, then all but the newest MAX_ENTRIES.
+gate_cache_evict() {
+    local dir max ttl_minutes
+    dir="$(gate_cache_dir)"
+    [[ -d "$dir" ]] || return 0
+    max="${CENTURION_GATE_CACHE_MAX_ENTRIES:-500}"
+    is_integer "$max" || max=500
+    ttl_minutes=$(( ($(_gate_cache_ttl) + 59) / 60 ))
+
+    find "$dir" -maxdepth 1 -type f -name '*.json' -mmin "+$ttl_minutes" -delete 2>/dev/null || true
+    find "$dir" -maxdepth 1 -type f -name '*.json' -printf '%T@ %p\n' 2>/dev/null \
+        | sort -rn | tail -n "+$((max + 1))" | cut -d' ' -f2- \
+        | while IFS= read -r stale; do rm -f "$stale"; done
+}
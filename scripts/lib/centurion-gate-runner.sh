@@ -0,0 +1,198 @@
+# shellcheck shell=bash
+# centurion-gate-runner.sh — Parallel executor for Centurion quality gates
+# Source this file; do not execute directly.
+# Requires: common.sh, config.sh, centurion-gate-cache.sh and centurion-test-gate.sh sourced.
+
+# ── Parallel gate executor ──────────────────────────────────────────────────
+# The gates are independent reads of the same tree, so they run concurrently
+# (up to the repo's gate_concurrency) with output captured per gate and
+# replayed in gate order. The first failure cancels the gates still running.
+
+_repo_gate_concurrency() {
+    local repo_path="$1"
+    local configured
+    configured="$(_repo_config_value "$repo_path" gate_concurrency)"
+    [[ -n "$configured" ]] || configured="${CENTURION_GATE_CONCURRENCY:-3}"
+    if is_integer "$configured" && (( configured >= 1 )); then
+        echo "$configured"
+    else
+        echo 3
+    fi
+}
+
+_gate_label() {
+    case "$1" in
+        lint) echo "Lint" ;;
+        tests) echo "Test" ;;
+        truthsayer) echo "Truthsayer" ;;
+    esac
+}
+
+# Kill a gate subshell and everything under it (timeout, the tool itself).
+_kill_process_tree() {
+    local pid="$1" child
+    if command -v pgrep >/dev/null 2>&1; then
+        for child in $(pgrep -P "$pid" 2>/dev/null); do
+            _kill_process_tree "$child"
+        done
+    fi
+    kill -TERM "$pid" 2>/dev/null || true
+}
+
+# Run one gate in the background; its *_LAST_OUTPUT is handed back via a file.
+_run_gate_job() {
+    local gate="$1" repo_path="$2" work_dir="$3"
+    local rc=0
+    case "$gate" in
+        lint)
+            run_lint_gate "$repo_path" >"$work_dir/$gate.out" 2>"$work_dir/$gate.err" || rc=$?
+            printf '%s' "$LINT_GATE_LAST_OUTPUT" >"$work_dir/$gate.detail"
+            ;;
+        tests)
+            run_unit_test_gate "$repo_path" >"$work_dir/$gate.out" 2>"$work_dir/$gate.err" || rc=$?
+            printf '%s' "$TEST_GATE_LAST_OUTPUT" >"$work_dir/$gate.detail"
+            ;;
+        truthsayer)
+            run_truthsayer_gate "$repo_path" >"$work_dir/$gate.out" 2>"$work_dir/$gate.err" || rc=$?
+            printf '%s' "$TRUTHSAYER_GATE_LAST_OUTPUT" >"$work_dir/$gate.detail"
+            ;;
+        *)
+            echo "Unknown gate: $gate" >"$work_dir/$gate.err"
+            rc=1
+            ;;
+    esac
+    exit "$rc"
+}
+
+# Usage: run_gates <repo-path> <gate>...
+# Sets CENTURION_LAST_CHECKS ("lint:812ms,tests:cancelled,...") and
+# CENTURION_LAST_GATES_JSON ([{name, status, duration_ms}], plus the lint
+# mode and file count from plan_lint_gate) for history. Gates with a cached pass for the same tree (centurion-gate-cache.sh) are
+# reported as "cached" and not run.
+run_gates() {
+    local repo_path="$1"
+    shift
+    local -a gates=("$@")
+    local -A gate_pid=() gate_status=() started_us=() duration_ms=() signature=() cached_at=()
+    local max_jobs work_dir next=0 running=0 failed_gate="" gate pid rc now_us
+    local checks="" gates_json="" extra tree="" entry stored=false
+
+    max_jobs="$(_repo_gate_concurrency "$repo_path")"
+    work_dir="$(mktemp -d)"
+
+    tree="$(gate_cache_tree "$repo_path")"
+    if [[ -n "$tree" ]]; then
+        for gate in "${gates[@]}"; do
+            signature[$gate]="$(gate_cache_signature "$gate" "$repo_path")"
+            if entry="$(gate_cache_lookup "$repo_path" "$tree" "$gate" "${signature[$gate]}")"; then
+                gate_status[$gate]="cached"
+                duration_ms[$gate]=0
+                cached_at[$gate]="$(jq -r '.cached_at // ""' <<<"$entry")"
+            fi
+        done
+    fi
+
+    while :; do
+        while [[ -z "$failed_gate" ]] && (( next < ${#gates[@]} && running < max_jobs )); do
+            gate="${gates[next]}"
+            next=$((next + 1))
+            [[ -z "${gate_status[$gate]:-}" ]] || continue
+            started_us[$gate]="${EPOCHREALTIME//[!0-9]/}"
+            _run_gate_job "$gate" "$repo_path" "$work_dir" </dev/null &
+            gate_pid[$!]="$gate"
+            running=$((running + 1))
+        done
+        (( running > 0 )) || break
+
+        rc=0
+        pid=""
+        wait -n -p pid "${!gate_pid[@]}" || rc=$?
+        [[ -n "$pid" && -n "${gate_pid[$pid]:-}" ]] || continue
+        gate="${gate_pid[$pid]}"
+        unset 'gate_pid[$pid]'
+        running=$((running - 1))
+        now_us="${EPOCHREALTIME//[!0-9]/}"
+        duration_ms[$gate]=$(( (now_us - ${started_us[$gate]}) / 1000 ))
+
+        if (( rc == 0 )); then
+            gate_status[$gate]="pass"
+            if [[ -n "$tree" && -n "${signature[$gate]:-}" ]]; then
+                gate_cache_store "$repo_path" "$tree" "$gate" "${signature[$gate]}" "${duration_ms[$gate]}"
+                stored=true
+            fi
+            continue
+        fi
+        gate_status[$gate]="fail"
+        if [[ -z "$failed_gate" ]]; then
+            failed_gate="$gate"
+            for pid in "${!gate_pid[@]}"; do
+                _kill_process_tree "$pid"
+            done
+            for pid in "${!gate_pid[@]}"; do
+                wait "$pid" 2>/dev/null || true
+                gate="${gate_pid[$pid]}"
+                gate_status[$gate]="cancelled"
+                now_us="${EPOCHREALTIME//[!0-9]/}"
+                duration_ms[$gate]=$(( (now_us - ${started_us[$gate]}) / 1000 ))
+            done
+            gate_pid=()
+            running=0
+        fi
+    done
+
+    for gate in "${gates[@]}"; do
+        case "${gate_status[$gate]:-not-run}" in
+            pass|fail)
+                cat "$work_dir/$gate.out" 2>/dev/null || true
+                cat "$work_dir/$gate.err" >&2 2>/dev/null || true
+                checks+="${checks:+,}$gate:${duration_ms[$gate]}ms"
+                ;;
+            cached)
+                echo "$(_gate_label "$gate") gate passed (cached for tree ${tree:0:12} at ${cached_at[$gate]})"
+                checks+="${checks:+,}$gate:cached"
+                ;;
+            cancelled)
+                echo "$(_gate_label "$gate") gate cancelled: $(_gate_label "$failed_gate") gate failed"
+                checks+="${checks:+,}$gate:cancelled"
+                ;;
+            not-run)
+                checks+="${checks:+,}$gate:not-run"
+                ;;
+        esac
+        extra="${cached_at[$gate]:+,\"cached_at\":\"${cached_at[$gate]}\"}"
+        if [[ "$gate" == "lint" ]]; then
+            extra+=",\"mode\":\"$LINT_GATE_MODE\",\"files\":${LINT_GATE_FILE_COUNT:-null}"
+        fi
+        gates_json+="${gates_json:+,}$(printf '{"name":"%s","status":"%s","duration_ms":%s%s}' \
+            "$gate" "${gate_status[$gate]:-not-run}" "${duration_ms[$gate]:-null}" "$extra")"
+    done
+    CENTURION_LAST_CHECKS="$checks"
+    CENTURION_LAST_GATES_JSON="[$gates_json]"
+    if [[ "$stored" == "true" ]]; then
+        gate_cache_evict
+    fi
+
+    if [[ -n "$failed_gate" ]]; then
+        local detail=""
+        detail="$(cat "$work_dir/$failed_gate.detail" 2>/dev/null || true)"
+        case "$failed_gate" in
+            lint)
+                LINT_GATE_LAST_OUTPUT="$detail"
+                TEST_GATE_LAST_OUTPUT="Lint checks failed:
+$detail"
+                ;;
+            tests)
+                TEST_GATE_LAST_OUTPUT="$detail"
+                ;;
+            truthsayer)
+                TRUTHSAYER_GATE_LAST_OUTPUT="$detail"
+                TEST_GATE_LAST_OUTPUT="Truthsayer checks failed:
+$detail"
+                ;;
+        esac
+        rm -rf "$work_dir"
+        return 1
+    fi
+    rm -rf "$work_dir"
+    return 0
+}
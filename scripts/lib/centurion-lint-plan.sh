@@ -0,0 +1,168 @@
+# shellcheck shell=bash
+# centurion-lint-plan.sh — Choose which files the Centurion lint gate checks
+# Source this file; do not execute directly.
+#
+# A merge only needs shellcheck/eslint on the files the branch touched plus
+# the shell files that `source` them. Everything is linted when no base ref
+# is known, when a lint config file changed, or when forced via env.
+#
+# Env:
+#   CENTURION_LINT_MODE   auto|full (default: auto)
+
+LINT_GATE_MODE="full"
+LINT_GATE_REASON=""
+LINT_GATE_PLAN_REPO=""
+LINT_GATE_FILE_COUNT=""
+LINT_GATE_SHELL_FILES=()
+LINT_GATE_JS_FILES=()
+
+_LINT_JS_PATTERN='\.(js|jsx|ts|tsx|mjs|cjs)$'
+
+# Changing any of these can change the verdict on files the diff does not touch.
+_lint_config_file() {
+    local file
+    for file in "$@"; do
+        case "${file##*/}" in
+            .shellcheckrc|.eslintrc|.eslintrc.*|.eslintignore|eslint.config.*|package.json|tsconfig*.json|.golangci.*)
+                echo "$file"
+                return 0
+                ;;
+        esac
+    done
+    return 1
+}
+
+_repo_has_eslint() {
+    local repo_path="$1"
+    [[ -f "$repo_path/package.json" ]] || return 1
+    if command -v jq >/dev/null 2>&1; then
+        jq -e \
+            '.dependencies.eslint != null
+             or .devDependencies.eslint != null
+             or .scripts.eslint != null
+             or ((.scripts.lint // "") | contains("eslint"))' \
+            "$repo_path/package.json" >/dev/null
+    else
+        rg -q '"eslint"' "$repo_path/package.json"
+    fi
+}
+
+# Every lintable file in the worktree, as run_lint_gate has always found them.
+_lint_find_files() {
+    local repo_path="$1"
+    (
+        cd "$repo_path" && find . -regextype posix-extended -type f \( -name '*.sh' -o -regex ".*$_LINT_JS_PATTERN" \) \
+            -not -path './.git/*' \
+            -not -path './node_modules/*' \
+            -not -path './vendor/*'
+    )
+}
+
+# Files changed on <branch> since it forked from <base>. When the branch is
+# the checked-out HEAD, uncommitted and untracked files count as changed too.
+_lint_changed_files() {
+    local repo_path="$1" base="$2" branch="$3"
+    local committed local_changes=""
+    committed="$(git -C "$repo_path" diff --name-only "$base...$branch" 2>/dev/null)" || return 1
+    if [[ "$branch" == "HEAD" ]]; then
+        local_changes="$(git -C "$repo_path" diff --name-only HEAD 2>/dev/null
+            git -C "$repo_path" ls-files --others --exclude-standard 2>/dev/null)"
+    fi
+    printf '%s\n%s\n' "$committed" "$local_changes" | awk 'NF && !seen[$0]++'
+}
+
+# Shell files whose `source` lines point at one of the given files. Uses the
+# same parsing as lint-rules/dependency-direction.sh (first word after the
+# last "source ", quotes stripped); leading $VAR/, ./ and ../ segments are
+# dropped and the rest is matched as a path suffix.
+_lint_sourcing_files() {
+    local repo_path="$1"
+    shift
+    local file sourced target
+    (( $# > 0 )) || return 0
+
+    while IFS=$'\t' read -r file sourced; do
+        while [[ "$sourced" =~ ^(\$\{[^}]*\}|\$[A-Za-z_][A-Za-z0-9_]*|\.|\.\.)/ ]]; do
+            sourced="${sourced#"${BASH_REMATCH[0]}"}"
+        done
+        [[ -n "$sourced" && "$sourced" != *'$'* ]] || continue
+        for target in "$@"; do
+            if [[ "$target" == "$sourced" || "$target" == */"$sourced" ]]; then
+                echo "$file"
+                break
+            fi
+        done
+    done < <(
+        cd "$repo_path" && git ls-files -z -- '*.sh' | xargs -0 -r awk '
+            /^[[:space:]]*#/ { next }
+            /source[[:space:]]+/ {
+                target = $0
+                sub(/.*source[[:space:]]+/, "", target)
+                sub(/[[:space:]].*/, "", target)
+                gsub(/["\047]/, "", target)
+                print FILENAME "\t" target
+            }'
+    )
+}
+
+# Usage: plan_lint_gate <repo-path> [base-ref] [branch-ref]
+# Sets LINT_GATE_MODE (full|incremental), LINT_GATE_REASON, LINT_GATE_SHELL_FILES
+# and LINT_GATE_JS_FILES (repo-relative) and LINT_GATE_FILE_COUNT (empty when
+# a configured lint_cmd decides for itself).
+plan_lint_gate() {
+    local repo_path="$1" base="${2:-}" branch="${3:-HEAD}"
+    local changed_output config_file file
+    local -a changed=() changed_shell=()
+
+    LINT_GATE_MODE="full"
+    LINT_GATE_REASON=""
+    LINT_GATE_PLAN_REPO="$repo_path"
+    LINT_GATE_FILE_COUNT=""
+    LINT_GATE_SHELL_FILES=()
+    LINT_GATE_JS_FILES=()
+
+    if [[ -n "$(_repo_config_value "$repo_path" lint_cmd)" ]]; then
+        LINT_GATE_REASON="configured lint_cmd"
+        return 0
+    fi
+
+    if [[ "${CENTURION_LINT_MODE:-auto}" == "full" ]]; then
+        LINT_GATE_REASON="CENTURION_LINT_MODE=full"
+    elif [[ -z "$base" ]]; then
+        LINT_GATE_REASON="no base ref"
+    elif ! changed_output="$(_lint_changed_files "$repo_path" "$base" "$branch")"; then
+        LINT_GATE_REASON="cannot diff $base...$branch"
+    else
+        [[ -z "$changed_output" ]] || mapfile -t changed <<<"$changed_output"
+        if config_file="$(_lint_config_file "${changed[@]}")"; then
+            LINT_GATE_REASON="lint config changed: $config_file"
+        fi
+    fi
+
+    if [[ -n "$LINT_GATE_REASON" ]]; then
+        while IFS= read -r file; do
+            if [[ "$file" == *.sh ]]; then
+                LINT_GATE_SHELL_FILES+=("$file")
+            else
+                LINT_GATE_JS_FILES+=("$file")
+            fi
+        done < <(_lint_find_files "$repo_path")
+    else
+        LINT_GATE_MODE="incremental"
+        for file in "${changed[@]}"; do
+            [[ "$file" == *.sh ]] && changed_shell+=("$file")
+            [[ -f "$repo_path/$file" ]] || continue
+            if [[ "$file" == *.sh ]]; then
+                LINT_GATE_SHELL_FILES+=("$file")
+            elif [[ "$file" =~ $_LINT_JS_PATTERN ]]; then
+                LINT_GATE_JS_FILES+=("$file")
+            fi
+        done
+        while IFS= read -r file; do
+            [[ " ${LINT_GATE_SHELL_FILES[*]} " == *" $file "* ]] || LINT_GATE_SHELL_FILES+=("$file")
+        done < <(_lint_sourcing_files "$repo_path" "${changed_shell[@]}")
+    fi
+
+    _repo_has_eslint "$repo_path" || LINT_GATE_JS_FILES=()
+    LINT_GATE_FILE_COUNT=$(( ${#LINT_GATE_SHELL_FILES[@]} + ${#LINT_GATE_JS_FILES[@]} ))
+}
@@ -0,0 +1,202 @@
+# shellcheck shell=bash
+# centurion-queue-worker.sh — Merge queue worker behind `centurion.sh queue run`
+# Source this file; do not execute directly.
+# Requires: centurion-queue.sh and the centurion.sh helpers it requires.
+#
+# One worker per repo holds the merge lock and drains the queue in order: up to
+# CENTURION_QUEUE_BATCH consecutive branches at the same level are merged on
+# top of each other in the merge worktree (centurion-worktree.sh) and gated
+# once. A failing batch is split in half and each
+# half retried, down to single branches, which take the regular cmd_merge path
+# (preflight, conflict analysis, Senate escalation). main only moves when a
+# batch or branch passes its gates; a failure is discarded with the scratch
+# worktree. Deep-level branches are always merged one at a time (semantic
+# review is per branch).
+
+# ── Worker ───────────────────────────────────────────────────────────────────
+
+# One branch through the regular merge path; its outcome is final.
+_queue_merge_single() {
+    local repo_path="$1" entry="$2" batch_id="$3"
+    local branch level rc=0
+    branch="$(jq -r '.branch' "$entry")"
+    level="$(jq -r '.quality_level // "standard"' "$entry")"
+
+    # cmd_merge exits, so it runs in a subshell; the worker already holds the lock.
+    ( CENTURION_MERGE_LOCK_HELD=true
+      CENTURION_HISTORY_EXTRA="$(jq -cn --arg id "$batch_id" '{queue:{batch_id:$id, batch_size:1, position:1}}')"
+      cmd_merge "$level" "false" "$branch" "$repo_path" ) || rc=$?
+    rm -f "$entry"
+    QUEUE_PROCESSED=$((QUEUE_PROCESSED + 1))
+    (( rc == 0 )) && QUEUE_MERGED=$((QUEUE_MERGED + 1))
+    log_info "Queue: $branch finished alone (rc=$rc)"
+    return 0
+}
+
+# Stack every branch onto main and gate the result once. Returns non-zero,
+# with main reset, when the batch has to be split.
+_queue_try_batch() {
+    local repo_path="$1" level="$2" batch_id="$3"
+    shift 3
+    local -a entries=("$@") branches=() commits=()
+    local entry branch main_before work_path started_epoch duration_ms i=0 checks rc=0
+
+    for entry in "${entries[@]}"; do
+        branches+=("$(jq -r '.branch' "$entry")")
+    done
+    started_epoch="$(epoch_now)"
+    main_before="$(git -C "$repo_path" rev-parse main)"
+    work_path="$(centurion_worktree_acquire "$repo_path" "$main_before")" || return 1
+
+    for branch in "${branches[@]}"; do
+        if ! git -C "$work_path" merge --no-ff "$branch" -m "centurion: merge $branch to main" >/dev/null 2>&1; then
+            log_info "Queue: batch $batch_id does not stack cleanly at $branch; splitting"
+            rc=1
+            break
+        fi
+        commits+=("$(git -C "$work_path" rev-parse --short HEAD)")
+    done
+
+    if (( rc == 0 )); then
+        CENTURION_GATE_WORKTREE="$work_path"
+        CENTURION_GATE_REPO="$repo_path"
+        if ! run_quality_gate "$work_path" "$level" "$main_before" "HEAD"; then
+            log_info "Queue: batch $batch_id (${#branches[@]} branches) failed ${CENTURION_LAST_CHECKS:-quality}; splitting"
+            rc=1
+        elif ! centurion_advance_main "$repo_path" "$main_before" "$(git -C "$work_path" rev-parse HEAD)"; then
+            log_info "Queue: main moved while batch $batch_id was gated; splitting"
+            rc=1
+        fi
+    fi
+    centurion_worktree_release "$repo_path" "$work_path"
+    (( rc == 0 )) || return 1
+
+    duration_ms="$(( ( $(epoch_now) - started_epoch ) * 1000 ))"
+    checks="${CENTURION_LAST_CHECKS:-quality}"
+    for branch in "${branches[@]}"; do
+        CENTURION_HISTORY_EXTRA="$(jq -cn --arg id "$batch_id" --argjson size "${#branches[@]}" --argjson pos "$((i + 1))" \
+            '{queue:{batch_id:$id, batch_size:$size, position:$pos}}')"
+        write_result "$branch" "merged" "$repo_path" "" "$level" "$CENTURION_HISTORY_EXTRA"
+        append_history "$branch" "$repo_path" "$level" "merged" "$checks" "${commits[i]}" "$duration_ms"
+        rm -f "${entries[i]}"
+        i=$((i + 1))
+    done
+    CENTURION_HISTORY_EXTRA=""
+    QUEUE_PROCESSED=$((QUEUE_PROCESSED + ${#branches[@]}))
+    QUEUE_MERGED=$((QUEUE_MERGED + ${#branches[@]}))
+    notify_wake_gateway "Centurion: merged ${#branches[@]} queued branches to main (${commits[*]}, level=$level)"
+    log_info "Queue: merged batch $batch_id: ${branches[*]}"
+}
+
+# Merge a batch, bisecting on failure until single branches remain.
+_queue_process_batch() {
+    local repo_path="$1" level="$2" batch_id="$3"
+    shift 3
+    local -a entries=() pending=("$@")
+    local entry branch half
+
+    # Branches that are gone or already merged get their result from cmd_merge.
+    for entry in "${pending[@]}"; do
+        branch="$(jq -r '.branch' "$entry")"
+        if ! git -C "$repo_path" show-ref --verify --quiet "refs/heads/$branch" \
+            || git -C "$repo_path" merge-base --is-ancestor "$branch" main 2>/dev/null; then
+            _queue_merge_single "$repo_path" "$entry" "$batch_id"
+        else
+            entries+=("$entry")
+        fi
+    done
+
+    (( ${#entries[@]} > 0 )) || return 0
+    if (( ${#entries[@]} == 1 )); then
+        _queue_merge_single "$repo_path" "${entries[0]}" "$batch_id"
+        return 0
+    fi
+    _queue_try_batch "$repo_path" "$level" "$batch_id" "${entries[@]}" && return 0
+
+    half=$(( ${#entries[@]} / 2 ))
+    _queue_process_batch "$repo_path" "$level" "$batch_id.a" "${entries[@]:0:half}"
+    _queue_process_batch "$repo_path" "$level" "$batch_id.b" "${entries[@]:half}"
+}
+
+# Remove the lock and PID files, but only while they still name this worker.
+_queue_release() {
+    local file
+    for file in "$@"; do
+        [[ "$(head -1 "$file" 2>/dev/null)" == "$$" ]] && rm -f "$file"
+    done
+    return 0
+}
+
+queue_run() {
+    local repo_path="$1" batch_max="$2"
+    local dir pid_file lock_file lock_pid waited=0 wait_max started_epoch elapsed
+    local -a entries=() batch=()
+    local entry level next_level batch_id main_checkout
+
+    git -C "$repo_path" rev-parse --git-dir &>/dev/null || { echo "Error: not a git repo: $repo_path" >&2; return 1; }
+    dir="$(queue_dir "$repo_path")"
+    mkdir -p "$dir"
+    pid_file="$dir/worker.pid"
+    if ! ( set -o noclobber; echo "$$" > "$pid_file" ) 2>/dev/null; then
+        if lock_pid="$(_queue_worker_pid "$repo_path")"; then
+            echo "Queue worker already running for $repo_path (PID $lock_pid)"
+            return 0
+        fi
+        echo "$$" > "$pid_file"
+    fi
+
+    # Wait out a direct `centurion.sh merge`, then hold its lock ourselves.
+    lock_file="$(centurion_lock_file "$repo_path")"
+    wait_max="${CENTURION_QUEUE_LOCK_WAIT:-3600}"
+    while lock_pid="$(head -1 "$lock_file" 2>/dev/null)" && [[ -n "$lock_pid" ]] && kill -0 "$lock_pid" 2>/dev/null; do
+        if (( waited >= wait_max )); then
+            echo "Error: merge lock for $repo_path still held by PID $lock_pid after ${wait_max}s" >&2
+            rm -f "$pid_file"
+            return 1
+        fi
+        sleep 1
+        waited=$((waited + 1))
+    done
+    echo "$$" > "$lock_file"
+    # shellcheck disable=SC2064 # paths are fixed for this worker
+    trap "_queue_release '$lock_file' '$pid_file'" EXIT
+
+    QUEUE_PROCESSED=0
+    QUEUE_MERGED=0
+    started_epoch="$(epoch_now)"
+    log_info "Queue worker $$ started for $repo_path (batch=$batch_max)"
+    sleep "${CENTURION_QUEUE_SETTLE:-0}"
+
+    while :; do
+        mapfile -t entries < <(_queue_entries "$repo_path")
+        if (( ${#entries[@]} == 0 )); then
+            # `queue add` skips autostart while our PID file exists, so give it
+            # up first and only then make sure nothing slipped in meanwhile.
+            rm -f "$pid_file"
+            [[ -n "$(_queue_entries "$repo_path")" ]] || break
+            ( set -o noclobber; echo "$$" > "$pid_file" ) 2>/dev/null || break
+            continue
+        fi
+
+        main_checkout="$(centurion_main_checkout "$repo_path")"
+        if [[ -n "$main_checkout" ]] && git -C "$main_checkout" status --porcelain 2>/dev/null | grep -q .; then
+            # cmd_merge records dirty-worktree for the head of the queue.
+            _queue_merge_single "$repo_path" "${entries[0]}" "$(basename "${entries[0]}" .json)"
+            continue
+        fi
+
+        level="$(jq -r '.quality_level // "standard"' "${entries[0]}")"
+        batch=()
+        for entry in "${entries[@]}"; do
+            next_level="$(jq -r '.quality_level // "standard"' "$entry")"
+            [[ "$next_level" == "$level" ]] || break
+            batch+=("$entry")
+            (( ${#batch[@]} < batch_max )) && [[ "$level" != "deep" ]] || break
+        done
+        batch_id="$(basename "${batch[0]}" .json)"
+        _queue_process_batch "$repo_path" "$level" "$batch_id" "${batch[@]}"
+    done
+
+    elapsed=$(( $(epoch_now) - started_epoch ))
+    log_info "Queue worker $$ done: $QUEUE_MERGED/$QUEUE_PROCESSED merged in ${elapsed}s ($(( elapsed > 0 ? QUEUE_MERGED * 3600 / elapsed : QUEUE_MERGED * 3600 )) merges/hour)"
+}
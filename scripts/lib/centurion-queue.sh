@@ -0,0 +1,173 @@
+# shellcheck shell=bash
+# centurion-queue.sh — Merge queue behind `centurion.sh queue`
+# Source this file; do not execute directly.
+# Requires: centurion.sh helpers (write_result, append_history, cmd_merge,
+# centurion_lock_file) and the centurion libs it sources.
+#
+# Branches are queued as state/centurion-queue/<repo-key>/<seq>.json; this
+# file is the `queue add|remove|status` front end and the command dispatcher.
+# The worker that drains the queue lives in centurion-queue-worker.sh.
+#
+# Env:
+#   CENTURION_QUEUE_DIR        default: state/centurion-queue
+#   CENTURION_QUEUE_BATCH      max branches gated together (default: 4)
+#   CENTURION_QUEUE_AUTOSTART  start a worker on `queue add` (default: true)
+#   CENTURION_QUEUE_LOCK_WAIT  seconds a worker waits for a running merge (default: 3600)
+#   CENTURION_QUEUE_SETTLE     seconds a worker waits for more branches before
+#                              its first batch (default: 0; autostarted: 3)
+
+queue_dir() {
+    local repo_path="$1"
+    echo "${CENTURION_QUEUE_DIR:-$WORKSPACE_ROOT/state/centurion-queue}/$(printf '%s' "$repo_path" | sha256sum | cut -c1-12)"
+}
+
+# Queue entries for a repo, oldest first.
+_queue_entries() {
+    local dir
+    dir="$(queue_dir "$1")"
+    [[ -d "$dir" ]] || return 0
+    find "$dir" -maxdepth 1 -type f -name '[0-9]*.json' | sort
+}
+
+_queue_worker_pid() {
+    local repo_path="$1" pid_file pid
+    pid_file="$(queue_dir "$repo_path")/worker.pid"
+    [[ -f "$pid_file" ]] || return 1
+    pid="$(head -1 "$pid_file" 2>/dev/null)" || return 1
+    [[ -n "$pid" ]] && kill -0 "$pid" 2>/dev/null || return 1
+    echo "$pid"
+}
+
+queue_add() {
+    local level="$1" branch="$2" repo_path="$3"
+    local dir entry seq position
+
+    case "$level" in
+        quick|standard|deep) ;;
+        *) echo "Error: invalid quality level '$level' (expected quick|standard|deep)" >&2; return 1 ;;
+    esac
+    git -C "$repo_path" rev-parse --git-dir &>/dev/null || { echo "Error: not a git repo: $repo_path" >&2; return 1; }
+    git -C "$repo_path" show-ref --verify --quiet "refs/heads/$branch" || {
+        echo "Error: branch not found: $branch" >&2
+        return 1
+    }
+
+    dir="$(queue_dir "$repo_path")"
+    mkdir -p "$dir"
+    while IFS= read -r entry; do
+        if [[ "$(jq -r '.branch' "$entry" 2>/dev/null)" == "$branch" ]]; then
+            echo "Already queued: $branch ($(basename "$entry" .json))"
+            return 0
+        fi
+    done < <(_queue_entries "$repo_path")
+
+    seq="$(date +%s%N)-$$"
+    entry="$dir/$seq.json"
+    jq -cn --arg id "$seq" --arg branch "$branch" --arg repo "$repo_path" --arg level "$level" \
+        --arg ts "$(iso_now)" \
+        '{id:$id, branch:$branch, repo:$repo, quality_level:$level, enqueued_at:$ts}' > "$entry.tmp.$$"
+    mv "$entry.tmp.$$" "$entry"
+    position="$(_queue_entries "$repo_path" | grep -n -F "$entry" | cut -d: -f1)"
+    echo "Queued $branch for $repo_path (position $position, id $seq)"
+
+    if [[ "${CENTURION_QUEUE_AUTOSTART:-true}" == "true" ]] && ! _queue_worker_pid "$repo_path" >/dev/null; then
+        # Branches that finish together are usually enqueued within seconds.
+        export CENTURION_QUEUE_SETTLE="${CENTURION_QUEUE_SETTLE:-3}"
+        if command -v setsid >/dev/null 2>&1; then
+            setsid "$SCRIPT_DIR/centurion.sh" queue run "$repo_path" >>"$dir/worker.log" 2>&1 </dev/null &
+        else
+            nohup "$SCRIPT_DIR/centurion.sh" queue run "$repo_path" >>"$dir/worker.log" 2>&1 </dev/null &
+        fi
+        echo "Started queue worker (log: $dir/worker.log)"
+    fi
+}
+
+queue_remove() {
+    local branch="$1" repo_path="$2" entry
+    while IFS= read -r entry; do
+        if [[ "$(jq -r '.branch' "$entry" 2>/dev/null)" == "$branch" ]]; then
+            rm -f "$entry"
+            echo "Removed $branch from the queue"
+            return 0
+        fi
+    done < <(_queue_entries "$repo_path")
+    echo "Not queued: $branch" >&2
+    return 1
+}
+
+queue_status() {
+    local repo_path="$1" as_json="$2"
+    local pending='[]' worker="" merged_last_hour=0 since
+
+    if [[ -d "$(queue_dir "$repo_path")" ]]; then
+        pending="$(_queue_entries "$repo_path" | xargs -r jq -s -c '.')"
+        [[ -n "$pending" ]] || pending='[]'
+    fi
+    worker="$(_queue_worker_pid "$repo_path")" || worker=""
+    if [[ -f "$CENTURION_HISTORY_FILE" ]]; then
+        since="$(date -u -d '1 hour ago' +%Y-%m-%dT%H:%M:%SZ)"
+        merged_last_hour="$(jq -s --arg repo "$repo_path" --arg since "$since" \
+            '[.[] | select(.repo == $repo and .status == "merged" and .queue != null and .timestamp >= $since)] | length' \
+            "$CENTURION_HISTORY_FILE" 2>/dev/null || echo 0)"
+    fi
+
+    if [[ "$as_json" == "true" ]]; then
+        jq -cn --arg repo "$repo_path" --argjson pending "$pending" --arg worker "$worker" \
+            --argjson merged "$merged_last_hour" \
+            '{repo:$repo, worker_pid:(if $worker == "" then null else ($worker | tonumber) end),
+              pending:$pending, merged_last_hour:$merged}'
+        return 0
+    fi
+
+    echo "Repo: $repo_path"
+    echo "  Worker: ${worker:-not running}"
+    echo "  Merged via queue in the last hour: $merged_last_hour"
+    jq -r 'if length == 0 then "  Queue empty"
+           else to_entries[] | "  \(.key + 1). \(.value.branch) (level=\(.value.quality_level), queued \(.value.enqueued_at))" end' \
+        <<<"$pending"
+}
+
+cmd_queue() {
+    local sub="${1:-}" level="standard" batch_max="${CENTURION_QUEUE_BATCH:-4}" as_json="false"
+    (( $# > 0 )) && shift
+    while (( $# > 0 )); do
+        case "$1" in
+            --level) level="${2:-}"; shift 2 ;;
+            --batch) batch_max="${2:-}"; shift 2 ;;
+            --json) as_json="true"; shift ;;
+            *) break ;;
+        esac
+    done
+    is_integer "$batch_max" && (( batch_max >= 1 )) || {
+        echo "Error: batch size must be a positive integer (got '$batch_max')" >&2
+        return 1
+    }
+
+    # Queue state is keyed by path, so `queue add . ` and `queue run $PWD` must agree.
+    local repo_arg_index=1
+    [[ "$sub" == "add" || "$sub" == "remove" ]] && repo_arg_index=2
+    if (( $# >= repo_arg_index )) && [[ -d "${!repo_arg_index}" ]]; then
+        set -- "${@:1:repo_arg_index-1}" "$(cd "${!repo_arg_index}" && pwd)" "${@:repo_arg_index+1}"
+    fi
+
+    case "$sub" in
+        add)
+            (( $# >= 2 )) || { echo "Error: queue add requires <branch> <repo-path>" >&2; return 1; }
+            queue_add "$level" "$1" "$2"
+            ;;
+        run)
+            queue_run "${1:-$PWD}" "$batch_max"
+            ;;
+        status)
+            queue_status "${1:-$PWD}" "$as_json"
+            ;;
+        remove)
+            (( $# >= 2 )) || { echo "Error: queue remove requires <branch> <repo-path>" >&2; return 1; }
+            queue_remove "$1" "$2"
+            ;;
+        *)
+            echo "Error: unknown queue command '$sub' (expected add|run|status|remove)" >&2
+            return 1
+            ;;
+    esac
+}
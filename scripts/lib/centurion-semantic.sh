@@ -1,6 +1,21 @@
 # shellcheck shell=bash
 # centurion-semantic.sh — Semantic review helpers for Centurion
 # Source this file; do not execute directly.
+# Requires: config.sh sourced.
+#
+# Reviews are cached: the same diff reviewed with the same prompt file and
+# model (or CENTURION_SEMANTIC_REVIEW_CMD) reuses the stored reviewer output,
+# so re-running a deep merge or check after an unrelated failure skips the
+# reviewer call. Cached results carry `cached: true` and the original
+# `reviewed_at` in SEMANTIC_REVIEW_LAST_JSON.
+#
+# Env:
+#   CENTURION_SEMANTIC_CACHE              true|false (default: true)
+#   CENTURION_SEMANTIC_CACHE_DIR          default: state/centurion-semantic-cache
+#   CENTURION_SEMANTIC_CACHE_TTL          entry lifetime in seconds (default: 604800)
+#   CENTURION_SEMANTIC_CACHE_MAX_ENTRIES  newest entries kept (default: 200)
+#   CENTURION_SEMANTIC_CACHE_REFRESH      true forces a fresh review, which
+#                                         replaces the entry (`--fresh-review`)
 
 SEMANTIC_REVIEW_LAST_JSON=""
 SEMANTIC_REVIEW_LAST_VERDICT="review-needed"
@@ -11,6 +26,7 @@ SEMANTIC_GAMING_FLAGS_JSON="[]"
 SEMANTIC_GAMING_SEVERITY="none"
 SEMANTIC_GAMING_SUMMARY=""
 SEMANTIC_DIFF_ANALYSIS_JSON="{}"
+SEMANTIC_REVIEW_OUTPUT_VALID="false"
 
 semantic_review_prompt_file() {
     if [[ -n "${CENTURION_SEMANTIC_PROMPT_FILE:-}" ]]; then
@@ -26,12 +42,7 @@ semantic_review_model() {
         return 0
     fi
 
-    if [[ -f "${CONFIG_FILE:-}" ]] && command -v jq >/dev/null 2>&1; then
-        jq -r '.claude.default_model // "opus"' "$CONFIG_FILE"
-        return 0
-    fi
-
-    echo "opus"
+    config_value claude default_model 2>/dev/null || echo "opus"
 }
 
 semantic_extract_diff() {
@@ -44,45 +55,28 @@ semantic_extract_changed_files() {
     git -C "$repo_path" diff --name-only "${target_branch}...${source_branch}" 2>/dev/null || true
 }
 
+# Per-file line counts for the branch diff: one `git diff --numstat`, one jq.
 semantic_build_diff_analysis() {
     local repo_path="$1" target_branch="$2" source_branch="$3"
-    local files_total=0 tests_changed=0 source_changed=0 added_lines=0 removed_lines=0
-    local entries_json='[]'
+    local added removed file is_test rows=""
 
     while IFS=$'\t' read -r added removed file; do
         [[ -n "${file:-}" ]] || continue
-        [[ "${added:-}" =~ ^[0-9]+$ ]] || added=0
-        [[ "${removed:-}" =~ ^[0-9]+$ ]] || removed=0
-
-        local is_test=false
-        if semantic_is_test_file "$file"; then
-            is_test=true
-            tests_changed=$((tests_changed + 1))
-        else
-            source_changed=$((source_changed + 1))
-        fi
-
-        files_total=$((files_total + 1))
-        added_lines=$((added_lines + added))
-        removed_lines=$((removed_lines + removed))
-
-        entries_json="$(jq -cn \
-            --argjson current "$entries_json" \
-            --arg file "$file" \
-            --argjson added "$added" \
-            --argjson removed "$removed" \
-            --argjson is_test "$is_test" \
-            '$current + [{file:$file, added:$added, removed:$removed, is_test:$is_test}]')"
+        is_test=false
+        semantic_is_test_file "$file" && is_test=true
+        rows+="$added"$'\x1f'"$removed"$'\x1f'"$is_test"$'\x1f'"$file"$'\n'
     done < <(git -C "$repo_path" diff --numstat "${target_branch}...${source_branch}" 2>/dev/null || true)
 
-    SEMANTIC_DIFF_ANALYSIS_JSON="$(jq -cn \
-        --argjson files_total "$files_total" \
-        --argjson tests_changed "$tests_changed" \
-        --argjson source_changed "$source_changed" \
-        --argjson added_lines "$added_lines" \
-        --argjson removed_lines "$removed_lines" \
-        --argjson files "$entries_json" \
-        '{files_total:$files_total, tests_changed:$tests_changed, source_changed:$source_changed, added_lines:$added_lines, removed_lines:$removed_lines, files:$files}')"
+    SEMANTIC_DIFF_ANALYSIS_JSON="$(printf '%s' "$rows" | jq -cRn '
+        def count: if test("^[0-9]+$") then tonumber else 0 end;
+        [inputs | split("\u001f")
+         | {file: (.[3:] | join("\u001f")), added: (.[0] | count), removed: (.[1] | count), is_test: (.[2] == "true")}] as $files
+        | {files_total: ($files | length),
+           tests_changed: ([$files[] | select(.is_test)] | length),
+           source_changed: ([$files[] | select(.is_test | not)] | length),
+           added_lines: ($files | map(.added) | add // 0),
+           removed_lines: ($files | map(.removed) | add // 0),
+           files: $files}')"
 }
 
 semantic_is_test_file() {
@@ -90,41 +84,40 @@ semantic_is_test_file() {
     [[ "$file" =~ (^|/)(test|tests)/ ]] || [[ "$file" =~ (_test\.[^/]+$|\.test\.[^/]+$|\.spec\.[^/]+$) ]]
 }
 
+# Flags test-gaming patterns in the branch diff. Test files are read from one
+# `git diff` over all of them; a file counts as having lost assertions when its
+# hunks remove assertion lines and add none.
 semantic_detect_test_gaming() {
     local repo_path="$1" target_branch="$2" source_branch="$3"
     local has_source_changes=0 has_test_changes=0 removed_assertions=0 added_skip_markers=0
     local severity="none"
     local summary="no suspicious test-gaming patterns detected"
-    local -a changed_files=()
+    local -a changed_files=() test_files=()
     local -a flags=()
 
     mapfile -t changed_files < <(semantic_extract_changed_files "$repo_path" "$target_branch" "$source_branch")
     for file in "${changed_files[@]}"; do
         [[ -n "$file" ]] || continue
-
         if semantic_is_test_file "$file"; then
             has_test_changes=1
-            local test_diff
-            test_diff="$(git -C "$repo_path" diff --no-color "${target_branch}...${source_branch}" -- "$file" 2>/dev/null || true)"
-            local removed_assertions_here=0
-            local added_assertions_here=0
-            if printf '%s\n' "$test_diff" | grep -E '^-.*(assert|expect\(|require\.|t\.(Fatal|Error|Fail(Now)?))' >/dev/null; then
-                removed_assertions_here=1
-            fi
-            if printf '%s\n' "$test_diff" | grep -E '^\+.*(assert|expect\(|require\.|t\.(Fatal|Error|Fail(Now)?))' >/dev/null; then
-                added_assertions_here=1
-            fi
-            if (( removed_assertions_here == 1 && added_assertions_here == 0 )); then
-                removed_assertions=1
-            fi
-            if printf '%s\n' "$test_diff" | grep -E '^\+.*(\.skip\(|t\.Skip\(|xit\(|xdescribe\(|@Disabled)' >/dev/null; then
-                added_skip_markers=1
-            fi
+            test_files+=("$file")
         else
             has_source_changes=1
         fi
     done
 
+    if (( ${#test_files[@]} > 0 )); then
+        read -r removed_assertions added_skip_markers < <(
+            git --literal-pathspecs -C "$repo_path" diff --no-color "${target_branch}...${source_branch}" -- "${test_files[@]}" 2>/dev/null \
+                | awk '
+                    function finish() { if (removed && !added) removed_any = 1; removed = 0; added = 0 }
+                    /^diff --git / { finish(); next }
+                    /^-.*(assert|expect\(|require\.|t\.(Fatal|Error|Fail(Now)?))/ { removed = 1 }
+                    /^\+.*(assert|expect\(|require\.|t\.(Fatal|Error|Fail(Now)?))/ { added = 1 }
+                    /^\+.*(\.skip\(|t\.Skip\(|xit\(|xdescribe\(|@Disabled)/ { skip = 1 }
+                    END { finish(); print removed_any + 0, skip + 0 }') || true
+    fi
+
     if (( removed_assertions == 1 )); then
         flags+=("test.assertions_removed")
         severity="high"
@@ -217,6 +210,79 @@ ${diff_text:-empty}
 PROMPT
 }
 
+# ── Verdict cache ───────────────────────────────────────────────────────────
+
+semantic_cache_dir() {
+    if [[ -n "${CENTURION_SEMANTIC_CACHE_DIR:-}" ]]; then
+        echo "$CENTURION_SEMANTIC_CACHE_DIR"
+        return 0
+    fi
+    echo "$WORKSPACE_ROOT/state/centurion-semantic-cache"
+}
+
+_semantic_cache_ttl() {
+    local ttl="${CENTURION_SEMANTIC_CACHE_TTL:-604800}"
+    is_integer "$ttl" || ttl=604800
+    echo "$ttl"
+}
+
+# Key for a review: sha256 of the diff, the prompt file and the reviewer
+# (model or command). Empty when caching is off.
+semantic_cache_key() {
+    local repo_path="$1" target_branch="$2" source_branch="$3" reviewer="$4"
+    local prompt_file prompt_hash="builtin"
+    [[ "${CENTURION_SEMANTIC_CACHE:-true}" == "true" ]] || return 0
+    prompt_file="$(semantic_review_prompt_file)"
+    [[ -f "$prompt_file" ]] && prompt_hash="$(sha256sum < "$prompt_file" | cut -d' ' -f1)"
+    printf '%s\n%s\n%s' \
+        "$(semantic_extract_diff "$repo_path" "$target_branch" "$source_branch" | sha256sum | cut -d' ' -f1)" \
+        "$prompt_hash" "$reviewer" | sha256sum | cut -d' ' -f1
+}
+
+# Prints the cache entry for a key, if there is a fresh one.
+semantic_cache_lookup() {
+    local key="$1" file entry
+    [[ -n "$key" ]] || return 1
+    file="$(semantic_cache_dir)/$key.json"
+    [[ -f "$file" ]] || return 1
+    entry="$(jq -c --argjson now "$(epoch_now)" --argjson ttl "$(_semantic_cache_ttl)" \
+        'select((.raw_output | type) == "string" and $now - (.cached_epoch // 0) <= $ttl)' "$file" 2>/dev/null)" || return 1
+    [[ -n "$entry" ]] || return 1
+    echo "$entry"
+}
+
+semantic_cache_store() {
+    local key="$1" reviewer="$2" raw_output="$3" reviewed_at="$4"
+    local file tmp
+    [[ -n "$key" ]] || return 0
+    file="$(semantic_cache_dir)/$key.json"
+    mkdir -p "$(dirname "$file")"
+    tmp="$(mktemp "${file}.tmp.XXXXXX")"
+    if jq -cn --arg key "$key" --arg reviewer "$reviewer" --arg raw "$raw_output" \
+            --arg reviewed_at "$reviewed_at" --argjson cached_epoch "$(epoch_now)" \
+            '{key:$key, reviewer:$reviewer, raw_output:$raw, reviewed_at:$reviewed_at, cached_epoch:$cached_epoch}' > "$tmp"; then
+        mv "$tmp" "$file"
+    else
+        rm -f "$tmp"
+    fi
+    semantic_cache_evict
+}
+
+# Drop entries older than the TTL, then all but the newest MAX_ENTRIES.
+semantic_cache_evict() {
+    local dir max ttl_minutes
+    dir="$(semantic_cache_dir)"
+    [[ -d "$dir" ]] || return 0
+    max="${CENTURION_SEMANTIC_CACHE_MAX_ENTRIES:-200}"
+    is_integer "$max" || max=200
+    ttl_minutes=$(( ($(_semantic_cache_ttl) + 59) / 60 ))
+
+    find "$dir" -maxdepth 1 -type f -name '*.json' -mmin "+$ttl_minutes" -delete 2>/dev/null || true
+    find "$dir" -maxdepth 1 -type f -name '*.json' -printf '%T@ %p\n' 2>/dev/null \
+        | sort -rn | tail -n "+$((max + 1))" | cut -d' ' -f2- \
+        | while IFS= read -r stale; do rm -f "$stale"; done
+}
+
 semantic_set_result() {
     local verdict="$1" summary="$2" flags_json="$3" raw_output="$4"
     local ts
@@ -242,6 +308,7 @@ semantic_set_result() {
 semantic_parse_review_json() {
     local raw="$1"
     local json_line=""
+    SEMANTIC_REVIEW_OUTPUT_VALID="false"
 
     if printf '%s' "$raw" | jq empty >/dev/null 2>&1; then
         json_line="$raw"
@@ -253,6 +320,7 @@ semantic_parse_review_json() {
         semantic_set_result "review-needed" "semantic review output was not valid JSON" '[]' "$raw"
         return 2
     fi
+    SEMANTIC_REVIEW_OUTPUT_VALID="true"
 
     local verdict summary flags_json
     verdict="$(printf '%s' "$json_line" | jq -r '.verdict // "review-needed"')"
@@ -281,7 +349,7 @@ semantic_parse_review_json() {
 
 run_semantic_review() {
     local repo_path="$1" source_branch="$2" target_branch="${3:-main}"
-    local prompt review_cmd model output
+    local prompt review_cmd model reviewer output cache_key cache_entry=""
     local parse_rc=0
     local merged_flags="[]"
 
@@ -292,22 +360,31 @@ run_semantic_review() {
         return 1
     fi
 
-    prompt="$(semantic_build_prompt "$repo_path" "$target_branch" "$source_branch")"
-
     if [[ -n "${CENTURION_SEMANTIC_REVIEW_CMD:-}" ]]; then
         review_cmd="$CENTURION_SEMANTIC_REVIEW_CMD"
+        reviewer="cmd:$review_cmd"
     else
-        if ! command -v claude >/dev/null 2>&1; then
-            semantic_set_result "review-needed" "claude CLI unavailable for semantic review" '[]' ""
-            return 2
-        fi
         model="$(semantic_review_model)"
         review_cmd="claude -p --dangerously-skip-permissions --model $model"
+        reviewer="model:$model"
     fi
 
-    if ! output="$(printf '%s\n' "$prompt" | bash -lc "$review_cmd" 2>&1)"; then
-        semantic_set_result "review-needed" "semantic review command failed" '[]' "$output"
-        return 2
+    cache_key="$(semantic_cache_key "$repo_path" "$target_branch" "$source_branch" "$reviewer")"
+    if [[ "${CENTURION_SEMANTIC_CACHE_REFRESH:-false}" != "true" ]] \
+        && cache_entry="$(semantic_cache_lookup "$cache_key")"; then
+        output="$(jq -r '.raw_output' <<<"$cache_entry")"
+    else
+        cache_entry=""
+        if [[ -z "${CENTURION_SEMANTIC_REVIEW_CMD:-}" ]] && ! command -v claude >/dev/null 2>&1; then
+            semantic_set_result "review-needed" "claude CLI unavailable for semantic review" '[]' ""
+            return 2
+        fi
+
+        prompt="$(semantic_build_prompt "$repo_path" "$target_branch" "$source_branch")"
+        if ! output="$(printf '%s\n' "$prompt" | bash -lc "$review_cmd" 2>&1)"; then
+            semantic_set_result "review-needed" "semantic review command failed" '[]' "$output"
+            return 2
+        fi
     fi
 
     if semantic_parse_review_json "$output"; then
@@ -315,16 +392,27 @@ run_semantic_review() {
     else
         parse_rc=$?
     fi
+    if [[ -z "$cache_entry" && "$SEMANTIC_REVIEW_OUTPUT_VALID" == "true" ]]; then
+        semantic_cache_store "$cache_key" "$reviewer" "$output" "$(jq -r '.reviewed_at' <<<"$SEMANTIC_REVIEW_LAST_JSON")"
+    fi
 
     if [[ "${SEMANTIC_GAMING_FLAGS_JSON:-[]}" != "[]" ]]; then
         merged_flags="$(jq -cn --argjson review "${SEMANTIC_REVIEW_LAST_FLAGS:-[]}" --argjson gaming "${SEMANTIC_GAMING_FLAGS_JSON:-[]}" \
             '$review + $gaming | unique')"
         if [[ "$SEMANTIC_GAMING_SEVERITY" == "medium" && "$SEMANTIC_REVIEW_LAST_VERDICT" == "pass" ]]; then
             semantic_set_result "review-needed" "semantic review flagged potential test gaming: $SEMANTIC_GAMING_SUMMARY" "$merged_flags" "$output"
-            return 2
+            parse_rc=2
+        else
+            semantic_set_result "$SEMANTIC_REVIEW_LAST_VERDICT" "$SEMANTIC_REVIEW_LAST_SUMMARY" "$merged_flags" "$output"
         fi
-        semantic_set_result "$SEMANTIC_REVIEW_LAST_VERDICT" "$SEMANTIC_REVIEW_LAST_SUMMARY" "$merged_flags" "$output"
-        return "$parse_rc"
+    fi
+
+    # A cached verdict keeps the time of the review that produced it.
+    if [[ -n "$cache_entry" ]]; then
+        SEMANTIC_REVIEW_LAST_JSON="$(jq -c --argjson entry "$cache_entry" \
+            '. + {cached: true, reviewed_at: $entry.reviewed_at}' <<<"$SEMANTIC_REVIEW_LAST_JSON")"
+    else
+        SEMANTIC_REVIEW_LAST_JSON="$(jq -c '. + {cached: false}' <<<"$SEMANTIC_REVIEW_LAST_JSON")"
     fi
 
     return "$parse_rc"
@@ -1,6 +1,7 @@
 # shellcheck shell=bash
 # centurion-senate.sh — Senate escalation helpers for Centurion
 # Source this file; do not execute directly.
+# Requires: centurion-conflicts.sh sourced.
 
 SENATE_ESCALATION_LAST_CASE_ID=""
 SENATE_ESCALATION_LAST_FILE=""
@@ -88,73 +89,39 @@ senate_wait_for_verdict() {
         wait_seconds=0
     fi
     deadline=$(( $(date +%s) + wait_seconds ))
-    while (( $(date +%s) <= deadline )); do
-        [[ -f "$verdict_file" ]] && { printf '%s\n' "$verdict_file"; return 0; }
+    while [[ ! -f "$verdict_file" ]]; do
+        (( $(date +%s) < deadline )) || return 1
         sleep 1
     done
-
-    return 1
+    printf '%s\n' "$verdict_file"
 }
 
 apply_senate_verdict() {
     local repo_path="$1" verdict_file="$2"
-    local mode files_json
-    local resolved_json='[]'
-    local unresolved_json='[]'
-    local resolved_count=0 unresolved_count=0
+    local mode path explicit_strategy
     local -a conflicted_files=()
+    local -A strategy=() explicit=()
 
     [[ -f "$verdict_file" ]] || return 1
     mode="$(jq -r '.resolution.mode // .mode // "manual"' "$verdict_file" 2>/dev/null)" || mode="manual"
-    files_json="$(jq -c '.resolution.files // .files // []' "$verdict_file" 2>/dev/null)" || files_json='[]'
+    # Per-file overrides; the first entry for a path wins.
+    while IFS=$'\x1f' read -r path explicit_strategy; do
+        [[ -n "$path" && -z "${explicit[$path]+set}" ]] && explicit["$path"]="$explicit_strategy"
+    done < <(jq -r '(.resolution.files // .files // [])[] | objects | select(.path | type == "string")
+        | [.path, (.strategy | tostring)] | join("\u001f")' "$verdict_file" 2>/dev/null || true)
 
-    mapfile -t conflicted_files < <(git -C "$repo_path" diff --name-only --diff-filter=U 2>/dev/null || true)
+    mapfile -t -d '' conflicted_files < <(git -C "$repo_path" diff --name-only -z --diff-filter=U 2>/dev/null || true)
     [[ ${#conflicted_files[@]} -gt 0 ]] || return 1
 
-    for file in "${conflicted_files[@]}"; do
-        [[ -n "$file" ]] || continue
-        local strategy="$mode"
-        local explicit
-        explicit="$(jq -r --arg file "$file" '.[] | select(.path == $file) | .strategy' <<<"$files_json" 2>/dev/null | head -n1 || true)"
-        [[ -n "$explicit" ]] && strategy="$explicit"
-
-        if [[ "$strategy" == "ours" || "$strategy" == "theirs" ]]; then
-            if git -C "$repo_path" checkout "--$strategy" -- "$file" >/dev/null 2>&1 && git -C "$repo_path" add -- "$file" >/dev/null 2>&1; then
-                resolved_count=$((resolved_count + 1))
-                resolved_json="$(jq -cn \
-                    --argjson current "$resolved_json" \
-                    --arg file "$file" \
-                    --arg strategy "$strategy" \
-                    '$current + [{file:$file, strategy:$strategy}]')"
-            else
-                unresolved_count=$((unresolved_count + 1))
-                unresolved_json="$(jq -cn \
-                    --argjson current "$unresolved_json" \
-                    --arg file "$file" \
-                    --arg reason "checkout_failed" \
-                    '$current + [{file:$file, reason:$reason}]')"
-            fi
-        else
-            unresolved_count=$((unresolved_count + 1))
-            unresolved_json="$(jq -cn \
-                --argjson current "$unresolved_json" \
-                --arg file "$file" \
-                --arg reason "manual_resolution_required" \
-                '$current + [{file:$file, reason:$reason}]')"
-        fi
+    for path in "${conflicted_files[@]}"; do
+        strategy["$path"]="${explicit[$path]:-$mode}"
     done
 
-    SENATE_RESOLUTION_LAST_JSON="$(jq -cn \
-        --arg status "applied" \
-        --arg verdict_file "$verdict_file" \
-        --arg mode "$mode" \
-        --argjson resolved_count "$resolved_count" \
-        --argjson unresolved_count "$unresolved_count" \
-        --argjson resolved "$resolved_json" \
-        --argjson unresolved "$unresolved_json" \
-        '{status:$status, verdict_file:$verdict_file, mode:$mode, resolved_count:$resolved_count, unresolved_count:$unresolved_count, resolved:$resolved, unresolved:$unresolved}')"
-
-    if (( unresolved_count == 0 && resolved_count > 0 )); then
+    SENATE_RESOLUTION_LAST_JSON="$(conflict_apply_strategies "$repo_path" strategy manual_resolution_required "${conflicted_files[@]}" \
+        | jq -cRn --arg verdict_file "$verdict_file" --arg mode "$mode" \
+            '{status: "applied", verdict_file: $verdict_file, mode: $mode} + ('"$_CONFLICT_RESOLUTION_JQ"')')"
+
+    if jq -e '.unresolved_count == 0 and .resolved_count > 0' <<<"$SENATE_RESOLUTION_LAST_JSON" >/dev/null; then
         if git -C "$repo_path" commit --no-edit >/dev/null 2>&1; then
             return 0
         fi
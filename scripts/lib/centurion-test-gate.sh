@@ -1,18 +1,33 @@
 # shellcheck shell=bash
 # centurion-test-gate.sh — Shared quality gate runner for centurion scripts
 # Source this file; do not execute directly.
+# Requires: common.sh, config.sh, centurion-gate-cache.sh, centurion-lint-plan.sh
+# and centurion-gate-runner.sh (run_gates) sourced.
 
 LINT_GATE_LAST_OUTPUT=""
 TEST_GATE_LAST_OUTPUT=""
 TRUTHSAYER_GATE_LAST_OUTPUT=""
 CENTURION_LAST_CHECKS=""
+CENTURION_LAST_GATES_JSON="[]"
 CENTURION_LAST_LEVEL="standard"
 
+# Gates may run in a scratch worktree of a configured repo (cmd_merge); its
+# config and gate-cache entries still belong to the repo itself.
+CENTURION_GATE_WORKTREE=""
+CENTURION_GATE_REPO=""
+
+_gate_config_repo() {
+    local repo_path="$1"
+    if [[ -n "$CENTURION_GATE_WORKTREE" && "$repo_path" == "$CENTURION_GATE_WORKTREE" ]]; then
+        echo "$CENTURION_GATE_REPO"
+    else
+        echo "$repo_path"
+    fi
+}
+
 _repo_config_value() {
     local repo_path="$1" key="$2"
-    if [[ -f "${CONFIG_FILE:-}" ]] && command -v jq >/dev/null 2>&1; then
-        jq -r --arg repo "$repo_path" --arg key "$key" '.repos[$repo][$key] // empty' "$CONFIG_FILE"
-    fi
+    config_value repos "$(_gate_config_repo "$repo_path")" "$key" 2>/dev/null || true
 }
 
 _repo_timeout_seconds() {
@@ -37,6 +52,7 @@ run_lint_gate() {
     LINT_GATE_LAST_OUTPUT=""
     timeout_seconds="$(_repo_timeout_seconds "$repo_path")"
     configured_lint_cmd="$(_repo_config_value "$repo_path" lint_cmd)"
+    [[ "$LINT_GATE_PLAN_REPO" == "$repo_path" ]] || plan_lint_gate "$repo_path"
 
     if [[ -n "$configured_lint_cmd" ]]; then
         lint_cmd="$configured_lint_cmd"
@@ -52,6 +68,8 @@ run_lint_gate() {
         return 0
     fi
 
+    echo "Lint mode: $LINT_GATE_MODE ($LINT_GATE_FILE_COUNT files${LINT_GATE_REASON:+; $LINT_GATE_REASON})"
+
     # Go: prefer golangci-lint, fall back to go vet.
     if [[ -f "$repo_path/go.mod" ]]; then
         if command -v golangci-lint >/dev/null 2>&1; then
@@ -77,58 +95,45 @@ run_lint_gate() {
     fi
 
     # JS/TS: run eslint only when the repo declares eslint in package.json.
-    if [[ -f "$repo_path/package.json" ]]; then
-        local has_eslint=1
-        if command -v jq >/dev/null 2>&1; then
-            jq -e \
-                '.dependencies.eslint != null
-                 or .devDependencies.eslint != null
-                 or .scripts.eslint != null
-                 or ((.scripts.lint // "") | contains("eslint"))' \
-                "$repo_path/package.json" >/dev/null || has_eslint=0
-        else
-            rg -q '"eslint"' "$repo_path/package.json" || has_eslint=0
+    if _repo_has_eslint "$repo_path" && [[ "$LINT_GATE_MODE" == "full" || ${#LINT_GATE_JS_FILES[@]} -gt 0 ]]; then
+        local -a eslint_args=(.)
+        lint_cmd="eslint ."
+        if [[ "$LINT_GATE_MODE" == "incremental" ]]; then
+            eslint_args=(-- "${LINT_GATE_JS_FILES[@]}")
+            lint_cmd="eslint (incremental, ${#LINT_GATE_JS_FILES[@]} files)"
         fi
-
-        if [[ "$has_eslint" -eq 1 ]]; then
-            lint_cmd="eslint ."
-            if [[ -x "$repo_path/node_modules/.bin/eslint" ]]; then
-                if ! (cd "$repo_path" && timeout "$timeout_seconds" ./node_modules/.bin/eslint .) >"$output_file" 2>&1; then
-                    LINT_GATE_LAST_OUTPUT="$(cat "$output_file")"
-                    rm -f "$output_file"
-                    echo "Lint gate failed: $lint_cmd" >&2
-                    echo "$LINT_GATE_LAST_OUTPUT" >&2
-                    return 1
-                fi
-            else
-                if ! command -v npx >/dev/null 2>&1; then
-                    LINT_GATE_LAST_OUTPUT="eslint is configured in package.json but npx is not available"
-                    rm -f "$output_file"
-                    echo "Lint gate failed: $lint_cmd" >&2
-                    echo "$LINT_GATE_LAST_OUTPUT" >&2
-                    return 1
-                fi
-                if ! (cd "$repo_path" && timeout "$timeout_seconds" npx --no-install eslint .) >"$output_file" 2>&1; then
-                    LINT_GATE_LAST_OUTPUT="$(cat "$output_file")"
-                    rm -f "$output_file"
-                    echo "Lint gate failed: $lint_cmd" >&2
-                    echo "$LINT_GATE_LAST_OUTPUT" >&2
-                    return 1
-                fi
+        if [[ -x "$repo_path/node_modules/.bin/eslint" ]]; then
+            if ! (cd "$repo_path" && timeout "$timeout_seconds" ./node_modules/.bin/eslint "${eslint_args[@]}") >"$output_file" 2>&1; then
+                LINT_GATE_LAST_OUTPUT="$(cat "$output_file")"
+                rm -f "$output_file"
+                echo "Lint gate failed: $lint_cmd" >&2
+                echo "$LINT_GATE_LAST_OUTPUT" >&2
+                return 1
+            fi
+        else
+            if ! command -v npx >/dev/null 2>&1; then
+                LINT_GATE_LAST_OUTPUT="eslint is configured in package.json but npx is not available"
+                rm -f "$output_file"
+                echo "Lint gate failed: $lint_cmd" >&2
+                echo "$LINT_GATE_LAST_OUTPUT" >&2
+                return 1
+            fi
+            if ! (cd "$repo_path" && timeout "$timeout_seconds" npx --no-install eslint "${eslint_args[@]}") >"$output_file" 2>&1; then
+                LINT_GATE_LAST_OUTPUT="$(cat "$output_file")"
+                rm -f "$output_file"
+                echo "Lint gate failed: $lint_cmd" >&2
+                echo "$LINT_GATE_LAST_OUTPUT" >&2
+                return 1
             fi
-            echo "Lint gate passed: $lint_cmd"
         fi
+        echo "Lint gate passed: $lint_cmd"
     fi
 
     # Bash: lint shell scripts with shellcheck.
-    mapfile -t shell_files < <(
-        cd "$repo_path" && find . -type f -name '*.sh' \
-            -not -path './.git/*' \
-            -not -path './node_modules/*' \
-            -not -path './vendor/*'
-    )
+    shell_files=("${LINT_GATE_SHELL_FILES[@]}")
     if [[ ${#shell_files[@]} -gt 0 ]]; then
         lint_cmd="shellcheck"
+        [[ "$LINT_GATE_MODE" == "incremental" ]] && lint_cmd="shellcheck (incremental, ${#shell_files[@]} files)"
         if ! command -v shellcheck >/dev/null 2>&1; then
             echo "Lint gate skipped: shellcheck not installed"
             rm -f "$output_file"
@@ -225,42 +230,32 @@ run_truthsayer_gate() {
     return 0
 }
 
+# Usage: run_quality_gate <repo-path> [level] [base-ref] [branch-ref]
+# With a base ref, the lint gate only checks what changed on branch-ref
+# (default HEAD) since base-ref; see plan_lint_gate.
 run_quality_gate() {
     local repo_path="$1"
     local level="${2:-standard}"
+    local base_ref="${3:-}" branch_ref="${4:-HEAD}"
 
     TEST_GATE_LAST_OUTPUT=""
     CENTURION_LAST_CHECKS=""
+    CENTURION_LAST_GATES_JSON="[]"
     CENTURION_LAST_LEVEL="$level"
+    plan_lint_gate "$repo_path" "$base_ref" "$branch_ref"
 
     case "$level" in
         quick)
-            CENTURION_LAST_CHECKS="lint"
-            run_lint_gate "$repo_path" || {
-                TEST_GATE_LAST_OUTPUT="Lint checks failed:
-$LINT_GATE_LAST_OUTPUT"
-                return 1
-            }
-            return 0
+            run_gates "$repo_path" lint
             ;;
         standard)
-            CENTURION_LAST_CHECKS="lint,tests,truthsayer"
-            run_lint_gate "$repo_path" || {
-                TEST_GATE_LAST_OUTPUT="Lint checks failed:
-$LINT_GATE_LAST_OUTPUT"
-                return 1
-            }
-            run_unit_test_gate "$repo_path" || return 1
-            run_truthsayer_gate "$repo_path" || {
-                TEST_GATE_LAST_OUTPUT="Truthsayer checks failed:
-$TRUTHSAYER_GATE_LAST_OUTPUT"
-                return 1
-            }
-            return 0
+            run_gates "$repo_path" lint tests truthsayer
             ;;
         deep)
-            CENTURION_LAST_CHECKS="lint,tests,truthsayer,semantic-review"
-            run_quality_gate "$repo_path" "standard" || return 1
+            local rc=0
+            run_gates "$repo_path" lint tests truthsayer || rc=$?
+            CENTURION_LAST_CHECKS+=",semantic-review"
+            (( rc == 0 )) || return 1
             echo "Deep mode: mechanical checks passed"
             return 0
             ;;
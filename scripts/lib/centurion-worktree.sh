@@ -0,0 +1,121 @@
+# shellcheck shell=bash
+# centurion-worktree.sh — Scratch worktrees for Centurion merges
+# Source this file; do not execute directly.
+#
+# `merge` and the merge queue merge and gate inside a detached worktree of the
+# repo, so the repo's own checkout (where dispatched agents work) is never
+# switched or reset. main only moves after the gates pass: fast-forwarded in
+# whichever worktree has main checked out, or with a compare-and-swap
+# update-ref when none does. Merges hold the per-repo lock, so one worktree
+# per repo is kept and reused; ignored build output (node_modules, target/)
+# survives between merges. Every acquire prunes pooled worktrees whose repo
+# is gone or that have not been used for CENTURION_WORKTREE_TTL seconds.
+#
+# Env:
+#   CENTURION_WORKTREE_ROOT  default: state/centurion-worktrees
+#   CENTURION_WORKTREE_POOL  true|false (default: true; false = remove after use)
+#   CENTURION_WORKTREE_TTL   seconds an unused pooled worktree is kept (default: 604800)
+
+centurion_worktree_root() {
+    echo "${CENTURION_WORKTREE_ROOT:-$WORKSPACE_ROOT/state/centurion-worktrees}"
+}
+
+centurion_worktree_path() {
+    local repo_path="$1"
+    echo "$(centurion_worktree_root)/$(printf '%s' "$repo_path" | sha256sum | cut -c1-12)"
+}
+
+_centurion_worktree_ttl() {
+    local ttl="${CENTURION_WORKTREE_TTL:-604800}"
+    is_integer "$ttl" || ttl=604800
+    echo "$ttl"
+}
+
+# Usage: centurion_worktree_prune [keep-path]
+# Remove pooled worktrees whose source repo no longer exists (the gitdir in
+# their .git file is gone) or that were last acquired or released more than
+# the TTL ago. <keep-path> is never removed.
+centurion_worktree_prune() {
+    local keep="${1:-}" root ttl_minutes path gitdir common
+    local -A idle=()
+    root="$(centurion_worktree_root)"
+    [[ -d "$root" ]] || return 0
+    ttl_minutes=$(( ($(_centurion_worktree_ttl) + 59) / 60 ))
+
+    while IFS= read -r -d '' path; do
+        idle["$path"]=1
+    done < <(find "$root" -mindepth 1 -maxdepth 1 -type d -mmin "+$ttl_minutes" -print0 2>/dev/null)
+
+    for path in "$root"/*; do
+        [[ -d "$path" && "$path" != "$keep" ]] || continue
+        gitdir=""
+        [[ -f "$path/.git" ]] && gitdir="$(sed -n 's/^gitdir: //p' "$path/.git" 2>/dev/null)"
+        [[ -z "$gitdir" || "$gitdir" == /* ]] || gitdir="$path/$gitdir"
+        if [[ -z "$gitdir" || ! -d "$gitdir" ]]; then
+            rm -rf "$path"
+        elif [[ -n "${idle[$path]:-}" ]]; then
+            common="$(git -C "$path" rev-parse --path-format=absolute --git-common-dir 2>/dev/null)" || common=""
+            if [[ -z "$common" ]] || ! git -C "$common" worktree remove --force "$path" >/dev/null 2>&1; then
+                rm -rf "$path"
+                [[ -z "$common" ]] || git -C "$common" worktree prune >/dev/null 2>&1 || true
+            fi
+        fi
+    done
+}
+
+# Usage: centurion_worktree_acquire <repo-path> <commit>
+# Prints the path of a clean worktree detached at <commit>.
+centurion_worktree_acquire() {
+    local repo_path="$1" commit="$2" path
+    path="$(centurion_worktree_path "$repo_path")"
+    centurion_worktree_prune "$path"
+
+    if [[ -e "$path/.git" ]] \
+        && [[ "$(git -C "$path" rev-parse --git-common-dir 2>/dev/null)" -ef "$(git -C "$repo_path" rev-parse --git-common-dir)" ]]; then
+        git -C "$path" merge --abort >/dev/null 2>&1 || true
+        if git -C "$path" checkout -q -f --detach "$commit" >/dev/null 2>&1 \
+            && git -C "$path" clean -fdq >/dev/null 2>&1; then
+            touch "$path"
+            echo "$path"
+            return 0
+        fi
+    fi
+
+    rm -rf "$path"
+    git -C "$repo_path" worktree prune >/dev/null 2>&1 || true
+    mkdir -p "$(dirname "$path")"
+    git -C "$repo_path" worktree add -q --detach "$path" "$commit" >/dev/null 2>&1 || return 1
+    echo "$path"
+}
+
+centurion_worktree_release() {
+    local repo_path="$1" path="$2"
+    [[ -n "$path" && -e "$path" ]] || return 0
+    if [[ "${CENTURION_WORKTREE_POOL:-true}" == "true" ]]; then
+        git -C "$path" merge --abort >/dev/null 2>&1 || true
+        touch "$path"
+        return 0
+    fi
+    git -C "$repo_path" worktree remove --force "$path" >/dev/null 2>&1 || rm -rf "$path"
+    git -C "$repo_path" worktree prune >/dev/null 2>&1 || true
+}
+
+# Worktree that has main checked out, if any (usually the repo itself).
+centurion_main_checkout() {
+    local repo_path="$1"
+    git -C "$repo_path" worktree list --porcelain 2>/dev/null \
+        | awk '/^worktree / { wt = substr($0, 10) } $0 == "branch refs/heads/main" { print wt; exit }'
+}
+
+# Usage: centurion_advance_main <repo-path> <expected-old> <new>
+# Fails without touching anything if main is no longer at <expected-old>.
+centurion_advance_main() {
+    local repo_path="$1" old="$2" new="$3" main_checkout
+    main_checkout="$(centurion_main_checkout "$repo_path")"
+    if [[ -n "$main_checkout" ]]; then
+        [[ "$(git -C "$main_checkout" rev-parse HEAD)" == "$old" ]] || return 1
+        git -C "$main_checkout" merge -q --ff-only "$new" >/dev/null 2>&1
+    else
+        git -C "$repo_path" update-ref -m "centurion: fast-forward main" refs/heads/main "$new" "$old"
+    fi
+}
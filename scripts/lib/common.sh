@@ -2,6 +2,9 @@
 # common.sh — Shared utility functions for dispatch scripts
 # Source this file; do not execute directly.
 
+source "$(dirname "${BASH_SOURCE[0]}")/run-index.sh"
+source "$(dirname "${BASH_SOURCE[0]}")/run-ledger.sh"
+
 iso_now() {
     date -u +"%Y-%m-%dT%H:%M:%SZ"
 }
@@ -63,8 +66,14 @@ tmux_list_sessions() {
 # Detect stale agent sessions: run records say "running" but tmux session is gone.
 # Prints bead IDs of stale agents, one per line.
 detect_stale_agents() {
-    local runs_dir="$1" socket="$2"
+    local runs_dir="$1" socket="$2" stale bead
     [[ -d "$runs_dir" ]] || return 0
+    if stale="$(run_index_stale_sessions "$runs_dir" "$socket")"; then
+        while IFS=$'\t' read -r bead _; do
+            [[ -n "$bead" ]] && echo "$bead"
+        done <<<"$stale"
+        return 0
+    fi
     for run_file in "$runs_dir"/*.json; do
         [[ -f "$run_file" ]] || continue
         local status bead session
@@ -0,0 +1,112 @@
+# shellcheck shell=bash
+# config-snapshot.sh — Compile and cache agents.json as a shell snapshot
+# Sourced by config.sh; do not source or execute directly.
+#
+# agents.json is compiled by one jq into a shell snapshot (every scalar keyed
+# by its jq path) that is cached on disk and sourced. The snapshot is reused
+# while the file's mtime, size and inode are unchanged, and recompiled only
+# when its sha256 changes. Configs outside the workspace (throwaway test
+# configs) are compiled in memory only, unless CONFIG_SNAPSHOT_DIR is set.
+#
+# Env:
+#   CONFIG_SNAPSHOT_DIR   default: state/config-cache
+
+# ── Snapshot ─────────────────────────────────────────────────────────────────
+
+# CONFIG_VALUES: jq path → scalar (null and false are left out, as `// empty`
+# would). CONFIG_KEYS: container path → its sorted keys, one per line.
+# CONFIG_TYPES: container path → object|array. The root path is ".".
+declare -gA CONFIG_VALUES=() CONFIG_KEYS=() CONFIG_TYPES=()
+CONFIG_LOADED_FILE=""
+CONFIG_SNAPSHOT_SOURCE=""
+CONFIG_SNAPSHOT_STAMP=""
+CONFIG_SNAPSHOT_HASH=""
+
+_CONFIG_COMPILE_JQ='
+def step: if type == "number" then "[\(.)]"
+    elif test("^[A-Za-z_][A-Za-z0-9_]*$") then ".\(.)"
+    else ".\(tojson)" end;
+def key: if length == 0 then "." else map(step) | join("") end;
+"declare -gA CONFIG_VALUES=(",
+(paths(scalars) as $p | getpath($p) | select(. != null and . != false)
+    | "  [\($p | key | @sh)]=\(tostring | @sh)"),
+")",
+"declare -gA CONFIG_KEYS=(",
+(path(.. | iterables) as $p | "  [\($p | key | @sh)]=\(getpath($p) | keys | map(tostring) | join("\n") | @sh)"),
+")",
+"declare -gA CONFIG_TYPES=(",
+(path(.. | iterables) as $p | "  [\($p | key | @sh)]=\(getpath($p) | type | @sh)"),
+")"
+'
+
+# Prints nothing when the snapshot is not kept on disk.
+_config_snapshot_file() {
+    local file="$CONFIG_FILE"
+    [[ "$file" == /* ]] || file="$PWD/$file"
+    [[ -n "${CONFIG_SNAPSHOT_DIR:-}" || "$file" == "$_CONFIG_ROOT"/* ]] || return 0
+    echo "${CONFIG_SNAPSHOT_DIR:-$_CONFIG_ROOT/state/config-cache}/${CONFIG_FILE//[^A-Za-z0-9._-]/_}.sh"
+}
+
+_config_write_snapshot() {
+    local snapshot="$1" tmp
+    mkdir -p "${snapshot%/*}" 2>/dev/null || return 1
+    tmp="$(mktemp "${snapshot}.XXXXXX" 2>/dev/null)" || return 1
+    {
+        printf '# Compiled from %s by scripts/lib/config-snapshot.sh; do not edit.\n' "$CONFIG_FILE"
+        printf 'CONFIG_SNAPSHOT_SOURCE=%q\n' "$CONFIG_SNAPSHOT_SOURCE"
+        printf 'CONFIG_SNAPSHOT_STAMP=%q\n' "$CONFIG_SNAPSHOT_STAMP"
+        printf 'CONFIG_SNAPSHOT_HASH=%q\n' "$CONFIG_SNAPSHOT_HASH"
+        local decl
+        for decl in "$(declare -p CONFIG_VALUES)" "$(declare -p CONFIG_KEYS)" "$(declare -p CONFIG_TYPES)"; do
+            printf '%s\n' "${decl/#declare -A /declare -gA }"
+        done
+    } > "$tmp" && mv "$tmp" "$snapshot" || { rm -f "$tmp"; return 1; }
+    # Snapshots of configs that are gone (or just idle) age out; a live one is
+    # recompiled on its next load.
+    find "${snapshot%/*}" -maxdepth 1 -name '*.sh' -mtime +7 -delete 2>/dev/null || true
+}
+
+# Load CONFIG_FILE into the CONFIG_* arrays, once per process and file.
+# Returns 1 when the file is missing or is not valid JSON.
+config_load() {
+    [[ "$CONFIG_LOADED_FILE" != "$CONFIG_FILE" ]] || return 0
+    [[ -f "$CONFIG_FILE" ]] || return 1
+
+    local stamp hash compiled snapshot
+    snapshot="$(_config_snapshot_file)"
+    stamp="$(stat -L -c '%y %s %i' "$CONFIG_FILE" 2>/dev/null)" || return 1
+    if [[ -n "$snapshot" && -f "$snapshot" ]]; then
+        # shellcheck source=/dev/null
+        source "$snapshot" 2>/dev/null || CONFIG_SNAPSHOT_SOURCE=""
+    fi
+    if [[ "$CONFIG_SNAPSHOT_SOURCE" == "$CONFIG_FILE" && "$CONFIG_SNAPSHOT_STAMP" == "$stamp" ]]; then
+        CONFIG_LOADED_FILE="$CONFIG_FILE"
+        return 0
+    fi
+
+    # Touched but unchanged files keep their snapshot; only a new hash recompiles.
+    hash="$(sha256sum < "$CONFIG_FILE")" || return 1
+    hash="${hash%% *}"
+    if [[ "$CONFIG_SNAPSHOT_SOURCE" != "$CONFIG_FILE" || "$CONFIG_SNAPSHOT_HASH" != "$hash" ]]; then
+        command -v jq >/dev/null 2>&1 || return 1
+        compiled="$(jq -r "$_CONFIG_COMPILE_JQ" "$CONFIG_FILE")" || return 1
+        eval "$compiled"
+    fi
+    CONFIG_SNAPSHOT_SOURCE="$CONFIG_FILE"
+    CONFIG_SNAPSHOT_STAMP="$stamp"
+    CONFIG_SNAPSHOT_HASH="$hash"
+    [[ -z "$snapshot" ]] || _config_write_snapshot "$snapshot" || true
+    CONFIG_LOADED_FILE="$CONFIG_FILE"
+}
+
+# Print every compiled value as "<path> = <value>", sorted by path.
+config_dump() {
+    config_load || return 1
+    local key value
+    printf '# source:   %s\n# snapshot: %s\n# sha256:   %s\n' \
+        "$CONFIG_SNAPSHOT_SOURCE" "$(_config_snapshot_file | grep . || echo "(in memory)")" "$CONFIG_SNAPSHOT_HASH"
+    while IFS= read -r key; do
+        value="${CONFIG_VALUES[$key]}"
+        printf '%s = %s\n' "$key" "${value//$'\n'/\\n}"
+    done < <(printf '%s\n' "${!CONFIG_VALUES[@]}" | LC_ALL=C sort)
+}
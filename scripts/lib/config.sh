@@ -1,11 +1,21 @@
 # shellcheck shell=bash
 # config.sh — Read agent configuration from config/agents.json
-# Source this file; do not execute directly.
+# Source this file; run it directly only as `config.sh --dump`.
+#
+# Lookups read the compiled snapshot of agents.json (config-snapshot.sh) as
+# plain array reads. Expressions that are not simple paths fall back to jq on
+# the file.
+#
+# Env:
+#   CONFIG_FILE           default: config/agents.json
+#   CONFIG_SNAPSHOT_DIR   see config-snapshot.sh
+
+_CONFIG_ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
 
 if [[ -v CONFIG_FILE ]]; then
     CONFIG_FILE="${CONFIG_FILE:?CONFIG_FILE cannot be empty}"
 else
-    CONFIG_FILE="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)/config/agents.json"
+    CONFIG_FILE="$_CONFIG_ROOT/config/agents.json"
 fi
 
 require_config() {
@@ -19,9 +29,83 @@ require_config() {
     fi
 }
 
+source "$(dirname "${BASH_SOURCE[0]}")/config-snapshot.sh"
+
+# ── Lookups ──────────────────────────────────────────────────────────────────
+
+# Snapshot key for a list of object keys. Usage: _config_key repos /path timeout
+_config_key() {
+    local key="" part
+    for part in "$@"; do
+        if [[ "$part" =~ ^[A-Za-z_][A-Za-z0-9_]*$ ]]; then
+            key+=".$part"
+        else
+            part="${part//\\/\\\\}"
+            key+=".\"${part//\"/\\\"}\""
+        fi
+    done
+    printf '%s' "${key:-.}"
+}
+
+# Print a scalar from agents.json by object keys; returns 1 if it is unset.
+# Usage: config_value repos "$repo" timeout
+config_value() {
+    config_load || return 1
+    local key
+    key="$(_config_key "$@")"
+    [[ -n "${CONFIG_VALUES[$key]+set}" ]] || return 1
+    printf '%s\n' "${CONFIG_VALUES[$key]}"
+}
+
+# Print the sorted keys of an object in agents.json, one per line.
+# Usage: config_keys repos
+config_keys() {
+    config_load || return 1
+    local key
+    key="$(_config_key "$@")"
+    [[ "${CONFIG_TYPES[$key]:-}" == "object" ]] || return 0
+    printf '%s\n' "${CONFIG_KEYS[$key]}"
+}
+
+# Snapshot lookup for a plain path expression (.a.b, ."quoted", trailing []
+# over an array of scalars) into CONFIG_LOOKUP. Returns 2 for anything else.
+CONFIG_LOOKUP=()
+_config_lookup() {
+    local expr="$1" key prefix index
+    local -a parts=()
+    CONFIG_LOOKUP=()
+    while [[ -n "$expr" && "$expr" != "[]" ]]; do
+        if [[ "$expr" =~ ^\.([A-Za-z_][A-Za-z0-9_]*) || "$expr" =~ ^\.\"([^\"\\]*)\" ]]; then
+            parts+=("${BASH_REMATCH[1]}")
+            expr="${expr:${#BASH_REMATCH[0]}}"
+        else
+            return 2
+        fi
+    done
+    key="$(_config_key "${parts[@]}")"
+
+    if [[ -z "$expr" ]]; then
+        [[ -z "${CONFIG_TYPES[$key]:-}" ]] || return 2
+        [[ -z "${CONFIG_VALUES[$key]+set}" ]] || CONFIG_LOOKUP=("${CONFIG_VALUES[$key]}")
+        return 0
+    fi
+
+    [[ -n "${CONFIG_TYPES[$key]:-}" ]] || return 0
+    [[ "${CONFIG_TYPES[$key]}" == "array" && -n "${CONFIG_KEYS[$key]}" ]] || return 2
+    prefix="${key%.}"
+    while IFS= read -r index; do
+        [[ -z "${CONFIG_TYPES[$prefix[$index]]:-}" ]] || return 2
+        [[ -z "${CONFIG_VALUES[$prefix[$index]]+set}" ]] || CONFIG_LOOKUP+=("${CONFIG_VALUES[$prefix[$index]]}")
+    done <<< "${CONFIG_KEYS[$key]}"
+}
+
 # Get a value from agents.json. Usage: config_get '.claude.default_model'
 config_get() {
     require_config
+    if config_load && _config_lookup "$1"; then
+        (( ${#CONFIG_LOOKUP[@]} == 0 )) || printf '%s\n' "${CONFIG_LOOKUP[@]}"
+        return 0
+    fi
     jq -r "$1 // empty" "$CONFIG_FILE"
 }
 
@@ -50,7 +134,9 @@ validate_agent_type() {
     exists=$(config_get ".${agent}.command")
     if [[ -z "$exists" ]]; then
         echo "Error: unknown agent type '$agent'" >&2
-        echo "  Valid agents: $(config_get '[keys[]] | join(", ")')" >&2
+        local valid
+        valid="$(config_keys)" || valid=""
+        echo "  Valid agents: ${valid//$'\n'/, }" >&2
         return 1
     fi
 }
@@ -89,7 +175,7 @@ build_agent_cmd() {
 
             # Agent mode flags (NOT print mode — agents need tool access)
             local claude_flags
-            if ! claude_flags="$(config_get '[.claude.agent_mode.flags[]] | .[]')"; then
+            if ! claude_flags="$(config_get '.claude.agent_mode.flags[]')"; then
                 echo "Warning: failed to read claude flags from config, using safe defaults" >&2
                 claude_flags=$'-p\n--dangerously-skip-permissions'
             fi
@@ -101,7 +187,7 @@ build_agent_cmd() {
 
             # Optional MCP config for Claude tool servers (if configured)
             local mcp_config
-            mcp_config=$(config_get '.claude.mcp_config // empty')
+            mcp_config=$(config_get '.claude.mcp_config')
             if [[ -n "$mcp_config" && -f "$mcp_config" ]]; then
                 AGENT_CMD+=("--mcp-config" "$mcp_config")
             fi
@@ -123,3 +209,16 @@ build_agent_cmd() {
             ;;
     esac
 }
+
+# Compile once when sourced, so lookups in command substitutions share it.
+config_load 2>/dev/null || true
+
+if [[ "${BASH_SOURCE[0]}" == "$0" ]]; then
+    set -euo pipefail
+    if [[ "${1:-}" != "--dump" ]]; then
+        echo "Usage: config.sh --dump" >&2
+        exit 1
+    fi
+    require_config
+    config_dump || { echo "Error: cannot compile $CONFIG_FILE" >&2; exit 1; }
+fi
@@ -0,0 +1,229 @@
+# shellcheck shell=bash
+# conflict-forecast.sh — Predict collisions between beads running on one repo
+# Source this file; do not execute directly.
+# Requires: common.sh (run-index.sh, epoch_now, iso_now).
+#
+# A running bead's work is every commit since its started_at whose message
+# names the bead (the runner commits "agent work: bead <id>" and agents are
+# told to reference their bead). One `git log` over all refs attributes
+# commits to beads, giving each its touched files and newest commit (tip).
+# Every pair of running beads then gets the files both touched (overlap) and,
+# from `git merge-tree` on their tips, the files a merge would conflict on.
+#
+# The forecast is written to CONFLICT_FORECAST_DIR/<repo-key>.json:
+#   {repo, generated_at,
+#    beads: {<id>: {started_at, tip, commits, files}},
+#    pairs: [{beads: [a, b], overlap: [...], conflict: true|false|null, conflicts: [...]}]}
+# conflict is null while either bead has no commits or merge-tree is
+# unavailable, and false when one tip already contains the other.
+#
+# Env:
+#   CONFLICT_FORECAST_DIR   default: state/conflict-forecast
+#   CONFLICT_FORECAST_TTL   seconds a forecast is reused (default: 120)
+
+# Set by conflict_forecast_refresh / conflict_forecast_collision.
+CONFLICT_FORECAST_FILE=""
+FORECAST_COLLISION_WITH=""
+FORECAST_COLLISION_FILES=""
+
+conflict_forecast_file() {
+    local repo_path="$1"
+    echo "${CONFLICT_FORECAST_DIR:-$WORKSPACE_ROOT/state/conflict-forecast}/$(printf '%s' "$repo_path" | sha256sum | cut -c1-12).json"
+}
+
+# ── Attribution ─────────────────────────────────────────────────────────────
+
+# Reads `git log --format=%x1e%H%x1f%ct%x1f%B%x1d --name-only` and prints
+#   bead US commit US committer-epoch US file
+# for every file of every commit whose message names one of $ids (a word
+# match, so bd-1 does not claim bd-12's commits). Commits without files print
+# one row with an empty file.
+# shellcheck disable=SC2016
+_FORECAST_ATTRIBUTE_AWK='
+function mentions(text, id,    rest, pos, off, before, after) {
+    rest = text; off = 0
+    while ((pos = index(rest, id)) > 0) {
+        off += pos
+        before = off > 1 ? substr(text, off - 1, 1) : ""
+        after = substr(text, off + length(id), 1)
+        if (before !~ /[A-Za-z0-9_-]/ && after !~ /[A-Za-z0-9_-]/) return 1
+        rest = substr(text, off + 1)
+    }
+    return 0
+}
+BEGIN { RS = "\036"; n = split(ids, id, " ") }
+NF {
+    split_at = index($0, "\035")
+    if (split_at == 0) next
+    split(substr($0, 1, split_at - 1), head, "\037")
+    body = substr($0, 1, split_at - 1)
+    body = substr(body, length(head[1]) + length(head[2]) + 3)
+    nfiles = split(substr($0, split_at + 1), files, "\n")
+    for (i = 1; i <= n; i++) {
+        if (!mentions(body, id[i])) continue
+        printed = 0
+        for (f = 1; f <= nfiles; f++) {
+            if (files[f] == "") continue
+            printf "%s\037%s\037%s\037%s\n", id[i], head[1], head[2], files[f]
+            printed = 1
+        }
+        if (!printed) printf "%s\037%s\037%s\037\n", id[i], head[1], head[2]
+    }
+}'
+
+# _forecast_commit_rows <repo> <space-separated ids> [git log args...]
+_forecast_commit_rows() {
+    local repo_path="$1" ids="$2"
+    shift 2
+    git -C "$repo_path" log --all --no-renames --format='%x1e%H%x1f%ct%x1f%B%x1d' --name-only "$@" 2>/dev/null \
+        | awk -v ids="$ids" "$_FORECAST_ATTRIBUTE_AWK"
+}
+
+# Running beads on a repo: bead<TAB>started_at, oldest first. Falls back to
+# one jq pass over the run records when the index is unavailable.
+_forecast_running_beads() {
+    local runs_dir="$1" repo_path="$2"
+    run_index_running_since "$runs_dir" "$repo_path" 2>/dev/null && return 0
+    [[ -d "$runs_dir" ]] || return 0
+    find "$runs_dir" -maxdepth 1 -type f -name '*.json' -exec awk \
+        'FNR == 1 && NR > 1 { print "" } { printf "%s ", $0 } END { if (NR > 0) print "" }' {} + 2>/dev/null \
+        | jq -Rrn --arg repo "$repo_path" '
+            [inputs | fromjson? | objects
+             | select(.status == "running" and .repo == $repo and (.bead | type == "string" and length > 0))]
+            | sort_by(.started_at // "", .bead)[] | [.bead, (.started_at // "")] | @tsv'
+}
+
+# ── Forecast ────────────────────────────────────────────────────────────────
+
+# Prints "<conflict>\t<files, US-separated>" for merging two tips, where
+# conflict is true, false or null (unknown).
+_forecast_merge_pair() {
+    local repo_path="$1" tip_a="$2" tip_b="$3"
+    local rc=0 output
+    if [[ -z "$tip_a" || -z "$tip_b" ]]; then
+        printf 'null\t\n'
+        return 0
+    fi
+    if [[ "$tip_a" == "$tip_b" ]] \
+        || git -C "$repo_path" merge-base --is-ancestor "$tip_a" "$tip_b" 2>/dev/null \
+        || git -C "$repo_path" merge-base --is-ancestor "$tip_b" "$tip_a" 2>/dev/null; then
+        printf 'false\t\n'
+        return 0
+    fi
+    # Output: the merged tree, then one conflicted path per line.
+    output="$(git -C "$repo_path" merge-tree --write-tree --name-only --no-messages "$tip_a" "$tip_b" 2>/dev/null)" || rc=$?
+    case "$rc" in
+        0) printf 'false\t\n' ;;
+        1) printf 'true\t%s\n' "$(sed -e 1d -e '/^$/,$d' <<<"$output" | paste -sd $'\x1f')" ;;
+        *) printf 'null\t\n' ;;
+    esac
+}
+
+# Usage: conflict_forecast_build <runs-dir> <repo-path>
+# Recomputes the forecast for a repo and writes it atomically.
+conflict_forecast_build() {
+    local runs_dir="$1" repo_path="$2"
+    local file tmp bead started since="" started_json="{}" beads_json pair_rows=""
+    local a b tip_a tip_b verdict conflicts
+    local -a ids=()
+
+    git -C "$repo_path" rev-parse --git-dir &>/dev/null || { echo "Error: not a git repo: $repo_path" >&2; return 1; }
+    file="$(conflict_forecast_file "$repo_path")"
+    mkdir -p "$(dirname "$file")"
+
+    while IFS=$'\t' read -r bead started; do
+        [[ -n "$bead" ]] || continue
+        ids+=("$bead")
+        started_json="$(jq -c --arg b "$bead" --arg s "$started" '. + {($b): $s}' <<<"$started_json")"
+        [[ -n "$started" ]] && { [[ -z "$since" || "$started" < "$since" ]]; } && since="$started"
+    done < <(_forecast_running_beads "$runs_dir" "$repo_path")
+
+    if (( ${#ids[@]} == 0 )); then
+        beads_json="{}"
+    else
+        beads_json="$(_forecast_commit_rows "$repo_path" "${ids[*]}" ${since:+"--since=$since"} \
+            | jq -Rn --argjson started "$started_json" '
+                def epoch: [try (sub("\\.[0-9]+"; "") | fromdateiso8601) catch 0][0];
+                [inputs | split("\u001f") | {bead: .[0], commit: .[1], ct: (.[2] | tonumber), file: .[3]}
+                 | select(.ct >= ($started[.bead] | epoch))] as $rows
+                | $started | to_entries | map(.key as $id
+                    | [$rows[] | select(.bead == $id)] as $mine
+                    | {key: $id, value: {started_at: .value, tip: ($mine[0].commit // null),
+                        commits: ($mine | map(.commit) | unique | length),
+                        files: ($mine | map(.file | select(. != "")) | unique)}})
+                | from_entries')"
+    fi
+
+    # Pairwise merge prediction on the tips, in started order.
+    while IFS=$'\x1f' read -r a b tip_a tip_b; do
+        [[ -n "$a" ]] || continue
+        IFS=$'\t' read -r verdict conflicts < <(_forecast_merge_pair "$repo_path" "$tip_a" "$tip_b")
+        pair_rows+="$a"$'\t'"$b"$'\t'"$verdict"$'\t'"$conflicts"$'\n'
+    done < <(jq -r 'to_entries as $e | range(0; $e | length) as $i | range($i + 1; $e | length) as $j
+        | [$e[$i].key, $e[$j].key, ($e[$i].value.tip // ""), ($e[$j].value.tip // "")] | join("\u001f")' <<<"$beads_json")
+
+    tmp="$(mktemp "$file.XXXXXX")"
+    printf '%s' "$pair_rows" | jq -Rn --arg repo "$repo_path" --arg now "$(iso_now)" --argjson beads "$beads_json" '
+        {repo: $repo, generated_at: $now, beads: $beads,
+         pairs: [inputs | split("\t") | . as [$a, $b, $conflict, $files]
+            | {beads: [$a, $b],
+               overlap: ($beads[$a].files - ($beads[$a].files - $beads[$b].files)),
+               conflict: ($conflict | fromjson),
+               conflicts: ($files | split("\u001f") | map(select(length > 0)))}]}' > "$tmp"
+    mv "$tmp" "$file"
+    CONFLICT_FORECAST_FILE="$file"
+}
+
+# Usage: conflict_forecast_refresh <runs-dir> <repo-path>
+# Sets CONFLICT_FORECAST_FILE, rebuilding the forecast once it is older than
+# CONFLICT_FORECAST_TTL seconds or the set of running beads has changed.
+conflict_forecast_refresh() {
+    local runs_dir="$1" repo_path="$2" file mtime running cached
+    local ttl="${CONFLICT_FORECAST_TTL:-120}"
+    file="$(conflict_forecast_file "$repo_path")"
+    if [[ -f "$file" ]] && mtime="$(stat -c %Y "$file" 2>/dev/null)" && (( $(epoch_now) - mtime < ttl )); then
+        running="$(_forecast_running_beads "$runs_dir" "$repo_path" | cut -f1 | LC_ALL=C sort | paste -sd ' ')"
+        cached="$(jq -r '.beads | keys | join(" ")' "$file" 2>/dev/null)" || cached="-"
+        if [[ "$running" == "$cached" ]]; then
+            CONFLICT_FORECAST_FILE="$file"
+            return 0
+        fi
+    fi
+    conflict_forecast_build "$runs_dir" "$repo_path"
+}
+
+# Usage: conflict_forecast_collision <forecast-file> <repo-path> <bead> [file...]
+# Predicts whether a bead about to start would collide with a running one:
+# its files are the ones given (e.g. declared by its plan) plus those its
+# earlier attempts committed. Returns 0 on a collision and sets
+# FORECAST_COLLISION_WITH (the earliest running bead it overlaps) and
+# FORECAST_COLLISION_FILES (comma-separated); 1 otherwise.
+conflict_forecast_collision() {
+    local forecast="$1" repo_path="$2" bead="$3"
+    shift 3
+    local files result
+    FORECAST_COLLISION_WITH=""
+    FORECAST_COLLISION_FILES=""
+    [[ -f "$forecast" ]] || return 1
+
+    files="$( { printf '%s\n' "$@"
+        _forecast_commit_rows "$repo_path" "$bead" --fixed-strings "--grep=$bead" | cut -d $'\x1f' -f4
+    } | sort -u)"
+    [[ -n "${files//$'\n'/}" ]] || return 1
+
+    result="$(jq -r --arg bead "$bead" --arg files "$files" '
+        ($files | split("\n") | map(select(length > 0))) as $mine
+        | [.beads | to_entries[] | select(.key != $bead)
+           | {key, shared: (.value.files - (.value.files - $mine))} | select(.shared | length > 0)][0]
+        // empty | "\(.key)\t\(.shared | join(","))"' "$forecast" 2>/dev/null)" || return 1
+    [[ -n "$result" ]] || return 1
+    IFS=$'\t' read -r FORECAST_COLLISION_WITH FORECAST_COLLISION_FILES <<<"$result"
+}
+
+# Usage: conflict_forecast_conflicts <forecast-file>
+# Running pairs predicted to conflict: a US b US a-tip US b-tip US files (comma-separated).
+conflict_forecast_conflicts() {
+    jq -r '.beads as $beads | .pairs[] | select(.conflict == true)
+        | [.beads[0], .beads[1], ($beads[.beads[0]].tip // ""), ($beads[.beads[1]].tip // ""),
+           (.conflicts | join(","))] | join("\u001f")' "$1" 2>/dev/null
+}
@@ -0,0 +1,34 @@
+# shellcheck shell=bash
+# lint-rule.sh — Shared helpers for scripts/lint-rules/*.sh
+# Source this file; do not execute directly.
+#
+# A rule that carries the `# lint-agent: batch` marker is called with any
+# number of files. It records findings with lint_violation and finishes with
+# `lint_report <rule-name>`, which prints one JSON object per finding and
+# returns 1 when there were any.
+
+LINT_VIOLATIONS=""
+LINT_TEXT_FILES=()
+
+# lint_violation <file> <line> <message> <fix>
+lint_violation() {
+    local row="$1"$'\x1f'"$2"$'\x1f'"$3"$'\x1f'"$4"
+    LINT_VIOLATIONS+="${row//$'\n'/ }"$'\n'
+}
+
+# lint_report <rule-name> — emit the recorded findings; exit status 1 if any.
+lint_report() {
+    [[ -n "$LINT_VIOLATIONS" ]] || return 0
+    printf '%s' "$LINT_VIOLATIONS" | jq -c -Rn --arg rule "$1" '
+        inputs | split("\u001f")
+        | {rule: $rule, file: .[0], line: (.[1] | tonumber? // 0), message: .[2], fix: .[3]}'
+    return 1
+}
+
+# lint_text_files <file>... — set LINT_TEXT_FILES to the readable, non-empty,
+# non-binary files among the arguments, in one grep.
+lint_text_files() {
+    LINT_TEXT_FILES=()
+    (( $# > 0 )) || return 0
+    mapfile -t -d '' LINT_TEXT_FILES < <(grep -lIZs . -- "$@" || true)
+}
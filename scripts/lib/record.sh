@@ -1,206 +1,298 @@
 # shellcheck shell=bash
 # record.sh — Run and result record building, validation, and writing
 # Source this file; do not execute directly.
-# Requires: common.sh sourced, and these globals set:
+# Requires: common.sh sourced (for the run index and ledger), and these globals set:
 #   BEAD_ID, AGENT_TYPE, MODEL, REPO_PATH, PROMPT, PROMPT_TRUNCATED, PROMPT_HASH,
 #   STARTED_AT, SESSION_NAME, RESULT_RECORD, RUN_RECORD, TEMPLATE_NAME,
 #   ATTEMPT, MAX_RETRIES, RUNS_DIR, RESULTS_DIR, WORKSPACE_ROOT
 
+# Schema predicates, shared by the builders (which check each payload in the
+# same jq process that produces it) and the file validators.
+RECORD_JQ_SCHEMA='
+def valid_run_record:
+    type == "object" and
+    (.schema_version == 1) and
+    (.bead | type == "string" and length > 0) and
+    (.agent as $a | ["claude", "codex"] | index($a) != null) and
+    (.model | type == "string" and length > 0) and
+    (.repo | type == "string" and length > 0) and
+    (.prompt | type == "string") and
+    (.prompt_hash | type == "string" and test("^[a-f0-9]{64}$")) and
+    (.started_at | type == "string") and
+    ((.finished_at == null) or (.finished_at | type == "string")) and
+    ((.duration_seconds == null) or (.duration_seconds | type == "number" and . >= 0 and floor == .)) and
+    (.status as $s | ["running", "done", "failed", "timeout"] | index($s) != null) and
+    (.attempt | type == "number" and . >= 1 and floor == .) and
+    (.max_retries | type == "number" and . >= 1 and floor == .) and
+    (.session_name | type == "string" and length > 0) and
+    (.result_file | type == "string" and length > 0) and
+    ((.exit_code == null) or (.exit_code | type == "number" and floor == .)) and
+    ((.output_summary == null) or (.output_summary | type == "string")) and
+    ((.failure_reason == null) or (.failure_reason | type == "string")) and
+    ((.template_name == null) or (.template_name | type == "string")) and
+    (.prompt_full | type == "string");
+
+def valid_result_record:
+    type == "object" and
+    (.schema_version == 1) and
+    (.bead | type == "string" and length > 0) and
+    (.agent as $a | ["claude", "codex"] | index($a) != null) and
+    (.status as $s | ["running", "done", "failed", "timeout"] | index($s) != null) and
+    (.reason | type == "string" and length > 0) and
+    (.started_at | type == "string") and
+    ((.finished_at == null) or (.finished_at | type == "string")) and
+    ((.duration_seconds == null) or (.duration_seconds | type == "number" and . >= 0 and floor == .)) and
+    (.attempt | type == "number" and . >= 1 and floor == .) and
+    (.max_retries | type == "number" and . >= 1 and floor == .) and
+    (.will_retry | type == "boolean") and
+    ((.exit_code == null) or (.exit_code | type == "number" and floor == .)) and
+    (.session_name | type == "string" and length > 0) and
+    ((.output_summary == null) or (.output_summary | type == "string"));
+
+def checked(valid; $what):
+    if valid then . else error("\($what) failed schema validation") end;
+'
+
+# Record shapes; reference the --arg values set by _set_record_jq_args.
+RECORD_JQ_SHAPES='
+def opt: if . == "" then null else . end;
+def opt_number: if . == "" then null else tonumber end;
+
+def run_record: {
+    schema_version: 1,
+    bead: $bead,
+    agent: $agent,
+    model: $model,
+    repo: $repo,
+    prompt: $prompt,
+    prompt_hash: $prompt_hash,
+    started_at: $started_at,
+    finished_at: ($finished_at | opt),
+    duration_seconds: ($duration | opt_number),
+    status: $status,
+    attempt: $attempt,
+    max_retries: $max_retries,
+    session_name: $session_name,
+    result_file: $result_file,
+    exit_code: ($exit_code | opt_number),
+    output_summary: ($output_summary | opt),
+    failure_reason: ($failure_reason | opt),
+    template_name: ($template_name | opt),
+    prompt_full: $prompt_full,
+    verification: $verification
+};
+
+def result_record: {
+    schema_version: 1,
+    bead: $bead,
+    agent: $agent,
+    status: $status,
+    reason: $reason,
+    started_at: $started_at,
+    finished_at: ($finished_at | opt),
+    duration_seconds: ($duration | opt_number),
+    attempt: $attempt,
+    max_retries: $max_retries,
+    will_retry: $will_retry,
+    exit_code: ($exit_code | opt_number),
+    session_name: $session_name,
+    output_summary: ($output_summary | opt),
+    verification: $verification
+};
+'
+
 validate_run_record_file() {
     local file="$1"
-    jq -e '
-        type == "object" and
-        (.schema_version == 1) and
-        (.bead | type == "string" and length > 0) and
-        (.agent as $a | ["claude", "codex"] | index($a) != null) and
-        (.model | type == "string" and length > 0) and
-        (.repo | type == "string" and length > 0) and
-        (.prompt | type == "string") and
-        (.prompt_hash | type == "string" and test("^[a-f0-9]{64}$")) and
-        (.started_at | type == "string") and
-        ((.finished_at == null) or (.finished_at | type == "string")) and
-        ((.duration_seconds == null) or (.duration_seconds | type == "number" and . >= 0 and floor == .)) and
-        (.status as $s | ["running", "done", "failed", "timeout"] | index($s) != null) and
-        (.attempt | type == "number" and . >= 1 and floor == .) and
-        (.max_retries | type == "number" and . >= 1 and floor == .) and
-        (.session_name | type == "string" and length > 0) and
-        (.result_file | type == "string" and length > 0) and
-        ((.exit_code == null) or (.exit_code | type == "number" and floor == .)) and
-        ((.output_summary == null) or (.output_summary | type == "string")) and
-        ((.failure_reason == null) or (.failure_reason | type == "string")) and
-        ((.template_name == null) or (.template_name | type == "string")) and
-        (.prompt_full | type == "string")
-    ' "$file" >/dev/null
+    jq -e "$RECORD_JQ_SCHEMA valid_run_record" "$file" >/dev/null
 }
 
 validate_result_record_file() {
     local file="$1"
-    jq -e '
-        type == "object" and
-        (.schema_version == 1) and
-        (.bead | type == "string" and length > 0) and
-        (.agent as $a | ["claude", "codex"] | index($a) != null) and
-        (.status as $s | ["running", "done", "failed", "timeout"] | index($s) != null) and
-        (.reason | type == "string" and length > 0) and
-        (.started_at | type == "string") and
-        ((.finished_at == null) or (.finished_at | type == "string")) and
-        ((.duration_seconds == null) or (.duration_seconds | type == "number" and . >= 0 and floor == .)) and
-        (.attempt | type == "number" and . >= 1 and floor == .) and
-        (.max_retries | type == "number" and . >= 1 and floor == .) and
-        (.will_retry | type == "boolean") and
-        ((.exit_code == null) or (.exit_code | type == "number" and floor == .)) and
-        (.session_name | type == "string" and length > 0) and
-        ((.output_summary == null) or (.output_summary | type == "string"))
-    ' "$file" >/dev/null
+    jq -e "$RECORD_JQ_SCHEMA valid_result_record" "$file" >/dev/null
+}
+
+# Fill RECORD_JQ_ARGS with every value the record shapes reference, so each
+# builder is a single `jq -cn` call.
+RECORD_JQ_ARGS=()
+_set_record_jq_args() {
+    local status="$1"
+    local reason="$2"
+    local finished_at="$3"
+    local duration="$4"
+    local exit_code="$5"
+    local will_retry="$6"
+    local output_summary="$7"
+    local failure_reason="$8"
+    local verification="$9"
+
+    RECORD_JQ_ARGS=(
+        --arg bead "$BEAD_ID"
+        --arg agent "$AGENT_TYPE"
+        --arg model "$MODEL"
+        --arg repo "$REPO_PATH"
+        --arg prompt "$PROMPT_TRUNCATED"
+        --arg prompt_hash "$PROMPT_HASH"
+        --arg started_at "$STARTED_AT"
+        --arg finished_at "$finished_at"
+        --arg duration "$duration"
+        --arg status "$status"
+        --arg reason "$reason"
+        --arg exit_code "$exit_code"
+        --arg session_name "$SESSION_NAME"
+        --arg result_file "$RESULT_RECORD"
+        --arg output_summary "$output_summary"
+        --arg failure_reason "$failure_reason"
+        --arg template_name "$TEMPLATE_NAME"
+        --arg prompt_full "$PROMPT"
+        --argjson attempt "$ATTEMPT"
+        --argjson max_retries "$MAX_RETRIES"
+        --argjson will_retry "$will_retry"
+        --argjson verification "$verification"
+    )
+}
+
+# Usage: _record_payloads <jq-filter> <status> <reason> <finished_at> <duration>
+#            <exit_code> <will_retry> [output_summary] [failure_reason] [verification]
+# One `jq -cn` over the record shapes; the filter picks the records to emit
+# from `run` and `result`, each checked against its schema.
+_record_payloads() {
+    local filter="$1"
+    _set_record_jq_args "$2" "$3" "$4" "$5" "$6" "$7" "${8:-}" "${9:-}" "${10:-null}"
+    jq -cn "${RECORD_JQ_ARGS[@]}" "$RECORD_JQ_SCHEMA$RECORD_JQ_SHAPES"'
+        def run: run_record | checked(valid_run_record; "run record");
+        def result: result_record | checked(valid_result_record; "result record");
+        '"$filter"
 }
 
-atomic_write_json() {
+# Usage: build_run_payload <status> <finished_at> <duration> <exit_code>
+#            [output_summary] [failure_reason] [verification]
+build_run_payload() {
+    _record_payloads run "$1" "" "$2" "$3" "$4" "false" "${5:-}" "${6:-}" "${7:-null}"
+}
+
+# Usage: build_result_payload <status> <reason> <finished_at> <duration>
+#            <exit_code> <will_retry> [output_summary] [verification]
+build_result_payload() {
+    _record_payloads result "$1" "$2" "$3" "$4" "$5" "$6" "${7:-}" "" "${8:-null}"
+}
+
+# Build both records in one jq call: the run record on the first line, the
+# result record on the second. Fails if either violates its schema. Takes
+# _record_payloads' arguments after the filter.
+build_records_payload() {
+    _record_payloads "run, result" "$@"
+}
+
+# Write an already-validated payload via tmp + mv.
+_write_record_file() {
     local target="$1"
     local payload="$2"
-    local validator="$3"
     local tmp
     tmp="$(mktemp "${target}.tmp.XXXXXX")"
     printf '%s\n' "$payload" > "$tmp"
+    mv "$tmp" "$target"
+}
 
-    if ! jq -e . "$tmp" >/dev/null 2>&1; then
-        rm -f "$tmp"
-        echo "Error: generated invalid JSON for $target" >&2
-        exit 1
+# Write RUN_RECORD and RESULT_RECORD; both temp files are written before
+# either rename, so a failure never updates one without the other.
+_write_record_pair() {
+    local run_payload="$1" result_payload="$2" run_tmp result_tmp
+    run_tmp="$(mktemp "${RUN_RECORD}.tmp.XXXXXX")"
+    result_tmp="$(mktemp "${RESULT_RECORD}.tmp.XXXXXX")"
+    if ! printf '%s\n' "$run_payload" > "$run_tmp" || ! printf '%s\n' "$result_payload" > "$result_tmp"; then
+        rm -f "$run_tmp" "$result_tmp"
+        return 1
     fi
+    mv "$run_tmp" "$RUN_RECORD"
+    mv "$result_tmp" "$RESULT_RECORD"
+}
 
-    if ! "$validator" "$tmp"; then
-        rm -f "$tmp"
-        echo "Error: JSON schema validation failed for $target" >&2
+# Single-record writers; dispatch.sh writes both records of a transition
+# with write_records. Arguments as for build_run_payload/build_result_payload.
+write_run_record() {
+    local payload index_current=false
+    if ! payload="$(build_run_payload "$@")"; then
+        echo "Error: JSON schema validation failed for $RUN_RECORD" >&2
         exit 1
     fi
-
-    mv "$tmp" "$target"
+    run_index_is_current "$RUNS_DIR" && index_current=true
+    _write_record_file "$RUN_RECORD" "$payload"
+    if [[ "$index_current" == "true" ]]; then
+        run_index_upsert_json "$RUNS_DIR" "$payload" \
+            || echo "Warning: run index update failed for $BEAD_ID; it will be rebuilt on next read" >&2
+    fi
+    run_ledger_append "$RUNS_DIR" "$payload" \
+        || echo "Warning: run ledger update failed for $BEAD_ID" >&2
 }
 
-build_run_payload() {
-    local status="$1"
-    local finished_at="$2"
-    local duration="$3"
-    local exit_code="$4"
-    local output_summary="${5:-}"
-    local failure_reason="${6:-}"
-    local verification="${7:-null}"
-
-    jq -cn \
-        --arg bead "$BEAD_ID" \
-        --arg agent "$AGENT_TYPE" \
-        --arg model "$MODEL" \
-        --arg repo "$REPO_PATH" \
-        --arg prompt "$PROMPT_TRUNCATED" \
-        --arg prompt_hash "$PROMPT_HASH" \
-        --arg started_at "$STARTED_AT" \
-        --arg finished_at "$finished_at" \
-        --arg duration "$duration" \
-        --arg status "$status" \
-        --arg exit_code "$exit_code" \
-        --arg session_name "$SESSION_NAME" \
-        --arg result_file "$RESULT_RECORD" \
-        --arg output_summary "$output_summary" \
-        --arg failure_reason "$failure_reason" \
-        --arg template_name "$TEMPLATE_NAME" \
-        --arg prompt_full "$PROMPT" \
-        --argjson attempt "$ATTEMPT" \
-        --argjson max_retries "$MAX_RETRIES" \
-        --argjson verification "$verification" \
-        '{
-            schema_version: 1,
-            bead: $bead,
-            agent: $agent,
-            model: $model,
-            repo: $repo,
-            prompt: $prompt,
-            prompt_hash: $prompt_hash,
-            started_at: $started_at,
-            finished_at: (if $finished_at == "" then null else $finished_at end),
-            duration_seconds: (if $duration == "" then null else ($duration | tonumber) end),
-            status: $status,
-            attempt: $attempt,
-            max_retries: $max_retries,
-            session_name: $session_name,
-            result_file: $result_file,
-            exit_code: (if $exit_code == "" then null else ($exit_code | tonumber) end),
-            output_summary: (if $output_summary == "" then null else $output_summary end),
-            failure_reason: (if $failure_reason == "" then null else $failure_reason end),
-            template_name: (if $template_name == "" then null else $template_name end),
-            prompt_full: $prompt_full,
-            verification: $verification
-        }'
+write_result_record() {
+    local payload
+    if ! payload="$(build_result_payload "$@")"; then
+        echo "Error: JSON schema validation failed for $RESULT_RECORD" >&2
+        exit 1
+    fi
+    _write_record_file "$RESULT_RECORD" "$payload"
+    run_index_update_result "$RUNS_DIR" "$BEAD_ID" "$2" "$6" || true
 }
 
-write_run_record() {
-    local status="$1"
-    local finished_at="$2"
-    local duration="$3"
-    local exit_code="$4"
-    local output_summary="${5:-}"
-    local failure_reason="${6:-}"
-    local verification="${7:-null}"
-    local payload
+# Write the run and result records for one state transition. Both payloads
+# are built and validated before either file is touched.
+# Usage: write_records <status> <reason> <finished_at> <duration> <exit_code>
+#            <will_retry> [output_summary] [failure_reason] [verification]
+write_records() {
+    local payloads run_payload="" result_payload="" index_current=false
 
-    payload="$(build_run_payload "$status" "$finished_at" "$duration" "$exit_code" "$output_summary" "$failure_reason" "$verification")"
-    atomic_write_json "$RUN_RECORD" "$payload" validate_run_record_file
-}
+    if ! payloads="$(build_records_payload "$@")"; then
+        echo "Error: JSON schema validation failed for $RUN_RECORD / $RESULT_RECORD" >&2
+        exit 1
+    fi
+    { IFS= read -r run_payload; IFS= read -r result_payload; } <<<"$payloads"
 
-build_result_payload() {
-    local status="$1"
-    local reason="$2"
-    local finished_at="$3"
-    local duration="$4"
-    local exit_code="$5"
-    local will_retry="$6"
-    local output_summary="${7:-}"
-    local verification="${8:-null}"
-
-    jq -cn \
-        --arg bead "$BEAD_ID" \
-        --arg agent "$AGENT_TYPE" \
-        --arg status "$status" \
-        --arg reason "$reason" \
-        --arg started_at "$STARTED_AT" \
-        --arg finished_at "$finished_at" \
-        --arg duration "$duration" \
-        --arg exit_code "$exit_code" \
-        --arg session_name "$SESSION_NAME" \
-        --arg output_summary "$output_summary" \
-        --argjson attempt "$ATTEMPT" \
-        --argjson max_retries "$MAX_RETRIES" \
-        --argjson will_retry "$will_retry" \
-        --argjson verification "$verification" \
-        '{
-            schema_version: 1,
-            bead: $bead,
-            agent: $agent,
-            status: $status,
-            reason: $reason,
-            started_at: $started_at,
-            finished_at: (if $finished_at == "" then null else $finished_at end),
-            duration_seconds: (if $duration == "" then null else ($duration | tonumber) end),
-            attempt: $attempt,
-            max_retries: $max_retries,
-            will_retry: $will_retry,
-            exit_code: (if $exit_code == "" then null else ($exit_code | tonumber) end),
-            session_name: $session_name,
-            output_summary: (if $output_summary == "" then null else $output_summary end),
-            verification: $verification
-        }'
+    run_index_is_current "$RUNS_DIR" && index_current=true
+    if ! _write_record_pair "$run_payload" "$result_payload"; then
+        echo "Error: failed to write records for $BEAD_ID" >&2
+        exit 1
+    fi
+
+    if [[ "$index_current" == "true" ]]; then
+        run_index_upsert_records "$RUNS_DIR" "$run_payload" "$result_payload" \
+            || echo "Warning: run index update failed for $BEAD_ID; it will be rebuilt on next read" >&2
+    fi
+    run_ledger_append "$RUNS_DIR" "$run_payload" "$result_payload" \
+        || echo "Warning: run ledger update failed for $BEAD_ID" >&2
 }
 
-write_result_record() {
-    local status="$1"
-    local reason="$2"
-    local finished_at="$3"
-    local duration="$4"
-    local exit_code="$5"
-    local will_retry="$6"
-    local output_summary="${7:-}"
-    local verification="${8:-null}"
-    local payload
+# Replace the verification block of both records, e.g. when the slow verify
+# checks finish after write_records recorded the fast result. Skipped when a
+# later attempt has rewritten the records in the meantime.
+attach_verification() {
+    local verification="$1"
+    local payloads run_payload="" result_payload="" index_current=false
+
+    [[ -f "$RUN_RECORD" && -f "$RESULT_RECORD" ]] || return 0
+    if ! payloads="$(jq -cn --argjson verification "$verification" --arg started_at "$STARTED_AT" \
+        "$RECORD_JQ_SCHEMA"'
+        [inputs] as [$run, $result]
+        | select($run.started_at == $started_at and $result.started_at == $started_at)
+        | ($run | .verification = $verification | checked(valid_run_record; "run record")),
+          ($result | .verification = $verification | checked(valid_result_record; "result record"))' \
+        "$RUN_RECORD" "$RESULT_RECORD")"; then
+        echo "Error: JSON schema validation failed attaching verification for $BEAD_ID" >&2
+        return 1
+    fi
+    { IFS= read -r run_payload; IFS= read -r result_payload; } <<<"$payloads"
+    [[ -n "$run_payload" && -n "$result_payload" ]] || return 0
+
+    run_index_is_current "$RUNS_DIR" && index_current=true
+    if ! _write_record_pair "$run_payload" "$result_payload"; then
+        echo "Error: failed to attach verification for $BEAD_ID" >&2
+        return 1
+    fi
 
-    payload="$(build_result_payload "$status" "$reason" "$finished_at" "$duration" "$exit_code" "$will_retry" "$output_summary" "$verification")"
-    atomic_write_json "$RESULT_RECORD" "$payload" validate_result_record_file
+    # Verification is not indexed; the upsert keeps the index current after
+    # the rename touched the runs directory.
+    if [[ "$index_current" == "true" ]]; then
+        run_index_upsert_json "$RUNS_DIR" "$run_payload" \
+            || echo "Warning: run index update failed for $BEAD_ID; it will be rebuilt on next read" >&2
+    fi
 }
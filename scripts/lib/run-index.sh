@@ -0,0 +1,249 @@
+# shellcheck shell=bash
+# run-index.sh — SQLite index over state/runs/*.json
+# Source this file; do not execute directly.
+#
+# The JSON run records stay the source of truth. This index mirrors the
+# fields that hot paths filter on (status, repo, session) so "running beads
+# for repo X" and "stale sessions" are one query instead of a jq fork per
+# file. record.sh keeps it current on every write; anything that bypasses
+# record.sh bumps the runs directory mtime, which triggers a rebuild on the
+# next read.
+#
+# Env:
+#   DISPATCH_RUN_INDEX      true|false (default: true; false = JSON scans)
+#   DISPATCH_RUN_INDEX_DB   index path (default: <runs-dir>/../runs.db)
+
+RUN_INDEX_JQ_QUOTE='
+    def q: if . == null then "NULL"
+        elif type == "number" then tostring
+        else "\u0027" + (tostring | gsub("\u0027"; "\u0027\u0027")) + "\u0027" end;'
+
+RUN_INDEX_ROW_SQL="$RUN_INDEX_JQ_QUOTE"'
+    select(type == "object" and (.bead | type == "string" and length > 0))
+    | "INSERT INTO runs (bead, status, repo, agent, model, session_name, prompt,"
+      + " attempt, started_at, finished_at, exit_code, failure_reason, updated_at)"
+      + " VALUES (" + ([.bead, (.status // "unknown"), .repo, .agent, .model, .session_name,
+                       .prompt, .attempt, .started_at, .finished_at, .exit_code,
+                       .failure_reason, (now | floor)] | map(q) | join(", ")) + ")"
+      + " ON CONFLICT(bead) DO UPDATE SET status = excluded.status, repo = excluded.repo,"
+      + " agent = excluded.agent, model = excluded.model, session_name = excluded.session_name,"
+      + " prompt = excluded.prompt, attempt = excluded.attempt, started_at = excluded.started_at,"
+      + " finished_at = excluded.finished_at, exit_code = excluded.exit_code,"
+      + " failure_reason = excluded.failure_reason, updated_at = excluded.updated_at;"'
+
+# Fallback for a batch that contains a malformed record: the batch is fed in
+# as one "<file>\t<record flattened to one line>" line per file (valid JSON
+# never contains a raw newline) and files that do not parse are skipped.
+RUN_INDEX_ROW_SQL_LENIENT='index("\t") as $tab | .[:$tab] as $file
+    | (.[$tab + 1:] | try fromjson catch null)
+    | if . == null then "-- skipped malformed record \($file)" else ('"$RUN_INDEX_ROW_SQL"') end'
+
+RUN_INDEX_SCHEMA='CREATE TABLE IF NOT EXISTS runs (
+    bead TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    repo TEXT,
+    agent TEXT,
+    model TEXT,
+    session_name TEXT,
+    prompt TEXT,
+    attempt INTEGER,
+    started_at TEXT,
+    finished_at TEXT,
+    exit_code INTEGER,
+    failure_reason TEXT,
+    reason TEXT,
+    will_retry INTEGER,
+    updated_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_status_repo ON runs(status, repo);'
+
+run_index_enabled() {
+    [[ "${DISPATCH_RUN_INDEX:-true}" == "true" ]] && command -v sqlite3 >/dev/null 2>&1
+}
+
+run_index_db() {
+    local runs_dir="$1"
+    echo "${DISPATCH_RUN_INDEX_DB:-$(dirname "$runs_dir")/runs.db}"
+}
+
+# Run SQL from stdin against the index with a busy timeout so concurrent
+# dispatches serialize instead of failing with SQLITE_BUSY.
+_run_index_sql() {
+    local db="$1"
+    shift
+    sqlite3 -batch -noheader -cmd ".timeout 5000" "$@" "$db"
+}
+
+_run_index_quote() {
+    printf "'%s'" "${1//\'/\'\'}"
+}
+
+# True when the index exists and nothing in the runs directory changed after
+# its last write. Writers check this *before* replacing a record: upserting
+# into an index that was already stale would bump its mtime and hide the
+# missed changes from run_index_sync.
+run_index_is_current() {
+    local runs_dir="$1" db
+    run_index_enabled || return 1
+    db="$(run_index_db "$runs_dir")"
+    [[ -f "$db" ]] && ! [[ "$runs_dir" -nt "$db" ]]
+}
+
+# Upsert one run record from its JSON payload. Never creates the index: a
+# partial index would look current, so the first read builds it in full.
+run_index_upsert_json() {
+    local runs_dir="$1" payload="$2" db
+    run_index_enabled || return 0
+    db="$(run_index_db "$runs_dir")"
+    [[ -f "$db" ]] || return 0
+    printf '%s\n' "$payload" | jq -r "$RUN_INDEX_ROW_SQL" | _run_index_sql "$db" >/dev/null
+}
+
+# Upsert a run record together with the reason/will_retry of its result
+# record, as written by write_records.
+run_index_upsert_records() {
+    local runs_dir="$1" run_payload="$2" result_payload="$3" db
+    run_index_enabled || return 0
+    db="$(run_index_db "$runs_dir")"
+    [[ -f "$db" ]] || return 0
+    printf '%s\n%s\n' "$run_payload" "$result_payload" \
+        | jq -rs "$RUN_INDEX_JQ_QUOTE"'
+            .[0] as $run | .[1] as $result
+            | ($run | '"$RUN_INDEX_ROW_SQL"'),
+              "UPDATE runs SET reason = \($result.reason | q),"
+              + " will_retry = \(if $result.will_retry then 1 else 0 end)"
+              + " WHERE bead = \($run.bead | q);"' \
+        | _run_index_sql "$db" >/dev/null
+}
+
+run_index_upsert_file() {
+    local runs_dir="$1" run_file="$2"
+    [[ -f "$run_file" ]] || return 0
+    run_index_upsert_json "$runs_dir" "$(cat "$run_file")"
+}
+
+# Mirror the result-record fields that are not in the run record. Skipped
+# when the index is stale for the same reason as in run_index_is_current.
+run_index_update_result() {
+    local runs_dir="$1" bead="$2" reason="$3" will_retry="$4" db
+    run_index_is_current "$runs_dir" || return 0
+    db="$(run_index_db "$runs_dir")"
+    [[ "$will_retry" == "true" ]] && will_retry=1 || will_retry=0
+    printf 'UPDATE runs SET reason = %s, will_retry = %s WHERE bead = %s;\n' \
+        "$(_run_index_quote "$reason")" "$will_retry" "$(_run_index_quote "$bead")" \
+        | _run_index_sql "$db" >/dev/null
+}
+
+# Rebuild the index from every run record in one transaction. Records are
+# parsed in xargs batches; a batch containing a malformed file is re-read
+# leniently so one bad record does not drop its neighbours.
+run_index_rebuild() {
+    local runs_dir="$1" db
+    run_index_enabled || return 1
+    db="$(run_index_db "$runs_dir")"
+    mkdir -p "$(dirname "$db")"
+
+    {
+        printf '%s\n' "$RUN_INDEX_SCHEMA"
+        echo "BEGIN IMMEDIATE;"
+        echo "DELETE FROM runs;"
+        if [[ -d "$runs_dir" ]]; then
+            find "$runs_dir" -maxdepth 1 -type f -name '*.json' -print0 \
+                | xargs -0 -r sh -c '
+                    filter="$1" lenient="$2"; shift 2
+                    jq -r "$filter" "$@" 2>/dev/null && exit 0
+                    awk '\''FNR == 1 { if (NR > 1) print ""; printf "%s\t", FILENAME }
+                        { printf "%s ", $0 } END { if (NR > 0) print "" }'\'' "$@" \
+                        | jq -Rr "$lenient"' \
+                    _ "$RUN_INDEX_ROW_SQL" "$RUN_INDEX_ROW_SQL_LENIENT"
+        fi
+        echo "COMMIT;"
+    } | _run_index_sql "$db" >/dev/null
+}
+
+# Make sure the index exists and is not older than the runs directory.
+# Returns non-zero when the index cannot be used; callers fall back to
+# scanning the JSON files.
+run_index_sync() {
+    local runs_dir="$1" db
+    run_index_enabled || return 1
+    [[ -d "$runs_dir" ]] || return 1
+    db="$(run_index_db "$runs_dir")"
+    if [[ ! -f "$db" || "$runs_dir" -nt "$db" ]]; then
+        run_index_rebuild "$runs_dir" || return 1
+    fi
+}
+
+# Running beads, optionally limited to one repo and excluding one bead.
+# Output: bead<TAB>agent<TAB>session<TAB>prompt (first 200 chars, one line).
+run_index_running() {
+    local runs_dir="$1" repo="${2:-}" exclude="${3:-}" where="status = 'running'"
+    run_index_sync "$runs_dir" || return 1
+    [[ -n "$repo" ]] && where+=" AND repo = $(_run_index_quote "$repo")"
+    [[ -n "$exclude" ]] && where+=" AND bead != $(_run_index_quote "$exclude")"
+    printf '%s\n' "SELECT bead, COALESCE(agent, ''), COALESCE(session_name, ''),
+        replace(replace(substr(COALESCE(prompt, ''), 1, 200), char(10), ' '), char(9), ' ')
+        FROM runs WHERE $where ORDER BY started_at, bead;" \
+        | _run_index_sql "$(run_index_db "$runs_dir")" -separator $'\t'
+}
+
+# Running beads on a repo with their start times, oldest first.
+# Output: bead<TAB>started_at
+run_index_running_since() {
+    local runs_dir="$1" repo="$2"
+    run_index_sync "$runs_dir" || return 1
+    printf '%s\n' "SELECT bead, COALESCE(started_at, '') FROM runs
+        WHERE status = 'running' AND repo = $(_run_index_quote "$repo")
+        ORDER BY started_at, bead;" \
+        | _run_index_sql "$(run_index_db "$runs_dir")" -separator $'\t'
+}
+
+# Records for the given sessions plus every running record (for stale
+# detection), in one query.
+# Output: session<US>bead<US>status<US>agent<US>model<US>started_at (US = \x1f)
+run_index_session_rows() {
+    local runs_dir="$1" session in_list=""
+    shift
+    run_index_sync "$runs_dir" || return 1
+    for session in "$@"; do
+        in_list+="${in_list:+, }'${session//\'/\'\'}'"
+    done
+    printf '%s\n' "SELECT session_name, bead, status, COALESCE(agent, '?'), COALESCE(model, '?'),
+        COALESCE(started_at, '?') FROM runs
+        WHERE COALESCE(session_name, '') != '' AND (status = 'running' OR session_name IN ($in_list))
+        ORDER BY bead;" \
+        | _run_index_sql "$(run_index_db "$runs_dir")" -separator $'\x1f'
+}
+
+# Quoted, comma-separated list of live tmux sessions for an SQL IN clause.
+_run_index_live_sessions() {
+    local socket="$1" live_list="" session
+    while IFS= read -r session; do
+        [[ -n "$session" ]] || continue
+        live_list+="${live_list:+, }'${session//\'/\'\'}'"
+    done < <(tmux_list_sessions "$socket")
+    echo "$live_list"
+}
+
+# Running beads whose tmux session is alive, counted with one list-sessions
+# call and one query.
+run_index_live_count() {
+    local runs_dir="$1" socket="$2" live_list
+    run_index_sync "$runs_dir" || return 1
+    live_list="$(_run_index_live_sessions "$socket")"
+    printf '%s\n' "SELECT COUNT(*) FROM runs
+        WHERE status = 'running' AND session_name IN ($live_list);" \
+        | _run_index_sql "$(run_index_db "$runs_dir")"
+}
+
+# Running beads whose tmux session is gone. Output: bead<TAB>session
+run_index_stale_sessions() {
+    local runs_dir="$1" socket="$2" live_list
+    run_index_sync "$runs_dir" || return 1
+    live_list="$(_run_index_live_sessions "$socket")"
+    printf '%s\n' "SELECT bead, session_name FROM runs
+        WHERE status = 'running' AND COALESCE(session_name, '') != ''
+          AND session_name NOT IN ($live_list)
+        ORDER BY bead;" \
+        | _run_index_sql "$(run_index_db "$runs_dir")" -separator $'\t'
+}
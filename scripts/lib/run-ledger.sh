@@ -0,0 +1,289 @@
+# shellcheck shell=bash
+# run-ledger.sh — Append-only ledger of finished runs with materialized rollups
+# Source this file; do not execute directly.
+#
+# record.sh appends one line to state/runs.jsonl for every terminal
+# transition (done/failed/timeout) and folds the new lines into
+# state/run-rollups.json: per agent/model/template (and per template and
+# agent:model pair) counts, success rate, average duration and duration
+# percentiles. state/template-scores.json is
+# rewritten from the rollups in the same step, so planner.sh and
+# select-template.sh always read current numbers without rescanning history.
+#
+# The rollups remember how many ledger bytes they cover, so an update only
+# reads the lines appended since (normally just the one being written), and a
+# missing or damaged rollups file is rebuilt from the ledger. A ledger that
+# does not exist yet is backfilled once from the run and result records.
+#
+# Only a bead's final attempt (will_retry=false) counts as a run; retried
+# attempts show up in `attempts`. Percentiles come from a fixed histogram and
+# report the upper bound of the bucket they fall in.
+#
+# Env:
+#   RUN_LEDGER                true|false (default: true; false = record.sh does not append)
+#   RUN_LEDGER_FILE           default: <runs-dir>/../runs.jsonl
+#   RUN_ROLLUPS_FILE          default: <runs-dir>/../run-rollups.json
+#   TEMPLATE_SCORES_FILE      default: <runs-dir>/../template-scores.json
+
+RUN_LEDGER_ENTRY_JQ='
+def ledger_entry($run; $result):
+    {
+        schema_version: 1,
+        bead: $run.bead,
+        agent: $run.agent,
+        model: $run.model,
+        template: ($run.template_name // "custom"),
+        repo: $run.repo,
+        status: $run.status,
+        reason: ($result.reason // $run.failure_reason // null),
+        attempt: ($run.attempt // 1),
+        will_retry: ($result.will_retry // false),
+        started_at: $run.started_at,
+        finished_at: $run.finished_at,
+        duration_seconds: $run.duration_seconds,
+        exit_code: $run.exit_code,
+        recorded_at: (now | strftime("%Y-%m-%dT%H:%M:%SZ"))
+    };'
+
+RUN_LEDGER_ROLLUP_JQ='
+def duration_bounds: [30, 60, 120, 300, 600, 900, 1200, 1800, 2700, 3600, 5400, 7200, 10800, 14400];
+
+def empty_bucket:
+    {attempts: 0, runs: 0, done: 0, failed: 0, timeout: 0, retries: 0,
+     duration_sum: 0, duration_count: 0, duration_max: 0,
+     duration_histogram: ([duration_bounds[] | 0] + [0])};
+
+def empty_rollups:
+    {schema_version: 2, ledger_offset: 0, entries: 0, updated_at: null,
+     overall: empty_bucket, by_agent: {}, by_model: {}, by_template: {},
+     by_template_route: {}};
+
+def add_entry($entry):
+    (. // empty_bucket) |
+    .attempts += 1 |
+    if $entry.will_retry == true then . else
+        .runs += 1 |
+        .done += (if $entry.status == "done" then 1 else 0 end) |
+        .failed += (if $entry.status == "failed" then 1 else 0 end) |
+        .timeout += (if $entry.status == "timeout" then 1 else 0 end) |
+        .retries += (($entry.attempt // 1) - 1) |
+        if ($entry.duration_seconds | type) == "number" then
+            $entry.duration_seconds as $d |
+            ([duration_bounds | to_entries[] | select($d <= .value) | .key][0] // (duration_bounds | length)) as $slot |
+            .duration_sum += $d |
+            .duration_count += 1 |
+            .duration_max = ([.duration_max, $d] | max) |
+            .duration_histogram[$slot] += 1
+        else . end
+    end;
+
+def percentile($p):
+    if .duration_count == 0 then null else
+        (.duration_count * $p / 100 | ceil) as $rank |
+        .duration_max as $max |
+        [foreach .duration_histogram[] as $n (0; . + $n)] as $cumulative |
+        ([range(0; $cumulative | length) | select($cumulative[.] >= $rank)][0]) as $slot |
+        ([duration_bounds[$slot] // $max, $max] | min)
+    end;
+
+def with_rates:
+    .success_rate = (if .runs > 0 then .done / .runs else 0 end) |
+    .avg_duration_s = (if .duration_count > 0 then .duration_sum / .duration_count else 0 end) |
+    .avg_retries = (if .runs > 0 then .retries / .runs else 0 end) |
+    .p50_duration_s = percentile(50) |
+    .p90_duration_s = percentile(90);
+
+def apply_entry($entry):
+    .entries += 1 |
+    .overall |= add_entry($entry) |
+    .by_agent[$entry.agent // "unknown" | tostring] |= add_entry($entry) |
+    .by_model[$entry.model // "unknown" | tostring] |= add_entry($entry) |
+    .by_template[$entry.template // "custom" | tostring] |= add_entry($entry) |
+    .by_template_route[$entry.template // "custom" | tostring]
+        ["\($entry.agent // "unknown"):\($entry.model // "unknown")"] |= add_entry($entry);
+
+def finish_rollups($offset):
+    .ledger_offset = $offset |
+    .updated_at = (now | strftime("%Y-%m-%dT%H:%M:%SZ")) |
+    .overall |= with_rates |
+    (.by_agent, .by_model, .by_template) |= map_values(with_rates) |
+    .by_template_route |= map_values(map_values(with_rates));
+
+# Same shape and recommendation as score-templates.sh has always written.
+def template_scores:
+    (.by_template | to_entries | map(select(.value.runs > 0)) | sort_by(-.value.runs)
+        | map({(.key): {
+            uses: .value.runs,
+            success_rate: .value.success_rate,
+            avg_duration_s: (.value.avg_duration_s | floor),
+            avg_retries: (.value.avg_retries | . * 10 | floor / 10),
+            p50_duration_s: .value.p50_duration_s,
+            p90_duration_s: .value.p90_duration_s
+          }})
+        | add // {}) as $templates |
+    {
+        generated_at: .updated_at,
+        templates: $templates,
+        recommendation: (
+            $templates | to_entries | map(select(.value.uses >= 2)) | sort_by(.value.success_rate) |
+            if length > 0 then
+                .[0] as $worst |
+                if $worst.value.success_rate < 0.5 then
+                    "Avoid \u0027\($worst.key)\u0027 template (\($worst.value.success_rate * 100 | floor)% success). Prefer templates with >70% success rate."
+                else
+                    "All templates performing adequately. Continue monitoring for patterns."
+                end
+            else
+                "Insufficient data (need at least 2 uses per template)."
+            end
+        )
+    };'
+
+run_ledger_enabled() {
+    [[ "${RUN_LEDGER:-true}" == "true" ]]
+}
+
+run_ledger_file() {
+    local runs_dir="$1"
+    echo "${RUN_LEDGER_FILE:-$(dirname "$runs_dir")/runs.jsonl}"
+}
+
+run_rollups_file() {
+    local runs_dir="$1"
+    echo "${RUN_ROLLUPS_FILE:-$(dirname "$runs_dir")/run-rollups.json}"
+}
+
+template_scores_file() {
+    local runs_dir="$1"
+    echo "${TEMPLATE_SCORES_FILE:-$(dirname "$runs_dir")/template-scores.json}"
+}
+
+# Run "$@" holding an exclusive lock next to the ledger, so concurrent
+# completions append and fold in turn.
+_run_ledger_locked() {
+    local ledger="$1"
+    shift
+    mkdir -p "$(dirname "$ledger")"
+    if command -v flock >/dev/null 2>&1; then
+        (
+            flock -w 10 9 || { echo "Warning: timed out waiting for $ledger.lock" >&2; exit 1; }
+            "$@"
+        ) 9>>"$ledger.lock"
+    else
+        "$@"
+    fi
+}
+
+# Fold ledger lines the rollups have not seen yet into the rollups file and
+# rewrite template-scores.json. Rebuilds from the start of the ledger when
+# the rollups are missing, unreadable, from an older schema or claim more
+# bytes than exist.
+_run_ledger_fold() {
+    local runs_dir="$1"
+    local ledger rollups scores size offset=0 start_empty=true output tmp_rollups tmp_scores
+    ledger="$(run_ledger_file "$runs_dir")"
+    rollups="$(run_rollups_file "$runs_dir")"
+    scores="$(template_scores_file "$runs_dir")"
+    [[ -f "$ledger" ]] || return 0
+    size="$(stat -c %s "$ledger")"
+
+    if [[ -f "$rollups" ]] && offset="$(jq -er 'select(.schema_version == 2) | .ledger_offset | numbers' "$rollups" 2>/dev/null)" \
+        && (( offset <= size )); then
+        start_empty=false
+        (( offset < size )) || [[ ! -f "$scores" ]] || return 0
+    else
+        offset=0
+    fi
+
+    output="$(tail -c "+$((offset + 1))" "$ledger" | head -c "$((size - offset))" \
+        | jq -cn --argjson start_empty "$start_empty" --slurpfile current <(
+            if [[ "$start_empty" == "true" ]]; then echo null; else cat "$rollups"; fi
+        ) --argjson offset "$size" "$RUN_LEDGER_ROLLUP_JQ"'
+            (if $start_empty then empty_rollups else $current[0] end)
+            | reduce (inputs | select(type == "object")) as $entry (.; apply_entry($entry))
+            | finish_rollups($offset)
+            | ., template_scores')" || return 1
+
+    tmp_rollups="$(mktemp "${rollups}.tmp.XXXXXX")"
+    tmp_scores="$(mktemp "${scores}.tmp.XXXXXX")"
+    sed -n 1p <<<"$output" > "$tmp_rollups"
+    sed -n 2p <<<"$output" | jq '.' > "$tmp_scores"
+    mv "$tmp_rollups" "$rollups"
+    mv "$tmp_scores" "$scores"
+}
+
+# Create the ledger from existing run/result records: one entry per bead in
+# a terminal state, streamed like analyze-runs.sh. Only used when no ledger
+# exists yet.
+_run_ledger_backfill() {
+    local runs_dir="$1" ledger tmp results_dir
+    ledger="$(run_ledger_file "$runs_dir")"
+    [[ ! -f "$ledger" ]] || return 0
+    results_dir="$(dirname "$runs_dir")/results"
+    tmp="$(mktemp "${ledger}.tmp.XXXXXX")"
+    if [[ -d "$runs_dir" ]]; then
+        if ! find "$runs_dir" -maxdepth 1 -type f -name '*.json' -exec cat {} + 2>/dev/null \
+            | jq -cn --slurpfile results <(
+                [[ -d "$results_dir" ]] && find "$results_dir" -maxdepth 1 -type f -name '*.json' -exec cat {} + 2>/dev/null \
+                    | jq -cn 'reduce (inputs | select(type == "object" and (.bead | type == "string"))) as $r
+                        ({}; .[$r.bead] = {reason: $r.reason, will_retry: $r.will_retry})' \
+                    || echo '{}'
+            ) "$RUN_LEDGER_ENTRY_JQ"'
+                ($results[0] // {}) as $by_bead
+                | inputs
+                | select(type == "object" and (.bead | type == "string")
+                    and (.status == "done" or .status == "failed" or .status == "timeout"))
+                | ledger_entry(.; $by_bead[.bead] // {})
+                | .recorded_at = (.finished_at // .recorded_at)' > "$tmp"; then
+            rm -f "$tmp"
+            return 1
+        fi
+    fi
+    mv "$tmp" "$ledger"
+}
+
+# Make sure the ledger exists (backfilling it once) and the rollups and
+# template scores cover every line in it.
+run_ledger_sync() {
+    local runs_dir="$1"
+    _run_ledger_locked "$(run_ledger_file "$runs_dir")" _run_ledger_sync_locked "$runs_dir"
+}
+
+_run_ledger_sync_locked() {
+    local runs_dir="$1"
+    _run_ledger_backfill "$runs_dir"
+    _run_ledger_fold "$runs_dir"
+}
+
+# Recompute the rollups from the whole ledger.
+run_ledger_rebuild_rollups() {
+    local runs_dir="$1"
+    rm -f "$(run_rollups_file "$runs_dir")"
+    run_ledger_sync "$runs_dir"
+}
+
+# The first append backfills the ledger from the records on disk, which
+# already include the one just written, so the entry itself is not added.
+_run_ledger_append_locked() {
+    local runs_dir="$1" entry="$2" ledger
+    ledger="$(run_ledger_file "$runs_dir")"
+    if [[ -f "$ledger" ]]; then
+        printf '%s\n' "$entry" >> "$ledger"
+    else
+        _run_ledger_backfill "$runs_dir" || return 1
+    fi
+    _run_ledger_fold "$runs_dir"
+}
+
+# Append the terminal transition described by a run payload (and its result
+# payload, when there is one) and fold it into the rollups. Non-terminal
+# payloads are ignored.
+run_ledger_append() {
+    local runs_dir="$1" run_payload="$2" result_payload="${3:-null}" entry
+    run_ledger_enabled || return 0
+    entry="$(jq -cn --argjson run "$run_payload" --argjson result "$result_payload" "$RUN_LEDGER_ENTRY_JQ"'
+        select($run.status == "done" or $run.status == "failed" or $run.status == "timeout")
+        | ledger_entry($run; $result // {})')" || return 1
+    [[ -n "$entry" ]] || return 0
+    _run_ledger_locked "$(run_ledger_file "$runs_dir")" _run_ledger_append_locked "$runs_dir" "$entry"
+}
@@ -0,0 +1,181 @@
+# shellcheck shell=bash
+# verify-checks.sh — Individual verification checks run by verify.sh
+# Source this file; do not execute directly.
+# Requires: SCRIPT_DIR, REPO_PATH, CHECK_DIR and TEST_LOG set by verify.sh.
+#
+# Each check_<name> prints its JSON fields on stdout; verify.sh runs the
+# selected checks concurrently and merges the fragments.
+
+# ── Check 0: PRD governance ─────────────────────────────────────────────────
+
+check_prd_governance() {
+    if [[ -x "$SCRIPT_DIR/prd-lint.sh" ]]; then
+        PRD_OUTPUT=""
+        if PRD_OUTPUT="$("$SCRIPT_DIR/prd-lint.sh" --json 2>/dev/null)"; then
+            PRD_GOVERNANCE_RESULT="pass"
+        else
+            PRD_GOVERNANCE_RESULT="fail"
+            if [[ -n "$PRD_OUTPUT" ]]; then
+                PRD_GOVERNANCE_DETAILS="$(printf '%s' "$PRD_OUTPUT" | jq -c '.summary // null' 2>/dev/null || echo "null")"
+            fi
+        fi
+    fi
+    printf '{"prd_governance":"%s","prd_governance_details":%s}' "$PRD_GOVERNANCE_RESULT" "${PRD_GOVERNANCE_DETAILS:-null}"
+}
+
+# ── Check 1: Lint changed files ──────────────────────────────────────────────
+
+check_lint() {
+    if git -C "$REPO_PATH" rev-parse --git-dir > /dev/null 2>&1; then
+        CHANGED_FILES=""
+        if ! CHANGED_FILES="$(git -C "$REPO_PATH" diff --name-only HEAD 2>&1)"; then
+            CHANGED_FILES=""
+        fi
+        if [[ -n "$CHANGED_FILES" ]] && [[ -x "$SCRIPT_DIR/lint-agent.sh" ]]; then
+            # Lint the whole changed set in one call (deleted files are skipped)
+            LINT_FILES=()
+            while IFS= read -r file; do
+                [[ -z "$file" ]] && continue
+                [[ -f "$REPO_PATH/$file" ]] && LINT_FILES+=("$REPO_PATH/$file")
+            done <<< "$CHANGED_FILES"
+            if [[ ${#LINT_FILES[@]} -gt 0 ]]; then
+                LINT_OUTPUT=""
+                if LINT_OUTPUT=$("$SCRIPT_DIR/lint-agent.sh" --json "${LINT_FILES[@]}"); then
+                    LINT_RESULT="pass"
+                else
+                    LINT_RESULT="fail"
+                    LINT_DETAILS="$(jq -c . <<< "$LINT_OUTPUT" 2>/dev/null)" || LINT_DETAILS="null"
+                fi
+            fi
+        elif [[ -n "$CHANGED_FILES" ]] && [[ ! -x "$SCRIPT_DIR/lint-agent.sh" ]]; then
+            LINT_RESULT="skipped"
+            echo "Warning: lint-agent.sh not found or not executable, skipping lint" >&2
+        fi
+    fi
+    printf '{"lint":"%s","lint_details":%s}' "$LINT_RESULT" "${LINT_DETAILS:-null}"
+}
+
+# ── Check 2: Run tests ──────────────────────────────────────────────────────
+
+# Auto-detect test runner and run with timeout
+run_test_check() {
+    local repo="$1"
+    local test_timeout=120
+
+    if [[ -f "$repo/package.json" ]]; then
+        if ! command -v npm >/dev/null 2>&1; then
+            echo "Warning: npm not found, skipping tests" >&2
+            TESTS_RESULT="skipped"
+            return
+        fi
+        # Use configured timeout or check for long test suites
+        if (cd "$repo" && timeout "$test_timeout" npm test) > "$TEST_LOG" 2>&1; then
+            TESTS_RESULT="pass"
+        else
+            local ec=$?
+            if [[ $ec -eq 124 ]]; then
+                TESTS_RESULT="timeout"
+                echo "Warning: tests timed out after ${test_timeout}s" >&2
+            else
+                TESTS_RESULT="fail"
+            fi
+            echo "=== TEST FAILURES ===" >&2
+            tail -30 "$TEST_LOG" >&2
+        fi
+    elif [[ -f "$repo/Cargo.toml" ]]; then
+        if ! command -v cargo >/dev/null 2>&1; then
+            echo "Warning: cargo not found, skipping tests" >&2
+            TESTS_RESULT="skipped"
+            return
+        fi
+        if (cd "$repo" && timeout 300 cargo test) > "$TEST_LOG" 2>&1; then
+            TESTS_RESULT="pass"
+        else
+            local ec=$?
+            if [[ $ec -eq 124 ]]; then
+                TESTS_RESULT="timeout"
+                echo "Warning: cargo tests timed out after 300s" >&2
+            else
+                TESTS_RESULT="fail"
+            fi
+            echo "=== TEST FAILURES ===" >&2
+            tail -30 "$TEST_LOG" >&2
+        fi
+    elif [[ -f "$repo/go.mod" ]]; then
+        if ! command -v go >/dev/null 2>&1; then
+            # Try common install location
+            export PATH="$PATH:/usr/local/go/bin"
+            if ! command -v go >/dev/null 2>&1; then
+                echo "Warning: go not found, skipping tests" >&2
+                TESTS_RESULT="skipped"
+                return
+            fi
+        fi
+        if (cd "$repo" && timeout 300 go test ./...) > "$TEST_LOG" 2>&1; then
+            TESTS_RESULT="pass"
+        else
+            local ec=$?
+            if [[ $ec -eq 124 ]]; then
+                TESTS_RESULT="timeout"
+                echo "Warning: go tests timed out after 300s" >&2
+            else
+                TESTS_RESULT="fail"
+            fi
+            echo "=== TEST FAILURES ===" >&2
+            tail -30 "$TEST_LOG" >&2
+        fi
+    fi
+}
+
+check_tests() {
+    run_test_check "$REPO_PATH"
+    printf '{"tests":"%s"}' "$TESTS_RESULT"
+}
+
+# ── Check 3: Truthsayer ─────────────────────────────────────────────────────
+
+check_truthsayer() {
+    if [[ -v TRUTHSAYER_BIN ]]; then
+        TRUTHSAYER_BIN="${TRUTHSAYER_BIN:?TRUTHSAYER_BIN cannot be empty}"
+    else
+        TRUTHSAYER_BIN="$HOME/truthsayer/truthsayer"
+    fi
+    if [[ -x "$TRUTHSAYER_BIN" ]]; then
+        TS_OUTPUT=""
+        if ! TS_OUTPUT=$("$TRUTHSAYER_BIN" scan --format json "$REPO_PATH" 2>&1); then
+            TS_OUTPUT=""
+        fi
+        if [[ -n "$TS_OUTPUT" ]]; then
+            if ! TRUTHSAYER_ERRORS="$(printf '%s' "$TS_OUTPUT" | jq '.summary.errors // 0' 2>/dev/null)"; then
+                TRUTHSAYER_ERRORS=0
+            fi
+            if ! TRUTHSAYER_WARNINGS="$(printf '%s' "$TS_OUTPUT" | jq '.summary.warnings // 0' 2>/dev/null)"; then
+                TRUTHSAYER_WARNINGS=0
+            fi
+            if [[ "$TRUTHSAYER_ERRORS" =~ ^[0-9]+$ ]] && [[ "$TRUTHSAYER_ERRORS" -gt 0 ]]; then
+                TRUTHSAYER_RESULT="fail"
+            else
+                TRUTHSAYER_RESULT="pass"
+            fi
+        fi
+    fi
+
+    # Ensure numeric types even if jq parsing failed
+    [[ "$TRUTHSAYER_ERRORS" =~ ^[0-9]+$ ]] || TRUTHSAYER_ERRORS=0
+    [[ "$TRUTHSAYER_WARNINGS" =~ ^[0-9]+$ ]] || TRUTHSAYER_WARNINGS=0
+    printf '{"truthsayer":"%s","truthsayer_errors":%s,"truthsayer_warnings":%s}' \
+        "$TRUTHSAYER_RESULT" "$TRUTHSAYER_ERRORS" "$TRUTHSAYER_WARNINGS"
+}
+
+# ── Check 4: UBS ────────────────────────────────────────────────────────────
+
+check_ubs() {
+    if command -v ubs > /dev/null 2>&1; then
+        if ubs "$REPO_PATH" > /dev/null 2>&1; then
+            UBS_RESULT="clean"
+        else
+            UBS_RESULT="issues"
+        fi
+    fi
+    printf '{"ubs":"%s"}' "$UBS_RESULT"
+}
@@ -0,0 +1,187 @@
+# shellcheck shell=bash
+# watcher-tick.sh — One watcher.sh tick: batched spec scan, session listing
+# and completion claim for every in-flight dispatch
+# Source this file; do not execute directly.
+# Requires: common.sh sourced; WORKSPACE_ROOT, WATCH_DIR, STATE_FILE, DISPATCH_SCRIPT, USE_RELAY,
+# RELAY_BIN, RELAY_ORCHESTRATOR_AGENT, COMPLETING, TICK_COUNT, TRACKED_COUNT
+# and log() set by watcher.sh.
+
+# One spec -> bead<TAB>session<TAB>socket<TAB>started<TAB>deadline<TAB>timeout<TAB>status_file<TAB>use_relay
+SPEC_ROW_JQ='[.bead, .session, .tmux_socket, .started_epoch, .deadline_epoch, .timeout_seconds, .status_file,
+    (if .use_relay == false then "false" else "true" end)] | @tsv'
+
+# ── Completion claims ────────────────────────────────────────────────────────
+
+relay_enabled() {
+    [[ "$USE_RELAY" == "true" && -x "$RELAY_BIN" ]]
+}
+
+# A previous daemon may have died between claiming a bead and finishing it.
+recover_claimed_specs() {
+    local claimed bead status
+    for claimed in "$WATCH_DIR"/*.claimed.json; do
+        [[ -f "$claimed" ]] || continue
+        bead="$(basename "$claimed" .claimed.json)"
+        status="$(jq -r '.status // empty' "$WORKSPACE_ROOT/state/runs/$bead.json" 2>/dev/null)" || status=""
+        if status_is_terminal "$status"; then
+            rm -f "$claimed"
+        else
+            log "recovering claimed bead=$bead"
+            mv "$claimed" "$WATCH_DIR/$bead.watch.json"
+        fi
+    done
+}
+
+# Claim the spec (rename) so a bead is only ever completed once, then fan out.
+complete_bead() {
+    local bead="$1" status="$2" exit_code="$3" reason="$4" finished_at="$5"
+    mv "$WATCH_DIR/$bead.watch.json" "$WATCH_DIR/$bead.claimed.json" 2>/dev/null || return 0
+    log "complete bead=$bead status=$status exit_code=$exit_code reason=$reason"
+    "$DISPATCH_SCRIPT" --complete "$bead" "$status" "$exit_code" "$reason" "$finished_at" </dev/null &
+    COMPLETING["$bead"]=$!
+}
+
+reap_completions() {
+    local bead
+    for bead in "${!COMPLETING[@]}"; do
+        kill -0 "${COMPLETING[$bead]}" 2>/dev/null && continue
+        wait "${COMPLETING[$bead]}" 2>/dev/null || log "completion for bead=$bead exited non-zero"
+        unset "COMPLETING[$bead]"
+    done
+}
+
+# ── Tick ─────────────────────────────────────────────────────────────────────
+
+tick() {
+    local now disk_low="false" messages=""
+    local -a specs=() beads=() status_files=()
+    local -A session_of=() socket_of=() started_of=() deadline_of=() timeout_of=() status_file_of=()
+    local -A relay_of=() live=() st_ec=() st_fa=() st_fe=() rl_status=() rl_ec=() rl_fa=() rl_fe=()
+    local bead session socket started deadline timeout status_file use_relay ec fa fe st spec_rows
+    local want_relay="false"
+
+    TICK_COUNT=$((TICK_COUNT + 1))
+    reap_completions
+    now="$(epoch_now)"
+
+    for status_file in "$WATCH_DIR"/*.watch.json; do
+        [[ -f "$status_file" ]] && specs+=("$status_file")
+    done
+
+    if (( ${#specs[@]} > 0 )); then
+        # 1. Every spec in one jq pass; if one is malformed, re-read them one
+        # by one so it does not hide the specs after it
+        if ! spec_rows="$(jq -r "$SPEC_ROW_JQ" "${specs[@]}" 2>/dev/null)"; then
+            spec_rows=""
+            for status_file in "${specs[@]}"; do
+                spec_rows+="$(jq -r "$SPEC_ROW_JQ" "$status_file" 2>/dev/null)"$'\n' \
+                    || log "skipping malformed spec $(basename "$status_file")"
+            done
+        fi
+        while IFS=$'\t' read -r bead session socket started deadline timeout status_file use_relay; do
+            [[ -n "$bead" ]] || continue
+            beads+=("$bead")
+            relay_of["$bead"]="$use_relay"
+            [[ "$use_relay" == "true" ]] && want_relay="true"
+            session_of["$bead"]="$session"
+            socket_of["$bead"]="$socket"
+            started_of["$bead"]="$started"
+            deadline_of["$bead"]="$deadline"
+            timeout_of["$bead"]="$timeout"
+            status_file_of["$bead"]="$status_file"
+            [[ -f "$status_file" ]] && status_files+=("$status_file")
+        done <<< "$spec_rows"
+
+        # 2. One list-sessions per tmux socket
+        local -A seen_socket=()
+        for bead in "${beads[@]}"; do
+            socket="${socket_of[$bead]}"
+            [[ -z "${seen_socket[$socket]:-}" ]] || continue
+            seen_socket["$socket"]=1
+            while IFS= read -r session; do
+                [[ -n "$session" ]] && live["$socket|$session"]=1
+            done <<< "$(tmux_list_sessions "$socket")"
+        done
+
+        # 3. Every written status file in one jq pass
+        if (( ${#status_files[@]} > 0 )); then
+            while IFS=$'\t' read -r bead ec fa fe; do
+                [[ -n "$bead" ]] || continue
+                st_ec["$bead"]="$ec"; st_fa["$bead"]="$fa"; st_fe["$bead"]="$fe"
+            done < <(jq -r 'select(.exit_code and .finished_at)
+                | [.bead, .exit_code, .finished_at, ((.finished_at | fromdateiso8601?) // 0)] | @tsv' \
+                "${status_files[@]}" 2>/dev/null || true)
+        fi
+
+        # 4. One Relay inbox read (left unread: other consumers share the inbox),
+        # only when some bead was dispatched with Relay
+        if [[ "$want_relay" == "true" ]] && relay_enabled; then
+            messages="$("$RELAY_BIN" read --agent "$RELAY_ORCHESTRATOR_AGENT" --last 200 --json 2>/dev/null)" || messages=""
+        fi
+        if [[ -n "$messages" ]]; then
+            while IFS=$'\t' read -r bead st ec fa fe; do
+                [[ -n "$bead" ]] || continue
+                rl_status["$bead"]="$st"; rl_ec["$bead"]="$ec"; rl_fa["$bead"]="$fa"; rl_fe["$bead"]="$fe"
+            done < <(printf '%s' "$messages" | jq -r '
+                [.[] | .body | fromjson? | select(type == "object" and .type == "completion" and (.bead | type) == "string")]
+                | group_by(.bead) | map(last) | .[]
+                | [.bead, (.status // "failed"), (.exit_code // 1), (.finished_at // ""), ((.finished_at | fromdateiso8601?) // 0)]
+                | @tsv' 2>/dev/null || true)
+        fi
+
+        # 5. One disk check
+        check_disk_space "$WORKSPACE_ROOT" 100 2>/dev/null || disk_low="true"
+    fi
+
+    # Fan out, same precedence as dispatch.sh detect_completion
+    for bead in "${beads[@]}"; do
+        [[ -z "${COMPLETING[$bead]:-}" ]] || continue
+        started="${started_of[$bead]}"
+        session="${session_of[$bead]}"
+        socket="${socket_of[$bead]}"
+
+        if [[ "${relay_of[$bead]}" == "true" && -n "${rl_status[$bead]:-}" ]] && (( ${rl_fe[$bead]} >= started )); then
+            st="failed"
+            [[ "${rl_status[$bead]}" == "done" || "${rl_status[$bead]}" == "success" ]] && st="done"
+            complete_bead "$bead" "$st" "${rl_ec[$bead]}" "relay-message" "${rl_fa[$bead]}"
+        elif [[ -n "${st_ec[$bead]:-}" ]] && (( ${st_fe[$bead]} >= started )); then
+            st="failed"
+            [[ "${st_ec[$bead]}" == "0" ]] && st="done"
+            complete_bead "$bead" "$st" "${st_ec[$bead]}" "status-file" "${st_fa[$bead]}"
+        elif [[ -z "${live[$socket|$session]:-}" ]]; then
+            complete_bead "$bead" "failed" "127" "session-exited-without-markers" "$(iso_now)"
+        elif (( now >= ${deadline_of[$bead]} )); then
+            kill_tmux_session "$socket" "$session"
+            complete_bead "$bead" "timeout" "124" "watch-timeout-${timeout_of[$bead]}s" "$(iso_now)"
+        elif [[ "$disk_low" == "true" ]]; then
+            log "Warning: disk space critically low during agent run $bead"
+            kill_tmux_session "$socket" "$session"
+            complete_bead "$bead" "failed" "1" "disk-space-exhausted" "$(iso_now)"
+        fi
+    done
+
+    TRACKED_COUNT=${#beads[@]}
+    write_state "$now" "${beads[@]}"
+}
+
+write_state() {
+    local now="$1"; shift
+    local bead tmp rows=""
+    for bead in "$@"; do
+        rows+="$(printf '%s\t%s\t%s\t%s\t%s' "$bead" "${session_of[$bead]:-}" "${started_of[$bead]:-0}" \
+            "${deadline_of[$bead]:-0}" "$([[ -n "${live[${socket_of[$bead]:-}|${session_of[$bead]:-}]:-}" ]] && echo true || echo false)")"$'\n'
+    done
+    tmp="$(mktemp "${STATE_FILE}.tmp.XXXXXX")"
+    printf '%s' "$rows" | jq -R -s \
+        --argjson pid "$$" \
+        --argjson tick "$TICK_COUNT" \
+        --argjson now "$now" \
+        --arg ts "$(iso_now)" \
+        --arg completing "${!COMPLETING[*]}" \
+        '{pid:$pid, ticks:$tick, last_tick_at:$ts, last_tick_epoch:$now,
+          completing:($completing | split(" ") | map(select(length > 0))),
+          tracked:[split("\n")[] | select(length > 0) | split("\t")
+            | {bead:.[0], session:.[1], started_epoch:(.[2] | tonumber), deadline_epoch:(.[3] | tonumber),
+               session_alive:(.[4] == "true"), age_seconds:($now - (.[2] | tonumber))}]}' > "$tmp"
+    mv "$tmp" "$STATE_FILE"
+}
@@ -3,13 +3,19 @@ set -euo pipefail
 
 # lint-agent.sh — Agent-friendly linter framework
 # Runs modular lint rules and outputs structured errors with fix instructions
+#
+# Rules are discovered once per run. A rule marked `# lint-agent: batch` gets
+# up to LINT_AGENT_BATCH files per call; other rules get one file per call.
+# Up to LINT_AGENT_JOBS rule calls run in parallel.
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 RULES_DIR="$SCRIPT_DIR/lint-rules"
+LINT_AGENT_BATCH="${LINT_AGENT_BATCH:-200}"
+LINT_AGENT_JOBS="${LINT_AGENT_JOBS:-$(nproc 2>/dev/null || echo 4)}"
 
 show_help() {
     cat <<EOF
-Usage: lint-agent.sh [OPTIONS] <file-or-directory>
+Usage: lint-agent.sh [OPTIONS] <file-or-directory>...
 
 Agent-friendly linter framework with actionable fix instructions.
 
@@ -18,9 +24,14 @@ OPTIONS:
     --json          Output JSON format (default: human-readable)
     --rule <name>   Run only the specified rule
 
+ENVIRONMENT:
+    LINT_AGENT_BATCH   Files per call to a batch-capable rule (default: 200)
+    LINT_AGENT_JOBS    Rule calls run in parallel (default: CPU count)
+
 EXAMPLES:
     lint-agent.sh src/                    # Lint all files in src/
     lint-agent.sh --json myfile.sh        # JSON output for agent consumption
+    lint-agent.sh --json a.sh b.json docs/  # Lint several targets in one run
     lint-agent.sh --rule json-valid *.json  # Run specific rule
 EOF
 }
@@ -28,7 +39,7 @@ EOF
 # Parse arguments
 JSON_OUTPUT=false
 SPECIFIC_RULE=""
-TARGET=""
+TARGETS=()
 
 while [[ $# -gt 0 ]]; do
     case "$1" in
@@ -45,80 +56,116 @@ while [[ $# -gt 0 ]]; do
             shift 2
             ;;
         *)
-            TARGET="$1"
+            TARGETS+=("$1")
             shift
             ;;
     esac
 done
 
-if [[ -z "$TARGET" ]]; then
+if [[ ${#TARGETS[@]} -eq 0 ]]; then
     echo "Error: No file or directory specified" >&2
     show_help
     exit 1
 fi
 
-if [[ ! -e "$TARGET" ]]; then
-    echo "Error: Target does not exist: $TARGET" >&2
-    exit 1
-fi
+for setting in LINT_AGENT_BATCH LINT_AGENT_JOBS; do
+    if [[ ! "${!setting}" =~ ^[0-9]+$ ]] || (( ${!setting} < 1 )); then
+        echo "Error: $setting must be a positive integer (got '${!setting}')" >&2
+        exit 1
+    fi
+done
 
 # Collect all files to lint
 FILES=()
-if [[ -d "$TARGET" ]]; then
-    while IFS= read -r -d '' file; do
-        FILES+=("$file")
-    done < <(find "$TARGET" -type f -print0)
-elif [[ -f "$TARGET" ]]; then
-    FILES=("$TARGET")
+for target in "${TARGETS[@]}"; do
+    if [[ ! -e "$target" ]]; then
+        echo "Error: Target does not exist: $target" >&2
+        exit 1
+    fi
+    if [[ -d "$target" ]]; then
+        while IFS= read -r -d '' file; do
+            FILES+=("$file")
+        done < <(find "$target" -type f -print0)
+    elif [[ -f "$target" ]]; then
+        FILES+=("$target")
+    fi
+done
+
+# Get applicable rules, once for the whole run
+RULES=()
+if [[ -n "$SPECIFIC_RULE" ]]; then
+    if [[ -x "$RULES_DIR/${SPECIFIC_RULE}.sh" ]]; then
+        RULES=("$RULES_DIR/${SPECIFIC_RULE}.sh")
+    fi
+else
+    # All executable rules
+    for rule in "$RULES_DIR"/*.sh; do
+        [[ -f "$rule" && -x "$rule" ]] && RULES+=("$rule")
+    done
 fi
 
-# Run rules and collect results
-ALL_RESULTS=()
-EXIT_CODE=0
-
-for file in "${FILES[@]}"; do
-    # Determine which rules apply based on file extension
-    EXT="${file##*.}"
-
-    # Get applicable rules
-    RULES=()
-    if [[ -n "$SPECIFIC_RULE" ]]; then
-        if [[ -x "$RULES_DIR/${SPECIFIC_RULE}.sh" ]]; then
-            RULES=("$RULES_DIR/${SPECIFIC_RULE}.sh")
-        fi
-    else
-        # All executable rules
-        while IFS= read -r rule; do
-            RULES+=("$rule")
-        done < <(find "$RULES_DIR" -name "*.sh" -type f -executable)
+if [[ ${#FILES[@]} -eq 0 || ${#RULES[@]} -eq 0 ]]; then
+    [[ "$JSON_OUTPUT" == "true" ]] && echo "[]"
+    exit 0
+fi
+
+declare -A BATCH_RULE=()
+while IFS= read -r rule; do
+    BATCH_RULE["$rule"]=1
+done < <(grep -l '^# lint-agent: batch$' "${RULES[@]}" 2>/dev/null || true)
+
+WORK_DIR="$(mktemp -d)"
+trap 'rm -rf "$WORK_DIR"' EXIT
+
+# Run one rule over some files; its findings go to $out as JSON lines.
+# Rules print JSON on failure and nothing on pass; other failure output is
+# wrapped so every failing call yields at least one result.
+run_rule() {
+    local rule="$1" out="$2"
+    shift 2
+    local rule_name rule_output
+    rule_name="${rule##*/}"
+    rule_name="${rule_name%.sh}"
+
+    if rule_output="$("$rule" "$@" 2>&1)"; then
+        : > "$out"
+        return 0
     fi
+    if [[ -n "$rule_output" ]] && jq -c . <<< "$rule_output" > "$out" 2>/dev/null; then
+        return 0
+    fi
+    jq -cn \
+        --arg rule "$rule_name" \
+        --arg file "$*" \
+        --arg msg "$rule_output" \
+        '{rule: $rule, file: $file, line: 0, message: $msg, fix: "Check rule output for details"}' > "$out"
+}
 
-    # Run each applicable rule
-    for rule in "${RULES[@]}"; do
-        RULE_NAME=$(basename "$rule" .sh)
-
-        # Run the rule - it outputs JSON on failure, nothing on pass
-        if ! RULE_OUTPUT=$("$rule" "$file" 2>&1); then
-            EXIT_CODE=1
-            # Rule failed - parse its output
-            if echo "$RULE_OUTPUT" | jq -e . >/dev/null 2>&1; then
-                # Valid JSON from rule
-                ALL_RESULTS+=("$RULE_OUTPUT")
-            else
-                # Rule didn't output JSON - wrap it
-                WRAPPED=$(jq -n \
-                    --arg rule "$RULE_NAME" \
-                    --arg file "$file" \
-                    --arg msg "$RULE_OUTPUT" \
-                    '{rule: $rule, file: $file, line: 0, message: $msg, fix: "Check rule output for details"}')
-                ALL_RESULTS+=("$WRAPPED")
-            fi
+# Run rules and collect results
+OUTPUTS=()
+running=0
+for rule in "${RULES[@]}"; do
+    size=1
+    [[ -n "${BATCH_RULE[$rule]:-}" ]] && size="$LINT_AGENT_BATCH"
+    for (( start = 0; start < ${#FILES[@]}; start += size )); do
+        out="$WORK_DIR/${#OUTPUTS[@]}.json"
+        OUTPUTS+=("$out")
+        run_rule "$rule" "$out" "${FILES[@]:start:size}" &
+        if (( ++running >= LINT_AGENT_JOBS )); then
+            wait -n
+            running=$((running - 1))
         fi
     done
 done
+wait
 
-# Output results
-if [[ ${#ALL_RESULTS[@]} -eq 0 ]]; then
+# Output results, grouped by file in the order the files were collected
+printf '%s\0' "${FILES[@]}" > "$WORK_DIR/files"
+ORDERED="$(jq -s --rawfile files "$WORK_DIR/files" '
+    (reduce ($files | split("\u0000") | to_entries[]) as $e ({}; .[$e.value] = $e.key)) as $order
+    | to_entries | sort_by([$order[.value.file] // infinite, .key]) | map(.value)' "${OUTPUTS[@]}")"
+
+if [[ "$ORDERED" == "[]" ]]; then
     # All checks passed
     if [[ "$JSON_OUTPUT" == "true" ]]; then
         echo "[]"
@@ -127,24 +174,12 @@ if [[ ${#ALL_RESULTS[@]} -eq 0 ]]; then
 fi
 
 if [[ "$JSON_OUTPUT" == "true" ]]; then
-    # Combine all results into JSON array
-    printf '%s\n' "${ALL_RESULTS[@]}" | jq -s .
+    printf '%s\n' "$ORDERED"
 else
     # Human-readable output
     echo "Lint issues found:"
     echo ""
-    for result in "${ALL_RESULTS[@]}"; do
-        RULE=$(echo "$result" | jq -r '.rule')
-        FILE=$(echo "$result" | jq -r '.file')
-        LINE=$(echo "$result" | jq -r '.line')
-        MSG=$(echo "$result" | jq -r '.message')
-        FIX=$(echo "$result" | jq -r '.fix')
-
-        echo "[$RULE] $FILE:$LINE"
-        echo "  Issue: $MSG"
-        echo "  Fix: $FIX"
-        echo ""
-    done
+    jq -r '.[] | "[\(.rule)] \(.file):\(.line)\n  Issue: \(.message)\n  Fix: \(.fix)\n"' <<< "$ORDERED"
 fi
 
-exit $EXIT_CODE
+exit 1
@@ -3,13 +3,10 @@ set -euo pipefail
 
 # dependency-direction.sh - Enforce layer dependency direction
 # Lower layers should not import/source higher layers
+# lint-agent: batch
 
-FILE="$1"
-
-# Skip if not a shell script or JS file
-if [[ ! "$FILE" =~ \.(sh|js)$ ]]; then
-    exit 0
-fi
+RULE_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "$RULE_DIR/../lib/lint-rule.sh"
 
 # Define layer boundaries (from SWARM-IMPLEMENTATION.md)
 # Layer 0: tools (br, tmux, etc) - no workspace imports
@@ -18,84 +15,85 @@ fi
 # Layer 3: templates/ - can reference docs, not scripts
 # Layer 5: flywheel - can read everything
 
-# Get file directory to determine layer
-dir=$(dirname "$FILE")
-filename=$(basename "$FILE")
-
-# Detect layer
-if [[ "$dir" =~ ^scripts/lint-rules ]]; then
-    layer="lint-rules"
-    allowed_imports="(state/|docs/)"
-elif [[ "$dir" =~ ^scripts ]]; then
-    layer="scripts"
-    allowed_imports="(state/|docs/)"
-elif [[ "$dir" =~ ^templates ]]; then
-    layer="templates"
-    allowed_imports="(docs/)"
-else
-    # Other directories - no strict enforcement yet
-    exit 0
-fi
-
-# Check for source/require/import statements
-violations=()
-
-# For shell scripts: check 'source' statements
-if [[ "$FILE" =~ \.sh$ ]]; then
-    while IFS= read -r line_num; do
-        line=$(sed -n "${line_num}p" "$FILE")
-
-        # Skip comments
-        if [[ "$line" =~ ^[[:space:]]*# ]]; then
-            continue
-        fi
+# Print the first violation in $FILE as "<line>:<message>"; nothing if clean.
+first_violation() {
+    local line_num=0 line sourced imported
+    local -a lines=()
+    mapfile -t lines < "$FILE"
 
-        # Check for source statements
-        if [[ "$line" =~ source[[:space:]]+ ]]; then
-            sourced=$(echo "$line" | sed -E 's/.*source[[:space:]]+([^[:space:]]+).*/\1/' | tr -d '"' | tr -d "'")
+    for line in "${lines[@]}"; do
+        line_num=$((line_num + 1))
 
-            # Check if sourced path violates layer rules
-            if [[ "$layer" == "scripts" ]] && [[ "$sourced" =~ templates/ ]]; then
-                violations+=("$line_num:scripts layer cannot source templates/ (line: $line)")
+        # For shell scripts: check 'source' statements
+        if [[ "$FILE" =~ \.sh$ ]] && [[ "$line" == *"source "* ]]; then
+            # Skip comments
+            if [[ "$line" =~ ^[[:space:]]*# ]]; then
+                continue
             fi
-            if [[ "$layer" == "templates" ]] && [[ "$sourced" =~ scripts/ ]]; then
-                violations+=("$line_num:templates layer cannot source scripts/ (line: $line)")
+
+            # Check for source statements
+            if [[ "$line" =~ source[[:space:]]+ ]]; then
+                sourced="$line"
+                if [[ "$line" =~ .*source[[:space:]]+([^[:space:]]+) ]]; then
+                    sourced="${BASH_REMATCH[1]}"
+                fi
+                sourced="${sourced//[\"\']/}"
+
+                # Check if sourced path violates layer rules
+                if [[ "$layer" == "scripts" ]] && [[ "$sourced" =~ templates/ ]]; then
+                    echo "$line_num:scripts layer cannot source templates/ (line: $line)"
+                    return
+                fi
+                if [[ "$layer" == "templates" ]] && [[ "$sourced" =~ scripts/ ]]; then
+                    echo "$line_num:templates layer cannot source scripts/ (line: $line)"
+                    return
+                fi
             fi
         fi
-    done < <(grep -n "source " "$FILE" | cut -d: -f1)
-fi
 
-# For JS files: check require/import statements
-if [[ "$FILE" =~ \.js$ ]]; then
-    while IFS= read -r line_num; do
-        line=$(sed -n "${line_num}p" "$FILE")
-
-        # Check for require/import
-        if [[ "$line" =~ (require\(|import.*from) ]]; then
-            imported=$(echo "$line" | sed -E 's/.*(require\(|from)[[:space:]]*['\''"]([^'\''"]+).*/\2/')
+        # For JS files: check require/import statements
+        if [[ "$FILE" =~ \.js$ ]] && [[ "$line" =~ (require\(|import.*from) ]]; then
+            imported="$line"
+            if [[ "$line" =~ .*(require\(|from)[[:space:]]*[\"\']([^\"\']+) ]]; then
+                imported="${BASH_REMATCH[2]}"
+            fi
 
             # Check if imported path violates layer rules
             if [[ "$layer" == "scripts" ]] && [[ "$imported" =~ templates/ ]]; then
-                violations+=("$line_num:scripts layer cannot import templates/ (line: $line)")
+                echo "$line_num:scripts layer cannot import templates/ (line: $line)"
+                return
             fi
         fi
-    done < <(grep -n -E "(require\(|import.*from)" "$FILE" | cut -d: -f1)
-fi
-
-# Report violations
-if [[ ${#violations[@]} -gt 0 ]]; then
-    first_violation="${violations[0]}"
-    line_num=$(echo "$first_violation" | cut -d: -f1)
-    message=$(echo "$first_violation" | cut -d: -f2-)
-
-    jq -n \
-        --arg rule "dependency-direction" \
-        --arg file "$FILE" \
-        --argjson line "$line_num" \
-        --arg message "$message" \
-        --arg fix "Move shared logic to a lower layer (state/ or docs/) or use a callback pattern to invert the dependency" \
-        '{rule: $rule, file: $file, line: $line, message: $message, fix: $fix}'
-    exit 1
-fi
-
-exit 0
+    done
+}
+
+for FILE in "$@"; do
+    # Skip if not a shell script or JS file
+    if [[ ! "$FILE" =~ \.(sh|js)$ ]] || [[ ! -r "$FILE" ]]; then
+        continue
+    fi
+
+    # Get file directory to determine layer
+    dir="."
+    [[ "$FILE" == */* ]] && dir="${FILE%/*}"
+
+    # Detect layer
+    if [[ "$dir" =~ ^scripts/lint-rules ]]; then
+        layer="lint-rules"
+    elif [[ "$dir" =~ ^scripts ]]; then
+        layer="scripts"
+    elif [[ "$dir" =~ ^templates ]]; then
+        layer="templates"
+    else
+        # Other directories - no strict enforcement yet
+        continue
+    fi
+
+    violation="$(first_violation)"
+    [[ -n "$violation" ]] || continue
+
+    lint_violation "$FILE" "${violation%%:*}" "${violation#*:}" \
+        "Move shared logic to a lower layer (state/ or docs/) or use a callback pattern to invert the dependency"
+done
+
+lint_report "dependency-direction"
@@ -2,41 +2,48 @@
 set -euo pipefail
 
 # file-size-limit.sh - Enforce file size limits to prevent monolithic files
+# lint-agent: batch
 
-FILE="$1"
-
-# Count lines
-if ! lines="$(wc -l < "$FILE")"; then
-    lines="0"
-fi
+RULE_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "$RULE_DIR/../lib/lint-rule.sh"
 
 # Define limits based on file type
-limit=0
-file_type=""
+FILES=()
+declare -A LIMIT=() FILE_TYPE=()
+for FILE in "$@"; do
+    dir="."
+    [[ "$FILE" == */* ]] && dir="${FILE%/*}"
 
-filename=$(basename "$FILE")
-dir=$(dirname "$FILE")
+    # Scripts: 300 lines max
+    if [[ "$FILE" =~ \.sh$ ]] && [[ "$dir" =~ scripts ]]; then
+        LIMIT["$FILE"]=300
+        FILE_TYPE["$FILE"]="script"
+    fi
 
-# Scripts: 300 lines max
-if [[ "$FILE" =~ \.sh$ ]] && [[ "$dir" =~ scripts ]]; then
-    limit=300
-    file_type="script"
-fi
+    # Docs: 150 lines max
+    if [[ "$FILE" =~ \.md$ ]] && [[ "$dir" =~ docs ]]; then
+        LIMIT["$FILE"]=150
+        FILE_TYPE["$FILE"]="documentation"
+    fi
 
-# Docs: 150 lines max
-if [[ "$FILE" =~ \.md$ ]] && [[ "$dir" =~ docs ]]; then
-    limit=150
-    file_type="documentation"
-fi
+    [[ -n "${LIMIT[$FILE]:-}" && -r "$FILE" ]] && FILES+=("$FILE")
+done
+(( ${#FILES[@]} > 0 )) || exit 0
+
+# Count lines of every limited file in one wc; its rows follow argument order.
+index=0
+while read -r lines _ && (( index < ${#FILES[@]} )); do
+    FILE="${FILES[index]}"
+    index=$((index + 1))
+    limit="${LIMIT[$FILE]}"
+    (( lines > limit )) || continue
 
-# Check if file exceeds limit
-if [[ $limit -gt 0 ]] && [[ $lines -gt $limit ]]; then
     # Try to identify functions/sections that could be extracted
     extract_candidates=""
 
     if [[ "$FILE" =~ \.sh$ ]]; then
         # Find large functions in bash scripts
-        large_funcs=$(awk '/^[a-z_]+\(\)/ {fname=$1; start=NR} /^}/ && fname {size=NR-start; if(size>50) print fname " (" size " lines)"; fname=""}' "$FILE" | head -3 | tr '\n' ', ' | sed 's/, $//')
+        large_funcs=$(awk '/^[a-z_]+\(\)/ {fname=$1; start=NR} /^}/ && fname {size=NR-start; if(size>50) print fname " (" size " lines)"; fname=""}' "$FILE" | head -3 | tr '\n' ', ' | sed 's/, $//') || true
         if [[ -n "$large_funcs" ]]; then
             extract_candidates="Consider extracting these functions: $large_funcs"
         fi
@@ -44,22 +51,15 @@ if [[ $limit -gt 0 ]] && [[ $lines -gt $limit ]]; then
 
     if [[ "$FILE" =~ \.md$ ]]; then
         # Find large sections in markdown
-        sections=$(grep -n "^##" "$FILE" | head -5 | awk -F: '{print $2}' | tr '\n' ', ' | sed 's/, $//')
+        sections=$(grep -n "^##" "$FILE" | head -5 | awk -F: '{print $2}' | tr '\n' ', ' | sed 's/, $//') || true
         if [[ -n "$sections" ]]; then
             extract_candidates="Consider splitting sections into separate docs: $sections"
         fi
     fi
 
-    fix_msg="Split into smaller modules. File has $lines lines (limit: $limit). $extract_candidates"
-
-    jq -n \
-        --arg rule "file-size-limit" \
-        --arg file "$FILE" \
-        --argjson line 0 \
-        --arg message "$file_type file exceeds $limit line limit (current: $lines lines)" \
-        --arg fix "$fix_msg" \
-        '{rule: $rule, file: $file, line: $line, message: $message, fix: $fix}'
-    exit 1
-fi
+    lint_violation "$FILE" 0 \
+        "${FILE_TYPE[$FILE]} file exceeds $limit line limit (current: $lines lines)" \
+        "Split into smaller modules. File has $lines lines (limit: $limit). $extract_candidates"
+done < <(wc -l -- "${FILES[@]}")
 
-exit 0
+lint_report "file-size-limit"
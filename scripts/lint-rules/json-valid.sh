@@ -3,46 +3,51 @@ set -euo pipefail
 
 # json-valid.sh — Validate JSON files with jq
 # Reports line-level errors with fix instructions
+# lint-agent: batch
 
-FILE="$1"
+RULE_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "$RULE_DIR/../lib/lint-rule.sh"
 
 # Only run on JSON files
-if [[ ! "$FILE" =~ \.json$ ]]; then
+FILES=()
+for file in "$@"; do
+    [[ "$file" =~ \.json$ ]] && FILES+=("$file")
+done
+(( ${#FILES[@]} > 0 )) || exit 0
+
+# One jq call covers the usual all-valid case; jq stops at the first parse
+# error, so only a failing batch is rechecked file by file.
+if jq empty -- "${FILES[@]}" >/dev/null 2>&1; then
     exit 0
 fi
 
-# Try to parse with jq
-if ! ERROR_OUTPUT=$(jq empty "$FILE" 2>&1); then
+for file in "${FILES[@]}"; do
+    if ERROR_OUTPUT=$(jq empty -- "$file" 2>&1); then
+        continue
+    fi
+
     # Parse failed - extract line number if possible
     LINE=0
-    if echo "$ERROR_OUTPUT" | grep -qE 'parse error.*at line [0-9]+'; then
-        LINE=$(echo "$ERROR_OUTPUT" | grep -oE 'line [0-9]+' | grep -oE '[0-9]+')
+    if [[ "$ERROR_OUTPUT" =~ parse\ error.*at\ line\ ([0-9]+) ]]; then
+        LINE="${BASH_REMATCH[1]}"
     fi
 
     # Extract error message
-    MESSAGE=$(echo "$ERROR_OUTPUT" | head -1)
+    MESSAGE="${ERROR_OUTPUT%%$'\n'*}"
 
     # Generate fix instruction
     FIX="Fix JSON syntax error. Common issues: missing quotes, trailing commas, unescaped characters"
 
     # Detect specific patterns and provide targeted fix
-    if echo "$ERROR_OUTPUT" | grep -q "Expected.*got.*comma"; then
+    if [[ "$ERROR_OUTPUT" =~ Expected.*got.*comma ]]; then
         FIX="Remove trailing comma before closing brace/bracket in JSON"
-    elif echo "$ERROR_OUTPUT" | grep -q "Invalid.*escape"; then
+    elif [[ "$ERROR_OUTPUT" =~ Invalid.*escape ]]; then
         FIX="Fix invalid escape sequence. Use \\\\ for backslash, \\\" for quote"
-    elif echo "$ERROR_OUTPUT" | grep -q "Expected.*string key"; then
+    elif [[ "$ERROR_OUTPUT" =~ Expected.*string\ key ]]; then
         FIX="Object keys must be quoted strings in JSON"
     fi
 
-    jq -n \
-        --arg rule "json-valid" \
-        --arg file "$FILE" \
-        --argjson line "$LINE" \
-        --arg message "$MESSAGE" \
-        --arg fix "$FIX" \
-        '{rule: $rule, file: $file, line: $line, message: $message, fix: $fix}'
-    exit 1
-fi
+    lint_violation "$file" "$LINE" "$MESSAGE" "$FIX"
+done
 
-# Valid JSON
-exit 0
+lint_report "json-valid"
@@ -3,17 +3,20 @@ set -euo pipefail
 
 # shellcheck-wrapper.sh — Run shellcheck with agent-friendly output
 # Reformats shellcheck errors with fix instructions
-
-FILE="$1"
-
-# Only run on shell scripts
-if [[ ! "$FILE" =~ \.sh$ ]]; then
-    [[ -r "$FILE" ]] || exit 0
-    first_line="$(head -1 "$FILE")" || exit 0
-    if ! grep -qE '^#!.*/(bash|sh)' <<< "$first_line"; then
-        exit 0
+# lint-agent: batch
+
+# Only run on shell scripts (by extension or shebang)
+FILES=()
+for FILE in "$@"; do
+    if [[ ! "$FILE" =~ \.sh$ ]]; then
+        [[ -r "$FILE" ]] || continue
+        first_line=""
+        IFS= read -r first_line < "$FILE" || [[ -n "$first_line" ]] || continue
+        [[ "$first_line" =~ ^#!.*/(bash|sh) ]] || continue
     fi
-fi
+    FILES+=("$FILE")
+done
+(( ${#FILES[@]} > 0 )) || exit 0
 
 # Check if shellcheck is available
 if ! command -v shellcheck >/dev/null 2>&1; then
@@ -21,14 +24,14 @@ if ! command -v shellcheck >/dev/null 2>&1; then
     exit 0
 fi
 
-# Run shellcheck with JSON output
+# Run shellcheck with JSON output, once for the whole batch
 shellcheck_rc=0
-if ! SHELLCHECK_OUTPUT="$(shellcheck -f json "$FILE" 2>&1)"; then
+if ! SHELLCHECK_OUTPUT="$(shellcheck -f json -- "${FILES[@]}" 2>&1)"; then
     shellcheck_rc=$?
 fi
 
 # Exit on shellcheck execution failures (syntax/config issues still return JSON array).
-if (( shellcheck_rc != 0 )) && ! jq -e 'type == "array"' <<< "$SHELLCHECK_OUTPUT" >/dev/null; then
+if (( shellcheck_rc != 0 )) && ! jq -e 'type == "array"' <<< "$SHELLCHECK_OUTPUT" >/dev/null 2>&1; then
     exit 0
 fi
 
@@ -37,42 +40,18 @@ if [[ -z "$SHELLCHECK_OUTPUT" ]] || [[ "$SHELLCHECK_OUTPUT" == "[]" ]]; then
     exit 0
 fi
 
-# Parse first error and reformat with fix instructions
-FIRST_ERROR=$(echo "$SHELLCHECK_OUTPUT" | jq -r '.[0] // empty')
-
-if [[ -z "$FIRST_ERROR" ]]; then
-    exit 0
-fi
-
-# Extract fields
-CODE=$(echo "$FIRST_ERROR" | jq -r '.code')
-LINE=$(echo "$FIRST_ERROR" | jq -r '.line')
-MESSAGE=$(echo "$FIRST_ERROR" | jq -r '.message')
-
-# Generate fix instruction based on common codes
-FIX="Check shellcheck wiki: https://www.shellcheck.net/wiki/SC${CODE}"
-case "$CODE" in
-    2086)
-        FIX="Quote variables to prevent word splitting: \"\$VAR\" instead of \$VAR"
-        ;;
-    2155)
-        FIX="Separate declaration and assignment: declare VAR; VAR=\$(command)"
-        ;;
-    2034)
-        FIX="Remove unused variable or prefix with _ to indicate intentional: _VAR=..."
-        ;;
-    2164)
-        FIX="Use 'cd ... || exit' to handle directory change failures"
-        ;;
-esac
-
-# Output JSON
-jq -n \
-    --arg rule "shellcheck" \
-    --arg file "$FILE" \
-    --argjson line "$LINE" \
-    --arg message "SC${CODE}: ${MESSAGE}" \
-    --arg fix "$FIX" \
-    '{rule: $rule, file: $file, line: $line, message: $message, fix: $fix}'
-
+# Report the first error of each file, with fix instructions for common codes
+OUTPUT="$(jq -c '
+    def fix:
+        {"2086": "Quote variables to prevent word splitting: \"$VAR\" instead of $VAR",
+         "2155": "Separate declaration and assignment: declare VAR; VAR=$(command)",
+         "2034": "Remove unused variable or prefix with _ to indicate intentional: _VAR=...",
+         "2164": "Use \u0027cd ... || exit\u0027 to handle directory change failures"}[.code | tostring]
+        // "Check shellcheck wiki: https://www.shellcheck.net/wiki/SC\(.code)";
+    reduce .[] as $issue ({}; if has($issue.file) then . else .[$issue.file] = $issue end)
+    | .[]
+    | {rule: "shellcheck", file, line, message: "SC\(.code): \(.message)", fix: fix}' <<< "$SHELLCHECK_OUTPUT")"
+
+[[ -n "$OUTPUT" ]] || exit 0
+printf '%s\n' "$OUTPUT"
 exit 1
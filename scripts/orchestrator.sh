@@ -40,6 +40,11 @@ done
 
 ORCH_LIB_DIR="$SCRIPT_DIR/orchestrator"
 source "$ORCH_LIB_DIR/common.sh"
+source "$ORCH_LIB_DIR/calibration.sh"
+source "$ORCH_LIB_DIR/pending.sh"
+source "$ORCH_LIB_DIR/policy.sh"
+source "$ORCH_LIB_DIR/scheduler.sh"
+source "$ORCH_LIB_DIR/passes.sh"
 source "$ORCH_LIB_DIR/commands.sh"
 source "$ORCH_LIB_DIR/run.sh"
 
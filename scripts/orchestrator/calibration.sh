@@ -0,0 +1,125 @@
+# shellcheck shell=bash
+# Calibration lookups for the orchestrator. Sourced by orchestrator.sh after
+# common.sh; do not execute directly.
+
+# ── Calibration pattern cache ───────────────────────────────────────────────
+# calibrate.sh patterns --json is loaded once per orchestrator session and
+# again only when state/calibration changes (directory mtime or record
+# count). Lookups read the arrays below in-process. Reject rates are kept in
+# per mille, rounded up, so "rate > 0.5" is exactly "permille > 500".
+
+_CALIBRATION_CACHE_KEY=""
+_CALIBRATION_PATTERNS_JSON="{}"
+declare -gA _CALIBRATION_REJECT_PERMILLE=()
+declare -gA _CALIBRATION_TOTAL=()
+
+# Set by calibration_lookup / calibration_confidence.
+CALIBRATION_REJECT_PERMILLE=0
+CALIBRATION_TOTAL=0
+CALIBRATION_CONFIDENCE="medium"
+
+_calibration_fetch_patterns() {
+    local patterns
+    if ! patterns="$(CALIBRATION_DIR="$CALIBRATION_DIR" "$WORKSPACE_ROOT/scripts/calibrate.sh" patterns --json)"; then
+        echo "Warning: calibrate.sh patterns failed; using empty calibration map" >&2
+        echo "{}"
+        return 0
+    fi
+    if ! echo "$patterns" | jq -e 'type == "object"' >/dev/null; then
+        echo "Warning: calibrate.sh returned invalid JSON; using empty calibration map" >&2
+        echo "{}"
+        return 0
+    fi
+    echo "$patterns"
+}
+
+# Reload the cached patterns if the calibration data changed. Must run in the
+# orchestrator's own shell (not in $(...)) for the cache to persist.
+refresh_calibration_patterns() {
+    local key="none" dimension name permille total
+    local -a files=()
+    if [[ -d "$CALIBRATION_DIR" ]]; then
+        shopt -s nullglob
+        files=("$CALIBRATION_DIR"/*.json)
+        shopt -u nullglob
+        key="$(stat -c %y "$CALIBRATION_DIR" 2>/dev/null):${#files[@]}"
+    fi
+    [[ "$key" == "$_CALIBRATION_CACHE_KEY" ]] && return 0
+
+    _CALIBRATION_PATTERNS_JSON="$(_calibration_fetch_patterns)"
+    _CALIBRATION_REJECT_PERMILLE=()
+    _CALIBRATION_TOTAL=()
+    while IFS=$'\t' read -r dimension name permille total; do
+        [[ -n "$dimension" ]] || continue
+        _CALIBRATION_REJECT_PERMILLE["$dimension/$name"]="$permille"
+        _CALIBRATION_TOTAL["$dimension/$name"]="$total"
+    done < <(jq -r '
+        {template: .by_template, agent: .by_agent, model: .by_model} | to_entries[]
+        | .key as $dimension
+        | (.value // {}) | to_entries[]
+        | [$dimension, .key, ((.value.reject_rate // 0) * 1000 | ceil), (.value.total // 0)]
+        | @tsv' <<<"$_CALIBRATION_PATTERNS_JSON" 2>/dev/null)
+    _CALIBRATION_CACHE_KEY="$key"
+}
+
+load_calibration_patterns() {
+    refresh_calibration_patterns
+    echo "$_CALIBRATION_PATTERNS_JSON"
+}
+
+# Usage: calibration_lookup <template|agent|model> <name>
+# Sets CALIBRATION_REJECT_PERMILLE and CALIBRATION_TOTAL (0 when unknown).
+calibration_lookup() {
+    local dimension="$1" name="$2"
+    CALIBRATION_REJECT_PERMILLE="${_CALIBRATION_REJECT_PERMILLE["$dimension/$name"]:-0}"
+    CALIBRATION_TOTAL="${_CALIBRATION_TOTAL["$dimension/$name"]:-0}"
+}
+
+# Sets CALIBRATION_CONFIDENCE (low|medium|high) for a template without
+# forking; check_calibration_confidence prints the same value.
+calibration_confidence() {
+    local template="$1"
+    local agent="$2"
+
+    if [[ ! -x "$WORKSPACE_ROOT/scripts/calibrate.sh" ]]; then
+        CALIBRATION_CONFIDENCE="medium" # default if calibrate.sh not available
+        return 0
+    fi
+
+    refresh_calibration_patterns
+    calibration_lookup template "$template"
+
+    # Keep signature consistent for future per-agent confidence tuning.
+    : "$agent"
+
+    if (( CALIBRATION_REJECT_PERMILLE > 500 )); then
+        CALIBRATION_CONFIDENCE="low"
+    elif (( CALIBRATION_REJECT_PERMILLE > 300 )); then
+        CALIBRATION_CONFIDENCE="medium"
+    else
+        CALIBRATION_CONFIDENCE="high"
+    fi
+}
+
+check_calibration_confidence() {
+    calibration_confidence "$@"
+    echo "$CALIBRATION_CONFIDENCE"
+}
+
+should_skip_category() {
+    local template="$1"
+
+    if [[ ! -x "$WORKSPACE_ROOT/scripts/calibrate.sh" ]]; then
+        return 1 # don't skip if calibrate.sh not available
+    fi
+
+    refresh_calibration_patterns
+    calibration_lookup template "$template"
+
+    # Skip if reject rate > 50% and at least 3 judgments
+    if (( CALIBRATION_TOTAL >= 3 && CALIBRATION_REJECT_PERMILLE > 500 )); then
+        return 0 # should skip
+    fi
+
+    return 1 # don't skip
+}
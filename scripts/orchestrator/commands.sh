@@ -9,6 +9,7 @@ orchestrate_dry_run() {
     echo "  Max concurrent agents: $ORCH_MAX_AGENTS"
     echo "  Max hours: $ORCH_MAX_HOURS"
     echo "  Max tasks: $ORCH_MAX_TASKS"
+    echo "  Scheduler: $ORCH_SCHEDULER"
     echo "  Repository: ${repo_path:-<none specified>}"
     echo ""
 
@@ -25,7 +26,11 @@ orchestrate_dry_run() {
     echo "     b. Check calibration confidence"
     echo "     c. Dispatch agent to shared branch (call dispatch.sh)"
     echo "     d. Log decision to orchestrator-log.jsonl"
-    echo "  4. Wait for completion, verify, cleanup"
+    if [[ "$ORCH_SCHEDULER" == "slots" ]]; then
+        echo "  4. Fill every free slot, then wait for an agent to finish (max ${ORCH_WAKE_INTERVAL}s)"
+    else
+        echo "  4. Wait for completion, verify, cleanup"
+    fi
     echo "  5. Periodic: clean stale agents, heartbeat log, disk check"
     echo "  6. Repeat until limits reached or no work"
     echo ""
@@ -55,6 +60,17 @@ orchestrate_status() {
     fi
     echo ""
 
+    local forecast
+    for forecast in "${CONFLICT_FORECAST_DIR:-$STATE_DIR/conflict-forecast}"/*.json; do
+        [[ -f "$forecast" ]] || continue
+        jq -r '"Conflict forecast for \(.repo) (\(.generated_at)):",
+            (.pairs[] | select(.conflict == true or (.overlap | length) > 0)
+             | "  \(.beads[0]) x \(.beads[1]): overlap \(.overlap | length) file(s)"
+               + (if .conflict == true then ", conflicts on \(.conflicts | join(", "))" else "" end))' \
+            "$forecast" 2>/dev/null || true
+        echo ""
+    done
+
     if [[ -f "$LOG_FILE" ]]; then
         echo "Recent events (last 5):"
         local recent_events
@@ -73,5 +89,6 @@ orchestrate_stop() {
     mkdir -p "$STATE_DIR"
     touch "$STOP_SENTINEL"
     log_event "stop_requested" "reason=user command"
+    poke_orchestrator "stop"
     echo "Orchestrator will stop gracefully (finish current tasks, no new tasks)"
 }
@@ -2,6 +2,7 @@
 # Depends on: lib/common.sh (for tmux_session_exists)
 
 source "$SCRIPT_DIR/lib/common.sh"
+source "$SCRIPT_DIR/lib/conflict-forecast.sh"
 
 usage() {
     cat <<EOF
@@ -27,6 +28,22 @@ Environment variables:
     ORCH_MAX_AGENTS    Max concurrent agents (default: 4)
     ORCH_MAX_HOURS     Max runtime in hours (default: 8)
     ORCH_MAX_TASKS     Max tasks per session (default: 20)
+    ORCH_BR_CACHE_TTL  Seconds to reuse a 'br list' snapshot (default: 30)
+    ORCH_SCHEDULER     slots (fill all free slots, wake on completion) or
+                       interval (one dispatch per 15s pass) (default: slots)
+    ORCH_DISPATCH_STAGGER    Seconds between dispatches in one pass (default: 0)
+    ORCH_WAKE_INTERVAL       Max seconds to wait for a completion (default: 60)
+    ORCH_HEARTBEAT_INTERVAL  Seconds between heartbeat events (default: 150)
+    ORCH_POLICY        Scheduling policy: duration (shortest expected job first
+                       within a priority, routed by template history) or
+                       priority (queue order, claude / codex for P0)
+                       (default: duration)
+    ORCH_POLICY_MIN_RUNS     Runs a template or route needs before its
+                             history is used (default: 3)
+    ORCH_CONFLICT_FORECAST   Hold back beads predicted to collide with a
+                             running bead on the same repo (default: true)
+    CONFLICT_FORECAST_TTL    Seconds a conflict forecast is reused while the
+                             running beads are unchanged (default: 120)
 
 Examples:
     orchestrator.sh dry-run
@@ -67,21 +84,6 @@ json_field_or_default() {
     echo "$value"
 }
 
-load_calibration_patterns() {
-    local patterns
-    if ! patterns="$("$WORKSPACE_ROOT/scripts/calibrate.sh" patterns --json)"; then
-        echo "Warning: calibrate.sh patterns failed; using empty calibration map" >&2
-        echo "{}"
-        return 0
-    fi
-    if ! echo "$patterns" | jq -e 'type == "object"' >/dev/null; then
-        echo "Warning: calibrate.sh returned invalid JSON; using empty calibration map" >&2
-        echo "{}"
-        return 0
-    fi
-    echo "$patterns"
-}
-
 count_active_agents() {
     # Count run records with status=running AND a live tmux session
     if [[ ! -d "$RUNS_DIR" ]]; then
@@ -91,6 +93,11 @@ count_active_agents() {
 
     local socket="${DISPATCH_TMUX_SOCKET:-/tmp/openclaw-coding-agents.sock}"
     local count=0
+    if count="$(run_index_live_count "$RUNS_DIR" "$socket")" && is_integer "$count"; then
+        echo "$count"
+        return
+    fi
+    count=0
     for run_file in "$RUNS_DIR"/*.json; do
         [[ -e "$run_file" ]] || continue
         local status session
@@ -109,12 +116,22 @@ count_active_agents() {
 # Returns count of cleaned-up agents.
 cleanup_stale_agents() {
     local socket="${DISPATCH_TMUX_SOCKET:-/tmp/openclaw-coding-agents.sock}"
-    local cleaned=0
+    local cleaned=0 stale bead session
     [[ -d "$RUNS_DIR" ]] || { echo "$cleaned"; return; }
 
+    if stale="$(run_index_stale_sessions "$RUNS_DIR" "$socket")"; then
+        while IFS=$'\t' read -r bead session; do
+            [[ -n "$bead" && -n "$session" ]] || continue
+            mark_stale_agent_failed "$bead" "$session"
+            cleaned=$((cleaned + 1))
+        done <<<"$stale"
+        echo "$cleaned"
+        return
+    fi
+
     for run_file in "$RUNS_DIR"/*.json; do
         [[ -f "$run_file" ]] || continue
-        local status session bead
+        local status
         status="$(json_field_or_default "$run_file" '.status // "unknown"' "unknown" "run status")"
         [[ "$status" == "running" ]] || continue
         session="$(json_field_or_default "$run_file" '.session_name // ""' "" "session name")"
@@ -122,146 +139,98 @@ cleanup_stale_agents() {
         [[ -n "$session" && -n "$bead" ]] || continue
 
         if ! tmux_session_exists "$socket" "$session"; then
-            echo "Stale agent detected: $bead (session '$session' gone)" >&2
-            local ts tmp
-            ts="$(date -u +"%Y-%m-%dT%H:%M:%SZ")"
-            # Update run record
-            tmp="$(mktemp "${run_file}.tmp.XXXXXX")"
-            if jq --arg ts "$ts" '.status = "failed" | .failure_reason = "session-disappeared" | .finished_at = $ts' "$run_file" > "$tmp" 2>/dev/null; then
-                mv "$tmp" "$run_file"
-            else
-                rm -f "$tmp"
-            fi
-            # Update result record
-            local result_file="$RESULTS_DIR/$bead.json"
-            if [[ -f "$result_file" ]]; then
-                tmp="$(mktemp "${result_file}.tmp.XXXXXX")"
-                if jq --arg ts "$ts" '.status = "failed" | .reason = "session-disappeared" | .finished_at = $ts' "$result_file" > "$tmp" 2>/dev/null; then
-                    mv "$tmp" "$result_file"
-                else
-                    rm -f "$tmp"
-                fi
-            fi
+            mark_stale_agent_failed "$bead" "$session"
             cleaned=$((cleaned + 1))
-            log_event "stale_agent_cleanup" "bead=$bead" "session=$session"
         fi
     done
     echo "$cleaned"
 }
 
-get_pending_beads() {
-    # Source work from three places (priority order):
-    # 1. Plan files in state/plans/ (pre-decomposed tasks with dispatch metadata)
-    # 2. Open beads from br CLI (todo status, sorted by priority)
-    # 3. Falls back to empty if neither source has work
-
-    local pending="[]"
-
-    # Try plan files first (structured dispatch-ready tasks)
-    if [[ -d "$PLANS_DIR" ]]; then
-        local plan_items
-        plan_items=$(
-            find "$PLANS_DIR" -name "*.json" -type f | while read -r plan; do
-                local status
-                status="$(json_field_or_default "$plan" '.status // "pending"' "unknown" "plan status")"
-                if [[ "$status" == "pending" ]]; then
-                    if jq -e '.' "$plan" >/dev/null; then
-                        jq '.' "$plan"
-                    else
-                        echo "Warning: skipping invalid plan JSON: $plan" >&2
-                    fi
-                fi
-            done | jq -s '.'
-        )
-
-        if [[ "$plan_items" != "[]" && -n "$plan_items" ]]; then
-            echo "$plan_items"
-            return
-        fi
-    fi
-
-    # Fall back to br CLI for open beads
-    if command -v br &>/dev/null; then
-        local br_output
-        if ! br_output="$(br list --json)"; then
-            echo "Warning: br list --json failed; using empty bead list" >&2
-            br_output="[]"
+# Mark a running bead whose tmux session is gone as failed. Both records are
+# rewritten the way write_records does it (both temp files before either
+# rename) and the transition goes through the run ledger, so these failures
+# count in run-rollups.json and template-scores.json.
+mark_stale_agent_failed() {
+    local bead="$1" session="$2"
+    local run_file="$RUNS_DIR/$bead.json" result_file="$RESULTS_DIR/$bead.json"
+    local ts payloads run_payload="" result_payload="" run_tmp result_tmp="" index_current=false
+    local -a record_files=("$run_file")
+    [[ -f "$result_file" ]] && record_files+=("$result_file")
+    echo "Stale agent detected: $bead (session '$session' gone)" >&2
+    ts="$(date -u +"%Y-%m-%dT%H:%M:%SZ")"
+
+    if [[ -f "$run_file" ]] && payloads="$(jq -cn --arg ts "$ts" '
+        def failed: .status = "failed" | .finished_at = $ts
+            | .duration_seconds = (((($ts | fromdateiso8601) - (.started_at | fromdateiso8601?)) // null)
+                | if . == null or . < 0 then null else . end);
+        [inputs] as [$run, $result]
+        | ($run | failed | .failure_reason = "session-disappeared"),
+          ($result | if . == null then null
+           else failed | .reason = "session-disappeared" | .will_retry = false end)' \
+        "${record_files[@]}" 2>/dev/null)"; then
+        { IFS= read -r run_payload; IFS= read -r result_payload; } <<<"$payloads"
+        run_index_is_current "$RUNS_DIR" && index_current=true
+        run_tmp="$(mktemp "${run_file}.tmp.XXXXXX")"
+        printf '%s\n' "$run_payload" > "$run_tmp"
+        if [[ "$result_payload" != "null" ]]; then
+            result_tmp="$(mktemp "${result_file}.tmp.XXXXXX")"
+            printf '%s\n' "$result_payload" > "$result_tmp"
         fi
+        mv "$run_tmp" "$run_file"
+        [[ -z "$result_tmp" ]] || mv "$result_tmp" "$result_file"
 
-        if [[ -n "$br_output" && "$br_output" != "[]" ]]; then
-            # Filter to todo/active beads sorted by priority
-            if ! pending="$(echo "$br_output" | jq '[.[] | select(.status == "todo" or .status == "open")] | sort_by(.priority)')"; then
-                echo "Warning: br list output was invalid JSON; using empty pending list" >&2
-                pending="[]"
+        if [[ "$index_current" == "true" ]]; then
+            if [[ "$result_payload" != "null" ]]; then
+                run_index_upsert_records "$RUNS_DIR" "$run_payload" "$result_payload" || true
+            else
+                run_index_upsert_json "$RUNS_DIR" "$run_payload" || true
             fi
-            echo "$pending"
-            return
         fi
+        run_ledger_append "$RUNS_DIR" "$run_payload" "$result_payload" \
+            || echo "Warning: run ledger update failed for $bead" >&2
     fi
-
-    echo "[]"
+    log_event "stale_agent_cleanup" "bead=$bead" "session=$session"
 }
 
-check_calibration_confidence() {
-    local template="$1"
-    local agent="$2"
-
-    # Query calibration patterns
-    if [[ ! -x "$WORKSPACE_ROOT/scripts/calibrate.sh" ]]; then
-        echo "medium" # default if calibrate.sh not available
-        return
-    fi
-
-    # Check if this template+agent combo has high reject rate
-    local patterns
-    patterns="$(load_calibration_patterns)"
-
-    # Extract reject rate for this template
-    local reject_rate
-    if ! reject_rate="$(echo "$patterns" | jq -r ".by_template.\"$template\".reject_rate // 0")"; then
-        echo "Warning: failed to parse reject rate for template '$template'" >&2
-        reject_rate="0"
-    fi
-
-    # Keep signature consistent for future per-agent confidence tuning.
-    : "$agent"
-
-    # Convert to percentage comparison (awk handles float)
-    if awk "BEGIN {exit !($reject_rate > 0.5)}"; then
-        echo "low"
-    elif awk "BEGIN {exit !($reject_rate > 0.3)}"; then
-        echo "medium"
-    else
-        echo "high"
-    fi
+# ── Conflict forecast ───────────────────────────────────────────────────────
+# Once per pass the run loop refreshes the forecast for its repo
+# (lib/conflict-forecast.sh: files each running bead has committed, and
+# merge-tree predictions between them). A queued item whose files — its
+# plan's "files" list plus whatever its earlier attempts committed — overlap a
+# running bead's is held back until that bead finishes, so colliding beads
+# run one after the other instead of side by side.
+
+ORCH_CONFLICT_FORECAST="${ORCH_CONFLICT_FORECAST:-true}"
+CONFLICT_FORECAST_TTL="${CONFLICT_FORECAST_TTL:-120}"
+
+declare -gA _FORECAST_LOGGED=()
+
+# Usage: refresh_conflict_forecast <repo-path>
+# Logs each predicted conflict between running beads once per pair of tips.
+refresh_conflict_forecast() {
+    local repo_path="$1" a b tip_a tip_b files
+    CONFLICT_FORECAST_FILE=""
+    [[ "$ORCH_CONFLICT_FORECAST" == "true" ]] || return 0
+    conflict_forecast_refresh "$RUNS_DIR" "$repo_path" 2>/dev/null || { CONFLICT_FORECAST_FILE=""; return 0; }
+    while IFS=$'\x1f' read -r a b tip_a tip_b files; do
+        [[ -n "$a" && -z "${_FORECAST_LOGGED["$a $b $tip_a $tip_b"]+set}" ]] || continue
+        _FORECAST_LOGGED["$a $b $tip_a $tip_b"]=1
+        echo "Forecast: running beads $a and $b are predicted to conflict on $files"
+        log_event "conflict_forecast" "beads=$a,$b" "files=$files"
+    done < <(conflict_forecast_conflicts "$CONFLICT_FORECAST_FILE")
 }
 
-should_skip_category() {
-    local template="$1"
-
-    if [[ ! -x "$WORKSPACE_ROOT/scripts/calibrate.sh" ]]; then
-        return 1 # don't skip if calibrate.sh not available
-    fi
-
-    local patterns
-    patterns="$(load_calibration_patterns)"
-
-    local reject_rate
-    if ! reject_rate="$(echo "$patterns" | jq -r ".by_template.\"$template\".reject_rate // 0")"; then
-        echo "Warning: failed to parse reject rate for template '$template'" >&2
-        reject_rate="0"
-    fi
-
-    local count
-    if ! count="$(echo "$patterns" | jq -r ".by_template.\"$template\".total // 0")"; then
-        echo "Warning: failed to parse sample count for template '$template'" >&2
-        count="0"
-    fi
-
-    # Skip if reject rate > 50% and at least 3 judgments
-    if [[ "$count" -ge 3 ]] && awk "BEGIN {exit !($reject_rate > 0.5)}"; then
-        return 0 # should skip
-    fi
-
-    return 1 # don't skip
+# Usage: forecast_holds_bead <row> <repo-path>
+# Returns 0 (and logs bead_held) when the queued row is predicted to collide
+# with a running bead.
+forecast_holds_bead() {
+    local row="$1" repo_path="$2" bead_id
+    local -a declared=()
+    [[ "$ORCH_CONFLICT_FORECAST" == "true" && -n "$CONFLICT_FORECAST_FILE" ]] || return 1
+    bead_id="${row%%$'\x1f'*}"
+    mapfile -t declared < <(jq -r '.files // [] | .[]? | strings' <<<"${row##*$'\x1f'}" 2>/dev/null)
+    conflict_forecast_collision "$CONFLICT_FORECAST_FILE" "$repo_path" "$bead_id" "${declared[@]}" || return 1
+    echo "Holding $bead_id — predicted to collide with running bead $FORECAST_COLLISION_WITH on $FORECAST_COLLISION_FILES"
+    log_event "bead_held" "bead=$bead_id" "reason=conflict_forecast" \
+        "with=$FORECAST_COLLISION_WITH" "files=$FORECAST_COLLISION_FILES"
 }
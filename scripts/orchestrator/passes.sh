@@ -0,0 +1,238 @@
+# shellcheck shell=bash
+# One pass of the orchestrator run loop: dispatching a popped queue row, and
+# the slots and interval schedulers built on it. Sourced by orchestrator.sh
+# after common.sh.
+
+# Usage: _dispatch_pending_row <row> <repo-path> <deadline-epoch>
+# Dispatches one popped queue row (see pop_pending_beads) to the agent the
+# scheduling policy picks. Returns 0 when dispatched, 1 when dispatch.sh
+# failed (the caller decides when to release_pending_bead it), 2 when
+# calibration says to skip it, 3 when it has no bead id, 4 when its expected
+# duration runs past the deadline, 5 when the conflict forecast holds it back
+# (the caller releases it; it is offered again on a later pass).
+_dispatch_pending_row() {
+    local row="$1" dispatch_repo="$2" deadline="$3"
+    local bead_id bead_priority bead_title bead_template
+    IFS=$'\x1f' read -r bead_id bead_priority bead_title bead_template _ <<<"$row"
+
+    if [[ -z "$bead_id" ]]; then
+        echo "Could not extract bead ID from pending work, skipping..."
+        return 3
+    fi
+
+    echo "Next bead: $bead_id - $bead_title (P$bead_priority)"
+
+    # Check calibration confidence for this type of work
+    local confidence
+    calibration_confidence "feature" "claude"
+    confidence="$CALIBRATION_CONFIDENCE"
+    if should_skip_category "feature" "claude"; then
+        echo "Skipping $bead_id — calibration indicates high reject rate"
+        log_event "bead_skipped" "bead=$bead_id" "reason=calibration"
+        return 2
+    fi
+
+    # Keep variable for logging/inspection while behavior stays unchanged.
+    : "$confidence"
+
+    # Serialize behind a running bead it is predicted to collide with
+    if forecast_holds_bead "$row" "$dispatch_repo"; then
+        return 5
+    fi
+
+    # Select agent (and model) per the scheduling policy
+    "_policy_${ORCH_POLICY}_route" "$row"
+    local agent_type="$POLICY_AGENT" estimate_s="$POLICY_ESTIMATE_S"
+
+    if [[ -n "$estimate_s" ]] && (( $(date +%s) + estimate_s > deadline )); then
+        echo "Deferring $bead_id — expected ${estimate_s}s would run past the deadline"
+        log_event "bead_skipped" "bead=$bead_id" "reason=deadline" "template=$bead_template" "estimate_s=$estimate_s"
+        return 4
+    fi
+
+    # Build prompt from bead metadata
+    local prompt="Fix/implement: $bead_title (bead: $bead_id, priority: P$bead_priority)"
+
+    # Dispatch via dispatch.sh
+    echo "Dispatching $bead_id to $agent_type..."
+    log_event "bead_dispatched" "bead=$bead_id" "agent=$agent_type" "title=$bead_title" \
+        "template=$bead_template" "policy=$ORCH_POLICY" "estimate_s=$estimate_s"
+
+    if "$SCRIPT_DIR/dispatch.sh" "$bead_id" "$dispatch_repo" "$agent_type" "$prompt" "$bead_template"; then
+        echo "Successfully dispatched $bead_id"
+        _SCHED_DISPATCHED=$((_SCHED_DISPATCHED + 1))
+        return 0
+    fi
+    echo "Failed to dispatch $bead_id" >&2
+    log_event "dispatch_failed" "bead=$bead_id" "agent=$agent_type"
+    return 1
+}
+
+# ── Scheduler passes ────────────────────────────────────────────────────────
+# Called from orchestrate_run's loop, after its stop checks. A pass updates
+# the loop's tasks_completed and consecutive_failures (and, for interval,
+# pending_batch) through bash's dynamic scoping, and reads its max_tasks and
+# max_consecutive_failures the same way. Returns 0 to go on to the next pass,
+# 1 once it has logged orchestrator_stop.
+
+# Usage: _slots_pass <active> <repo-path> <deadline-epoch>
+# Fills every free slot now, then sleeps until an agent finishes.
+_slots_pass() {
+    local active="$1" dispatch_repo="$2" deadline="$3"
+    local free=$(( ORCH_MAX_AGENTS - active )) filled=0 halted=false calibration_skip=false i rc row
+    local pending_count=0
+    local -a failed_rows=() held_rows=() skipped_rows=()
+    while (( free > 0 && tasks_completed < max_tasks )) \
+            && [[ "$halted" == "false" && "$calibration_skip" == "false" ]]; do
+        pop_pending_beads "$free"
+        pending_count=$(( ${#PENDING_BATCH[@]} + PENDING_REMAINING ))
+        (( ${#PENDING_BATCH[@]} > 0 )) || break
+        for (( i = 0; i < ${#PENDING_BATCH[@]}; i++ )); do
+            if (( filled > 0 && ORCH_DISPATCH_STAGGER > 0 )); then
+                sleep "$ORCH_DISPATCH_STAGGER"
+            fi
+            echo "[$(date -u +%H:%M:%S)] Active: $((active + filled)) | Pending: $pending_count | Completed: $tasks_completed"
+            pending_count=$((pending_count - 1))
+            rc=0
+            _dispatch_pending_row "${PENDING_BATCH[i]}" "$dispatch_repo" "$deadline" || rc=$?
+            case "$rc" in
+                0)
+                    tasks_completed=$((tasks_completed + 1))
+                    consecutive_failures=0
+                    filled=$((filled + 1))
+                    free=$((free - 1))
+                    ;;
+                1)
+                    # Back on the queue after this pass; retried next wake.
+                    consecutive_failures=$((consecutive_failures + 1))
+                    failed_rows+=("${PENDING_BATCH[i]}")
+                    ;;
+                2)
+                    # Calibration judges the category, not the bead, so the
+                    # rest of the queue would be skipped too; stop filling
+                    # and offer it all again next wake.
+                    calibration_skip=true
+                    skipped_rows+=("${PENDING_BATCH[i]}")
+                    ;;
+                5)
+                    held_rows+=("${PENDING_BATCH[i]}")
+                    ;;
+            esac
+            if [[ -f "$STOP_SENTINEL" ]] || (( tasks_completed >= max_tasks \
+                    || consecutive_failures >= max_consecutive_failures )); then
+                halted=true
+            fi
+            if [[ "$halted" == "true" || "$calibration_skip" == "true" ]]; then
+                # Hand back what this pass popped but did not reach (still
+                # counted in pending_count).
+                for (( i = i + 1; i < ${#PENDING_BATCH[@]}; i++ )); do
+                    release_pending_bead "${PENDING_BATCH[i]}"
+                done
+                break
+            fi
+        done
+    done
+    for row in "${failed_rows[@]}" "${held_rows[@]}" "${skipped_rows[@]}"; do
+        release_pending_bead "$row"
+    done
+    pending_count=$((pending_count + ${#failed_rows[@]} + ${#held_rows[@]} + ${#skipped_rows[@]}))
+
+    if (( active == 0 && filled == 0 )) && [[ "$halted" == "false" ]]; then
+        if (( pending_count == 0 )); then
+            echo "No pending work and no active agents, shutting down..."
+            log_event "orchestrator_stop" "reason=no_work" "tasks_completed=$tasks_completed"
+            return 1
+        fi
+        if [[ "$calibration_skip" == "true" ]]; then
+            # Nothing running can produce the judgments that would lift the skip.
+            echo "Calibration skips all $pending_count pending item(s) and no agents are active, shutting down..."
+            log_event "orchestrator_stop" "reason=calibration_skip" "tasks_completed=$tasks_completed" "pending=$pending_count"
+            return 1
+        fi
+    fi
+
+    scheduler_sample "$(date +%s)" $((active + filled)) "$pending_count"
+    # A halted pass goes straight back to the stop checks.
+    [[ "$halted" == "true" ]] && return 0
+    wait_for_completion "$ORCH_WAKE_INTERVAL"
+    _SCHED_COMPLETED=$((_SCHED_COMPLETED + WAKE_COMPLETIONS))
+    _SCHED_WAKEUPS=$((_SCHED_WAKEUPS + 1))
+    return 0
+}
+
+# Usage: _interval_pass <active> <now-epoch> <repo-path> <deadline-epoch>
+# Dispatches at most one item, with fixed sleeps between passes.
+_interval_pass() {
+    local active="$1" now="$2" dispatch_repo="$3" deadline="$4"
+    drain_wake_fifo
+    _SCHED_COMPLETED=$((_SCHED_COMPLETED + WAKE_COMPLETIONS))
+
+    if [[ $active -ge $ORCH_MAX_AGENTS ]]; then
+        scheduler_sample "$now" "$active" 0
+        sleep 10
+        return 0
+    fi
+
+    # Get pending work: pop one bead per free agent slot and work through
+    # that batch before going back to the queue
+    if (( ${#pending_batch[@]} == 0 )); then
+        pop_pending_beads $((ORCH_MAX_AGENTS - active))
+        pending_batch=("${PENDING_BATCH[@]}")
+    fi
+    local pending_count=$(( ${#pending_batch[@]} + PENDING_REMAINING ))
+    scheduler_sample "$now" "$active" "$pending_count"
+
+    if [[ $pending_count -eq 0 ]]; then
+        # Check if agents are still running — if so, wait for them
+        if [[ $active -gt 0 ]]; then
+            sleep 15
+            return 0
+        fi
+        echo "No pending work and no active agents, shutting down..."
+        log_event "orchestrator_stop" "reason=no_work" "tasks_completed=$tasks_completed"
+        return 1
+    fi
+
+    echo "[$(date -u +%H:%M:%S)] Active: $active | Pending: $pending_count | Completed: $tasks_completed"
+
+    # Select next bead (first of the priority-sorted batch)
+    local next_bead="${pending_batch[0]}"
+    pending_batch=("${pending_batch[@]:1}")
+    local rc=0
+    _dispatch_pending_row "$next_bead" "$dispatch_repo" "$deadline" || rc=$?
+    case "$rc" in
+        0)
+            tasks_completed=$((tasks_completed + 1))
+            consecutive_failures=0
+            ;;
+        1)
+            consecutive_failures=$((consecutive_failures + 1))
+            release_pending_bead "$next_bead"
+            ;;
+        2)
+            release_pending_bead "$next_bead"
+            if (( active == 0 )); then
+                # The skip applies to every pending bead, and nothing is
+                # running that could change the calibration.
+                echo "Calibration skips all $pending_count pending item(s) and no agents are active, shutting down..."
+                log_event "orchestrator_stop" "reason=calibration_skip" "tasks_completed=$tasks_completed" "pending=$pending_count"
+                return 1
+            fi
+            sleep 5
+            return 0
+            ;;
+        3)
+            sleep 10
+            return 0
+            ;;
+        4)
+            return 0
+            ;;
+        5)
+            release_pending_bead "$next_bead"
+            ;;
+    esac
+
+    # Wait before next dispatch to avoid resource contention
+    sleep 15
+}
@@ -0,0 +1,166 @@
+# shellcheck shell=bash
+# Pending-work queue for the orchestrator. Sourced by orchestrator.sh after
+# common.sh; do not execute directly.
+
+# ── Pending-work index ──────────────────────────────────────────────────────
+# Pending work comes from plan files in state/plans/ (pre-decomposed tasks
+# with dispatch metadata) or, when no plan is pending, open beads from
+# `br list --json`. Each plan file is parsed only when its mtime changes and
+# the br snapshot is reused for ORCH_BR_CACHE_TTL seconds, so refreshing the
+# queue on every loop iteration is one `find` in the common case. The caches
+# live in the calling shell: call refresh_pending_work / pop_pending_beads
+# directly, not through $(...).
+
+ORCH_BR_CACHE_TTL="${ORCH_BR_CACHE_TTL:-30}"
+
+declare -gA _PLAN_MTIME=()
+declare -gA _PLAN_ITEM=()
+declare -gA _PENDING_TAKEN=()
+_PLAN_GENERATION=0
+_BR_SNAPSHOT="[]"
+_BR_SNAPSHOT_AT=0
+_PENDING_SOURCE_KEY=""
+_PENDING_ORDER_KEY=""
+_PENDING_JSON="[]"
+# "id<US>priority<US>title<US>template<US>compact JSON" per item (US = \x1f,
+# which unlike a tab keeps empty fields when read), in priority order.
+_PENDING_BASE_ROWS=()
+# The same rows in the order the scheduling policy dispatches them.
+_PENDING_ROWS=()
+
+# Set by pop_pending_beads.
+PENDING_BATCH=()
+PENDING_REMAINING=0
+
+# Re-read plan files whose mtime changed; forget deleted ones. Sets
+# _PLAN_ITEM[file] to the plan JSON when it is pending and bumps
+# _PLAN_GENERATION whenever anything changed.
+_refresh_plan_cache() {
+    local mtime plan item
+    local -A seen=()
+    if [[ ! -d "$PLANS_DIR" ]]; then
+        (( ${#_PLAN_MTIME[@]} == 0 )) || _PLAN_GENERATION=$((_PLAN_GENERATION + 1))
+        _PLAN_MTIME=()
+        _PLAN_ITEM=()
+        return 0
+    fi
+
+    while IFS=' ' read -r mtime plan; do
+        [[ -n "$plan" ]] || continue
+        seen["$plan"]=1
+        [[ "${_PLAN_MTIME["$plan"]:-}" == "$mtime" ]] && continue
+        item=""
+        if jq -e '.' "$plan" >/dev/null 2>&1; then
+            item="$(jq -c 'select((.status // "pending") == "pending")' "$plan")"
+        else
+            echo "Warning: skipping invalid plan JSON: $plan" >&2
+        fi
+        _PLAN_MTIME["$plan"]="$mtime"
+        _PLAN_ITEM["$plan"]="$item"
+        _PLAN_GENERATION=$((_PLAN_GENERATION + 1))
+    done < <(find "$PLANS_DIR" -name "*.json" -type f -printf '%T@ %p\n')
+
+    for plan in "${!_PLAN_MTIME[@]}"; do
+        [[ -n "${seen["$plan"]:-}" ]] && continue
+        unset '_PLAN_MTIME[$plan]' '_PLAN_ITEM[$plan]'
+        _PLAN_GENERATION=$((_PLAN_GENERATION + 1))
+    done
+}
+
+# Open beads from br, re-fetched once the snapshot is older than the TTL.
+_refresh_br_snapshot() {
+    local now br_output filtered
+    command -v br &>/dev/null || { _BR_SNAPSHOT="[]"; return 0; }
+    now="$(epoch_now)"
+    (( now - _BR_SNAPSHOT_AT < ORCH_BR_CACHE_TTL )) && return 0
+
+    if ! br_output="$(br list --json)"; then
+        echo "Warning: br list --json failed; using empty bead list" >&2
+        br_output="[]"
+    fi
+    # Filter to todo/active beads sorted by priority
+    if [[ -z "$br_output" ]]; then
+        filtered="[]"
+    elif ! filtered="$(jq -c '[.[] | select(.status == "todo" or .status == "open")] | sort_by(.priority)' <<<"$br_output")"; then
+        echo "Warning: br list output was invalid JSON; using empty pending list" >&2
+        filtered="[]"
+    fi
+    _BR_SNAPSHOT="$filtered"
+    _BR_SNAPSHOT_AT="$now"
+}
+
+# Bring the queue up to date. Rebuilds it (one jq) only when a plan file or
+# the br snapshot changed since the last call.
+refresh_pending_work() {
+    local plan key plan_items=""
+    _refresh_plan_cache
+    for plan in "${!_PLAN_ITEM[@]}"; do
+        [[ -n "${_PLAN_ITEM["$plan"]}" ]] && plan_items+="${_PLAN_ITEM["$plan"]}"$'\n'
+    done
+    if [[ -n "$plan_items" ]]; then
+        key="plans:$_PLAN_GENERATION"
+    else
+        _refresh_br_snapshot
+        key="br:$_BR_SNAPSHOT_AT"
+    fi
+    if [[ "$key" != "$_PENDING_SOURCE_KEY" ]]; then
+        if [[ -n "$plan_items" ]]; then
+            _PENDING_JSON="$(jq -cs 'sort_by(.priority // 2)' <<<"$plan_items")" || _PENDING_JSON="[]"
+        else
+            _PENDING_JSON="$_BR_SNAPSHOT"
+        fi
+        # Items without a template get one from their title, by the same
+        # keywords planner.sh classifies subtasks with.
+        mapfile -t _PENDING_BASE_ROWS < <(jq -r '.[]
+            | (.title // .description // "untitled" | tostring) as $title
+            | ($title | ascii_downcase) as $t
+            | (.template // .template_name // (
+                if $t | test("\\b(fix|bug)\\b") then "bug-fix"
+                elif $t | test("\\b(add|create|implement|build|feature)\\b") then "feature"
+                elif $t | test("\\b(refactor|clean|reorganize)\\b") then "refactor"
+                elif $t | test("\\b(test|validate|verify)\\b") then "test"
+                elif $t | test("\\b(document|doc|write)\\b") then "docs"
+                elif $t | test("\\b(deploy|release|ship)\\b") then "deploy"
+                else "custom" end) | tostring) as $template
+            | [(.id // .bead_id // "" | tostring), (.priority // "2" | tostring), $title, $template, tojson]
+            | map(gsub("[\u001f\n]"; " ")) | join("\u001f")' \
+            <<<"$_PENDING_JSON" 2>/dev/null)
+        _PENDING_SOURCE_KEY="$key"
+    fi
+    "_policy_${ORCH_POLICY}_order"
+}
+
+get_pending_beads() {
+    refresh_pending_work
+    echo "$_PENDING_JSON"
+}
+
+# Usage: pop_pending_beads <n>
+# Takes up to <n> queued items not yet taken this session into PENDING_BATCH
+# (rows as in _PENDING_ROWS) and counts what is left in PENDING_REMAINING.
+pop_pending_beads() {
+    local want="$1" row key
+    PENDING_BATCH=()
+    PENDING_REMAINING=0
+    refresh_pending_work
+    for row in "${_PENDING_ROWS[@]}"; do
+        # Items without an id are keyed by their JSON.
+        key="${row%%$'\x1f'*}"
+        [[ -n "$key" ]] || key="${row##*$'\x1f'}"
+        [[ -n "${_PENDING_TAKEN["$key"]:-}" ]] && continue
+        if (( ${#PENDING_BATCH[@]} < want )); then
+            PENDING_BATCH+=("$row")
+            _PENDING_TAKEN["$key"]=1
+        else
+            PENDING_REMAINING=$((PENDING_REMAINING + 1))
+        fi
+    done
+}
+
+# Put a popped item back (e.g. its dispatch failed) so it is offered again.
+release_pending_bead() {
+    local row="$1" key
+    key="${row%%$'\x1f'*}"
+    [[ -n "$key" ]] || key="${row##*$'\x1f'}"
+    unset '_PENDING_TAKEN[$key]'
+}
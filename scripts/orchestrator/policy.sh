@@ -0,0 +1,135 @@
+# shellcheck shell=bash
+# Scheduling policies for the orchestrator. Sourced by orchestrator.sh after
+# common.sh; a new policy is a set of _policy_<name>_* functions in this file.
+
+# ── Scheduling policy ───────────────────────────────────────────────────────
+# ORCH_POLICY names the pair of functions that order the queue and pick an
+# agent for each item. A policy <name> provides:
+#   _policy_<name>_order        set _PENDING_ROWS from _PENDING_BASE_ROWS
+#                               (called on every refresh; memoize on
+#                               _PENDING_ORDER_KEY)
+#   _policy_<name>_route <row>  set POLICY_AGENT (dispatch.sh agent[:model])
+#                               and POLICY_ESTIMATE_S (empty when unknown)
+#   _policy_<name>_init         optional; run once when `run` starts
+# The run loop does not start an item whose estimate runs past --max-hours.
+#
+# priority: queue order; claude, or codex for P0 (the original behavior).
+# duration: priority first, then shortest expected job first. Each template
+#   goes to the agent:model with the most successful runs per agent-minute
+#   in run-rollups.json. A template or route needs ORCH_POLICY_MIN_RUNS
+#   finished runs before its numbers are used; until then it routes like
+#   `priority`.
+
+ORCH_POLICY="${ORCH_POLICY:-duration}"
+ORCH_POLICY_MIN_RUNS="${ORCH_POLICY_MIN_RUNS:-3}"
+
+POLICY_AGENT=""
+POLICY_ESTIMATE_S=""
+
+declare -gA _POLICY_TEMPLATE_EST=()
+declare -gA _POLICY_ROUTE=()
+declare -gA _POLICY_ROUTE_EST=()
+_POLICY_STATS_KEY=""
+
+policy_exists() {
+    declare -F "_policy_${1}_order" >/dev/null && declare -F "_policy_${1}_route" >/dev/null
+}
+
+_policy_priority_order() {
+    [[ "$_PENDING_ORDER_KEY" == "$_PENDING_SOURCE_KEY" ]] && return 0
+    _PENDING_ROWS=("${_PENDING_BASE_ROWS[@]}")
+    _PENDING_ORDER_KEY="$_PENDING_SOURCE_KEY"
+}
+
+_policy_priority_route() {
+    local row="$1" _id priority
+    IFS=$'\x1f' read -r _id priority _ <<<"$row"
+    POLICY_AGENT="claude"
+    if [[ "$priority" == "0" ]]; then
+        POLICY_AGENT="codex" # P0 gets codex for complex work
+    fi
+    POLICY_ESTIMATE_S=""
+}
+
+# Reload per-template estimates and best routes when run-rollups.json changes.
+_policy_load_stats() {
+    local rollups key kind template value estimate
+    rollups="$(run_rollups_file "$RUNS_DIR")"
+    key="none"
+    [[ -f "$rollups" ]] && key="$(stat -c %y "$rollups" 2>/dev/null)"
+    [[ "$key" == "$_POLICY_STATS_KEY" ]] && return 0
+
+    _POLICY_TEMPLATE_EST=()
+    _POLICY_ROUTE=()
+    _POLICY_ROUTE_EST=()
+    if [[ -f "$rollups" ]]; then
+        while IFS=$'\t' read -r kind template value estimate; do
+            case "$kind" in
+                T) _POLICY_TEMPLATE_EST["$template"]="$value" ;;
+                R)
+                    _POLICY_ROUTE["$template"]="$value"
+                    _POLICY_ROUTE_EST["$template"]="$estimate"
+                    ;;
+            esac
+        done < <(jq -r --argjson min "$ORCH_POLICY_MIN_RUNS" '
+            (.by_template // {} | to_entries[]
+                | select(.value.duration_count >= $min)
+                | ["T", .key, (.value.avg_duration_s | floor)]),
+            (.by_template_route // {} | to_entries[]
+                | .key as $template
+                | [.value | to_entries[]
+                    | (.key | split(":")) as $route
+                    | select(.value.runs >= $min and .value.duration_sum > 0
+                        and ($route | length) == 2
+                        and ($route | all(. != "unknown" and . != "null" and . != "")))
+                    | {route: .key, runs: .value.runs,
+                       per_minute: (.value.done / (.value.duration_sum / 60)),
+                       estimate: (.value.avg_duration_s | floor)}]
+                | max_by([.per_minute, .runs]) // empty
+                | select(.per_minute > 0)
+                | ["R", $template, .route, .estimate])
+            | map(tostring) | join("\t")' "$rollups" 2>/dev/null)
+    fi
+    _POLICY_STATS_KEY="$key"
+}
+
+# Fold any ledger lines (or an older rollups schema) into run-rollups.json.
+_policy_duration_init() {
+    run_ledger_enabled || return 0
+    run_ledger_sync "$RUNS_DIR" || echo "Warning: could not update run rollups; routing by priority" >&2
+}
+
+_policy_duration_order() {
+    local row _id priority _title template estimate i=0
+    local -a keyed=() order=()
+    _policy_load_stats
+    [[ "$_PENDING_ORDER_KEY" == "$_PENDING_SOURCE_KEY|$_POLICY_STATS_KEY" ]] && return 0
+
+    # Unknown estimates sort after known ones within the same priority; ties
+    # keep queue order.
+    for row in "${_PENDING_BASE_ROWS[@]}"; do
+        IFS=$'\x1f' read -r _id priority _title template _ <<<"$row"
+        is_integer "$priority" || priority=2
+        estimate="${_POLICY_ROUTE_EST["$template"]:-${_POLICY_TEMPLATE_EST["$template"]:-999999999}}"
+        keyed+=("$priority $estimate $i")
+        i=$((i + 1))
+    done
+    _PENDING_ROWS=()
+    if (( ${#keyed[@]} > 0 )); then
+        mapfile -t order < <(printf '%s\n' "${keyed[@]}" | sort -n -k1,1 -k2,2 -k3,3 | cut -d' ' -f3)
+        for i in "${order[@]}"; do
+            _PENDING_ROWS+=("${_PENDING_BASE_ROWS[i]}")
+        done
+    fi
+    _PENDING_ORDER_KEY="$_PENDING_SOURCE_KEY|$_POLICY_STATS_KEY"
+}
+
+_policy_duration_route() {
+    local row="$1" _id _priority _title template
+    IFS=$'\x1f' read -r _id _priority _title template _ <<<"$row"
+    _policy_priority_route "$row"
+    if [[ -n "${_POLICY_ROUTE["$template"]:-}" ]]; then
+        POLICY_AGENT="${_POLICY_ROUTE["$template"]}"
+    fi
+    POLICY_ESTIMATE_S="${_POLICY_ROUTE_EST["$template"]:-${_POLICY_TEMPLATE_EST["$template"]:-}}"
+}
@@ -28,6 +28,34 @@ orchestrate_run() {
         esac
     done
 
+    case "$ORCH_CONFLICT_FORECAST" in
+        true|false) ;;
+        *)
+            echo "Error: ORCH_CONFLICT_FORECAST must be true or false (got '$ORCH_CONFLICT_FORECAST')" >&2
+            exit 1
+            ;;
+    esac
+    case "$ORCH_SCHEDULER" in
+        slots|interval) ;;
+        *)
+            echo "Error: ORCH_SCHEDULER must be slots or interval (got '$ORCH_SCHEDULER')" >&2
+            exit 1
+            ;;
+    esac
+    if ! policy_exists "$ORCH_POLICY"; then
+        echo "Error: unknown ORCH_POLICY '$ORCH_POLICY' (built in: duration, priority)" >&2
+        exit 1
+    fi
+    local numeric_var
+    for numeric_var in ORCH_DISPATCH_STAGGER ORCH_WAKE_INTERVAL ORCH_HEARTBEAT_INTERVAL ORCH_POLICY_MIN_RUNS \
+            CONFLICT_FORECAST_TTL; do
+        if ! is_integer "${!numeric_var}"; then
+            echo "Error: $numeric_var must be a non-negative integer (got: ${!numeric_var})" >&2
+            exit 1
+        fi
+    done
+    (( ORCH_WAKE_INTERVAL >= 1 )) || ORCH_WAKE_INTERVAL=1
+
     # Remove stop sentinel if exists
     rm -f "$STOP_SENTINEL"
 
@@ -43,12 +71,13 @@ orchestrate_run() {
     local consecutive_failures=0
     local max_consecutive_failures=5
 
-    log_event "orchestrator_start" "max_hours=$max_hours" "max_tasks=$max_tasks" "repo=$repo_path"
+    log_event "orchestrator_start" "max_hours=$max_hours" "max_tasks=$max_tasks" "repo=$repo_path" "scheduler=$ORCH_SCHEDULER" "policy=$ORCH_POLICY"
 
     echo "Starting orchestrator..."
     echo "  Max hours: $max_hours"
     echo "  Max tasks: $max_tasks"
     echo "  Max concurrent agents: $ORCH_MAX_AGENTS"
+    echo "  Scheduler: $ORCH_SCHEDULER (policy: $ORCH_POLICY)"
     echo ""
 
     # Clean up any stale agents from previous runs
@@ -58,9 +87,14 @@ orchestrate_run() {
         echo "Cleaned up $stale_count stale agent(s) from previous runs"
     fi
 
+    if declare -F "_policy_${ORCH_POLICY}_init" >/dev/null; then
+        "_policy_${ORCH_POLICY}_init"
+    fi
+
     # Approval gate: preview work before dispatching
     local pending_preview
-    pending_preview=$(get_pending_beads)
+    refresh_pending_work
+    pending_preview="$_PENDING_JSON"
     local preview_count
     if ! preview_count="$(echo "$pending_preview" | jq 'length')"; then
         echo "Warning: pending work preview was not valid JSON; treating as empty queue" >&2
@@ -100,7 +134,14 @@ orchestrate_run() {
     echo ""
 
     # Main loop
+    if [[ "$ORCH_SCHEDULER" == "slots" ]] && ! open_wake_fifo; then
+        echo "Warning: could not create wake FIFO $ORCH_WAKE_FIFO; checking every ${ORCH_WAKE_INTERVAL}s" >&2
+    fi
+    scheduler_metrics_start "$start_time"
     local loop_iteration=0
+    local last_heartbeat="$start_time"
+    local -a pending_batch=()
+    local dispatch_repo="${repo_path:-$WORKSPACE_ROOT}"
     while true; do
         loop_iteration=$((loop_iteration + 1))
 
@@ -146,111 +187,37 @@ orchestrate_run() {
             break
         fi
 
-        # Heartbeat log (every 10 iterations)
-        if (( loop_iteration % 10 == 0 )); then
-            local elapsed_hours=$(( (current_time - start_time) / 3600 ))
-            local active_now
-            active_now="$(count_active_agents)"
-            log_event "heartbeat" "tasks_completed=$tasks_completed" "active=$active_now" "elapsed_hours=$elapsed_hours" "iteration=$loop_iteration"
-        fi
-
         # Check active agents
         local active
         active=$(count_active_agents)
 
-        if [[ $active -ge $ORCH_MAX_AGENTS ]]; then
-            sleep 10
-            continue
-        fi
-
-        # Get pending work
-        local pending
-        pending=$(get_pending_beads)
-        local pending_count
-        if ! pending_count=$(echo "$pending" | jq 'length' 2>/dev/null); then
-            echo "Warning: failed to parse pending beads, retrying..." >&2
-            sleep 10
-            continue
-        fi
-
-        if [[ $pending_count -eq 0 ]]; then
-            # Check if agents are still running — if so, wait for them
-            if [[ $active -gt 0 ]]; then
-                sleep 15
-                continue
-            fi
-            echo "No pending work and no active agents, shutting down..."
-            log_event "orchestrator_stop" "reason=no_work" "tasks_completed=$tasks_completed"
-            break
-        fi
-
-        echo "[$(date -u +%H:%M:%S)] Active: $active | Pending: $pending_count | Completed: $tasks_completed"
-
-        # Select next bead (first in priority-sorted list)
-        local next_bead
-        next_bead=$(echo "$pending" | jq '.[0]')
-        local bead_id
-        bead_id=$(echo "$next_bead" | jq -r '.id // .bead_id // empty')
-        local bead_title
-        bead_title=$(echo "$next_bead" | jq -r '.title // .description // "untitled"')
-        local bead_priority
-        bead_priority=$(echo "$next_bead" | jq -r '.priority // "2"')
-
-        if [[ -z "$bead_id" ]]; then
-            echo "Could not extract bead ID from pending work, skipping..."
-            sleep 10
-            continue
-        fi
-
-        echo "Next bead: $bead_id - $bead_title (P$bead_priority)"
-
-        # Check calibration confidence for this type of work
-        local confidence
-        confidence=$(check_calibration_confidence "feature" "claude")
-        if should_skip_category "feature" "claude"; then
-            echo "Skipping $bead_id — calibration indicates high reject rate"
-            log_event "bead_skipped" "bead=$bead_id" "reason=calibration"
-            sleep 5
-            continue
-        fi
-
-        # Keep variable for logging/inspection while behavior stays unchanged.
-        : "$confidence"
-
-        # Select agent type based on priority
-        local agent_type="claude"
-        if [[ "$bead_priority" == "0" ]]; then
-            agent_type="codex" # P0 gets codex for complex work
+        # Heartbeat log (every ORCH_HEARTBEAT_INTERVAL seconds)
+        if (( current_time - last_heartbeat >= ORCH_HEARTBEAT_INTERVAL )); then
+            last_heartbeat="$current_time"
+            local elapsed_hours=$(( (current_time - start_time) / 3600 ))
+            scheduler_sample "$current_time" "$_SCHED_LAST_ACTIVE" "$_SCHED_LAST_IDLE"
+            scheduler_metrics "$current_time"
+            log_event "heartbeat" "tasks_completed=$tasks_completed" "active=$active" "elapsed_hours=$elapsed_hours" "iteration=$loop_iteration" "${SCHED_METRICS[@]}"
         fi
 
-        # Determine repo path
-        local dispatch_repo="${repo_path:-$WORKSPACE_ROOT}"
+        refresh_conflict_forecast "$dispatch_repo"
 
-        # Build prompt from bead metadata
-        local prompt="Fix/implement: $bead_title (bead: $bead_id, priority: P$bead_priority)"
-
-        # Dispatch via dispatch.sh
-        echo "Dispatching $bead_id to $agent_type..."
-        log_event "bead_dispatched" "bead=$bead_id" "agent=$agent_type" "title=$bead_title"
-
-        if "$SCRIPT_DIR/dispatch.sh" "$bead_id" "$dispatch_repo" "$agent_type" "$prompt"; then
-            echo "Successfully dispatched $bead_id"
-            tasks_completed=$((tasks_completed + 1))
-            consecutive_failures=0
+        if [[ "$ORCH_SCHEDULER" == "slots" ]]; then
+            _slots_pass "$active" "$dispatch_repo" "$max_end_time" || break
         else
-            echo "Failed to dispatch $bead_id" >&2
-            log_event "dispatch_failed" "bead=$bead_id" "agent=$agent_type"
-            consecutive_failures=$((consecutive_failures + 1))
+            _interval_pass "$active" "$current_time" "$dispatch_repo" "$max_end_time" || break
         fi
-
-        # Wait before next dispatch to avoid resource contention
-        sleep 15
     done
+    close_wake_fifo
 
     echo ""
     echo "Orchestrator stopped."
     echo "  Tasks completed: $tasks_completed"
     echo "  Runtime: $(( ($(date +%s) - start_time) / 60 )) minutes"
     echo "  Consecutive failures at exit: $consecutive_failures"
-    log_event "orchestrator_complete" "tasks_completed=$tasks_completed" "runtime_minutes=$(( ($(date +%s) - start_time) / 60 ))"
+    local end_time
+    end_time=$(date +%s)
+    scheduler_sample "$end_time" "$_SCHED_LAST_ACTIVE" "$_SCHED_LAST_IDLE"
+    scheduler_metrics "$end_time"
+    log_event "orchestrator_complete" "tasks_completed=$tasks_completed" "runtime_minutes=$(( (end_time - start_time) / 60 ))" "${SCHED_METRICS[@]}"
 }
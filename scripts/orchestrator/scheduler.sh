@@ -0,0 +1,135 @@
+# shellcheck shell=bash
+# Slot scheduler support for the orchestrator: the completion wake FIFO and
+# throughput metrics. Sourced by orchestrator.sh after common.sh.
+
+# ── Scheduler wake-ups and metrics ──────────────────────────────────────────
+# In slots mode the run loop fills every free slot, then blocks on a wake
+# FIFO instead of sleeping. dispatch.sh pokes it ("completed <bead>") right
+# after writing a result record, whether the run ended via the status file, a
+# Relay completion event or a timeout; `orchestrator.sh stop` pokes it too.
+# ORCH_WAKE_INTERVAL bounds the wait so maintenance still runs when nothing
+# finishes. The same pattern as dispatch.sh's event-mode watcher: the FIFO is
+# held open read-write, so a poke that lands between waits is buffered.
+
+ORCH_SCHEDULER="${ORCH_SCHEDULER:-slots}"
+ORCH_DISPATCH_STAGGER="${ORCH_DISPATCH_STAGGER:-0}"
+ORCH_WAKE_INTERVAL="${ORCH_WAKE_INTERVAL:-60}"
+ORCH_HEARTBEAT_INTERVAL="${ORCH_HEARTBEAT_INTERVAL:-150}"
+ORCH_WAKE_FIFO="$STATE_DIR/orchestrator.wake"
+
+ORCH_WAKE_FD=""
+# Completion pokes read by the last wait_for_completion/drain_wake_fifo.
+WAKE_COMPLETIONS=0
+
+open_wake_fifo() {
+    rm -f "$ORCH_WAKE_FIFO"
+    mkfifo "$ORCH_WAKE_FIFO" 2>/dev/null || return 1
+    exec {ORCH_WAKE_FD}<>"$ORCH_WAKE_FIFO"
+}
+
+close_wake_fifo() {
+    if [[ -n "$ORCH_WAKE_FD" ]]; then
+        exec {ORCH_WAKE_FD}>&-
+        ORCH_WAKE_FD=""
+    fi
+    rm -f "$ORCH_WAKE_FIFO"
+}
+
+# Wake the orchestrator if it is waiting. Opening read-write never blocks.
+poke_orchestrator() {
+    local message="$1"
+    [[ -p "$ORCH_WAKE_FIFO" ]] || return 0
+    printf '%s\n' "$message" 1<>"$ORCH_WAKE_FIFO" 2>/dev/null || true
+}
+
+_count_wake_line() {
+    [[ "$1" == completed* ]] && WAKE_COMPLETIONS=$((WAKE_COMPLETIONS + 1))
+    return 0
+}
+
+# Read whatever pokes are already buffered, without waiting.
+drain_wake_fifo() {
+    local line
+    WAKE_COMPLETIONS=0
+    [[ -n "$ORCH_WAKE_FD" ]] || return 0
+    while read -r -t 0 -u "$ORCH_WAKE_FD"; do
+        read -r -u "$ORCH_WAKE_FD" line || break
+        _count_wake_line "$line"
+    done
+}
+
+# Usage: wait_for_completion <seconds>
+# Returns as soon as a poke arrives (plus any that queued behind it), or after
+# <seconds>. Without the FIFO this is a plain sleep.
+wait_for_completion() {
+    local seconds="$1" line
+    WAKE_COMPLETIONS=0
+    if [[ -z "$ORCH_WAKE_FD" ]]; then
+        sleep "$seconds"
+        return 0
+    fi
+    read -r -t "$seconds" -u "$ORCH_WAKE_FD" line || return 0
+    _count_wake_line "$line"
+    local first="$WAKE_COMPLETIONS"
+    drain_wake_fifo
+    WAKE_COMPLETIONS=$((WAKE_COMPLETIONS + first))
+}
+
+# Slot accounting, sampled once per loop pass: busy slot-seconds, and idle
+# slot-seconds during which work was queued but not dispatched.
+_SCHED_START=0
+_SCHED_LAST_SAMPLE=0
+_SCHED_LAST_ACTIVE=0
+_SCHED_LAST_IDLE=0
+_SCHED_BUSY_SLOT_SECONDS=0
+_SCHED_IDLE_SLOT_SECONDS=0
+_SCHED_DISPATCHED=0
+_SCHED_COMPLETED=0
+_SCHED_WAKEUPS=0
+
+scheduler_metrics_start() {
+    _SCHED_START="$1"
+    _SCHED_LAST_SAMPLE="$1"
+}
+
+# Usage: scheduler_sample <now> <active> <queued>
+# Charges the time since the previous sample to the previous state, then
+# records the current one.
+scheduler_sample() {
+    local now="$1" active="$2" queued="$3" dt free
+    dt=$(( now - _SCHED_LAST_SAMPLE ))
+    if (( dt > 0 )); then
+        _SCHED_BUSY_SLOT_SECONDS=$(( _SCHED_BUSY_SLOT_SECONDS + _SCHED_LAST_ACTIVE * dt ))
+        _SCHED_IDLE_SLOT_SECONDS=$(( _SCHED_IDLE_SLOT_SECONDS + _SCHED_LAST_IDLE * dt ))
+    fi
+    free=$(( ORCH_MAX_AGENTS - active ))
+    (( free < 0 )) && free=0
+    (( queued < free )) && free="$queued"
+    _SCHED_LAST_SAMPLE="$now"
+    _SCHED_LAST_ACTIVE="$active"
+    _SCHED_LAST_IDLE="$free"
+}
+
+# "n.nn" from a value scaled by 100.
+_centi() {
+    printf '%d.%02d' $(( $1 / 100 )) $(( $1 % 100 ))
+}
+
+# Sets SCHED_METRICS to key=value heartbeat fields.
+scheduler_metrics() {
+    local now="$1" elapsed capacity
+    elapsed=$(( now - _SCHED_START ))
+    (( elapsed > 0 )) || elapsed=1
+    capacity=$(( ORCH_MAX_AGENTS * elapsed ))
+    (( capacity > 0 )) || capacity=1
+    SCHED_METRICS=(
+        "scheduler=$ORCH_SCHEDULER"
+        "dispatched=$_SCHED_DISPATCHED"
+        "completed=$_SCHED_COMPLETED"
+        "dispatched_per_hour=$(_centi $(( _SCHED_DISPATCHED * 360000 / elapsed )))"
+        "completed_per_hour=$(_centi $(( _SCHED_COMPLETED * 360000 / elapsed )))"
+        "slot_utilization=$(_centi $(( _SCHED_BUSY_SLOT_SECONDS * 100 / capacity )))"
+        "idle_slot_seconds=$_SCHED_IDLE_SLOT_SECONDS"
+        "wakeups=$_SCHED_WAKEUPS"
+    )
+}
@@ -3,7 +3,16 @@ set -euo pipefail
 
 # poll-agents.sh — Show status of all agent sessions and detect stale agents
 #
-# Usage: poll-agents.sh [--json]
+# Usage: poll-agents.sh [--json] [--watch [seconds]]
+#
+# One snapshot costs one `tmux list-panes`, one query against the run index
+# (state/runs.db; a single jq pass over state/runs/ when the index is
+# unavailable) and, for the text view, one jq over the five newest results.
+# An agent counts as active while its pane is alive and its runner has not
+# yet written state/watch/<bead>.status.json.
+#
+# --watch redraws the snapshot in place every N seconds (default: 2); with
+# --json it prints one compact array per refresh instead.
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 WORKSPACE_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
@@ -13,144 +22,200 @@ source "$SCRIPT_DIR/lib/common.sh"
 SOCKET="${DISPATCH_TMUX_SOCKET:-/tmp/openclaw-coding-agents.sock}"
 RUNS_DIR="$WORKSPACE_ROOT/state/runs"
 RESULTS_DIR="$WORKSPACE_ROOT/state/results"
+WATCH_DIR="$WORKSPACE_ROOT/state/watch"
 JSON_OUTPUT=false
+WATCH_SECONDS=""
+
+while [[ $# -gt 0 ]]; do
+    case "$1" in
+        --json)
+            JSON_OUTPUT=true
+            shift
+            ;;
+        --watch)
+            WATCH_SECONDS=2
+            if [[ -n "${2:-}" && "${2:-}" != --* ]]; then
+                WATCH_SECONDS="$2"
+                shift
+            fi
+            shift
+            ;;
+        -h|--help)
+            sed -n '4,16{ s/^# \?//; p }' "$0"
+            exit 0
+            ;;
+        *)
+            echo "Error: unknown option '$1'" >&2
+            exit 1
+            ;;
+    esac
+done
 
-[[ "${1:-}" == "--json" ]] && JSON_OUTPUT=true
-
-# Collect session info
-sessions=""
-if [[ -S "$SOCKET" ]]; then
-    sessions="$(tmux -S "$SOCKET" list-sessions -F "#{session_name}" 2>/dev/null)" || sessions=""
+if [[ -n "$WATCH_SECONDS" ]] && { ! is_integer "$WATCH_SECONDS" || (( WATCH_SECONDS < 1 )); }; then
+    echo "Error: --watch interval must be a positive integer (got '$WATCH_SECONDS')" >&2
+    exit 1
 fi
 
-# Collect run record info
+US=$'\x1f'
+
+# ── Snapshot ─────────────────────────────────────────────────────────────────
+
+SESSIONS=()
+declare -A pane_dead=()
 declare -A run_status=()
 declare -A run_bead=()
 declare -A run_agent=()
 declare -A run_model=()
 declare -A run_started=()
-if [[ -d "$RUNS_DIR" ]]; then
-    for run_file in "$RUNS_DIR"/*.json; do
-        [[ -f "$run_file" ]] || continue
-        local_bead="$(jq -r '.bead // empty' "$run_file" 2>/dev/null)" || continue
-        [[ -n "$local_bead" ]] || continue
-        local_session="$(jq -r '.session_name // empty' "$run_file" 2>/dev/null)" || local_session=""
-        local_status="$(jq -r '.status // "unknown"' "$run_file" 2>/dev/null)" || local_status="unknown"
-        local_agent="$(jq -r '.agent // "?"' "$run_file" 2>/dev/null)" || local_agent="?"
-        local_model="$(jq -r '.model // "?"' "$run_file" 2>/dev/null)" || local_model="?"
-        local_started="$(jq -r '.started_at // "?"' "$run_file" 2>/dev/null)" || local_started="?"
-        [[ -n "$local_session" ]] && run_status["$local_session"]="$local_status"
-        [[ -n "$local_session" ]] && run_bead["$local_session"]="$local_bead"
-        [[ -n "$local_session" ]] && run_agent["$local_session"]="$local_agent"
-        [[ -n "$local_session" ]] && run_model["$local_session"]="$local_model"
-        [[ -n "$local_session" ]] && run_started["$local_session"]="$local_started"
-    done
-fi
 
-if [[ "$JSON_OUTPUT" == "true" ]]; then
-    # JSON output mode
-    json_items="[]"
+# Run records for the given sessions plus all running ones, as rows like
+# run_index_session_rows prints, without the index: one jq over every record
+# (flattened to one line per file, so a malformed record is skipped alone).
+_session_rows_from_json() {
+    [[ -d "$RUNS_DIR" ]] || return 0
+    find "$RUNS_DIR" -maxdepth 1 -type f -name '*.json' -exec awk \
+        'FNR == 1 && NR > 1 { print "" } { printf "%s ", $0 } END { if (NR > 0) print "" }' {} + 2>/dev/null \
+        | jq -Rrn --arg live "$(printf '%s\n' "$@")" '
+            ($live | split("\n") | map(select(length > 0) | {(.): true}) | add // {}) as $live
+            | inputs | fromjson? | objects
+            | select((.bead | type == "string" and length > 0) and ((.session_name // "") != ""))
+            | select(.status == "running" or $live[.session_name])
+            | [.session_name, .bead, (.status // "unknown"), (.agent // "?"), (.model // "?"), (.started_at // "?")]
+            | map(tostring | gsub("[\u001f\n]"; " ")) | join("\u001f")'
+}
+
+collect_snapshot() {
+    local session dead bead status agent model started rows
+    SESSIONS=()
+    pane_dead=()
+    run_status=()
+    run_bead=()
+    run_agent=()
+    run_model=()
+    run_started=()
+
+    if [[ -S "$SOCKET" ]]; then
+        while IFS="$US" read -r session dead; do
+            [[ -n "$session" && -z "${pane_dead[$session]+set}" ]] || continue
+            SESSIONS+=("$session")
+            pane_dead["$session"]="$dead"
+        done < <(tmux -S "$SOCKET" list-panes -a -F "#{session_name}${US}#{pane_dead}" 2>/dev/null || true)
+    fi
 
-    if [[ -n "$sessions" ]]; then
+    if ! rows="$(run_index_session_rows "$RUNS_DIR" "${SESSIONS[@]}" 2>/dev/null)"; then
+        rows="$(_session_rows_from_json "${SESSIONS[@]}")"
+    fi
+    while IFS="$US" read -r session bead status agent model started; do
+        [[ -n "$session" ]] || continue
+        run_status["$session"]="$status"
+        run_bead["$session"]="$bead"
+        run_agent["$session"]="$agent"
+        run_model["$session"]="$model"
+        run_started["$session"]="$started"
+    done <<<"$rows"
+}
+
+# The runner writes its status file on exit; until then the agent is working.
+agent_active() {
+    local session="$1" bead="${run_bead[$1]:-}"
+    [[ "${pane_dead[$session]:-0}" != "1" ]] || return 1
+    [[ -z "$bead" || ! -f "$WATCH_DIR/$bead.status.json" ]]
+}
+
+stale_sessions() {
+    local session
+    for session in "${!run_status[@]}"; do
+        [[ "${run_status[$session]}" == "running" && -z "${pane_dead[$session]+set}" ]] && echo "$session"
+    done | sort
+}
+
+# ── Output ───────────────────────────────────────────────────────────────────
+
+render_json() {
+    local session live
+    local -a jq_flags=("$@")
+    {
+        for session in "${SESSIONS[@]}"; do
+            live="false"
+            agent_active "$session" && live="true"
+            printf '%s\n' "$session${US}${run_bead[$session]:-unknown}${US}${run_status[$session]:-unknown}${US}${run_agent[$session]:-?}${US}${run_model[$session]:-?}${US}${run_started[$session]:-?}${US}true${US}$live"
+        done
         while IFS= read -r session; do
-            [[ -z "$session" ]] && continue
-            local_pane=""
-            if ! local_pane="$(tmux -S "$SOCKET" capture-pane -t "$session" -p -J -S -3 2>/dev/null)"; then
-                local_pane=""
-            fi
-            # Detect if shell prompt visible
-            local_live="true"
-            if echo "$local_pane" | grep -qE '(^|[[:space:]])(\$|>|%)([[:space:]]|$)'; then
-                local_live="false"
-            fi
-            json_items="$(echo "$json_items" | jq \
-                --arg session "$session" \
-                --arg bead "${run_bead[$session]:-unknown}" \
-                --arg status "${run_status[$session]:-unknown}" \
-                --arg agent "${run_agent[$session]:-?}" \
-                --arg model "${run_model[$session]:-?}" \
-                --arg started "${run_started[$session]:-?}" \
-                --argjson live "$local_live" \
-                '. + [{session:$session, bead:$bead, status:$status, agent:$agent, model:$model, started:$started, tmux_alive:true, agent_active:$live}]')"
-        done <<< "$sessions"
+            [[ -n "$session" ]] || continue
+            printf '%s\n' "$session${US}${run_bead[$session]:-unknown}${US}stale${US}${run_agent[$session]:-?}${US}${run_model[$session]:-?}${US}${run_started[$session]:-?}${US}false${US}false"
+        done < <(stale_sessions)
+    } | jq "${jq_flags[@]}" -Rn '[inputs | split("\u001f")
+        | {session: .[0], bead: .[1], status: .[2], agent: .[3], model: .[4], started: .[5],
+           tmux_alive: (.[6] == "true"), agent_active: (.[7] == "true")}]'
+}
+
+render_text() {
+    local session label stale_found=false
+    local -a stale=() recent=()
+
+    mapfile -t stale < <(stale_sessions)
+    if (( ${#SESSIONS[@]} == 0 && ${#stale[@]} == 0 )); then
+        echo "No active agents"
+        echo ""
     fi
 
-    # Add stale entries (running in state but no tmux session)
-    for session in "${!run_status[@]}"; do
-        if [[ "${run_status[$session]}" == "running" ]]; then
-            if [[ -z "$sessions" ]] || ! echo "$sessions" | grep -q "^${session}$"; then
-                json_items="$(echo "$json_items" | jq \
-                    --arg session "$session" \
-                    --arg bead "${run_bead[$session]:-unknown}" \
-                    --arg agent "${run_agent[$session]:-?}" \
-                    --arg model "${run_model[$session]:-?}" \
-                    --arg started "${run_started[$session]:-?}" \
-                    '. + [{session:$session, bead:$bead, status:"stale", agent:$agent, model:$model, started:$started, tmux_alive:false, agent_active:false}]')"
-            fi
+    # Show live sessions
+    if (( ${#SESSIONS[@]} > 0 )); then
+        echo "=== Live Sessions ==="
+        for session in "${SESSIONS[@]}"; do
+            label="RUNNING"
+            agent_active "$session" || label="DONE"
+            printf "  %-20s %s  bead=%s agent=%s/%s\n" "$session" "$label" \
+                "${run_bead[$session]:-?}" "${run_agent[$session]:-?}" "${run_model[$session]:-?}"
+        done
+        echo ""
+    fi
+
+    # Show stale agents
+    for session in "${stale[@]}"; do
+        if [[ "$stale_found" == "false" ]]; then
+            echo "=== Stale Agents (running in state, no tmux session) ==="
+            stale_found=true
         fi
+        printf "  %-20s STALE  bead=%s started=%s\n" "$session" "${run_bead[$session]:-?}" "${run_started[$session]:-?}"
     done
-
-    echo "$json_items" | jq '.'
-    exit 0
-fi
-
-# Human-readable output
-if [[ -z "$sessions" ]] && [[ ${#run_status[@]} -eq 0 ]]; then
-    echo "No active agents"
-    exit 0
-fi
-
-# Show live sessions
-if [[ -n "$sessions" ]]; then
-    echo "=== Live Sessions ==="
-    while IFS= read -r session; do
-        [[ -z "$session" ]] && continue
-        local_pane=""
-        if ! local_pane="$(tmux -S "$SOCKET" capture-pane -t "$session" -p -J -S -3 2>/dev/null)"; then
-            local_pane=""
+    [[ "$stale_found" == "true" ]] && echo ""
+
+    # Show recent results
+    if [[ -d "$RESULTS_DIR" ]]; then
+        mapfile -t recent < <(ls -t "$RESULTS_DIR"/*.json 2>/dev/null | head -5)
+        if (( ${#recent[@]} > 0 )); then
+            echo "=== Recent Results (last 5) ==="
+            jq -r '[(.bead // "?"), (.status // "?"), (.duration_seconds // "?"), (.reason // "")]
+                | map(tostring) | join("\u001f")' "${recent[@]}" 2>/dev/null \
+                | while IFS="$US" read -r bead status duration reason; do
+                    printf "  %-10s %-8s %ss  %s\n" "$bead" "$status" "$duration" "$reason"
+                done
+            echo ""
         fi
+    fi
+}
 
-        local_status_label="RUNNING"
-        if echo "$local_pane" | grep -qE '(^|[[:space:]])(\$|>|%)([[:space:]]|$)'; then
-            local_status_label="DONE"
-        fi
+# ── Main ─────────────────────────────────────────────────────────────────────
 
-        local_bead="${run_bead[$session]:-?}"
-        local_agent="${run_agent[$session]:-?}"
-        local_model="${run_model[$session]:-?}"
-        printf "  %-20s %s  bead=%s agent=%s/%s\n" "$session" "$local_status_label" "$local_bead" "$local_agent" "$local_model"
-    done <<< "$sessions"
-    echo ""
+if [[ -z "$WATCH_SECONDS" ]]; then
+    collect_snapshot
+    if [[ "$JSON_OUTPUT" == "true" ]]; then
+        render_json
+    else
+        render_text
+    fi
+    exit 0
 fi
 
-# Show stale agents
-stale_found=false
-for session in "${!run_status[@]}"; do
-    if [[ "${run_status[$session]}" == "running" ]]; then
-        if [[ -z "$sessions" ]] || ! echo "$sessions" | grep -q "^${session}$"; then
-            if [[ "$stale_found" == "false" ]]; then
-                echo "=== Stale Agents (running in state, no tmux session) ==="
-                stale_found=true
-            fi
-            printf "  %-20s STALE  bead=%s started=%s\n" "$session" "${run_bead[$session]:-?}" "${run_started[$session]:-?}"
-        fi
+trap 'exit 0' INT TERM
+while true; do
+    collect_snapshot
+    if [[ "$JSON_OUTPUT" == "true" ]]; then
+        render_json -c
+    else
+        frame="$(render_text)"
+        printf '\033[H\033[2J%s  (every %ss, Ctrl-C to exit)\n\n%s\n' "$(date -u +%H:%M:%S)" "$WATCH_SECONDS" "$frame"
     fi
+    sleep "$WATCH_SECONDS"
 done
-[[ "$stale_found" == "true" ]] && echo ""
-
-# Show recent results
-if [[ -d "$RESULTS_DIR" ]]; then
-    recent_results="$(ls -t "$RESULTS_DIR"/*.json 2>/dev/null | head -5)" || recent_results=""
-    if [[ -n "$recent_results" ]]; then
-        echo "=== Recent Results (last 5) ==="
-        while IFS= read -r result_file; do
-            [[ -f "$result_file" ]] || continue
-            local_bead="$(jq -r '.bead // "?"' "$result_file" 2>/dev/null)" || local_bead="?"
-            local_status="$(jq -r '.status // "?"' "$result_file" 2>/dev/null)" || local_status="?"
-            local_reason="$(jq -r '.reason // ""' "$result_file" 2>/dev/null)" || local_reason=""
-            local_duration="$(jq -r '.duration_seconds // "?"' "$result_file" 2>/dev/null)" || local_duration="?"
-            printf "  %-10s %-8s %ss  %s\n" "$local_bead" "$local_status" "$local_duration" "$local_reason"
-        done <<< "$recent_results"
-        echo ""
-    fi
-fi
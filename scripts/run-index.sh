@@ -0,0 +1,95 @@
+#!/usr/bin/env bash
+# run-index.sh — Inspect and rebuild the SQLite run-state index (state/runs.db)
+#
+# Usage:
+#   run-index.sh rebuild                Backfill the index from state/runs/*.json
+#   run-index.sh running [--repo PATH]  Running beads (bead, agent, session, prompt)
+#   run-index.sh stale                  Running beads whose tmux session is gone
+#   run-index.sh status [--json]        Index path, freshness and counts by status
+#
+# The index is kept current by write_records/attach_verification and is
+# rebuilt automatically when the runs directory changes behind its back, so
+# `rebuild` is only needed after restoring records by hand or to recover a
+# corrupted database. Reads go through the same sync as dispatch/orchestrator.
+#
+# Env: DISPATCH_RUN_INDEX_DB, DISPATCH_TMUX_SOCKET
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+WORKSPACE_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
+
+source "$SCRIPT_DIR/lib/common.sh"
+
+RUNS_DIR="$WORKSPACE_ROOT/state/runs"
+SOCKET="${DISPATCH_TMUX_SOCKET:-/tmp/openclaw-coding-agents.sock}"
+
+usage() { sed -n '2,/^set /{ /^#/s/^# \?//p }' "$0"; }
+
+require_index() {
+    require_cmd sqlite3
+    require_cmd jq
+    if [[ "${DISPATCH_RUN_INDEX:-true}" != "true" ]]; then
+        echo "Error: run index disabled (DISPATCH_RUN_INDEX=${DISPATCH_RUN_INDEX})" >&2
+        exit 1
+    fi
+}
+
+cmd_rebuild() {
+    local db count
+    require_index
+    db="$(run_index_db "$RUNS_DIR")"
+    run_index_rebuild "$RUNS_DIR" || { echo "Error: rebuild failed for $db" >&2; exit 1; }
+    count="$(echo "SELECT COUNT(*) FROM runs;" | _run_index_sql "$db")"
+    echo "Indexed $count run records into $db"
+}
+
+cmd_running() {
+    local repo=""
+    if [[ "${1:-}" == "--repo" ]]; then
+        repo="${2:?--repo requires a path}"
+    fi
+    require_index
+    run_index_running "$RUNS_DIR" "$repo" || { echo "Error: run index unavailable" >&2; exit 1; }
+}
+
+cmd_stale() {
+    require_index
+    run_index_stale_sessions "$RUNS_DIR" "$SOCKET" || { echo "Error: run index unavailable" >&2; exit 1; }
+}
+
+cmd_status() {
+    local as_json="$1" db fresh=true counts
+    require_index
+    db="$(run_index_db "$RUNS_DIR")"
+    run_index_is_current "$RUNS_DIR" || fresh=false
+    run_index_sync "$RUNS_DIR" || { echo "Error: run index unavailable" >&2; exit 1; }
+    counts="$(echo "SELECT status, COUNT(*) FROM runs GROUP BY status ORDER BY status;" \
+        | _run_index_sql "$db" -separator $'\t')"
+
+    if [[ "$as_json" == "true" ]]; then
+        jq -Rn --arg db "$db" --argjson fresh "$fresh" '
+            {db: $db, was_current: $fresh,
+             counts: ([inputs | select(length > 0) | split("\t") | {(.[0]): (.[1] | tonumber)}] | add // {})}
+        ' <<<"$counts"
+        return 0
+    fi
+
+    echo "Index: $db"
+    echo "Was current: $fresh"
+    if [[ -z "$counts" ]]; then
+        echo "No run records indexed"
+        return 0
+    fi
+    while IFS=$'\t' read -r status count; do
+        printf '  %-10s %s\n' "$status" "$count"
+    done <<<"$counts"
+}
+
+case "${1:-}" in
+    rebuild) cmd_rebuild ;;
+    running) shift; cmd_running "$@" ;;
+    stale)   cmd_stale ;;
+    status)  cmd_status "$([[ "${2:-}" == "--json" ]] && echo true || echo false)" ;;
+    -h|--help|help) usage ;;
+    *) usage >&2; exit 1 ;;
+esac
@@ -4,6 +4,11 @@ set -euo pipefail
 WORKSPACE_ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 SCHEMAS_DIR="$WORKSPACE_ROOT/state/schemas"
 
+# Records are checked in batches of VALIDATE_STATE_BATCH files per jq process,
+# with up to VALIDATE_STATE_JOBS batches running at once.
+VALIDATE_STATE_BATCH="${VALIDATE_STATE_BATCH:-500}"
+VALIDATE_STATE_JOBS="${VALIDATE_STATE_JOBS:-$(nproc 2>/dev/null || echo 4)}"
+
 usage() {
     cat << EOF
 Usage: validate-state.sh [OPTIONS] [PATH]
@@ -15,12 +20,18 @@ OPTIONS:
     --results [PATH]   Validate result records (default: state/results/)
     --all              Validate both runs and results
     --fix              Migrate legacy records (add missing nullable fields)
+    --json             Print a per-file JSON report on stdout
     --help             Show this help message
 
+ENVIRONMENT:
+    VALIDATE_STATE_BATCH   Files per jq process (default: 500)
+    VALIDATE_STATE_JOBS    Batches validated in parallel (default: CPU count)
+
 EXAMPLES:
     validate-state.sh --runs
     validate-state.sh --runs state/runs/bd-abc.json
     validate-state.sh --all
+    validate-state.sh --all --json | jq '.runs.files'
     validate-state.sh --fix --runs
 EOF
 }
@@ -29,6 +40,7 @@ EOF
 MODE=""
 TARGET_PATH=""
 FIX_MODE=false
+JSON_OUTPUT=false
 
 while [[ $# -gt 0 ]]; do
     case "$1" in
@@ -60,6 +72,10 @@ while [[ $# -gt 0 ]]; do
             FIX_MODE=true
             shift
             ;;
+        --json)
+            JSON_OUTPUT=true
+            shift
+            ;;
         *)
             echo "Unknown option: $1" >&2
             usage
@@ -74,237 +90,235 @@ if [[ -z "$MODE" ]]; then
     exit 1
 fi
 
-# Validate a run record using jq
-validate_run_record() {
-    local file="$1"
-    local errors=0
-
-    # Check required fields
-    local required_fields=("schema_version" "bead" "agent" "model" "repo" "prompt" "prompt_hash" "started_at" "finished_at" "duration_seconds" "status" "attempt" "max_retries" "session_name" "result_file" "exit_code" "prompt_full")
-
-    for field in "${required_fields[@]}"; do
-        if ! jq -e "has(\"$field\")" "$file" >/dev/null 2>&1; then
-            echo "  Missing required field: $field" >&2
-            ((errors++))
-        fi
-    done
-
-    # Validate field types and values
-    if ! jq -e '.schema_version == 1' "$file" >/dev/null 2>&1; then
-        echo "  schema_version must be 1" >&2
-        ((errors++))
-    fi
-
-    if ! jq -e '.agent | IN("claude", "codex")' "$file" >/dev/null 2>&1; then
-        echo "  agent must be 'claude' or 'codex'" >&2
-        ((errors++))
-    fi
-
-    if ! jq -e '.status | IN("running", "done", "failed", "timeout")' "$file" >/dev/null 2>&1; then
-        echo "  status must be one of: running, done, failed, timeout" >&2
-        ((errors++))
-    fi
-
-    if ! jq -e '.prompt_hash | test("^[a-f0-9]{64}$")' "$file" >/dev/null 2>&1; then
-        echo "  prompt_hash must be a 64-character hex string" >&2
-        ((errors++))
+for setting in VALIDATE_STATE_BATCH VALIDATE_STATE_JOBS; do
+    if [[ ! "${!setting}" =~ ^[0-9]+$ ]] || (( ${!setting} < 1 )); then
+        echo "Error: $setting must be a positive integer (got '${!setting}')" >&2
+        exit 1
     fi
+done
 
-    return $errors
+US=$'\x1f'
+WORK_DIR="$(mktemp -d)"
+trap 'rm -rf "$WORK_DIR"' EXIT
+
+# ── Batch validator ──────────────────────────────────────────────────────────
+
+# Reads "<file>US<file contents on one line>" rows and prints one row per file:
+#   file US ok|fail|invalid US migrated record (or empty) US error US error ...
+# The checks are driven by the schema in $schema[0] (the subset of JSON Schema
+# the state schemas use); with $fix set, the legacy migration for $kind is
+# applied first and the migrated record is what gets validated.
+VALIDATE_JQ='
+# Flatten a schema once so per-record checks are plain lookups.
+def compile:
+    {types: (.type // null | if . == null or type == "array" then . else [.] end),
+     has_const: has("const"), const, enum, minLength, minimum, pattern,
+     required: (.required // []),
+     names: (.properties // {}),
+     props: [.properties // {} | to_entries[] | {key, value: (.value | compile)}],
+     closed: (.additionalProperties == false)};
+
+def type_ok($types):
+    type as $t
+    | ($types | index([$t]) != null)
+      or ($t == "number" and ($types | index(["integer"]) != null) and floor == .);
+
+def schema_errors($s; $path):
+    . as $v
+    | type as $t
+    | if $s.types != null and (type_ok($s.types) | not) then
+        "\($path) must be \($s.types | join(" or ")) (got \($t))"
+      elif $t == "object" then
+        ($s.required[] as $k | select($v | has($k) | not) | "Missing required field: \($k)"),
+        ($s.props[] as $p | select($v | has($p.key))
+            | $v[$p.key] | schema_errors($p.value; ($path | if . == "" then "" else . + "." end) + $p.key)),
+        (if $s.closed then
+            $v | keys_unsorted[] as $k | select($s.names | has($k) | not) | "Unexpected field: \($k)"
+         else empty end)
+      else
+        (if $s.has_const and $v != $s.const then "\($path) must be \($s.const | tojson)" else empty end),
+        (if $s.enum != null and ($s.enum | index([$v]) == null) then
+            "\($path) must be one of: \($s.enum | map(tostring) | join(", "))" else empty end),
+        (if $t == "string" then
+            (if $s.minLength != null and length < $s.minLength then "\($path) must not be empty" else empty end),
+            (if $s.pattern != null and (test($s.pattern) | not) then "\($path) must match \($s.pattern)" else empty end)
+         elif $t == "number" and $s.minimum != null and $v < $s.minimum then
+            "\($path) must be >= \($s.minimum)"
+         else empty end)
+      end;
+
+def migrate:
+    if $kind == "run" then . + {
+        output_summary: (if has("output_summary") then .output_summary else null end),
+        failure_reason: (if has("failure_reason") then .failure_reason else null end),
+        template_name: (if has("template_name") then .template_name else null end),
+        prompt_full: (if has("prompt_full") then .prompt_full else .prompt end)
+    } else . + {
+        output_summary: (if has("output_summary") then .output_summary else null end)
+    } end;
+
+($schema[0] | compile) as $s
+| inputs
+| index("\u001f") as $i
+| .[:$i] as $file
+| [.[$i + 1:] | try (fromjson | [.]) catch sub(" \\(while parsing.*"; "")][0] as $parsed
+| if ($parsed | type) == "string" then
+    [$file, "invalid", "", ($parsed | gsub("[\u001f\n]"; " "))]
+  else
+    $parsed[0] as $record
+    | (if $fix and ($record | type) == "object" then $record | migrate else $record end) as $checked
+    | [$checked | schema_errors($s; "")] as $errors
+    | [$file, (if ($errors | length) == 0 then "ok" else "fail" end),
+       (if $checked != $record then $checked | tojson else "" end)]
+      + ($errors | map(gsub("[\u001f\n]"; " ")))
+  end
+| join("\u001f")
+'
+
+# Validate one batch of files; rows go to $out.
+_validate_batch() {
+    local kind="$1" out="$2"
+    shift 2
+    awk 'FNR == 1 { if (NR > 1) print ""; printf "%s\037", FILENAME } { printf "%s ", $0 } END { if (NR > 0) print "" }' "$@" \
+        | jq -Rrn --arg kind "$kind" --argjson fix "$FIX_MODE" \
+            --slurpfile schema "$SCHEMAS_DIR/$kind.schema.json" "$VALIDATE_JQ" > "$out"
 }
 
-# Validate a result record using jq
-validate_result_record() {
-    local file="$1"
-    local errors=0
-
-    # Check required fields
-    local required_fields=("schema_version" "bead" "agent" "status" "reason" "started_at" "finished_at" "duration_seconds" "attempt" "max_retries" "will_retry" "exit_code" "session_name")
-
-    for field in "${required_fields[@]}"; do
-        if ! jq -e "has(\"$field\")" "$file" >/dev/null 2>&1; then
-            echo "  Missing required field: $field" >&2
-            ((errors++))
+# Validate every file in FILES as $kind, in parallel batches; the rows are
+# concatenated in file order into $out.
+_validate_files() {
+    local kind="$1" out="$2"
+    local -a batch=() parts=()
+    local file start part running=0
+    local empty="$WORK_DIR/$kind.empty"
+    : > "$empty"
+
+    # Empty files have no content row; report them here, after the rest.
+    for file in "${FILES[@]}"; do
+        if [[ -s "$file" ]]; then
+            batch+=("$file")
+        else
+            printf '%s\n' "$file${US}invalid${US}${US}empty file" >> "$empty"
         fi
     done
 
-    # Validate field types and values
-    if ! jq -e '.schema_version == 1' "$file" >/dev/null 2>&1; then
-        echo "  schema_version must be 1" >&2
-        ((errors++))
-    fi
-
-    if ! jq -e '.agent | IN("claude", "codex")' "$file" >/dev/null 2>&1; then
-        echo "  agent must be 'claude' or 'codex'" >&2
-        ((errors++))
-    fi
-
-    if ! jq -e '.status | IN("running", "done", "failed", "timeout")' "$file" >/dev/null 2>&1; then
-        echo "  status must be one of: running, done, failed, timeout" >&2
-        ((errors++))
-    fi
-
-    if ! jq -e '.will_retry | type == "boolean"' "$file" >/dev/null 2>&1; then
-        echo "  will_retry must be a boolean" >&2
-        ((errors++))
-    fi
-
-    return $errors
-}
-
-# Validate a single file against a schema
-validate_file() {
-    local file="$1"
-    local schema_name="$2"
-
-    if [[ ! -f "$file" ]]; then
-        echo "Error: File not found: $file" >&2
-        return 1
-    fi
-
-    # Check if file is valid JSON
-    local jq_error
-    if ! jq_error="$(jq empty "$file" 2>&1 >/dev/null)"; then
-        echo "FAIL: $file is not valid JSON" >&2
-        [[ -n "$jq_error" ]] && echo "  jq: $jq_error" >&2
-        return 1
-    fi
-
-    # Validate based on schema type
-    local errors=0
-    if [[ "$schema_name" == "run" ]]; then
-        validate_run_record "$file" || errors=$?
-    elif [[ "$schema_name" == "result" ]]; then
-        validate_result_record "$file" || errors=$?
-    fi
-
-    if [[ $errors -gt 0 ]]; then
-        echo "FAIL: $file has $errors validation error(s)" >&2
-        return 1
-    fi
-
-    return 0
-}
-
-# Fix legacy records by adding missing nullable fields
-fix_record() {
-    local file="$1"
-    local type="$2"
-
-    if [[ ! -f "$file" ]]; then
-        return 1
-    fi
-
-    # Create backup
-    cp "$file" "${file}.bak"
-
-    # Add missing nullable fields based on type
-    if [[ "$type" == "run" ]]; then
-        jq '. + {
-            output_summary: (if has("output_summary") then .output_summary else null end),
-            failure_reason: (if has("failure_reason") then .failure_reason else null end),
-            template_name: (if has("template_name") then .template_name else null end),
-            prompt_full: (if has("prompt_full") then .prompt_full else .prompt end)
-        }' "$file" > "${file}.tmp"
-        mv "${file}.tmp" "$file"
-    elif [[ "$type" == "result" ]]; then
-        jq '. + {
-            output_summary: (if has("output_summary") then .output_summary else null end)
-        }' "$file" > "${file}.tmp"
-        mv "${file}.tmp" "$file"
-    fi
+    for (( start = 0; start < ${#batch[@]}; start += VALIDATE_STATE_BATCH )); do
+        part="$WORK_DIR/$kind.$start"
+        parts+=("$part")
+        _validate_batch "$kind" "$part" "${batch[@]:start:VALIDATE_STATE_BATCH}" &
+        if (( ++running >= VALIDATE_STATE_JOBS )); then
+            wait -n || return 1
+            running=$(( running - 1 ))
+        fi
+    done
+    while (( running > 0 )); do
+        wait -n || return 1
+        running=$(( running - 1 ))
+    done
+    cat "${parts[@]}" "$empty" > "$out"
 }
 
-# Validate runs directory
-validate_runs() {
-    local runs_path="${1:-$WORKSPACE_ROOT/state/runs}"
-    local failed=0
-    local passed=0
-
-    if [[ -f "$runs_path" ]]; then
-        # Single file
-        if $FIX_MODE; then
-            fix_record "$runs_path" "run"
+# ── Reporting ────────────────────────────────────────────────────────────────
+
+# Apply --fix migrations and print the text report for one kind's rows.
+# Sets PASSED and FAILED.
+_process_rows() {
+    local rows="$1"
+    local file state fixed
+    local -a fields=()
+    PASSED=0
+    FAILED=0
+
+    while IFS="$US" read -r -a fields; do
+        file="${fields[0]}" state="${fields[1]}" fixed="${fields[2]:-}"
+        if [[ -n "$fixed" ]]; then
+            cp "$file" "${file}.bak"
+            printf '%s\n' "$fixed" > "${file}.tmp"
+            mv "${file}.tmp" "$file"
         fi
-        if validate_file "$runs_path" "run"; then
-            ((passed++))
-        else
-            ((failed++))
-        fi
-    elif [[ -d "$runs_path" ]]; then
-        # Directory
-        for file in "$runs_path"/*.json; do
-            [[ -f "$file" ]] || continue
-            if $FIX_MODE; then
-                fix_record "$file" "run"
-            fi
-            if validate_file "$file" "run"; then
-                ((passed++))
-            else
-                ((failed++))
-            fi
-        done
-    else
-        echo "Error: Path not found: $runs_path" >&2
-        return 1
-    fi
-
-    echo "Run records: $passed passed, $failed failed" >&2
-    return $failed
+        case "$state" in
+            ok)
+                PASSED=$(( PASSED + 1 ))
+                continue
+                ;;
+            invalid)
+                if [[ "$JSON_OUTPUT" != "true" ]]; then
+                    echo "FAIL: $file is not valid JSON" >&2
+                    echo "  jq: ${fields[3]:-}" >&2
+                fi
+                ;;
+            *)
+                if [[ "$JSON_OUTPUT" != "true" ]]; then
+                    printf '  %s\n' "${fields[@]:3}" >&2
+                    echo "FAIL: $file has $(( ${#fields[@]} - 3 )) validation error(s)" >&2
+                fi
+                ;;
+        esac
+        FAILED=$(( FAILED + 1 ))
+    done < "$rows"
 }
 
-# Validate results directory
-validate_results() {
-    local results_path="${1:-$WORKSPACE_ROOT/state/results}"
-    local failed=0
-    local passed=0
-
-    if [[ -f "$results_path" ]]; then
-        # Single file
-        if $FIX_MODE; then
-            fix_record "$results_path" "result"
-        fi
-        if validate_file "$results_path" "result"; then
-            ((passed++))
-        else
-            ((failed++))
-        fi
-    elif [[ -d "$results_path" ]]; then
-        # Directory
-        for file in "$results_path"/*.json; do
-            [[ -f "$file" ]] || continue
-            if $FIX_MODE; then
-                fix_record "$file" "result"
-            fi
-            if validate_file "$file" "result"; then
-                ((passed++))
-            else
-                ((failed++))
-            fi
+# Validate a file or directory of records of one kind (run|result).
+validate_kind() {
+    local kind="$1" path="$2" label="$3"
+    local rows="$WORK_DIR/$kind.rows"
+    FILES=()
+
+    if [[ -f "$path" ]]; then
+        FILES=("$path")
+    elif [[ -d "$path" ]]; then
+        for file in "$path"/*.json; do
+            [[ -f "$file" ]] && FILES+=("$file")
         done
     else
-        echo "Error: Path not found: $results_path" >&2
+        echo "Error: Path not found: $path" >&2
         return 1
     fi
 
-    echo "Result records: $passed passed, $failed failed" >&2
-    return $failed
+    _validate_files "$kind" "$rows"
+    _process_rows "$rows"
+
+    echo "$label: $PASSED passed, $FAILED failed" >&2
+    (( FAILED == 0 ))
 }
 
 # Main execution
 EXIT_CODE=0
+REPORTED=()
 
 case "$MODE" in
     runs)
-        validate_runs "$TARGET_PATH" || EXIT_CODE=1
+        validate_kind run "${TARGET_PATH:-$WORKSPACE_ROOT/state/runs}" "Run records" || EXIT_CODE=1
+        REPORTED=(run)
         ;;
     results)
-        validate_results "$TARGET_PATH" || EXIT_CODE=1
+        validate_kind result "${TARGET_PATH:-$WORKSPACE_ROOT/state/results}" "Result records" || EXIT_CODE=1
+        REPORTED=(result)
         ;;
     all)
-        validate_runs || EXIT_CODE=1
-        validate_results || EXIT_CODE=1
+        validate_kind run "$WORKSPACE_ROOT/state/runs" "Run records" || EXIT_CODE=1
+        validate_kind result "$WORKSPACE_ROOT/state/results" "Result records" || EXIT_CODE=1
+        REPORTED=(run result)
         ;;
 esac
 
+# One object per kind: counts plus the errors of every failing file.
+if [[ "$JSON_OUTPUT" == "true" ]]; then
+    for kind in "${REPORTED[@]}"; do
+        [[ -f "$WORK_DIR/$kind.rows" ]] || continue
+        sed "s/^/$kind$US/" "$WORK_DIR/$kind.rows"
+    done | jq -Rn --argjson fix "$FIX_MODE" --arg kinds "${REPORTED[*]}" '
+        def key: {run: "runs", result: "results"}[.];
+        reduce (inputs | split("\u001f")) as $row (
+            $kinds | split(" ") | map({key: key, value: {checked: 0, passed: 0, failed: 0, fixed: 0, files: {}}}) | from_entries;
+            ($row[0] | key) as $key
+            | .[$key].checked += 1
+            | .[$key].passed += (if $row[2] == "ok" then 1 else 0 end)
+            | .[$key].failed += (if $row[2] == "ok" then 0 else 1 end)
+            | .[$key].fixed += (if $row[3] != "" then 1 else 0 end)
+            | .[$key].files += (if $row[2] == "ok" then {} else
+                {($row[1]): {valid_json: ($row[2] != "invalid"), errors: $row[4:]}} end))
+        | map_values(if $fix then . else del(.fixed) end)'
+fi
+
 exit $EXIT_CODE
@@ -3,11 +3,25 @@ set -euo pipefail
 
 # verify.sh — Run verification checks on a repo after agent work
 #
-# Usage: verify.sh <repo-path> [bead-id]
+# Usage: verify.sh [--checks all|fast|slow] <repo-path> [bead-id]
 # Output: JSON to stdout + optional state/results/<bead-id>-verify.json
+#
+# The selected checks run concurrently; checks.duration_ms records how long
+# each one took. "fast" is PRD governance and lint, "slow" is tests,
+# truthsayer and UBS. Checks that were not selected are reported as
+# "pending" (and listed in .pending), and overall is "pending" unless a
+# selected check already failed. With a bead id, a later run of the pending
+# checks is merged into that bead's verify file and the merged result is
+# printed, so dispatch.sh can record the fast result first.
+
+CHECKS="all"
+if [[ "${1:-}" == "--checks" ]]; then
+    CHECKS="${2:-}"
+    shift 2 || true
+fi
 
 if [[ $# -lt 1 ]]; then
-    echo "Usage: $0 <repo-path> [bead-id]" >&2
+    echo "Usage: $0 [--checks all|fast|slow] <repo-path> [bead-id]" >&2
     exit 1
 fi
 
@@ -19,6 +33,16 @@ if [[ ! -d "$REPO_PATH" ]]; then
     exit 1
 fi
 
+case "$CHECKS" in
+    all)  SELECTED=(prd_governance lint tests truthsayer ubs); PENDING=() ;;
+    fast) SELECTED=(prd_governance lint); PENDING=(tests truthsayer ubs) ;;
+    slow) SELECTED=(tests truthsayer ubs); PENDING=(prd_governance lint) ;;
+    *)
+        echo "Error: --checks must be all, fast or slow (got '$CHECKS')" >&2
+        exit 1
+        ;;
+esac
+
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 if [[ -x "$SCRIPT_DIR/lint-no-hidden-workspace.sh" ]]; then
     "$SCRIPT_DIR/lint-no-hidden-workspace.sh" >/dev/null
@@ -34,211 +58,87 @@ LINT_DETAILS="null"
 PRD_GOVERNANCE_DETAILS="null"
 TRUTHSAYER_ERRORS=0
 TRUTHSAYER_WARNINGS=0
-OVERALL="pass"
 
-# Ensure test log cleanup on exit
-TEST_LOG="/tmp/verify-tests-$$.log"
-cleanup() { rm -f "$TEST_LOG"; }
+# Each check writes its fields to $CHECK_DIR/<check>.json; test log and
+# fragments are cleaned up on exit
+CHECK_DIR="$(mktemp -d)"
+TEST_LOG="$CHECK_DIR/tests.log"
+cleanup() { rm -rf "$CHECK_DIR"; }
 trap cleanup EXIT
 
-# ── Check 0: PRD governance ─────────────────────────────────────────────────
-
-if [[ -x "$SCRIPT_DIR/prd-lint.sh" ]]; then
-    PRD_OUTPUT=""
-    if PRD_OUTPUT="$("$SCRIPT_DIR/prd-lint.sh" --json 2>/dev/null)"; then
-        PRD_GOVERNANCE_RESULT="pass"
-    else
-        PRD_GOVERNANCE_RESULT="fail"
-        OVERALL="fail"
-        if [[ -n "$PRD_OUTPUT" ]]; then
-            PRD_GOVERNANCE_DETAILS="$(printf '%s' "$PRD_OUTPUT" | jq '.summary // null' 2>/dev/null || echo "null")"
-        fi
-    fi
-fi
-
-# ── Check 1: Lint changed files ──────────────────────────────────────────────
-
-if git -C "$REPO_PATH" rev-parse --git-dir > /dev/null 2>&1; then
-    CHANGED_FILES=""
-    if ! CHANGED_FILES="$(git -C "$REPO_PATH" diff --name-only HEAD 2>&1)"; then
-        CHANGED_FILES=""
-    fi
-    if [[ -n "$CHANGED_FILES" ]] && [[ -x "$SCRIPT_DIR/lint-agent.sh" ]]; then
-        LINT_OUTPUT=""
-        while IFS= read -r file; do
-            [[ -z "$file" ]] && continue
-            if [[ -f "$REPO_PATH/$file" ]]; then
-                if LINT_OUTPUT=$("$SCRIPT_DIR/lint-agent.sh" --json "$REPO_PATH/$file" 2>&1); then
-                    if [[ "$LINT_RESULT" != "fail" ]]; then
-                        LINT_RESULT="pass"
-                    fi
-                else
-                    LINT_RESULT="fail"
-                    OVERALL="fail"
-                    if [[ "$LINT_DETAILS" == "null" ]]; then
-                        LINT_DETAILS="$LINT_OUTPUT"
-                    else
-                        LINT_DETAILS=$(printf '%s\n%s' "$LINT_DETAILS" "$LINT_OUTPUT" | jq -s 'add' 2>/dev/null) || true
-                    fi
-                fi
-            fi
-        done <<< "$CHANGED_FILES"
-    elif [[ -n "$CHANGED_FILES" ]] && [[ ! -x "$SCRIPT_DIR/lint-agent.sh" ]]; then
-        LINT_RESULT="skipped"
-        echo "Warning: lint-agent.sh not found or not executable, skipping lint" >&2
-    fi
-fi
-
-# ── Check 2: Run tests ──────────────────────────────────────────────────────
+source "$SCRIPT_DIR/lib/verify-checks.sh"
 
-# Auto-detect test runner and run with timeout
-run_test_check() {
-    local repo="$1"
-    local test_timeout=120
+# ── Run checks concurrently ──────────────────────────────────────────────────
 
-    if [[ -f "$repo/package.json" ]]; then
-        if ! command -v npm >/dev/null 2>&1; then
-            echo "Warning: npm not found, skipping tests" >&2
-            TESTS_RESULT="skipped"
-            return
-        fi
-        # Use configured timeout or check for long test suites
-        if (cd "$repo" && timeout "$test_timeout" npm test) > "$TEST_LOG" 2>&1; then
-            TESTS_RESULT="pass"
-        else
-            local ec=$?
-            if [[ $ec -eq 124 ]]; then
-                TESTS_RESULT="timeout"
-                echo "Warning: tests timed out after ${test_timeout}s" >&2
-            else
-                TESTS_RESULT="fail"
-            fi
-            OVERALL="fail"
-            echo "=== TEST FAILURES ===" >&2
-            tail -30 "$TEST_LOG" >&2
-        fi
-    elif [[ -f "$repo/Cargo.toml" ]]; then
-        if ! command -v cargo >/dev/null 2>&1; then
-            echo "Warning: cargo not found, skipping tests" >&2
-            TESTS_RESULT="skipped"
-            return
-        fi
-        if (cd "$repo" && timeout 300 cargo test) > "$TEST_LOG" 2>&1; then
-            TESTS_RESULT="pass"
-        else
-            local ec=$?
-            if [[ $ec -eq 124 ]]; then
-                TESTS_RESULT="timeout"
-                echo "Warning: cargo tests timed out after 300s" >&2
-            else
-                TESTS_RESULT="fail"
-            fi
-            OVERALL="fail"
-            echo "=== TEST FAILURES ===" >&2
-            tail -30 "$TEST_LOG" >&2
-        fi
-    elif [[ -f "$repo/go.mod" ]]; then
-        if ! command -v go >/dev/null 2>&1; then
-            # Try common install location
-            export PATH="$PATH:/usr/local/go/bin"
-            if ! command -v go >/dev/null 2>&1; then
-                echo "Warning: go not found, skipping tests" >&2
-                TESTS_RESULT="skipped"
-                return
-            fi
+# Run one check in the background; its fields plus duration_ms go to
+# $CHECK_DIR/<check>.json.
+start_check() {
+    local name="$1"
+    (
+        local started fields
+        started="${EPOCHREALTIME//[^0-9]/}"
+        if ! fields="$("check_$name")"; then
+            echo "Warning: $name check failed to run" >&2
+            fields="{\"$name\":\"skipped\"}"
         fi
-        if (cd "$repo" && timeout 300 go test ./...) > "$TEST_LOG" 2>&1; then
-            TESTS_RESULT="pass"
-        else
-            local ec=$?
-            if [[ $ec -eq 124 ]]; then
-                TESTS_RESULT="timeout"
-                echo "Warning: go tests timed out after 300s" >&2
-            else
-                TESTS_RESULT="fail"
-            fi
-            OVERALL="fail"
-            echo "=== TEST FAILURES ===" >&2
-            tail -30 "$TEST_LOG" >&2
-        fi
-    fi
+        printf '%s\n{"duration_ms":{"%s":%d}}\n' "$fields" "$name" \
+            $(( (${EPOCHREALTIME//[^0-9]/} - started) / 1000 )) > "$CHECK_DIR/$name.json"
+    ) &
 }
 
-run_test_check "$REPO_PATH"
-
-# ── Check 3: Truthsayer ─────────────────────────────────────────────────────
-
-if [[ -v TRUTHSAYER_BIN ]]; then
-    TRUTHSAYER_BIN="${TRUTHSAYER_BIN:?TRUTHSAYER_BIN cannot be empty}"
-else
-    TRUTHSAYER_BIN="$HOME/truthsayer/truthsayer"
-fi
-if [[ -x "$TRUTHSAYER_BIN" ]]; then
-    TS_OUTPUT=""
-    if ! TS_OUTPUT=$("$TRUTHSAYER_BIN" scan --format json "$REPO_PATH" 2>&1); then
-        TS_OUTPUT=""
-    fi
-    if [[ -n "$TS_OUTPUT" ]]; then
-        if ! TRUTHSAYER_ERRORS="$(printf '%s' "$TS_OUTPUT" | jq '.summary.errors // 0' 2>/dev/null)"; then
-            TRUTHSAYER_ERRORS=0
-        fi
-        if ! TRUTHSAYER_WARNINGS="$(printf '%s' "$TS_OUTPUT" | jq '.summary.warnings // 0' 2>/dev/null)"; then
-            TRUTHSAYER_WARNINGS=0
-        fi
-        if [[ "$TRUTHSAYER_ERRORS" =~ ^[0-9]+$ ]] && [[ "$TRUTHSAYER_ERRORS" -gt 0 ]]; then
-            TRUTHSAYER_RESULT="fail"
-            OVERALL="fail"
-        else
-            TRUTHSAYER_RESULT="pass"
-        fi
-    fi
-fi
-
-# ── Check 4: UBS ────────────────────────────────────────────────────────────
-
-if command -v ubs > /dev/null 2>&1; then
-    if ubs "$REPO_PATH" > /dev/null 2>&1; then
-        UBS_RESULT="clean"
-    else
-        UBS_RESULT="issues"
-        OVERALL="fail"
-    fi
-fi
+for check in "${SELECTED[@]}"; do
+    start_check "$check"
+done
+wait
 
 # ── Build JSON output ────────────────────────────────────────────────────────
 
-# Ensure numeric types even if jq parsing failed
-[[ "$TRUTHSAYER_ERRORS" =~ ^[0-9]+$ ]] || TRUTHSAYER_ERRORS=0
-[[ "$TRUTHSAYER_WARNINGS" =~ ^[0-9]+$ ]] || TRUTHSAYER_WARNINGS=0
+# A check counts against overall when it failed; overall stays "pending"
+# while any check has not run yet.
+VERIFY_JQ_DEFS='
+def ordered:
+    . as $c
+    | ["lint", "tests", "ubs", "truthsayer", "prd_governance", "truthsayer_errors",
+       "truthsayer_warnings", "lint_details", "prd_governance_details", "duration_ms"]
+    | map(select(. as $k | $c | has($k)) | {(.): $c[.]}) | add // {};
+def overall:
+    if .lint == "fail" or .prd_governance == "fail" or .truthsayer == "fail"
+       or (.tests == "fail" or .tests == "timeout") or .ubs == "issues" then "fail"
+    elif any(.[]; . == "pending") then "pending"
+    else "pass" end;
+'
+
+# Merge into this bead's earlier result when it is waiting on exactly the
+# checks that just ran.
+VERIFY_FILE=""
+[[ -n "$BEAD_ID" ]] && VERIFY_FILE="$SCRIPT_DIR/../state/results/${BEAD_ID}-verify.json"
+PREVIOUS="null"
+if [[ "$CHECKS" != "all" && -n "$VERIFY_FILE" && -f "$VERIFY_FILE" ]]; then
+    PREVIOUS="$(jq -c --arg repo "$REPO_PATH" --arg selected "${SELECTED[*]}" '
+        select(.repo == $repo and (.pending // []) == ($selected | split(" ")))' "$VERIFY_FILE" 2>/dev/null)" || PREVIOUS=""
+    [[ -n "$PREVIOUS" ]] || PREVIOUS="null"
+fi
 
-JSON_OUTPUT=$(jq -n \
+JSON_OUTPUT=$(cat "$CHECK_DIR"/*.json | jq -s \
     --arg repo "$REPO_PATH" \
     --arg bead "$BEAD_ID" \
-    --arg lint "$LINT_RESULT" \
-    --arg tests "$TESTS_RESULT" \
-    --arg ubs "$UBS_RESULT" \
-    --arg truthsayer "$TRUTHSAYER_RESULT" \
-    --arg prd_governance "$PRD_GOVERNANCE_RESULT" \
-    --argjson ts_errors "$TRUTHSAYER_ERRORS" \
-    --argjson ts_warnings "$TRUTHSAYER_WARNINGS" \
-    --argjson lint_details "$LINT_DETAILS" \
-    --argjson prd_governance_details "$PRD_GOVERNANCE_DETAILS" \
-    --arg overall "$OVERALL" \
-    '{
+    --argjson previous "$PREVIOUS" \
+    --arg pending "${PENDING[*]}" \
+    "$VERIFY_JQ_DEFS"'
+    (reduce .[] as $fields ({}; . * $fields)) as $ran
+    | ($pending | split(" ") | map(select(length > 0))) as $pending
+    | (if $previous != null then
+        ($previous.checks * $ran) as $merged
+        | {checks: $merged, pending: ($previous.pending - ($ran | keys))}
+       else
+        {checks: (reduce $pending[] as $name ($ran; .[$name] = "pending")), pending: $pending}
+       end) as $state
+    | {
         repo: $repo,
         bead: $bead,
-        checks: {
-            lint: $lint,
-            tests: $tests,
-            ubs: $ubs,
-            truthsayer: $truthsayer,
-            prd_governance: $prd_governance,
-            truthsayer_errors: $ts_errors,
-            truthsayer_warnings: $ts_warnings,
-            lint_details: $lint_details,
-            prd_governance_details: $prd_governance_details
-        },
-        overall: $overall
+        checks: ($state.checks | ordered),
+        pending: $state.pending,
+        overall: ($state.checks | overall)
     }')
 
 echo "$JSON_OUTPUT"
@@ -0,0 +1,203 @@
+#!/usr/bin/env bash
+# watcher.sh — Single watcher daemon for every in-flight dispatch
+#
+# Usage:
+#   watcher.sh start             Start the daemon in the background (no-op if already running)
+#   watcher.sh run [--once]      Run the watch loop in the foreground
+#   watcher.sh stop              Stop the daemon (in-flight completions keep running)
+#   watcher.sh status [--json]   Show the daemon and the beads it is tracking
+#
+# dispatch.sh (DISPATCH_WATCHER=daemon) drops a state/watch/<bead>.watch.json spec
+# per bead instead of forking its own watcher. Each tick costs one jq over all
+# specs, one tmux list-sessions per socket, one jq over written status files,
+# one Relay inbox read and one df, then finished beads are handed to
+# `dispatch.sh --complete` (scripts/lib/watcher-tick.sh). Runners poke
+# state/watch/watcher.wake on exit.
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+WORKSPACE_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
+
+source "$SCRIPT_DIR/lib/common.sh"
+source "$SCRIPT_DIR/lib/watcher-tick.sh"
+
+WATCH_DIR="$WORKSPACE_ROOT/state/watch"
+PID_FILE="$WATCH_DIR/watcher.pid"
+WAKE_FIFO="$WATCH_DIR/watcher.wake"
+STATE_FILE="$WATCH_DIR/watcher.state.json"
+LOG_FILE="$WATCH_DIR/watcher.log"
+DISPATCH_SCRIPT="$SCRIPT_DIR/dispatch.sh"
+
+TICK_SECONDS="${DISPATCH_WATCHER_INTERVAL:-20}"
+IDLE_EXIT_SECONDS="${DISPATCH_WATCHER_IDLE_EXIT:-900}"
+USE_RELAY="${DISPATCH_USE_RELAY:-true}"
+RELAY_BIN="${DISPATCH_RELAY_BIN:-$HOME/go/bin/relay}"
+RELAY_ORCHESTRATOR_AGENT="${DISPATCH_RELAY_ORCHESTRATOR_AGENT:-athena}"
+
+is_integer "$TICK_SECONDS" && (( TICK_SECONDS >= 1 )) || {
+    echo "Error: DISPATCH_WATCHER_INTERVAL must be a positive integer (got '$TICK_SECONDS')" >&2
+    exit 1
+}
+is_integer "$IDLE_EXIT_SECONDS" || {
+    echo "Error: DISPATCH_WATCHER_IDLE_EXIT must be a non-negative integer (got '$IDLE_EXIT_SECONDS')" >&2
+    exit 1
+}
+
+mkdir -p "$WATCH_DIR"
+
+declare -A COMPLETING=()   # bead -> PID of its `dispatch.sh --complete`
+TICK_COUNT=0
+TRACKED_COUNT=0
+STOP_REQUESTED=false
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+usage() { sed -n '2,/^set /{ /^#/s/^# \?//p }' "$0"; }
+
+log() { printf '%s %s\n' "$(iso_now)" "$*"; }
+
+daemon_pid() {
+    local pid
+    [[ -f "$PID_FILE" ]] || return 1
+    pid="$(head -1 "$PID_FILE" 2>/dev/null)" || return 1
+    [[ -n "$pid" ]] && kill -0 "$pid" 2>/dev/null || return 1
+    echo "$pid"
+}
+
+ensure_fifo() {
+    [[ -p "$WAKE_FIFO" ]] || mkfifo "$WAKE_FIFO" 2>/dev/null || [[ -p "$WAKE_FIFO" ]]
+}
+
+# Take the PID file atomically; a stale file from a dead daemon is replaced once.
+acquire_pid_file() {
+    local holder
+    if ( set -o noclobber; echo "$$" > "$PID_FILE" ) 2>/dev/null; then
+        return 0
+    fi
+    if holder="$(daemon_pid)"; then
+        echo "Error: watcher daemon already running (PID $holder)" >&2
+        return 1
+    fi
+    rm -f "$PID_FILE"
+    ( set -o noclobber; echo "$$" > "$PID_FILE" ) 2>/dev/null
+}
+
+# ── Commands ─────────────────────────────────────────────────────────────────
+
+cmd_run() {
+    local once="$1" wake_fd="" idle_since _line=""
+
+    require_cmd jq
+    require_cmd tmux
+    acquire_pid_file || exit 1
+    trap 'rm -f "$PID_FILE"' EXIT
+    trap 'STOP_REQUESTED=true' SIGTERM SIGINT SIGHUP
+
+    ensure_fifo || { echo "Error: cannot create wake FIFO $WAKE_FIFO" >&2; exit 1; }
+    exec {wake_fd}<>"$WAKE_FIFO"
+    recover_claimed_specs
+    log "watcher started pid=$$ interval=${TICK_SECONDS}s idle_exit=${IDLE_EXIT_SECONDS}s"
+
+    idle_since="$(epoch_now)"
+    while true; do
+        tick
+        [[ "$once" == "true" || "$STOP_REQUESTED" == "true" ]] && break
+
+        if (( TRACKED_COUNT > 0 || ${#COMPLETING[@]} > 0 )); then
+            idle_since="$(epoch_now)"
+        elif (( IDLE_EXIT_SECONDS > 0 && $(epoch_now) - idle_since >= IDLE_EXIT_SECONDS )); then
+            log "idle for ${IDLE_EXIT_SECONDS}s, exiting"
+            break
+        fi
+
+        read -r -t "$TICK_SECONDS" -u "$wake_fd" _line 2>/dev/null || true
+        # Coalesce a burst of pokes into one tick
+        while read -r -t 0.05 -u "$wake_fd" _line 2>/dev/null; do :; done
+    done
+
+    reap_completions
+    log "watcher stopped pid=$$ (in-flight completions: ${#COMPLETING[@]})"
+}
+
+cmd_start() {
+    local pid i
+    if pid="$(daemon_pid)"; then
+        echo "Watcher already running (PID $pid)"
+        return 0
+    fi
+    ensure_fifo || { echo "Error: cannot create wake FIFO $WAKE_FIFO" >&2; return 1; }
+
+    if command -v setsid >/dev/null 2>&1; then
+        setsid "$0" run >>"$LOG_FILE" 2>&1 </dev/null &
+    else
+        nohup "$0" run >>"$LOG_FILE" 2>&1 </dev/null &
+    fi
+
+    for i in $(seq 1 50); do
+        if pid="$(daemon_pid)"; then
+            echo "Watcher started (PID $pid)"
+            return 0
+        fi
+        sleep 0.1
+    done
+    echo "Error: watcher failed to start; see $LOG_FILE" >&2
+    return 1
+}
+
+cmd_stop() {
+    local pid i
+    if ! pid="$(daemon_pid)"; then
+        echo "Watcher not running"
+        rm -f "$PID_FILE"
+        return 0
+    fi
+    kill "$pid" 2>/dev/null || true
+    # Wake it so the stop is noticed without waiting out a tick
+    printf 'stop\n' 1<>"$WAKE_FIFO" 2>/dev/null || true
+    for i in $(seq 1 50); do
+        kill -0 "$pid" 2>/dev/null || { echo "Watcher stopped (PID $pid)"; return 0; }
+        sleep 0.1
+    done
+    echo "Error: watcher (PID $pid) did not stop" >&2
+    return 1
+}
+
+cmd_status() {
+    local json="$1" pid="" running="false" pending=0 state='{}' spec
+
+    pid="$(daemon_pid)" && running="true" || pid=""
+    [[ -f "$STATE_FILE" ]] && state="$(cat "$STATE_FILE")"
+    for spec in "$WATCH_DIR"/*.watch.json; do
+        [[ -f "$spec" ]] && pending=$((pending + 1))
+    done
+
+    if [[ "$json" == "true" ]]; then
+        jq -n --argjson state "$state" --argjson running "$running" --arg pid "$pid" --argjson specs "$pending" \
+            '$state + {running:$running, pid:(if $pid == "" then null else ($pid | tonumber) end), specs_on_disk:$specs}'
+        return 0
+    fi
+
+    if [[ "$running" == "true" ]]; then
+        echo "Watcher: running (PID $pid)"
+    else
+        echo "Watcher: stopped"
+    fi
+    echo "Specs on disk: $pending"
+    jq -r '
+        "Last tick: \(.last_tick_at // "never") (tick #\(.ticks // 0))",
+        "Completing: \(if (.completing // []) == [] then "none" else (.completing | join(", ")) end)",
+        (if (.tracked // []) == [] then "Tracking: none"
+         else "Tracking:", (.tracked[] | "  \(.bead)  session=\(.session) alive=\(.session_alive) age=\(.age_seconds)s deadline_in=\(.deadline_epoch - .started_epoch - .age_seconds)s")
+         end)' <<< "$state"
+}
+
+# ── Main ─────────────────────────────────────────────────────────────────────
+
+case "${1:-}" in
+    start)  cmd_start ;;
+    stop)   cmd_stop ;;
+    run)    cmd_run "$([[ "${2:-}" == "--once" ]] && echo true || echo false)" ;;
+    status) cmd_status "$([[ "${2:-}" == "--json" ]] && echo true || echo false)" ;;
+    --help|-h|help) usage ;;
+    *)      echo "Error: unknown command '${1:-}'" >&2; usage; exit 1 ;;
+esac
@@ -0,0 +1,111 @@
+#!/usr/bin/env bash
+# tests/bench/record-forks.sh — Processes spawned per dispatch for record writes
+#
+# Usage:
+#   tests/bench/record-forks.sh [--iterations N] [--baseline-ref REF]
+#
+# Replays the record writes of one dispatch (running on launch, done on
+# completion) N times against a scratch state dir, with PATH shims that log
+# every external command. Reports spawned processes, jq calls and wall time
+# per dispatch for:
+#   batch       write_records (what dispatch.sh uses)
+#   per-record  write_run_record + write_result_record
+#   baseline    REF's record.sh + the advisory validate-state.sh call that
+#               complete_run made before records were checked at build time
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+WORKSPACE_ROOT="$(cd "$SCRIPT_DIR/../.." && pwd)"
+
+ITERATIONS=20
+BASELINE_REF=""
+
+while [[ $# -gt 0 ]]; do
+    case "$1" in
+        --iterations) ITERATIONS="${2:?--iterations requires a value}"; shift 2 ;;
+        --baseline-ref) BASELINE_REF="${2:?--baseline-ref requires a git ref}"; shift 2 ;;
+        --help|-h) sed -n '2,/^set /{ /^#/s/^# \?//p }' "$0"; exit 0 ;;
+        *) echo "Unknown option: $1" >&2; exit 1 ;;
+    esac
+done
+
+SCRATCH="$(mktemp -d)"
+trap 'rm -rf "$SCRATCH"' EXIT
+
+# ── PATH shims ───────────────────────────────────────────────────────────────
+
+SHIM_DIR="$SCRATCH/shims"
+mkdir -p "$SHIM_DIR"
+for cmd in jq mktemp mv cat sqlite3 awk sed head tail date sha256sum find xargs sh bash; do
+    real="$(command -v "$cmd" 2>/dev/null)" || continue
+    printf '#!%s\necho %s >> "$BENCH_FORK_LOG"\nexec %s "$@"\n' "$(command -v sh)" "$cmd" "$real" \
+        > "$SHIM_DIR/$cmd"
+    chmod +x "$SHIM_DIR/$cmd"
+done
+
+# ── Scenario ─────────────────────────────────────────────────────────────────
+
+# Run one mode in a subshell; prints "<execs> <jq> <ms>" per dispatch.
+measure() {
+    local mode="$1" lib="$2" validator="${3:-}"
+    local state="$SCRATCH/$mode/state"
+    mkdir -p "$state/runs" "$state/results"
+    (
+        source "$WORKSPACE_ROOT/scripts/lib/common.sh"
+        source "$lib"
+        AGENT_TYPE="claude" MODEL="sonnet" REPO_PATH="$SCRATCH/repo"
+        PROMPT="Fix the flaky retry test in the dispatcher"
+        PROMPT_TRUNCATED="$PROMPT" PROMPT_HASH="$(printf '%s' "$PROMPT" | sha256sum | awk '{print $1}')"
+        TEMPLATE_NAME="bug-fix" ATTEMPT=1 MAX_RETRIES=2
+        RUNS_DIR="$state/runs" RESULTS_DIR="$state/results"
+        run_index_rebuild "$RUNS_DIR" 2>/dev/null || true
+
+        export BENCH_FORK_LOG="$SCRATCH/$mode.log"
+        : > "$BENCH_FORK_LOG"
+        PATH="$SHIM_DIR:$PATH"
+        local i start end
+        start="$(date +%s%N)"
+        for (( i = 1; i <= ITERATIONS; i++ )); do
+            BEAD_ID="bd-bench$i" SESSION_NAME="agent-bd-bench$i"
+            RUN_RECORD="$RUNS_DIR/$BEAD_ID.json" RESULT_RECORD="$RESULTS_DIR/$BEAD_ID.json"
+            STARTED_AT="2026-10-17T00:00:00Z"
+            case "$mode" in
+                batch)
+                    write_records "running" "dispatched" "" "" "" "false"
+                    write_records "done" "status-file" "2026-10-17T00:01:00Z" "60" "0" "false" "ok" "" "null"
+                    ;;
+                *)
+                    write_run_record "running" "" "" ""
+                    write_result_record "running" "dispatched" "" "" "" "false"
+                    write_run_record "done" "2026-10-17T00:01:00Z" "60" "0" "ok" "" "null"
+                    write_result_record "done" "status-file" "2026-10-17T00:01:00Z" "60" "0" "false" "ok" "null"
+                    if [[ -n "$validator" ]]; then
+                        "$validator" --runs "$RUN_RECORD" --results "$RESULT_RECORD" 2>/dev/null || true
+                    fi
+                    ;;
+            esac
+        done
+        end="$(date +%s%N)"
+        PATH="${PATH#"$SHIM_DIR:"}"
+        printf '%s %s %s\n' \
+            "$(( $(wc -l < "$BENCH_FORK_LOG") / ITERATIONS ))" \
+            "$(( $(grep -c '^jq$' "$BENCH_FORK_LOG" || true) / ITERATIONS ))" \
+            "$(( (end - start) / 1000000 / ITERATIONS ))"
+    )
+}
+
+report() {
+    local mode="$1" execs jq_calls ms
+    read -r execs jq_calls ms
+    printf '%-12s %16s %12s %14s\n' "$mode" "$execs" "$jq_calls" "$ms"
+}
+
+printf '%-12s %16s %12s %14s\n' "mode" "procs/dispatch" "jq/dispatch" "ms/dispatch"
+if [[ -n "$BASELINE_REF" ]]; then
+    git -C "$WORKSPACE_ROOT" show "$BASELINE_REF:scripts/lib/record.sh" > "$SCRATCH/record-baseline.sh"
+    git -C "$WORKSPACE_ROOT" show "$BASELINE_REF:scripts/validate-state.sh" > "$SCRATCH/validate-state.sh"
+    chmod +x "$SCRATCH/validate-state.sh"
+    measure baseline "$SCRATCH/record-baseline.sh" "$SCRATCH/validate-state.sh" | report baseline
+fi
+measure per-record "$WORKSPACE_ROOT/scripts/lib/record.sh" | report per-record
+measure batch "$WORKSPACE_ROOT/scripts/lib/record.sh" | report batch
@@ -1,5 +1,6 @@
 #!/usr/bin/env bash
-# Test: dispatch.sh full lifecycle — create bead, dispatch trivial task, wait for completion, verify results
+# Test: dispatch.sh full lifecycle — create bead, dispatch trivial task, wait for completion, verify results.
+# Runs once per watcher: inline, the watcher daemon, and the inline fallback when the daemon cannot start.
 set -euo pipefail
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
@@ -7,20 +8,26 @@ source "$SCRIPT_DIR/helpers.sh"
 WORKSPACE="$(cd "$SCRIPT_DIR/../.." && pwd)"
 
 TEST_NAME="dispatch-lifecycle"
-BEAD_ID=""
+BEAD_IDS=()
 TEST_REPO=""
 TMUX_SOCKET="/tmp/openclaw-e2e-test.sock"
+WATCH_DIR="$WORKSPACE/state/watch"
+STARTED_DAEMON="false"
 
 cleanup() {
-    [[ -n "$BEAD_ID" ]] && {
-        if ! br delete "$BEAD_ID" --force >/dev/null 2>&1; then
-            echo "WARN: cleanup failed to delete bead $BEAD_ID" >&2
+    local bead
+    for bead in "${BEAD_IDS[@]}"; do
+        if ! br delete "$bead" --force >/dev/null 2>&1; then
+            echo "WARN: cleanup failed to delete bead $bead" >&2
         fi
-        rm -f "$WORKSPACE/state/runs/$BEAD_ID.json" \
-              "$WORKSPACE/state/results/$BEAD_ID.json" \
-              "$WORKSPACE/state/results/${BEAD_ID}-verify.json" \
-              "$WORKSPACE/state/watch/$BEAD_ID".*
-    }
+        rm -f "$WORKSPACE/state/runs/$bead.json" \
+              "$WORKSPACE/state/results/$bead.json" \
+              "$WORKSPACE/state/results/${bead}-verify.json" \
+              "$WATCH_DIR/$bead".*
+    done
+    if [[ "$STARTED_DAEMON" == "true" ]]; then
+        "$WORKSPACE/scripts/watcher.sh" stop >/dev/null 2>&1 || true
+    fi
     [[ -n "$TEST_REPO" ]] && rm -rf "$TEST_REPO"
     if ! tmux -S "$TMUX_SOCKET" kill-server 2>/dev/null; then  # REASON: isolated test socket may already be gone by cleanup time.
         :
@@ -28,6 +35,56 @@ cleanup() {
 }
 trap cleanup EXIT
 
+# Dispatch one bead and wait for its result record. Extra arguments are
+# NAME=value environment overrides for dispatch.sh. Sets BEAD_ID, DISPATCH_OUTPUT
+# and COMPLETION_LAG (seconds from the agent's finished_at to the result landing).
+run_lifecycle() {
+    local label="$1" status finished_epoch seen_epoch=0 deadline
+    shift
+
+    BEAD_ID="$(br q "e2e-dispatch-test-$label-$(date +%s)")"
+    assert_not_empty "$BEAD_ID" "$label: bead created"
+    BEAD_IDS+=("$BEAD_ID")
+
+    DISPATCH_OUTPUT="$(env "$@" "$WORKSPACE/scripts/dispatch.sh" "$BEAD_ID" "$TEST_REPO" codex \
+        "Create a file called hello.txt containing exactly 'hello world'. Nothing else." \
+        2>&1)" || fail "$TEST_NAME" "$label: dispatch.sh failed to launch"
+
+    echo "  [$label] Waiting for agent completion (up to 120s)..."
+    deadline=$((SECONDS + 150))
+    while (( SECONDS < deadline )); do
+        if [[ -f "$WORKSPACE/state/results/$BEAD_ID.json" ]]; then
+            status="$(jq -r '.status' "$WORKSPACE/state/results/$BEAD_ID.json")"
+            if [[ "$status" == "done" || "$status" == "failed" || "$status" == "timeout" ]]; then
+                seen_epoch="$(date +%s)"
+                break
+            fi
+        fi
+        sleep 1
+    done
+
+    # Verify result and run records exist
+    RESULT_FILE="$WORKSPACE/state/results/$BEAD_ID.json"
+    RUN_FILE="$WORKSPACE/state/runs/$BEAD_ID.json"
+    assert_file_exists "$RESULT_FILE" "$label: result record created"
+    assert_file_exists "$RUN_FILE" "$label: run record created"
+
+    # We accept done or failed — the test verifies the pipeline works, not that codex succeeds
+    RESULT_STATUS="$(jq -r '.status' "$RESULT_FILE")"
+    echo "  [$label] Agent finished with status: $RESULT_STATUS"
+    [[ "$RESULT_STATUS" == "done" || "$RESULT_STATUS" == "failed" || "$RESULT_STATUS" == "timeout" ]] || \
+        fail "$TEST_NAME" "$label: unexpected status: $RESULT_STATUS"
+
+    # Verify JSON structure
+    jq -e '.bead and .agent and .model and .status' "$RESULT_FILE" >/dev/null 2>&1 || \
+        fail "$TEST_NAME" "$label: result record missing required fields"
+    jq -e '.bead and .agent and .model and .status' "$RUN_FILE" >/dev/null 2>&1 || \
+        fail "$TEST_NAME" "$label: run record missing required fields"
+
+    finished_epoch="$(date -d "$(jq -r '.finished_at // empty' "$RESULT_FILE")" +%s 2>/dev/null)" || finished_epoch="$seen_epoch"
+    COMPLETION_LAG=$((seen_epoch - finished_epoch))
+}
+
 begin "$TEST_NAME"
 
 # Check codex is available
@@ -40,51 +97,31 @@ git init -q
 echo "# test" > README.md
 git add . && git commit -q -m "init"
 
-# Create bead
-BEAD_ID="$(br q "e2e-dispatch-test-$(date +%s)")"
-assert_not_empty "$BEAD_ID" "bead created"
-
 # Dispatch with isolated tmux socket and short timeout
 export DISPATCH_TMUX_SOCKET="$TMUX_SOCKET"
 export DISPATCH_WATCH_INTERVAL="5"
 export DISPATCH_WATCH_TIMEOUT="120"
 
-"$WORKSPACE/scripts/dispatch.sh" "$BEAD_ID" "$TEST_REPO" codex \
-    "Create a file called hello.txt containing exactly 'hello world'. Nothing else." \
-    2>&1 || fail "$TEST_NAME" "dispatch.sh failed to launch"
-
-echo "  Waiting for agent completion (up to 120s)..."
-DEADLINE=$((SECONDS + 120))
-while (( SECONDS < DEADLINE )); do
-    if [[ -f "$WORKSPACE/state/results/$BEAD_ID.json" ]]; then
-        STATUS="$(jq -r '.status' "$WORKSPACE/state/results/$BEAD_ID.json")"
-        if [[ "$STATUS" == "done" || "$STATUS" == "failed" || "$STATUS" == "timeout" ]]; then
-            break
-        fi
-    fi
-    sleep 5
+# 1. Inline watcher
+run_lifecycle "inline" DISPATCH_WATCHER=inline
+
+# 2. Watcher daemon: the spec is claimed and completed through dispatch.sh --complete
+"$WORKSPACE/scripts/watcher.sh" status --json | jq -e '.running' >/dev/null 2>&1 || STARTED_DAEMON="true"
+run_lifecycle "daemon" DISPATCH_WATCHER=daemon
+assert_contains "$DISPATCH_OUTPUT" "Tracked by watcher daemon" "daemon: bead handed to the daemon"
+grep -q "complete bead=$BEAD_ID " "$WATCH_DIR/watcher.log" || \
+    fail "$TEST_NAME" "daemon: watcher log has no completion for $BEAD_ID"
+for _i in $(seq 1 50); do
+    [[ -f "$WATCH_DIR/$BEAD_ID.claimed.json" ]] || break
+    sleep 0.1
 done
-
-# Verify result record exists
-RESULT_FILE="$WORKSPACE/state/results/$BEAD_ID.json"
-assert_file_exists "$RESULT_FILE" "result record created"
-
-# Verify run record exists
-RUN_FILE="$WORKSPACE/state/runs/$BEAD_ID.json"
-assert_file_exists "$RUN_FILE" "run record created"
-
-# Check status
-RESULT_STATUS="$(jq -r '.status' "$RESULT_FILE")"
-echo "  Agent finished with status: $RESULT_STATUS"
-
-# We accept done or failed — the test verifies the pipeline works, not that codex succeeds
-[[ "$RESULT_STATUS" == "done" || "$RESULT_STATUS" == "failed" || "$RESULT_STATUS" == "timeout" ]] || \
-    fail "$TEST_NAME" "unexpected status: $RESULT_STATUS"
-
-# Verify JSON structure
-jq -e '.bead and .agent and .model and .status' "$RESULT_FILE" >/dev/null 2>&1 || \
-    fail "$TEST_NAME" "result record missing required fields"
-jq -e '.bead and .agent and .model and .status' "$RUN_FILE" >/dev/null 2>&1 || \
-    fail "$TEST_NAME" "run record missing required fields"
+assert_file_not_exists "$WATCH_DIR/$BEAD_ID.watch.json" "daemon: watch spec claimed"
+assert_file_not_exists "$WATCH_DIR/$BEAD_ID.claimed.json" "daemon: claimed spec removed after --complete"
+(( COMPLETION_LAG < 30 )) || fail "$TEST_NAME" "daemon: completion took ${COMPLETION_LAG}s after the agent finished"
+
+# 3. Daemon cannot start: the inline fallback must be woken by the runner, not the 120s fallback poll
+run_lifecycle "fallback" DISPATCH_WATCHER=daemon DISPATCH_WATCHER_BIN=/bin/false DISPATCH_WATCH_FALLBACK_INTERVAL=120
+assert_contains "$DISPATCH_OUTPUT" "using an inline watcher" "fallback: inline watcher used"
+(( COMPLETION_LAG < 30 )) || fail "$TEST_NAME" "fallback: completion took ${COMPLETION_LAG}s after the agent finished"
 
 pass "$TEST_NAME"
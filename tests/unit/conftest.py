@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_centurion_state(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep Centurion's pooled state and caches out of the real workspace, so
+    a cached pass or verdict from one run cannot mask gate behaviour in the
+    next. Tests copy os.environ (or inherit it), so these reach every
+    centurion.sh they run."""
+    monkeypatch.setenv("CENTURION_WORKTREE_ROOT", str(tmp_path / "worktrees"))
+    monkeypatch.setenv("CENTURION_GATE_CACHE_DIR", str(tmp_path / "gate-cache"))
+    monkeypatch.setenv("CONFIG_SNAPSHOT_DIR", str(tmp_path / "config-cache"))
+    monkeypatch.setenv("CENTURION_SEMANTIC_CACHE_DIR", str(tmp_path / "semantic-cache"))
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import subprocess
+import time
+
+CENTURION = Path("scripts/centurion.sh")
+
+
+def _run(*args: str, env: dict[str, str] | None = None) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        ["bash", str(CENTURION), *args],
+        text=True,
+        capture_output=True,
+        check=False,
+        env=env,
+    )
+
+
+def _git(repo: Path, *args: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        ["git", "-C", str(repo), *args],
+        text=True,
+        capture_output=True,
+        check=False,
+    )
+
+
+def _must_git(repo: Path, *args: str) -> str:
+    proc = _git(repo, *args)
+    assert proc.returncode == 0, proc.stderr
+    return proc.stdout.strip()
+
+
+def _setup_repo(repo: Path) -> None:
+    _must_git(repo, "init", "-b", "main")
+    _must_git(repo, "config", "user.name", "Centurion Test")
+    _must_git(repo, "config", "user.email", "centurion@example.com")
+    (repo / "README.md").write_text("hello\n", encoding="utf-8")
+    _must_git(repo, "add", "README.md")
+    _must_git(repo, "commit", "-m", "base")
+
+
+def _env(tmp_path: Path, repo: Path, repo_config: dict[str, object]) -> tuple[dict[str, str], Path]:
+    config_file = tmp_path / "agents.json"
+    config_file.write_text(json.dumps({"repos": {str(repo): {"timeout": 60, **repo_config}}}), encoding="utf-8")
+    history_file = tmp_path / "centurion-history.jsonl"
+
+    env = os.environ.copy()
+    env["CONFIG_FILE"] = str(config_file)
+    env["CENTURION_HISTORY_FILE"] = str(history_file)
+    env["CENTURION_SKIP_TRUTHSAYER"] = "true"
+    return env, history_file
+
+
+def _last_history(history_file: Path) -> dict[str, object]:
+    return json.loads(history_file.read_text(encoding="utf-8").strip().splitlines()[-1])
+
+
+def test_standard_gates_run_concurrently_and_record_wall_time(tmp_path: Path) -> None:
+    repo = tmp_path / "repo-parallel"
+    repo.mkdir()
+    _setup_repo(repo)
+    env, history_file = _env(tmp_path, repo, {"lint_cmd": "sleep 1.5", "test_cmd": "sleep 1.5"})
+
+    started = time.monotonic()
+    result = _run("check", "--level", "standard", str(repo), env=env)
+    elapsed_ms = (time.monotonic() - started) * 1000
+    assert result.returncode == 0, result.stderr
+
+    assert "Lint gate passed: sleep 1.5" in result.stdout
+    assert "Test gate passed: sleep 1.5" in result.stdout
+
+    payload = _last_history(history_file)
+    gates = {gate["name"]: gate for gate in payload["gates"]}
+    assert [gate["name"] for gate in payload["gates"]] == ["lint", "tests", "truthsayer"]
+    assert gates["lint"]["status"] == "pass"
+    assert gates["lint"]["duration_ms"] >= 1400
+    assert gates["tests"]["duration_ms"] >= 1400
+    # Overlapping gates: the whole check is shorter than lint + tests back to back.
+    assert elapsed_ms < gates["lint"]["duration_ms"] + gates["tests"]["duration_ms"]
+    assert payload["checks"].startswith("lint:")
+    assert "tests:" in payload["checks"]
+
+
+def test_failing_gate_cancels_the_others(tmp_path: Path) -> None:
+    repo = tmp_path / "repo-failfast"
+    repo.mkdir()
+    _setup_repo(repo)
+    marker = tmp_path / "lint-finished"
+    env, history_file = _env(
+        tmp_path,
+        repo,
+        {"lint_cmd": f"sleep 4 && touch {marker}", "test_cmd": "echo broken >&2; exit 7"},
+    )
+
+    started = time.monotonic()
+    result = _run("check", "--level", "standard", str(repo), env=env)
+    elapsed = time.monotonic() - started
+    assert result.returncode == 1
+    assert elapsed < 4
+    assert "Test gate failed" in result.stderr
+    assert "Lint gate cancelled: Test gate failed" in result.stdout
+
+    payload = _last_history(history_file)
+    statuses = {gate["name"]: gate["status"] for gate in payload["gates"]}
+    assert statuses["lint"] == "cancelled"
+    assert statuses["tests"] == "fail"
+    assert "lint:cancelled" in payload["checks"]
+
+    time.sleep(max(0.0, 5 - elapsed))
+    assert not marker.exists(), "cancelled lint gate kept running"
+
+
+def test_gate_concurrency_one_runs_gates_in_order(tmp_path: Path) -> None:
+    repo = tmp_path / "repo-serial"
+    repo.mkdir()
+    _setup_repo(repo)
+    env, history_file = _env(
+        tmp_path,
+        repo,
+        {"lint_cmd": "exit 3", "test_cmd": "sleep 1", "gate_concurrency": 1},
+    )
+
+    result = _run("check", "--level", "standard", str(repo), env=env)
+    assert result.returncode == 1
+    assert "Lint gate failed: exit 3" in result.stderr
+
+    statuses = {gate["name"]: gate["status"] for gate in _last_history(history_file)["gates"]}
+    assert statuses == {"lint": "fail", "tests": "not-run", "truthsayer": "not-run"}
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import subprocess
+import time
+
+CENTURION = Path("scripts/centurion.sh")
+
+
+def _run(*args: str, env: dict[str, str] | None = None) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        ["bash", str(CENTURION), *args],
+        text=True,
+        capture_output=True,
+        check=False,
+        env=env,
+    )
+
+
+def _must_git(repo: Path, *args: str) -> str:
+    proc = subprocess.run(["git", "-C", str(repo), *args], text=True, capture_output=True, check=False)
+    assert proc.returncode == 0, proc.stderr
+    return proc.stdout.strip()
+
+
+def _setup(tmp_path: Path) -> tuple[Path, Path, dict[str, str], Path]:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _must_git(repo, "init", "-b", "main")
+    _must_git(repo, "config", "user.name", "Centurion Test")
+    _must_git(repo, "config", "user.email", "centurion@example.com")
+    (repo / "README.md").write_text("hello\n", encoding="utf-8")
+    _must_git(repo, "add", "README.md")
+    _must_git(repo, "commit", "-m", "base")
+
+    gate_log = tmp_path / "gate.log"
+    config_file = tmp_path / "agents.json"
+    config_file.write_text(
+        json.dumps(
+            {
+                "repos": {
+                    str(repo): {
+                        "timeout": 60,
+                        "lint_cmd": f"echo lint >> {gate_log}",
+                        "test_cmd": f"echo tests >> {gate_log}",
+                    }
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+    history_file = tmp_path / "centurion-history.jsonl"
+
+    env = os.environ.copy()
+    env["CONFIG_FILE"] = str(config_file)
+    env["CENTURION_HISTORY_FILE"] = str(history_file)
+    env["CENTURION_GATE_CACHE_DIR"] = str(tmp_path / "gate-cache")
+    env["CENTURION_SKIP_TRUTHSAYER"] = "true"
+    return repo, gate_log, env, history_file
+
+
+def _history(history_file: Path) -> list[dict[str, object]]:
+    return [json.loads(line) for line in history_file.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def test_passing_gates_are_cached_for_the_same_tree(tmp_path: Path) -> None:
+    repo, gate_log, env, history_file = _setup(tmp_path)
+
+    first = _run("check", "--level", "standard", str(repo), env=env)
+    assert first.returncode == 0, first.stderr
+    second = _run("check", "--level", "standard", str(repo), env=env)
+    assert second.returncode == 0, second.stderr
+
+    assert sorted(gate_log.read_text(encoding="utf-8").split()) == ["lint", "tests"]
+    assert "Lint gate passed (cached for tree" in second.stdout
+    assert "Test gate passed (cached for tree" in second.stdout
+
+    runs = _history(history_file)
+    assert runs[0]["cache_hits"] == 0
+    assert runs[1]["cache_hits"] == 2
+    assert "lint:cached" in str(runs[1]["checks"])
+    statuses = {gate["name"]: gate["status"] for gate in runs[1]["gates"]}
+    assert statuses["lint"] == "cached"
+    assert statuses["tests"] == "cached"
+
+    # A new commit is a new tree, so the gates run again.
+    (repo / "README.md").write_text("changed\n", encoding="utf-8")
+    _must_git(repo, "commit", "-am", "change")
+    third = _run("check", "--level", "standard", str(repo), env=env)
+    assert third.returncode == 0, third.stderr
+    assert gate_log.read_text(encoding="utf-8").split().count("lint") == 2
+    assert _history(history_file)[-1]["cache_hits"] == 0
+
+
+def test_dirty_worktree_and_failures_are_not_cached(tmp_path: Path) -> None:
+    repo, gate_log, env, history_file = _setup(tmp_path)
+    (repo / "untracked.txt").write_text("wip\n", encoding="utf-8")
+
+    for _ in range(2):
+        result = _run("check", "--level", "standard", str(repo), env=env)
+        assert result.returncode == 0, result.stderr
+    assert gate_log.read_text(encoding="utf-8").split().count("tests") == 2
+    assert not (tmp_path / "gate-cache").exists()
+
+    (repo / "untracked.txt").unlink()
+    config_file = Path(env["CONFIG_FILE"])
+    config = json.loads(config_file.read_text(encoding="utf-8"))
+    config["repos"][str(repo)]["test_cmd"] = f"echo tests >> {gate_log}; exit 1"
+    config["repos"][str(repo)]["gate_concurrency"] = 1  # lint finishes before tests fail
+    config_file.write_text(json.dumps(config), encoding="utf-8")
+
+    for _ in range(2):
+        assert _run("check", "--level", "standard", str(repo), env=env).returncode == 1
+    assert gate_log.read_text(encoding="utf-8").split().count("tests") == 4
+    assert _history(history_file)[-1]["cache_hits"] == 1  # lint still passes on this tree
+
+
+def test_cache_eviction_by_age_and_count(tmp_path: Path) -> None:
+    repo, _gate_log, env, _history_file = _setup(tmp_path)
+    cache_dir = tmp_path / "gate-cache"
+    cache_dir.mkdir()
+    expired = cache_dir / "expired.json"
+    expired.write_text("{}", encoding="utf-8")
+    old = time.time() - 3 * 3600
+    os.utime(expired, (old, old))
+    for index in range(5):
+        entry = cache_dir / f"filler-{index}.json"
+        entry.write_text("{}", encoding="utf-8")
+        os.utime(entry, (old + 5400 + index, old + 5400 + index))
+
+    env["CENTURION_GATE_CACHE_TTL"] = "7200"
+    env["CENTURION_GATE_CACHE_MAX_ENTRIES"] = "3"
+    result = _run("check", "--level", "standard", str(repo), env=env)
+    assert result.returncode == 0, result.stderr
+
+    remaining = sorted(path.name for path in cache_dir.glob("*.json"))
+    assert "expired.json" not in remaining
+    assert len(remaining) == 3
+    # The two entries just written are the newest and survive.
+    assert sum(1 for name in remaining if not name.startswith("filler-")) == 2
+    assert "filler-4.json" in remaining
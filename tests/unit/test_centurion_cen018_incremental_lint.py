@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import subprocess
+
+CENTURION = Path("scripts/centurion.sh")
+
+
+def _run(*args: str, env: dict[str, str] | None = None) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        ["bash", str(CENTURION), *args],
+        text=True,
+        capture_output=True,
+        check=False,
+        env=env,
+    )
+
+
+def _must_git(repo: Path, *args: str) -> str:
+    proc = subprocess.run(["git", "-C", str(repo), *args], text=True, capture_output=True, check=False)
+    assert proc.returncode == 0, proc.stderr
+    return proc.stdout.strip()
+
+
+def _write(repo: Path, rel: str, content: str) -> None:
+    path = repo / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+
+
+def _setup(tmp_path: Path) -> tuple[Path, dict[str, str], Path, Path]:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _must_git(repo, "init", "-b", "main")
+    _must_git(repo, "config", "user.name", "Centurion Test")
+    _must_git(repo, "config", "user.email", "centurion@example.com")
+    _write(repo, "scripts/lib/common.sh", "helper() { echo hi; }\n")
+    _write(repo, "scripts/tool.sh", 'source "$SCRIPT_DIR/lib/common.sh"\nhelper\n')
+    _write(repo, "scripts/other.sh", "# source lib/common.sh is only mentioned here\necho other\n")
+    _write(repo, "scripts/unrelated.sh", "echo unrelated\n")
+    _must_git(repo, "add", ".")
+    _must_git(repo, "commit", "-m", "base")
+
+    # Stand-in shellcheck that records the files it was asked to check.
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    shellcheck_log = tmp_path / "shellcheck.log"
+    fake = bin_dir / "shellcheck"
+    fake.write_text(f'#!/usr/bin/env bash\nprintf "%s\\n" "$@" >> {shellcheck_log}\n', encoding="utf-8")
+    fake.chmod(0o755)
+
+    config_file = tmp_path / "agents.json"
+    config_file.write_text(json.dumps({"repos": {str(repo): {"timeout": 60}}}), encoding="utf-8")
+    history_file = tmp_path / "centurion-history.jsonl"
+
+    env = os.environ.copy()
+    env["PATH"] = f"{bin_dir}:{env['PATH']}"
+    env["CONFIG_FILE"] = str(config_file)
+    env["CENTURION_HISTORY_FILE"] = str(history_file)
+    env["CENTURION_RESULTS_DIR"] = str(tmp_path / "results")
+    env["CENTURION_GATE_CACHE"] = "false"
+    return repo, env, history_file, shellcheck_log
+
+
+def _branch(repo: Path, name: str, rel: str, content: str) -> None:
+    _must_git(repo, "checkout", "-b", name)
+    _write(repo, rel, content)
+    _must_git(repo, "add", ".")
+    _must_git(repo, "commit", "-m", f"change {rel}")
+    _must_git(repo, "checkout", "main")
+
+
+def _last_history(history_file: Path) -> dict[str, object]:
+    return json.loads(history_file.read_text(encoding="utf-8").strip().splitlines()[-1])
+
+
+def _linted(shellcheck_log: Path) -> list[str]:
+    return sorted(path.lstrip("./") for path in shellcheck_log.read_text(encoding="utf-8").split())
+
+
+def test_merge_lints_changed_files_and_their_sourcers(tmp_path: Path) -> None:
+    repo, env, history_file, shellcheck_log = _setup(tmp_path)
+    _branch(repo, "feature/lib", "scripts/lib/common.sh", "helper() { echo hello; }\n")
+
+    result = _run("merge", "--level", "quick", "feature/lib", str(repo), env=env)
+    assert result.returncode == 0, result.stderr
+    assert "Lint mode: incremental (2 files)" in result.stdout
+
+    assert _linted(shellcheck_log) == ["scripts/lib/common.sh", "scripts/tool.sh"]
+    payload = _last_history(history_file)
+    assert payload["status"] == "merged"
+    assert payload["lint_mode"] == "incremental"
+    assert payload["lint_files"] == 2
+
+
+def test_lint_config_change_falls_back_to_full_lint(tmp_path: Path) -> None:
+    repo, env, history_file, shellcheck_log = _setup(tmp_path)
+    _branch(repo, "feature/rc", ".shellcheckrc", "disable=SC1091\n")
+
+    result = _run("merge", "--level", "quick", "feature/rc", str(repo), env=env)
+    assert result.returncode == 0, result.stderr
+    assert "lint config changed: .shellcheckrc" in result.stdout
+
+    assert _linted(shellcheck_log) == [
+        "scripts/lib/common.sh",
+        "scripts/other.sh",
+        "scripts/tool.sh",
+        "scripts/unrelated.sh",
+    ]
+    payload = _last_history(history_file)
+    assert payload["lint_mode"] == "full"
+    assert payload["lint_files"] == 4
+
+
+def test_check_on_main_and_forced_full_mode_lint_everything(tmp_path: Path) -> None:
+    repo, env, history_file, shellcheck_log = _setup(tmp_path)
+
+    result = _run("check", "--level", "quick", str(repo), env=env)
+    assert result.returncode == 0, result.stderr
+    assert _last_history(history_file)["lint_mode"] == "full"
+
+    _must_git(repo, "checkout", "-b", "feature/wip")
+    _write(repo, "scripts/unrelated.sh", "echo still unrelated\n")
+    shellcheck_log.unlink()
+    result = _run("check", "--level", "quick", str(repo), env=env)
+    assert result.returncode == 0, result.stderr
+    assert _linted(shellcheck_log) == ["scripts/unrelated.sh"]
+    assert _last_history(history_file)["lint_files"] == 1
+
+    env["CENTURION_LINT_MODE"] = "full"
+    result = _run("check", "--level", "quick", str(repo), env=env)
+    assert result.returncode == 0, result.stderr
+    assert _last_history(history_file)["lint_mode"] == "full"
+    assert _last_history(history_file)["lint_files"] == 4
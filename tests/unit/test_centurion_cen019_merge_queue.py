@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import subprocess
+
+CENTURION = Path("scripts/centurion.sh")
+
+
+def _run(*args: str, env: dict[str, str] | None = None) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        ["bash", str(CENTURION), *args],
+        text=True,
+        capture_output=True,
+        check=False,
+        env=env,
+    )
+
+
+def _must_git(repo: Path, *args: str) -> str:
+    proc = subprocess.run(["git", "-C", str(repo), *args], text=True, capture_output=True, check=False)
+    assert proc.returncode == 0, proc.stderr
+    return proc.stdout.strip()
+
+
+def _setup(tmp_path: Path, branches: list[str]) -> tuple[Path, dict[str, str], Path, Path]:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _must_git(repo, "init", "-b", "main")
+    _must_git(repo, "config", "user.name", "Centurion Test")
+    _must_git(repo, "config", "user.email", "centurion@example.com")
+    (repo / "README.md").write_text("hello\n", encoding="utf-8")
+    _must_git(repo, "add", "README.md")
+    _must_git(repo, "commit", "-m", "base")
+    for name in branches:
+        _must_git(repo, "checkout", "-b", f"feature/{name}", "main")
+        (repo / f"{name}.txt").write_text(f"{name}\n", encoding="utf-8")
+        _must_git(repo, "add", f"{name}.txt")
+        _must_git(repo, "commit", "-m", f"add {name}")
+    _must_git(repo, "checkout", "main")
+
+    gate_log = tmp_path / "gate.log"
+    config_file = tmp_path / "agents.json"
+    config_file.write_text(
+        json.dumps(
+            {
+                "repos": {
+                    str(repo): {
+                        "timeout": 60,
+                        "lint_cmd": "true",
+                        "test_cmd": f"echo run >> {gate_log}; test ! -e broken.txt",
+                    }
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+    history_file = tmp_path / "centurion-history.jsonl"
+
+    env = os.environ.copy()
+    env["CONFIG_FILE"] = str(config_file)
+    env["CENTURION_HISTORY_FILE"] = str(history_file)
+    env["CENTURION_RESULTS_DIR"] = str(tmp_path / "results")
+    env["CENTURION_QUEUE_DIR"] = str(tmp_path / "queue")
+    env["CENTURION_QUEUE_AUTOSTART"] = "false"
+    env["CENTURION_GATE_CACHE"] = "false"
+    env["CENTURION_SKIP_TRUTHSAYER"] = "true"
+    env["CENTURION_WAKE_BIN"] = "/bin/true"
+    return repo, env, history_file, gate_log
+
+
+def _enqueue(repo: Path, env: dict[str, str], *names: str) -> None:
+    for name in names:
+        result = _run("queue", "add", f"feature/{name}", str(repo), env=env)
+        assert result.returncode == 0, result.stderr
+
+
+def _history(history_file: Path) -> dict[str, dict[str, object]]:
+    lines = history_file.read_text(encoding="utf-8").splitlines()
+    return {record["branch"]: record for record in map(json.loads, lines)}
+
+
+def test_queue_merges_a_batch_with_one_gate_run(tmp_path: Path) -> None:
+    repo, env, history_file, gate_log = _setup(tmp_path, ["one", "two", "three"])
+    _enqueue(repo, env, "one", "two", "three")
+
+    result = _run("queue", "run", "--batch", "4", str(repo), env=env)
+    assert result.returncode == 0, result.stderr
+
+    assert gate_log.read_text(encoding="utf-8").split() == ["run"]
+    for name in ("one", "two", "three"):
+        assert (repo / f"{name}.txt").exists()
+        record = json.loads((tmp_path / "results" / f"feature-{name}-centurion.json").read_text(encoding="utf-8"))
+        assert record["status"] == "merged"
+
+    history = _history(history_file)
+    assert [history[f"feature/{name}"]["queue"]["position"] for name in ("one", "two", "three")] == [1, 2, 3]
+    assert {history[f"feature/{name}"]["queue"]["batch_size"] for name in ("one", "two", "three")} == {3}
+    assert _must_git(repo, "rev-parse", "--abbrev-ref", "HEAD") == "main"
+
+    status = json.loads(_run("queue", "status", "--json", str(repo), env=env).stdout)
+    assert status["pending"] == []
+    assert status["worker_pid"] is None
+    assert status["merged_last_hour"] == 3
+
+
+def test_failing_batch_is_bisected_down_to_the_bad_branch(tmp_path: Path) -> None:
+    repo, env, history_file, gate_log = _setup(tmp_path, ["good", "broken", "late"])
+    _enqueue(repo, env, "good", "broken", "late")
+
+    result = _run("queue", "run", str(repo), env=env)
+    assert result.returncode == 0, result.stderr
+
+    history = _history(history_file)
+    assert history["feature/good"]["status"] == "merged"
+    assert history["feature/broken"]["status"] == "quality-failed"
+    assert history["feature/late"]["status"] == "merged"
+    assert (repo / "good.txt").exists()
+    assert (repo / "late.txt").exists()
+    assert not (repo / "broken.txt").exists()
+    # Whole batch, "good" alone, "broken"+"late", then each of those alone.
+    assert len(gate_log.read_text(encoding="utf-8").split()) == 5
+
+
+def test_queue_add_dedupes_and_remove_drops_entries(tmp_path: Path) -> None:
+    repo, env, _history_file, _gate_log = _setup(tmp_path, ["one", "two"])
+    _enqueue(repo, env, "one", "two")
+
+    again = _run("queue", "add", "feature/one", str(repo), env=env)
+    assert again.returncode == 0
+    assert "Already queued: feature/one" in again.stdout
+    missing = _run("queue", "add", "feature/nope", str(repo), env=env)
+    assert missing.returncode == 1
+
+    assert _run("queue", "remove", "feature/one", str(repo), env=env).returncode == 0
+    status = json.loads(_run("queue", "status", "--json", str(repo), env=env).stdout)
+    assert [entry["branch"] for entry in status["pending"]] == ["feature/two"]
+    assert status["pending"][0]["quality_level"] == "standard"
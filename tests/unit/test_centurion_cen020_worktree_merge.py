@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import subprocess
+
+CENTURION = Path("scripts/centurion.sh")
+
+
+def _run(*args: str, env: dict[str, str] | None = None) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        ["bash", str(CENTURION), *args],
+        text=True,
+        capture_output=True,
+        check=False,
+        env=env,
+    )
+
+
+def _must_git(repo: Path, *args: str) -> str:
+    proc = subprocess.run(["git", "-C", str(repo), *args], text=True, capture_output=True, check=False)
+    assert proc.returncode == 0, proc.stderr
+    return proc.stdout.strip()
+
+
+def _setup(tmp_path: Path, test_cmd: str) -> tuple[Path, dict[str, str], Path]:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _must_git(repo, "init", "-b", "main")
+    _must_git(repo, "config", "user.name", "Centurion Test")
+    _must_git(repo, "config", "user.email", "centurion@example.com")
+    (repo / "README.md").write_text("hello\n", encoding="utf-8")
+    _must_git(repo, "add", "README.md")
+    _must_git(repo, "commit", "-m", "base")
+    _must_git(repo, "checkout", "-b", "feature/done")
+    (repo / "feature.txt").write_text("feature\n", encoding="utf-8")
+    _must_git(repo, "add", "feature.txt")
+    _must_git(repo, "commit", "-m", "feature")
+
+    config_file = tmp_path / "agents.json"
+    config_file.write_text(
+        json.dumps({"repos": {str(repo): {"timeout": 60, "lint_cmd": "true", "test_cmd": test_cmd}}}),
+        encoding="utf-8",
+    )
+    env = os.environ.copy()
+    env["CONFIG_FILE"] = str(config_file)
+    env["CENTURION_HISTORY_FILE"] = str(tmp_path / "centurion-history.jsonl")
+    env["CENTURION_RESULTS_DIR"] = str(tmp_path / "results")
+    env["CENTURION_WORKTREE_ROOT"] = str(tmp_path / "worktrees")
+    env["CENTURION_GATE_CACHE"] = "false"
+    env["CENTURION_SKIP_TRUTHSAYER"] = "true"
+    env["CENTURION_WAKE_BIN"] = "/bin/true"
+    return repo, env, tmp_path / "results" / "feature-done-centurion.json"
+
+
+def test_merge_leaves_an_agent_checkout_alone(tmp_path: Path) -> None:
+    gate_dirs = tmp_path / "gate-dirs.log"
+    repo, env, result_file = _setup(tmp_path, f"pwd >> {gate_dirs}")
+    # An agent is mid-task in the repo checkout on another branch.
+    _must_git(repo, "checkout", "-b", "agent/wip", "main")
+    (repo / "README.md").write_text("half-written change\n", encoding="utf-8")
+
+    result = _run("merge", "feature/done", str(repo), env=env)
+    assert result.returncode == 0, result.stderr
+
+    assert _must_git(repo, "rev-parse", "--abbrev-ref", "HEAD") == "agent/wip"
+    assert (repo / "README.md").read_text(encoding="utf-8") == "half-written change\n"
+    assert not (repo / "feature.txt").exists()
+    assert _must_git(repo, "show", "main:feature.txt") == "feature"
+    assert json.loads(result_file.read_text(encoding="utf-8"))["status"] == "merged"
+    assert gate_dirs.read_text(encoding="utf-8").strip().startswith(str(tmp_path / "worktrees"))
+
+
+def test_failed_gate_leaves_main_and_checkout_untouched(tmp_path: Path) -> None:
+    repo, env, result_file = _setup(tmp_path, "exit 1")
+    _must_git(repo, "checkout", "main")
+    main_before = _must_git(repo, "rev-parse", "main")
+
+    result = _run("merge", "feature/done", str(repo), env=env)
+    assert result.returncode == 1
+
+    assert _must_git(repo, "rev-parse", "main") == main_before
+    assert _must_git(repo, "status", "--porcelain") == ""
+    assert json.loads(result_file.read_text(encoding="utf-8"))["status"] == "quality-failed"
+
+    # The pooled worktree is reused (and reset) by the next merge.
+    (tmp_path / "agents.json").write_text(
+        json.dumps({"repos": {str(repo): {"timeout": 60, "lint_cmd": "true", "test_cmd": "true"}}}),
+        encoding="utf-8",
+    )
+    result = _run("merge", "feature/done", str(repo), env=env)
+    assert result.returncode == 0, result.stderr
+    assert (repo / "feature.txt").exists(), "main checkout should be fast-forwarded"
+    assert _must_git(repo, "status", "--porcelain") == ""
+    assert len(list((tmp_path / "worktrees").iterdir())) == 1
+
+
+def test_dirty_main_checkout_is_refused(tmp_path: Path) -> None:
+    repo, env, result_file = _setup(tmp_path, "true")
+    _must_git(repo, "checkout", "main")
+    (repo / "README.md").write_text("uncommitted\n", encoding="utf-8")
+
+    result = _run("merge", "feature/done", str(repo), env=env)
+    assert result.returncode == 1
+    assert "working tree is dirty" in result.stderr
+    assert json.loads(result_file.read_text(encoding="utf-8"))["status"] == "dirty-worktree"
+
+
+def test_pool_prunes_worktrees_of_removed_repos_and_idle_entries(tmp_path: Path) -> None:
+    repo, env, _result_file = _setup(tmp_path, "true")
+    worktrees = tmp_path / "worktrees"
+    gone = tmp_path / "gone"
+    subprocess.run(["git", "clone", "-q", str(repo), str(gone)], check=True)
+    _must_git(gone, "worktree", "add", "-q", "--detach", str(worktrees / "gone-entry"), "HEAD")
+    subprocess.run(["rm", "-rf", str(gone)], check=True)
+    idle = tmp_path / "idle"
+    subprocess.run(["git", "clone", "-q", str(repo), str(idle)], check=True)
+    _must_git(idle, "worktree", "add", "-q", "--detach", str(worktrees / "idle-entry"), "HEAD")
+    os.utime(worktrees / "idle-entry", (1, 1))
+
+    env["CENTURION_WORKTREE_TTL"] = "3600"
+    result = _run("merge", "feature/done", str(repo), env=env)
+    assert result.returncode == 0, result.stderr
+
+    assert [path.name for path in worktrees.iterdir()] == [hashlib.sha256(str(repo).encode()).hexdigest()[:12]]
+    assert str(worktrees / "idle-entry") not in _must_git(idle, "worktree", "list")
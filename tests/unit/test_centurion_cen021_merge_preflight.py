@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import subprocess
+
+CENTURION = Path("scripts/centurion.sh")
+WORKSPACE = Path(__file__).resolve().parents[2]
+
+
+def _run(*args: str, env: dict[str, str] | None = None) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        ["bash", str(CENTURION), *args],
+        text=True,
+        capture_output=True,
+        check=False,
+        env=env,
+    )
+
+
+def _must_git(repo: Path, *args: str) -> str:
+    proc = subprocess.run(["git", "-C", str(repo), *args], text=True, capture_output=True, check=False)
+    assert proc.returncode == 0, proc.stderr
+    return proc.stdout.strip()
+
+
+def _commit(repo: Path, message: str, **files: str | None) -> None:
+    for name, content in files.items():
+        path = repo / f"{name}.txt"
+        if content is None:
+            _must_git(repo, "rm", "-q", path.name)
+        else:
+            path.write_text(content, encoding="utf-8")
+            _must_git(repo, "add", path.name)
+    _must_git(repo, "commit", "-m", message)
+
+
+def _setup(tmp_path: Path) -> tuple[Path, dict[str, str]]:
+    """main and feature/preflight both edit shared.txt; the feature also deletes
+    gone.txt, which main modifies (a conflict with a trivial strategy)."""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _must_git(repo, "init", "-b", "main")
+    _must_git(repo, "config", "user.name", "Centurion Test")
+    _must_git(repo, "config", "user.email", "centurion@example.com")
+    _commit(repo, "base", shared="base\n", gone="base\n")
+    _must_git(repo, "checkout", "-b", "feature/preflight")
+    _commit(repo, "feature", shared="feature\n", gone=None)
+    _must_git(repo, "checkout", "main")
+    _commit(repo, "main", shared="main\n", gone="main\n")
+
+    env = os.environ.copy()
+    env["CONFIG_FILE"] = str(tmp_path / "agents.json")
+    env["CENTURION_HISTORY_FILE"] = str(tmp_path / "centurion-history.jsonl")
+    env["CENTURION_RESULTS_DIR"] = str(tmp_path / "results")
+    env["CENTURION_WORKTREE_ROOT"] = str(tmp_path / "worktrees")
+    env["CENTURION_SENATE_INBOX_DIR"] = str(tmp_path / "senate-inbox")
+    env["CENTURION_SENATE_VERDICTS_DIR"] = str(tmp_path / "senate-verdicts")
+    env["CENTURION_GATE_CACHE"] = "false"
+    env["CENTURION_SKIP_TRUTHSAYER"] = "true"
+    env["CENTURION_WAKE_BIN"] = "/bin/true"
+    return repo, env
+
+
+def _preflight(repo: Path, target: str, source: str) -> tuple[int, dict]:
+    script = "\n".join(
+        [
+            "set -euo pipefail",
+            "source scripts/lib/centurion-conflicts.sh",
+            "rc=0",
+            f'merge_preflight "{repo}" "{target}" "{source}" || rc=$?',
+            'printf "%s\\n%s\\n" "$rc" "$MERGE_PREFLIGHT_LAST_JSON"',
+        ]
+    )
+    proc = subprocess.run(["bash", "-c", script], cwd=WORKSPACE, text=True, capture_output=True, check=False)
+    assert proc.returncode == 0, proc.stderr
+    rc, payload = proc.stdout.split("\n", 1)
+    return int(rc), json.loads(payload)
+
+
+def test_preflight_predicts_conflicts_and_strategies_without_a_checkout(tmp_path: Path) -> None:
+    repo, _env = _setup(tmp_path)
+    index_before = (repo / ".git" / "index").read_bytes()
+
+    rc, payload = _preflight(repo, "main", "feature/preflight")
+
+    assert rc == 1
+    assert payload["status"] == "conflict"
+    assert payload["conflict_count"] == 2
+    assert payload["auto_resolvable"] is False
+    conflicts = {entry["file"]: entry for entry in payload["conflicts"]}
+    assert conflicts["gone.txt"]["strategy"] == "ours"
+    assert conflicts["gone.txt"]["stages"]["theirs"] is None
+    assert conflicts["shared.txt"]["strategy"] is None
+    assert conflicts["shared.txt"]["marker_lines"] == [1, 3, 5]
+    assert conflicts["shared.txt"]["preview"].startswith("<<<<<<<")
+
+    assert _must_git(repo, "rev-parse", "--abbrev-ref", "HEAD") == "main"
+    assert _must_git(repo, "status", "--porcelain") == ""
+    assert (repo / ".git" / "index").read_bytes() == index_before
+
+
+def test_preflight_tree_matches_a_clean_merge(tmp_path: Path) -> None:
+    repo, _env = _setup(tmp_path)
+    _must_git(repo, "checkout", "-b", "feature/clean", "main~1")
+    _commit(repo, "clean", extra="extra\n")
+    _must_git(repo, "checkout", "main")
+
+    rc, payload = _preflight(repo, "main", "feature/clean")
+    assert rc == 0
+    assert payload["status"] == "clean"
+    assert payload["conflicts"] == []
+
+    _must_git(repo, "merge", "--no-ff", "-m", "merge", "feature/clean")
+    assert payload["tree"] == _must_git(repo, "rev-parse", "HEAD^{tree}")
+
+
+def test_merge_rejects_unresolvable_conflict_before_creating_a_worktree(tmp_path: Path) -> None:
+    repo, env = _setup(tmp_path)
+    main_before = _must_git(repo, "rev-parse", "main")
+
+    result = _run("merge", "feature/preflight", str(repo), env=env)
+    assert result.returncode == 1
+    assert "Merge conflict" in result.stderr
+
+    assert not (tmp_path / "worktrees").exists()
+    assert _must_git(repo, "rev-parse", "main") == main_before
+    payload = json.loads((tmp_path / "results" / "feature-preflight-centurion.json").read_text(encoding="utf-8"))
+    assert payload["status"] == "conflict"
+    extra = payload["extra"]
+    assert extra["preflight"]["conflict_count"] == 2
+    assert extra["conflict_report"]["conflicts"][1]["file"] == "shared.txt"
+    assert extra["auto_resolution"]["unresolved"] == [{"file": "shared.txt", "reason": "no_trivial_strategy"}]
+    assert extra["senate_escalation"]["status"] == "pending"
+    history = json.loads((tmp_path / "centurion-history.jsonl").read_text(encoding="utf-8").splitlines()[-1])
+    assert history["checks"].startswith("preflight,")
+
+
+def test_check_fails_fast_when_branch_conflicts_with_main(tmp_path: Path) -> None:
+    repo, env = _setup(tmp_path)
+    _must_git(repo, "checkout", "feature/preflight")
+
+    result = _run("check", str(repo), env=env)
+    assert result.returncode == 1
+    assert "Merge preflight failed" in result.stderr
+    assert "shared.txt" in result.stderr
+
+    env["CENTURION_MERGE_PREFLIGHT"] = "false"
+    assert _run("check", str(repo), env=env).returncode == 0
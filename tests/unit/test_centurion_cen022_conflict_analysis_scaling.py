@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import subprocess
+import time
+
+WORKSPACE = Path(__file__).resolve().parents[2]
+FILES = 1000
+# The per-file jq accumulation took over a minute for this merge; the
+# single-pass pipelines take well under a second.
+BUDGET_SECONDS = 10.0
+
+
+def _must_git(repo: Path, *args: str) -> str:
+    proc = subprocess.run(["git", "-C", str(repo), *args], text=True, capture_output=True, check=False)
+    assert proc.returncode == 0, proc.stderr
+    return proc.stdout.strip()
+
+
+def _write_all(repo: Path, label: str, indexes: range) -> None:
+    for i in indexes:
+        (repo / "src" / f"f{i:04d}.txt").write_text(f"line\n{label} {i}\nline\n", encoding="utf-8")
+
+
+def _setup(tmp_path: Path) -> Path:
+    """A merge of feature/wide into main that leaves FILES conflicted paths:
+    the first half edited on both sides (no trivial strategy), the second half
+    deleted on the feature and edited on main (resolves to ours)."""
+    repo = tmp_path / "repo"
+    (repo / "src").mkdir(parents=True)
+    _must_git(repo, "init", "-b", "main")
+    _must_git(repo, "config", "user.name", "Centurion Test")
+    _must_git(repo, "config", "user.email", "centurion@example.com")
+    _write_all(repo, "base", range(FILES))
+    (repo / "tests").mkdir()
+    (repo / "tests" / "test_wide.py").write_text("def test_wide():\n    assert True\n", encoding="utf-8")
+    _must_git(repo, "add", "-A")
+    _must_git(repo, "commit", "-q", "-m", "base")
+
+    _must_git(repo, "checkout", "-q", "-b", "feature/wide")
+    _write_all(repo, "feature", range(FILES // 2))
+    for i in range(FILES // 2, FILES):
+        (repo / "src" / f"f{i:04d}.txt").unlink()
+    (repo / "tests" / "test_wide.py").write_text("def test_wide():\n    pass\n", encoding="utf-8")
+    _must_git(repo, "add", "-A")
+    _must_git(repo, "commit", "-q", "-m", "feature")
+
+    _must_git(repo, "checkout", "-q", "main")
+    _write_all(repo, "main", range(FILES))
+    _must_git(repo, "commit", "-q", "-a", "-m", "main")
+    merge = subprocess.run(["git", "-C", str(repo), "merge", "-q", "feature/wide"], capture_output=True, check=False)
+    assert merge.returncode != 0
+    return repo
+
+
+def _timed(lib_calls: list[str]) -> tuple[float, list[str]]:
+    script = "\n".join(["set -euo pipefail", f"WORKSPACE_ROOT={WORKSPACE}", *lib_calls])
+    started = time.monotonic()
+    proc = subprocess.run(["bash", "-c", script], cwd=WORKSPACE, text=True, capture_output=True, check=False)
+    elapsed = time.monotonic() - started
+    assert proc.returncode == 0, proc.stderr
+    return elapsed, proc.stdout.splitlines()
+
+
+def test_thousand_file_conflict_report_and_auto_resolution(tmp_path: Path) -> None:
+    repo = _setup(tmp_path)
+
+    elapsed, lines = _timed(
+        [
+            "source scripts/lib/centurion-conflicts.sh",
+            f'collect_conflict_report "{repo}"',
+            "rc=0",
+            f'auto_resolve_trivial_conflicts "{repo}" || rc=$?',
+            'printf "%s\\n%s\\n" "$rc" "$AUTO_RESOLUTION_LAST_JSON"',
+        ]
+    )
+    assert elapsed < BUDGET_SECONDS
+
+    report = json.loads(lines[0])
+    assert report["conflict_count"] == FILES
+    first = report["conflicts"][0]
+    assert first["file"] == "src/f0000.txt"
+    assert first["marker_lines"] == [2, 4, 6]
+    assert first["preview"] == "line\n<<<<<<< HEAD\nmain 0\n=======\nfeature 0\n>>>>>>> feature/wide\nline"
+    assert report["conflicts"][-1] == {"file": "src/f0999.txt", "marker_lines": [], "preview": ""}
+
+    assert lines[1] == "1"
+    resolution = json.loads(lines[2])
+    assert resolution["resolved_count"] == FILES // 2
+    assert resolution["unresolved_count"] == FILES // 2
+    assert resolution["resolved"][0] == {"file": "src/f0500.txt", "strategy": "ours"}
+    assert resolution["unresolved"][0] == {"file": "src/f0000.txt", "reason": "no_trivial_strategy"}
+    unmerged = _must_git(repo, "diff", "--name-only", "--diff-filter=U").splitlines()
+    assert len(unmerged) == FILES // 2
+
+
+def test_thousand_file_senate_verdict_and_diff_analysis(tmp_path: Path) -> None:
+    repo = _setup(tmp_path)
+    verdict = tmp_path / "verdict.json"
+    verdict.write_text(
+        json.dumps({"resolution": {"mode": "ours", "files": [{"path": "src/f0001.txt", "strategy": "theirs"}]}}),
+        encoding="utf-8",
+    )
+
+    elapsed, lines = _timed(
+        [
+            "source scripts/lib/centurion-conflicts.sh",
+            "source scripts/lib/centurion-senate.sh",
+            "source scripts/lib/centurion-semantic.sh",
+            f'semantic_build_diff_analysis "{repo}" main feature/wide',
+            'printf "%s\\n" "$SEMANTIC_DIFF_ANALYSIS_JSON"',
+            f'semantic_detect_test_gaming "{repo}" main feature/wide',
+            'printf "%s\\n" "$SEMANTIC_GAMING_FLAGS_JSON"',
+            "rc=0",
+            f'apply_senate_verdict "{repo}" "{verdict}" || rc=$?',
+            'printf "%s\\n%s\\n" "$rc" "$SENATE_RESOLUTION_LAST_JSON"',
+        ]
+    )
+    assert elapsed < BUDGET_SECONDS
+
+    analysis = json.loads(lines[0])
+    assert analysis["files_total"] == FILES + 1
+    assert analysis["tests_changed"] == 1
+    assert analysis["added_lines"] == FILES // 2 + 1
+    assert analysis["removed_lines"] == FILES // 2 * 3 + FILES // 2 + 1
+    assert json.loads(lines[1]) == ["test.assertions_removed"]
+
+    assert lines[2] == "0"
+    resolution = json.loads(lines[3])
+    assert resolution["status"] == "applied"
+    assert resolution["mode"] == "ours"
+    assert resolution["resolved_count"] == FILES
+    assert resolution["unresolved_count"] == 0
+    assert resolution["resolved"][1] == {"file": "src/f0001.txt", "strategy": "theirs"}
+    assert (repo / "src" / "f0001.txt").read_text(encoding="utf-8") == "line\nfeature 1\nline\n"
+    assert _must_git(repo, "log", "-1", "--format=%P").count(" ") == 1
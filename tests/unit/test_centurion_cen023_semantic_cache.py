@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import subprocess
+
+WORKSPACE = Path(__file__).resolve().parents[2]
+
+
+def _must_git(repo: Path, *args: str) -> str:
+    proc = subprocess.run(["git", "-C", str(repo), *args], text=True, capture_output=True, check=False)
+    assert proc.returncode == 0, proc.stderr
+    return proc.stdout.strip()
+
+
+def _setup(tmp_path: Path) -> tuple[Path, dict[str, str]]:
+    """feature/semantic changes app.py and its test; the review command counts
+    its calls in calls.log and passes the change."""
+    repo = tmp_path / "repo"
+    (repo / "tests").mkdir(parents=True)
+    _must_git(repo, "init", "-b", "main")
+    _must_git(repo, "config", "user.name", "Centurion Test")
+    _must_git(repo, "config", "user.email", "centurion@example.com")
+    (repo / "app.py").write_text("def add(a, b):\n    return a + b\n", encoding="utf-8")
+    (repo / "tests" / "test_app.py").write_text("def test_add():\n    assert 1 + 2 == 3\n", encoding="utf-8")
+    _must_git(repo, "add", "-A")
+    _must_git(repo, "commit", "-m", "base")
+    _must_git(repo, "checkout", "-b", "feature/semantic")
+    (repo / "app.py").write_text("def add(a, b):\n    return b + a\n", encoding="utf-8")
+    (repo / "tests" / "test_app.py").write_text("def test_add():\n    assert 2 + 1 == 3\n", encoding="utf-8")
+    _must_git(repo, "commit", "-a", "-m", "feature")
+    _must_git(repo, "checkout", "main")
+
+    env = os.environ.copy()
+    env["CENTURION_SEMANTIC_CACHE_DIR"] = str(tmp_path / "semantic-cache")
+    env["CENTURION_SEMANTIC_REVIEW_CMD"] = (
+        f"echo call >> '{tmp_path / 'calls.log'}'; "
+        "printf '{\"verdict\":\"pass\",\"summary\":\"looks good\",\"flags\":[\"semantic.ok\"]}'"
+    )
+    return repo, env
+
+
+def _review(repo: Path, env: dict[str, str]) -> tuple[int, dict]:
+    script = "\n".join(
+        [
+            "set -euo pipefail",
+            f'WORKSPACE_ROOT="{WORKSPACE}"',
+            "source scripts/lib/common.sh",
+            "source scripts/lib/config.sh",
+            "source scripts/lib/centurion-semantic.sh",
+            "rc=0",
+            f'run_semantic_review "{repo}" "feature/semantic" "main" || rc=$?',
+            'printf "%s\\n%s\\n" "$rc" "$SEMANTIC_REVIEW_LAST_JSON"',
+        ]
+    )
+    proc = subprocess.run(["bash", "-c", script], cwd=WORKSPACE, text=True, capture_output=True, check=False, env=env)
+    assert proc.returncode == 0, proc.stderr
+    rc, payload = proc.stdout.split("\n", 1)
+    return int(rc), json.loads(payload)
+
+
+def _calls(tmp_path: Path) -> int:
+    log = tmp_path / "calls.log"
+    return len(log.read_text(encoding="utf-8").splitlines()) if log.exists() else 0
+
+
+def test_identical_diff_reuses_the_cached_verdict(tmp_path: Path) -> None:
+    repo, env = _setup(tmp_path)
+
+    rc, first = _review(repo, env)
+    assert rc == 0
+    assert first["cached"] is False
+    assert _calls(tmp_path) == 1
+
+    # A new commit with the same diff still hits.
+    _must_git(repo, "checkout", "-q", "feature/semantic")
+    _must_git(repo, "commit", "--amend", "-q", "-m", "feature, reworded")
+    _must_git(repo, "checkout", "-q", "main")
+    rc, second = _review(repo, env)
+    assert rc == 0
+    assert _calls(tmp_path) == 1
+    assert second["cached"] is True
+    assert second["reviewed_at"] == first["reviewed_at"]
+    assert second["verdict"] == "pass"
+    assert second["flags"] == ["semantic.ok"]
+    assert second["diff_analysis"] == first["diff_analysis"]
+
+    env["CENTURION_SEMANTIC_CACHE_REFRESH"] = "true"
+    _rc, forced = _review(repo, env)
+    assert forced["cached"] is False
+    assert _calls(tmp_path) == 2
+
+
+def test_diff_prompt_or_reviewer_change_misses(tmp_path: Path) -> None:
+    repo, env = _setup(tmp_path)
+    _review(repo, env)
+
+    prompt = tmp_path / "prompt.md"
+    prompt.write_text("Review this change.\n", encoding="utf-8")
+    env["CENTURION_SEMANTIC_PROMPT_FILE"] = str(prompt)
+    assert _review(repo, env)[1]["cached"] is False
+    assert _calls(tmp_path) == 2
+
+    env["CENTURION_SEMANTIC_REVIEW_CMD"] += " # other model"
+    assert _review(repo, env)[1]["cached"] is False
+    assert _calls(tmp_path) == 3
+
+    _must_git(repo, "checkout", "-q", "feature/semantic")
+    (repo / "app.py").write_text("def add(a, b):\n    return a + b + 0\n", encoding="utf-8")
+    _must_git(repo, "commit", "-q", "-a", "-m", "more")
+    _must_git(repo, "checkout", "-q", "main")
+    assert _review(repo, env)[1]["cached"] is False
+    assert _calls(tmp_path) == 4
+    assert _review(repo, env)[1]["cached"] is True
+    assert _calls(tmp_path) == 4
+
+
+def test_invalid_output_is_not_cached_and_entries_expire(tmp_path: Path) -> None:
+    repo, env = _setup(tmp_path)
+    cache_dir = tmp_path / "semantic-cache"
+
+    invalid = dict(env, CENTURION_SEMANTIC_REVIEW_CMD="printf 'not-json'")
+    rc, payload = _review(repo, invalid)
+    assert rc == 2
+    assert payload["cached"] is False
+    assert not cache_dir.exists() or not list(cache_dir.glob("*.json"))
+
+    _review(repo, env)
+    entries = list(cache_dir.glob("*.json"))
+    assert len(entries) == 1
+    entry = json.loads(entries[0].read_text(encoding="utf-8"))
+    entry["cached_epoch"] -= 3600
+    entries[0].write_text(json.dumps(entry), encoding="utf-8")
+
+    env["CENTURION_SEMANTIC_CACHE_TTL"] = "60"
+    assert _review(repo, env)[1]["cached"] is False
+    assert _calls(tmp_path) == 2
+
+    env["CENTURION_SEMANTIC_CACHE_MAX_ENTRIES"] = "1"
+    env["CENTURION_SEMANTIC_REVIEW_CMD"] += " # other model"
+    _review(repo, env)
+    assert len(list(cache_dir.glob("*.json"))) == 1
+
+    env["CENTURION_SEMANTIC_CACHE"] = "false"
+    assert _review(repo, env)[1]["cached"] is False
+    assert _calls(tmp_path) == 4
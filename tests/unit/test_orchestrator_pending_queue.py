@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import subprocess
+
+import pytest
+
+WORKSPACE = Path(__file__).resolve().parents[2]
+
+
+def _setup(tmp_path: Path, plans: dict[str, int]) -> dict[str, str]:
+    """One pending plan per id (at the given priority) and a fake dispatch.sh
+    that records "<bead> <agent>" in dispatch.log. A bead listed in fail-once
+    fails its first dispatch."""
+    plans_dir = tmp_path / "state" / "plans"
+    plans_dir.mkdir(parents=True)
+    for bead, priority in plans.items():
+        plan = {"id": bead, "title": f"Implement {bead}", "priority": priority, "status": "pending"}
+        (plans_dir / f"{bead}.json").write_text(json.dumps(plan), encoding="utf-8")
+
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    dispatch = bin_dir / "dispatch.sh"
+    dispatch.write_text(
+        "#!/usr/bin/env bash\n"
+        f"if grep -qx \"$1\" '{tmp_path / 'fail-once'}' 2>/dev/null; then\n"
+        f"    sed -i \"/^$1\\$/d\" '{tmp_path / 'fail-once'}'\n"
+        "    exit 1\n"
+        "fi\n"
+        f"echo \"$1 $3\" >> '{tmp_path / 'dispatch.log'}'\n",
+        encoding="utf-8",
+    )
+    dispatch.chmod(0o755)
+
+    env = os.environ.copy()
+    env.update(
+        {
+            "ORCH_MAX_AGENTS": "2",
+            "ORCH_MAX_HOURS": "1",
+            "ORCH_MAX_TASKS": "20",
+            "ORCH_AUTO_APPROVE": "true",
+            "ORCH_CONFLICT_FORECAST": "false",
+            "ORCH_POLICY": "priority",
+            "ORCH_WAKE_INTERVAL": "1",
+        }
+    )
+    return env
+
+
+def _orchestrator(tmp_path: Path, env: dict[str, str], *body: str) -> subprocess.CompletedProcess[str]:
+    """Source the orchestrator libraries against tmp_path/state, point dispatch
+    at the fake one, then run body."""
+    state = tmp_path / "state"
+    script = "\n".join(
+        [
+            "set -euo pipefail",
+            f'SCRIPT_DIR="{WORKSPACE / "scripts"}"',
+            f'WORKSPACE_ROOT="{WORKSPACE}"',
+            f'STATE_DIR="{state}"',
+            'RUNS_DIR="$STATE_DIR/runs"',
+            'RESULTS_DIR="$STATE_DIR/results"',
+            'PLANS_DIR="$STATE_DIR/plans"',
+            'CALIBRATION_DIR="$STATE_DIR/calibration"',
+            'LOG_FILE="$STATE_DIR/orchestrator-log.jsonl"',
+            'STOP_SENTINEL="$STATE_DIR/orchestrator-stop"',
+            'source "$SCRIPT_DIR/orchestrator/common.sh"',
+            'source "$SCRIPT_DIR/orchestrator/calibration.sh"',
+            'source "$SCRIPT_DIR/orchestrator/pending.sh"',
+            'source "$SCRIPT_DIR/orchestrator/policy.sh"',
+            'source "$SCRIPT_DIR/orchestrator/scheduler.sh"',
+            'source "$SCRIPT_DIR/orchestrator/passes.sh"',
+            'source "$SCRIPT_DIR/orchestrator/commands.sh"',
+            'source "$SCRIPT_DIR/orchestrator/run.sh"',
+            f'SCRIPT_DIR="{tmp_path / "bin"}"',
+            *body,
+        ]
+    )
+    proc = subprocess.run(
+        ["bash", "-c", script], cwd=WORKSPACE, text=True, capture_output=True, check=False, env=env, timeout=120
+    )
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    return proc
+
+
+def _events(tmp_path: Path, event: str) -> list[dict]:
+    log = tmp_path / "state" / "orchestrator-log.jsonl"
+    rows = [json.loads(line) for line in log.read_text(encoding="utf-8").splitlines() if line.strip()]
+    return [row for row in rows if row["event"] == event]
+
+
+def _dispatched(tmp_path: Path) -> list[str]:
+    log = tmp_path / "dispatch.log"
+    return [line.split()[0] for line in log.read_text(encoding="utf-8").splitlines()] if log.exists() else []
+
+
+def test_pop_takes_each_item_once_until_released(tmp_path: Path) -> None:
+    env = _setup(tmp_path, {"bd-low": 3, "bd-high": 0, "bd-mid": 1})
+    proc = _orchestrator(
+        tmp_path,
+        env,
+        'show() { local row ids=(); for row in "${PENDING_BATCH[@]}"; do ids+=("${row%%$\'\\x1f\'*}"); done; '
+        'echo "${ids[*]} | $PENDING_REMAINING"; }',
+        "pop_pending_beads 2; show",
+        'first="${PENDING_BATCH[0]}"',
+        "pop_pending_beads 2; show",
+        "pop_pending_beads 2; show",
+        'release_pending_bead "$first"',
+        "pop_pending_beads 5; show",
+    )
+    assert proc.stdout.splitlines() == [
+        "bd-high bd-mid | 1",
+        "bd-low | 0",
+        " | 0",
+        "bd-high | 0",
+    ]
+
+
+@pytest.mark.parametrize("scheduler", ["slots", "interval"])
+def test_every_item_is_dispatched_once_and_a_failed_dispatch_is_retried(tmp_path: Path, scheduler: str) -> None:
+    env = _setup(tmp_path, {"bd-a": 0, "bd-b": 1, "bd-c": 2})
+    env["ORCH_SCHEDULER"] = scheduler
+    (tmp_path / "fail-once").write_text("bd-b\n", encoding="utf-8")
+    if scheduler == "interval":
+        # The interval scheduler sleeps 15s between dispatches.
+        env["PATH"] = f"{tmp_path / 'fastbin'}:{env['PATH']}"
+        (tmp_path / "fastbin").mkdir()
+        (tmp_path / "fastbin" / "sleep").write_text("#!/bin/sh\nexit 0\n", encoding="utf-8")
+        (tmp_path / "fastbin" / "sleep").chmod(0o755)
+
+    _orchestrator(tmp_path, env, f'orchestrate_run --repo "{tmp_path}"')
+
+    if scheduler == "slots":
+        # Back on the queue after the pass, so bd-c fills the slot first.
+        assert _dispatched(tmp_path) == ["bd-a", "bd-c", "bd-b"]
+    else:
+        assert _dispatched(tmp_path) == ["bd-a", "bd-b", "bd-c"]
+    assert [row["bead"] for row in _events(tmp_path, "dispatch_failed")] == ["bd-b"]
+    stop = _events(tmp_path, "orchestrator_stop")
+    assert [row["reason"] for row in stop] == ["no_work"]
+    assert stop[0]["tasks_completed"] == "3"
+
+
+def test_slots_fill_only_the_free_slots_each_pass(tmp_path: Path) -> None:
+    env = _setup(tmp_path, {"bd-a": 0, "bd-b": 1, "bd-c": 2})
+    env.update(ORCH_SCHEDULER="slots", ORCH_MAX_TASKS="2")
+
+    proc = _orchestrator(
+        tmp_path,
+        env,
+        # One of the two slots stays busy, so each pass dispatches one item.
+        "count_active_agents() { echo 1; }",
+        f'orchestrate_run --repo "{tmp_path}"',
+    )
+
+    progress = [line.split("] ", 1)[1] for line in proc.stdout.splitlines() if "| Pending:" in line]
+    assert progress == ["Active: 1 | Pending: 3 | Completed: 0", "Active: 1 | Pending: 2 | Completed: 1"]
+    assert _dispatched(tmp_path) == ["bd-a", "bd-b"]
+    assert [row["reason"] for row in _events(tmp_path, "orchestrator_stop")] == ["max_tasks"]
+
+
+@pytest.mark.parametrize("scheduler", ["slots", "interval"])
+def test_calibration_skip_releases_the_item_and_stops_with_its_own_reason(tmp_path: Path, scheduler: str) -> None:
+    env = _setup(tmp_path, {"bd-a": 0, "bd-b": 1, "bd-c": 2})
+    env["ORCH_SCHEDULER"] = scheduler
+
+    proc = _orchestrator(
+        tmp_path,
+        env,
+        "should_skip_category() { return 0; }",
+        f'orchestrate_run --repo "{tmp_path}"',
+        "pop_pending_beads 5",
+        'echo "left: ${#PENDING_BATCH[@]}"',
+    )
+
+    assert _dispatched(tmp_path) == []
+    # The verdict covers the category, so one skip ends the pass.
+    assert [row["bead"] for row in _events(tmp_path, "bead_skipped")] == ["bd-a"]
+    stop = _events(tmp_path, "orchestrator_stop")
+    assert [row["reason"] for row in stop] == ["calibration_skip"]
+    assert stop[0]["pending"] == "3"
+    if scheduler == "slots":
+        assert "left: 3" in proc.stdout